@@ -0,0 +1,5 @@
+"""性能基准脚本
+
+需要本地服务（Neo4j等）的基准以 `python -m benchmarks.<name>` 在 backend 目录下运行，
+不参与 pytest 收集。
+"""
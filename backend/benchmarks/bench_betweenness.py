@@ -0,0 +1,100 @@
+"""采样 Brandes 中介中心性基准：误差与耗时
+
+在合成的无向图（度数近似幂律分布）上先做精确计算，再按不同 sampling_size 采样，
+每个采样规模换多个 sampling_seed 统计：
+
+- time: 单进程耗时
+- rel_err: 所有节点 |估计 - 精确| 之和 / 精确分数之和
+- top_err: 精确排名前 10 的节点的最大相对误差
+- top10: 估计的前 10 名与精确前 10 名的重合数
+
+另外给出用工作进程池（共享内存传递邻接数组）跑精确计算的耗时。不需要 Neo4j。
+用法（在 backend 目录下）::
+
+    python -m benchmarks.bench_betweenness --nodes 2000 --edges 6000 --workers 4
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+import time
+
+import numpy as np
+
+from src.config import settings
+from src.domain.services.analysis.betweenness import (
+    betweenness,
+    betweenness_partial,
+    sample_sources,
+    scale_scores,
+    undirected_csr,
+)
+from src.infrastructure.compute import call_with_shared, run_in_worker, share_arrays, shutdown_worker_pool
+
+
+def _synthetic_graph(n_nodes: int, n_edges: int, seed: int) -> tuple[np.ndarray, np.ndarray]:
+    rng = random.Random(seed)
+    edges = np.array([
+        (rng.randrange(n_nodes), min(int(rng.paretovariate(1.2)) - 1, n_nodes - 1))
+        for _ in range(n_edges)
+    ])
+    return undirected_csr(edges[:, 0], edges[:, 1], n_nodes)
+
+
+async def _parallel_exact(indptr: np.ndarray, indices: np.ndarray, workers: int) -> np.ndarray:
+    sources = sample_sources(len(indptr) - 1)
+    with share_arrays(indptr, indices) as handles:
+        partials = await asyncio.gather(*(
+            run_in_worker(call_with_shared, betweenness_partial, handles, chunk)
+            for chunk in np.array_split(sources, workers * 4)
+        ))
+    return scale_scores(np.sum(partials, axis=0), len(indptr) - 1, len(sources))
+
+
+def main(n_nodes: int, n_edges: int, seed: int, seeds: int, workers: int) -> None:
+    indptr, indices = _synthetic_graph(n_nodes, n_edges, seed)
+
+    start = time.perf_counter()
+    exact = betweenness(indptr, indices)
+    print(f"{'exact':>8}: {(time.perf_counter() - start) * 1000:9.1f}ms")
+    top = np.argsort(-exact)[:10]
+
+    if workers > 0:
+        settings.graph_compute_workers = workers
+        try:
+            start = time.perf_counter()
+            parallel = asyncio.run(_parallel_exact(indptr, indices, workers))
+            elapsed = time.perf_counter() - start
+        finally:
+            shutdown_worker_pool()
+        assert np.allclose(parallel, exact)
+        print(f"{f'{workers}procs':>8}: {elapsed * 1000:9.1f}ms  (含进程启动)")
+
+    print(f"{'k':>8}  {'time':>9}  {'rel_err':>8}  {'top_err':>8}  {'top10':>5}")
+    for fraction in (0.01, 0.05, 0.1, 0.25, 0.5):
+        k = max(int(n_nodes * fraction), 1)
+        timings, rel_errors, top_errors, overlaps = [], [], [], []
+        for sampling_seed in range(seeds):
+            start = time.perf_counter()
+            sampled = betweenness(indptr, indices, sampling_size=k, sampling_seed=sampling_seed)
+            timings.append(time.perf_counter() - start)
+            rel_errors.append(np.abs(sampled - exact).sum() / exact.sum())
+            top_errors.append((np.abs(sampled[top] - exact[top]) / exact[top]).max())
+            overlaps.append(len(set(np.argsort(-sampled)[:10].tolist()) & set(top.tolist())))
+        print(
+            f"{k:>8}  {np.mean(timings) * 1000:7.1f}ms  {np.mean(rel_errors):8.3f}  "
+            f"{np.mean(top_errors):8.3f}  {np.mean(overlaps):5.1f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--nodes", type=int, default=2000)
+    parser.add_argument("--edges", type=int, default=6000)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--seeds", type=int, default=5, help="每个采样规模重复的 sampling_seed 数")
+    parser.add_argument("--workers", type=int, default=2, help="并行精确计算的进程数，0 跳过")
+    args = parser.parse_args()
+    main(args.nodes, args.edges, args.seed, args.seeds, args.workers)
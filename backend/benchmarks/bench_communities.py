@@ -0,0 +1,88 @@
+"""进程内社区发现扩展性基准：Louvain / 标签传播
+
+在合成的社区结构图上（每个社区 100 个节点，10% 的关系随机连到其它社区）按关系数
+逐级放大，对每个规模报告：
+
+- single: 单进程直接调用的耗时、社区数和模块度
+- pool: 通过工作进程池并行计算 --projects 个同规模项目的总耗时（含数组 pickle 传输），
+  对比同样数量的项目依次单进程计算
+
+单进程耗时与 CPU 核数无关；pool 一栏的加速比取决于可用核数。不需要 Neo4j。
+用法（在 backend 目录下）::
+
+    python -m benchmarks.bench_communities --max-edges 1000000 --workers 4 --projects 4
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+
+import numpy as np
+
+from src.config import settings
+from src.domain.services.analysis.community import detect_communities, modularity, symmetric_edges
+from src.infrastructure.compute import run_in_worker, shutdown_worker_pool
+
+ALGORITHMS = ("louvain", "label_propagation")
+
+
+def _synthetic_graph(n_edges: int, seed: int) -> tuple[np.ndarray, np.ndarray, int]:
+    rng = np.random.default_rng(seed)
+    n_nodes = max(n_edges // 5, 100)
+    groups = n_nodes // 100
+    group = rng.integers(0, groups, n_edges)
+    source = group * 100 + rng.integers(0, 100, n_edges)
+    target = group * 100 + rng.integers(0, 100, n_edges)
+    noise = rng.random(n_edges) < 0.1
+    target[noise] = rng.integers(0, n_nodes, int(noise.sum()))
+    return source, target, n_nodes
+
+
+async def _run_projects(algorithm: str, graphs: list[tuple[np.ndarray, np.ndarray, int]]) -> None:
+    await asyncio.gather(*(
+        run_in_worker(detect_communities, algorithm, source, target, n_nodes)
+        for source, target, n_nodes in graphs
+    ))
+
+
+def main(max_edges: int, seed: int, workers: int, projects: int) -> None:
+    sizes = [size for size in (10_000, 100_000, 1_000_000, 10_000_000) if size <= max_edges]
+    print(f"{'edges':>9}  {'algorithm':>17}  {'single':>9}  {'communities':>11}  {'Q':>6}  "
+          f"{f'{projects}x seq':>9}  {f'{projects}x pool':>9}")
+    for n_edges in sizes:
+        source, target, n_nodes = _synthetic_graph(n_edges, seed)
+        rows, cols, weights = symmetric_edges(source, target)
+        graphs = [_synthetic_graph(n_edges, seed + i) for i in range(projects)]
+        for algorithm in ALGORITHMS:
+            start = time.perf_counter()
+            labels = detect_communities(algorithm, source, target, n_nodes)
+            single = time.perf_counter() - start
+            quality = modularity(rows, cols, weights, labels)
+
+            pooled = ""
+            sequential = ""
+            if workers > 0 and projects > 0:
+                sequential = f"{single * projects * 1000:7.0f}ms"
+                settings.graph_compute_workers = workers
+                try:
+                    # 先启动进程，计时不含进程启动
+                    asyncio.run(_run_projects(algorithm, graphs[:1]))
+                    start = time.perf_counter()
+                    asyncio.run(_run_projects(algorithm, graphs))
+                    pooled = f"{(time.perf_counter() - start) * 1000:7.0f}ms"
+                finally:
+                    shutdown_worker_pool()
+            print(f"{n_edges:>9}  {algorithm:>17}  {single * 1000:7.0f}ms  "
+                  f"{len(np.unique(labels)):>11}  {quality:6.3f}  {sequential:>9}  {pooled:>9}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--max-edges", type=int, default=1_000_000)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--workers", type=int, default=2, help="工作进程数，0 跳过 pool 一栏")
+    parser.add_argument("--projects", type=int, default=2, help="pool 一栏并行计算的项目数")
+    args = parser.parse_args()
+    main(args.max_edges, args.seed, args.workers, args.projects)
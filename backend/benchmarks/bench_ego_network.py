@@ -0,0 +1,144 @@
+"""ego network 查询基准：路径枚举 vs 逐层扩展邻居
+
+在本地 Neo4j 写入合成的幂律图（优先连接），分别以度数最高的枢纽节点和度数为 1
+左右的叶子节点为中心，比较 1~3 跳的 ego network：
+
+- legacy: 旧实现，变长路径 [:RELATION*1..depth] 枚举所有路径后再去重、截断，
+  路径数随度数按指数增长
+- frontier: 当前实现（GetGraphVisualizationHandler），每一跳 UNWIND 上一层
+  节点取不重复的新邻居，在数据库内按剩余名额 LIMIT，最后一次取节点之间的关系
+
+legacy 超过 --timeout 秒记为 timeout。用法（在 backend 目录下）::
+
+    python -m benchmarks.bench_ego_network --entities 20000 --node-limit 500
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import time
+from functools import partial
+from uuid import uuid4
+
+import numpy as np
+
+from src.application.queries.get_graph_visualization import (
+    GetGraphVisualizationHandler,
+    GetGraphVisualizationQuery
+)
+from src.domain.entities.entity import Entity
+from src.domain.entities.relation import Relation
+from src.domain.value_objects.entity_type import EntityType
+from src.domain.value_objects.relation_type import RelationType
+from src.infrastructure.persistence.neo4j.client import Neo4jClient
+from src.infrastructure.persistence.neo4j.graph_repository import Neo4jGraphRepository
+
+# 旧实现的 ego network 查询（{depth} / {limit} 为文本替换）
+LEGACY_EGO_NETWORK = """
+MATCH (center:Entity {id: $entity_id, project_id: $project_id})
+OPTIONAL MATCH path = (center)-[:RELATION*1..{depth}]-(neighbor:Entity {project_id: $project_id})
+WITH center, neighbor, path
+ORDER BY length(path)
+WITH center, collect(DISTINCT neighbor)[0..{limit}] as neighbors, collect(DISTINCT path) as paths
+UNWIND paths as p
+UNWIND relationships(p) as rel
+WITH center, neighbors, collect(DISTINCT rel) as relations
+UNWIND ([center] + neighbors) as node
+RETURN collect(DISTINCT node) as nodes, relations
+"""
+
+
+async def _seed(project_id: str, n_entities: int, edges_per_node: int, seed: int) -> tuple[str, str]:
+    """写入幂律图，返回 (枢纽节点ID, 叶子节点ID)"""
+    rng = np.random.default_rng(seed)
+    repo = Neo4jGraphRepository()
+    entities = [
+        Entity.create(project_id=project_id, external_id=f"实体{i}", type=EntityType.ENTERPRISE)
+        for i in range(n_entities)
+    ]
+    for i in range(0, n_entities, 1000):
+        await repo.merge_entities_bulk(entities[i:i + 1000])
+
+    endpoints: list[int] = [0]
+    relations = []
+    for node in range(1, n_entities):
+        # 在已有端点中均匀抽样 ≈ 按度数比例选择
+        targets = {endpoints[rng.integers(0, len(endpoints))] for _ in range(edges_per_node)}
+        for target in targets:
+            relations.append(Relation.create(
+                project_id=project_id,
+                source_id=entities[node].id,
+                target_id=entities[target].id,
+                type=RelationType.OWNS,
+            ))
+            endpoints.extend((node, target))
+    for i in range(0, len(relations), 1000):
+        await repo.merge_relations_bulk(relations[i:i + 1000])
+
+    degree = np.bincount(np.array(endpoints[1:]), minlength=n_entities)
+    return entities[int(degree.argmax())].id, entities[n_entities - 1].id
+
+
+async def _legacy(project_id: str, entity_id: str, depth: int, limit: int) -> None:
+    query = LEGACY_EGO_NETWORK.replace("{depth}", str(depth)).replace("{limit}", str(limit))
+    await Neo4jClient.execute_read(query, {"entity_id": entity_id, "project_id": project_id})
+
+
+async def _frontier(handler: GetGraphVisualizationHandler, project_id: str, entity_id: str, depth: int, limit: int) -> None:
+    await handler.handle(GetGraphVisualizationQuery(
+        project_id=project_id,
+        owner_id="bench",
+        center_entity_id=entity_id,
+        depth=depth,
+        node_limit=limit,
+        layout=None,
+    ))
+
+
+async def _measure(run, repeat: int, timeout: float) -> str:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(run(), timeout)
+        except asyncio.TimeoutError:
+            return "timeout"
+        samples.append(time.perf_counter() - start)
+    return f"{statistics.median(samples) * 1000:8.1f}ms"
+
+
+async def main(n_entities: int, edges_per_node: int, node_limit: int, repeat: int, timeout: float, seed: int) -> None:
+    await Neo4jClient.connect()
+    project_id = f"bench-{uuid4()}"
+    try:
+        hub, leaf = await _seed(project_id, n_entities, edges_per_node, seed)
+        handler = GetGraphVisualizationHandler()
+        print(f"{n_entities} entities, node_limit {node_limit}")
+        print(f"  {'center':>6}  {'depth':>5}  {'legacy':>10}  {'frontier':>10}")
+        for name, center in (("hub", hub), ("leaf", leaf)):
+            for depth in (1, 2, 3):
+                legacy = await _measure(partial(_legacy, project_id, center, depth, node_limit), repeat, timeout)
+                frontier = await _measure(
+                    partial(_frontier, handler, project_id, center, depth, node_limit), repeat, timeout
+                )
+                print(f"  {name:>6}  {depth:>5}  {legacy:>10}  {frontier:>10}")
+    finally:
+        await Neo4jClient.execute_write(
+            "MATCH (n:Entity {project_id: $project_id}) DETACH DELETE n",
+            {"project_id": project_id},
+        )
+        await Neo4jClient.disconnect()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entities", type=int, default=20000)
+    parser.add_argument("--edges-per-node", type=int, default=2)
+    parser.add_argument("--node-limit", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--timeout", type=float, default=30.0, help="单次查询超时（秒）")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    asyncio.run(main(args.entities, args.edges_per_node, args.node_limit, args.repeat, args.timeout, args.seed))
@@ -0,0 +1,130 @@
+"""图数据响应编码基准：逐条 JSON vs 列式 msgpack / Arrow，以及 gzip / brotli
+
+构造与 /api/visualization/graph 相同结构的 GraphVisualizationResponse（默认 2000 个
+节点、幂律分布的边，节点 value 带类型、标签和若干属性），对每种格式报告序列化 +
+压缩的 CPU 耗时中位数和响应体字节数：
+
+- fastapi-json: 旧实现，model_dump 后由 FastAPI 的 JSONResponse 用 json.dumps 序列化
+- json: GraphResponseEncoder 的 JSON（pydantic-core 直接输出字节）
+- msgpack / arrow: 列式编码（需要 pip install .[binary]，未安装时跳过）
+
+不需要 Neo4j。用法（在 backend 目录下）::
+
+    python -m benchmarks.bench_graph_encoding --nodes 2000 --repeat 20
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import time
+from functools import partial
+
+import numpy as np
+
+from src.api.dependencies import encoding
+from src.api.dependencies.encoding import (
+    ARROW_MEDIA_TYPE,
+    JSON_MEDIA_TYPE,
+    MSGPACK_MEDIA_TYPE,
+    GraphResponseEncoder,
+)
+from src.api.schemas.visualization import Edge, GraphData, GraphVisualizationResponse, Node
+
+TYPES = ["ENTERPRISE", "PERSON", "ACCOUNT", "PRODUCT"]
+
+
+def _response(n_nodes: int, edges_per_node: int, seed: int) -> GraphVisualizationResponse:
+    rng = np.random.default_rng(seed)
+    nodes = [
+        Node(
+            id=f"entity-{i:08d}",
+            name=f"实体{i}",
+            category=i % len(TYPES),
+            symbolSize=int(30 + rng.integers(0, 30)),
+            value={
+                "type": TYPES[i % len(TYPES)],
+                "labels": ["企业"] if i % 2 else [],
+                "properties": {"registered_capital": f"{rng.integers(1, 1000)}万", "city": "深圳"},
+                "version": 1,
+            },
+            x=round(float(rng.normal(0, 500)), 1),
+            y=round(float(rng.normal(0, 500)), 1),
+        )
+        for i in range(n_nodes)
+    ]
+    endpoints = [0]
+    edges = []
+    for node in range(1, n_nodes):
+        for _ in range(edges_per_node):
+            # 在已有端点中均匀抽样 ≈ 按度数比例选择
+            target = endpoints[rng.integers(0, len(endpoints))]
+            edges.append(Edge(
+                source=nodes[node].id,
+                target=nodes[target].id,
+                relation="OWNS",
+                value={"id": f"rel-{len(edges)}", "properties": {"ratio": 0.3}},
+            ))
+            endpoints.extend((node, target))
+    return GraphVisualizationResponse(
+        data=GraphData(nodes=nodes, edges=edges, categories=TYPES),
+        total_nodes=len(nodes),
+        total_edges=len(edges),
+    )
+
+
+def _fastapi_json(response: GraphVisualizationResponse) -> bytes:
+    # 等价于 FastAPI 校验 response_model 后的 JSONResponse.render
+    return json.dumps(
+        response.model_dump(mode="json"), ensure_ascii=False, allow_nan=False, separators=(",", ":")
+    ).encode()
+
+
+def _encode_fastapi(encoder: GraphResponseEncoder, response: GraphVisualizationResponse) -> bytes:
+    return encoder.compress(_fastapi_json(response))[0]
+
+
+def _encode(encoder: GraphResponseEncoder, response: GraphVisualizationResponse) -> bytes:
+    return encoder.compress(encoder.encode(response, nodes="data.nodes", edges="data.edges"))[0]
+
+
+def _measure(encode, repeat: int) -> tuple[float, int]:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        body = encode()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples), len(body)
+
+
+def main(n_nodes: int, edges_per_node: int, repeat: int, seed: int) -> None:
+    response = _response(n_nodes, edges_per_node, seed)
+    print(f"{n_nodes} nodes, {response.total_edges} edges")
+    print(f"  {'format':>14}  {'encoding':>8}  {'cpu':>9}  {'bytes':>10}")
+
+    formats = [("fastapi-json", None), ("json", JSON_MEDIA_TYPE)]
+    formats += [("msgpack", MSGPACK_MEDIA_TYPE)] if encoding.msgpack is not None else []
+    formats += [("arrow", ARROW_MEDIA_TYPE)] if encoding.pa is not None else []
+    content_encodings = [None, "gzip"] + (["br"] if encoding.brotli is not None else [])
+
+    for name, media_type in formats:
+        for content_encoding in content_encodings:
+            encoder = GraphResponseEncoder(media_type or JSON_MEDIA_TYPE, content_encoding)
+            encode = partial(_encode_fastapi if media_type is None else _encode, encoder, response)
+            cpu, size = _measure(encode, repeat)
+            print(f"  {name:>14}  {content_encoding or 'identity':>8}  {cpu * 1000:7.2f}ms  {size / 1e3:8.1f}KB")
+
+    missing = [lib for lib in ("msgpack", "pa", "brotli") if getattr(encoding, lib) is None]
+    if missing:
+        print(f"  (not installed: {', '.join('pyarrow' if lib == 'pa' else lib for lib in missing)})")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--nodes", type=int, default=2000)
+    parser.add_argument("--edges-per-node", type=int, default=2)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    main(args.nodes, args.edges_per_node, args.repeat, args.seed)
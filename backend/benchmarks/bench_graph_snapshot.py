@@ -0,0 +1,101 @@
+"""项目拓扑快照基准：NumPy CSR 快照 vs networkx.DiGraph
+
+用合成的 UUID 实体/关系（度数近似幂律分布）比较：
+
+- csr_build: AdjacencySnapshot.from_edges 构建耗时与常驻内存
+- csr_mmap: 从 .npy 文件以 mmap 方式打开的耗时（worker 启动场景）
+- networkx: 构建 networkx.DiGraph（只存 relation_id/type 两个边属性）的耗时与常驻内存
+
+内存用 tracemalloc 统计构建结束后仍被引用的分配（NumPy 数组同样会被计入），
+不含输入的边列表本身。不需要 Neo4j。用法（在 backend 目录下）::
+
+    python -m benchmarks.bench_graph_snapshot --nodes 200000 --edges 1000000
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import random
+import tempfile
+import time
+import tracemalloc
+import uuid
+from pathlib import Path
+
+from src.infrastructure.persistence.neo4j.adjacency_snapshot import AdjacencySnapshot
+
+RELATION_TYPES = ("OWNS", "CONTROLS", "GUARANTEES", "TRANSFERRED_TO", "HOLDS")
+
+
+def _synthetic_edges(n_nodes: int, n_edges: int, seed: int) -> list[tuple[str, str, str, str]]:
+    rng = random.Random(seed)
+    nodes = [str(uuid.UUID(int=rng.getrandbits(128), version=4)) for _ in range(n_nodes)]
+    # 目标端按 Pareto 分布偏向少数枢纽节点
+    return [
+        (
+            nodes[rng.randrange(n_nodes)],
+            nodes[min(int(rng.paretovariate(1.2)) - 1, n_nodes - 1)],
+            str(uuid.UUID(int=rng.getrandbits(128), version=4)),
+            rng.choice(RELATION_TYPES),
+        )
+        for _ in range(n_edges)
+    ]
+
+
+def _measure(build):
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = build()
+    elapsed = time.perf_counter() - start
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, retained
+
+
+def _build_networkx(edges):
+    import networkx as nx
+
+    graph = nx.DiGraph()
+    for source, target, relation_id, relation_type in edges:
+        graph.add_edge(source, target, id=relation_id, type=relation_type)
+    return graph
+
+
+def _report(name: str, seconds: float, retained: int, n_edges: int) -> None:
+    print(
+        f"{name:>10}: {seconds * 1000:9.1f}ms  "
+        f"{retained / 1024 / 1024:8.1f}MB  {retained / n_edges:6.1f} B/edge"
+    )
+
+
+def main(n_nodes: int, n_edges: int, seed: int) -> None:
+    edges = _synthetic_edges(n_nodes, n_edges, seed)
+
+    snapshot, seconds, retained = _measure(lambda: AdjacencySnapshot.from_edges("bench", 0, edges))
+    _report("csr_build", seconds, retained, n_edges)
+    print(f"{'':>10}  array bytes: {snapshot.nbytes / n_edges:.1f} B/edge")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "v0"
+        snapshot.save(path)
+        loaded, seconds, retained = _measure(lambda: AdjacencySnapshot.load(path))
+        _report("csr_mmap", seconds, retained, n_edges)
+        del loaded
+
+    try:
+        _, seconds, retained = _measure(lambda: _build_networkx(edges))
+    except ImportError:
+        print("  networkx: not installed, skipped")
+        return
+    _report("networkx", seconds, retained, n_edges)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--nodes", type=int, default=100000)
+    parser.add_argument("--edges", type=int, default=500000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    main(args.nodes, args.edges, args.seed)
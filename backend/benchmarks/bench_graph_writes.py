@@ -0,0 +1,112 @@
+"""图谱写入吞吐基准：逐条 MERGE vs 批量 UNWIND
+
+对本地 Neo4j 分别用 `merge_entity` / `merge_relation` 逐条写入和
+`merge_entities_bulk` / `merge_relations_bulk` 分批写入同样规模的合成数据，
+输出每种方式的耗时与每秒写入条数。
+
+用法（在 backend 目录下）::
+
+    python -m benchmarks.bench_graph_writes --entities 20000 --batch-size 500
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+import time
+from uuid import uuid4
+
+from src.domain.entities.entity import Entity
+from src.domain.entities.relation import Relation
+from src.domain.value_objects.entity_type import EntityType
+from src.domain.value_objects.relation_type import RelationType
+from src.infrastructure.persistence.neo4j.client import Neo4jClient
+from src.infrastructure.persistence.neo4j.graph_repository import Neo4jGraphRepository
+
+
+def _synthetic_graph(project_id: str, n_entities: int) -> tuple[list[Entity], list[Relation]]:
+    rng = random.Random(42)
+    entities = [
+        Entity.create(
+            project_id=project_id,
+            external_id=f"企业{i}",
+            type=EntityType.ENTERPRISE,
+            labels=["ENTERPRISE"],
+            properties={"seq": i},
+        )
+        for i in range(n_entities)
+    ]
+    relations = []
+    for i in range(1, n_entities):
+        j = rng.randrange(i)
+        relations.append(
+            Relation.create(
+                project_id=project_id,
+                source_id=entities[i].id,
+                target_id=entities[j].id,
+                type=RelationType.OWNS,
+            )
+        )
+    return entities, relations
+
+
+async def _cleanup(project_id: str) -> None:
+    await Neo4jClient.execute_write(
+        "MATCH (n:Entity {project_id: $project_id}) DETACH DELETE n",
+        {"project_id": project_id},
+    )
+
+
+async def _per_row(repo: Neo4jGraphRepository, entities: list[Entity], relations: list[Relation]) -> float:
+    start = time.perf_counter()
+    for entity in entities:
+        await repo.merge_entity(entity)
+    for relation in relations:
+        await repo.merge_relation(relation)
+    return time.perf_counter() - start
+
+
+async def _batched(
+    repo: Neo4jGraphRepository,
+    entities: list[Entity],
+    relations: list[Relation],
+    batch_size: int,
+) -> float:
+    start = time.perf_counter()
+    for i in range(0, len(entities), batch_size):
+        await repo.merge_entities_bulk(entities[i:i + batch_size])
+    for i in range(0, len(relations), batch_size):
+        await repo.merge_relations_bulk(relations[i:i + batch_size])
+    return time.perf_counter() - start
+
+
+async def main(n_entities: int, batch_size: int) -> None:
+    await Neo4jClient.connect()
+    repo = Neo4jGraphRepository()
+    try:
+        results = {}
+        for mode in ("per_row", "batched"):
+            project_id = f"bench-{uuid4()}"
+            entities, relations = _synthetic_graph(project_id, n_entities)
+            try:
+                if mode == "per_row":
+                    elapsed = await _per_row(repo, entities, relations)
+                else:
+                    elapsed = await _batched(repo, entities, relations, batch_size)
+            finally:
+                await _cleanup(project_id)
+            results[mode] = elapsed
+            items = len(entities) + len(relations)
+            print(f"{mode:>8}: {elapsed:8.2f}s  {items / elapsed:10.0f} items/s")
+        print(f"speedup: {results['per_row'] / results['batched']:.1f}x")
+    finally:
+        await Neo4jClient.disconnect()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entities", type=int, default=5000)
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+    asyncio.run(main(args.entities, args.batch_size))
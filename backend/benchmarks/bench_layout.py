@@ -0,0 +1,73 @@
+"""力引导布局基准：耗时与节点数
+
+在合成的幂律图（每个节点平均 2 条关系）上按节点数逐级放大，对每个规模报告：
+
+- exact / barnes-hut: 斥力精确计算与 Barnes-Hut 近似各自的冷启动耗时
+  （精确计算是 O(n²)，超过 --max-exact 个节点时跳过）
+- warm: 增加 1% 新节点后从上一次布局热启动（迭代次数为冷启动的 1/3）的耗时
+- moved: 热启动后原有节点的平均位移 / 布局宽度
+
+不需要 Neo4j。用法（在 backend 目录下）::
+
+    python -m benchmarks.bench_layout --max-nodes 20000 --iterations 50
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+import numpy as np
+
+from src.domain.services.analysis.layout import force_layout
+
+
+def _synthetic_graph(n_nodes: int, seed: int) -> tuple[np.ndarray, np.ndarray]:
+    rng = np.random.default_rng(seed)
+    n_edges = n_nodes * 2
+    source = rng.integers(0, n_nodes, n_edges)
+    target = np.minimum(rng.pareto(1.2, n_edges).astype(np.int64), n_nodes - 1)
+    return source, target
+
+
+def _timed(*args, **kwargs) -> tuple[np.ndarray, float]:
+    start = time.perf_counter()
+    positions = force_layout(*args, **kwargs)
+    return positions, time.perf_counter() - start
+
+
+def main(max_nodes: int, max_exact: int, iterations: int, algorithm: str, seed: int) -> None:
+    sizes = [size for size in (100, 500, 1000, 2000, 5000, 10_000, 20_000, 50_000) if size <= max_nodes]
+    print(f"{'nodes':>7}  {'exact':>9}  {'barnes-hut':>10}  {'warm':>9}  {'moved':>6}")
+    for n_nodes in sizes:
+        source, target = _synthetic_graph(n_nodes, seed)
+        options = {"algorithm": algorithm, "iterations": iterations, "seed": seed}
+
+        exact = ""
+        if n_nodes <= max_exact:
+            _, elapsed = _timed(source, target, n_nodes, barnes_hut_threshold=n_nodes, **options)
+            exact = f"{elapsed * 1000:7.0f}ms"
+        positions, elapsed = _timed(source, target, n_nodes, barnes_hut_threshold=0, **options)
+
+        added = max(n_nodes // 100, 1)
+        rng = np.random.default_rng(seed)
+        grown_source = np.concatenate([source, np.arange(n_nodes, n_nodes + added)])
+        grown_target = np.concatenate([target, rng.integers(0, n_nodes, added)])
+        initial = np.vstack([positions, np.full((added, 2), np.nan)])
+        warm, warm_elapsed = _timed(
+            grown_source, grown_target, n_nodes + added,
+            initial=initial, **{**options, "iterations": max(iterations // 3, 1)}
+        )
+        moved = np.linalg.norm(warm[:n_nodes] - positions, axis=1).mean() / np.ptp(positions, axis=0).mean()
+        print(f"{n_nodes:>7}  {exact:>9}  {elapsed * 1000:8.0f}ms  {warm_elapsed * 1000:7.0f}ms  {moved:6.3f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--max-nodes", type=int, default=20_000)
+    parser.add_argument("--max-exact", type=int, default=5000, help="精确斥力计算的最大节点数")
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--algorithm", default="forceatlas2", choices=["forceatlas2", "fruchterman_reingold"])
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    main(args.max_nodes, args.max_exact, args.iterations, args.algorithm, args.seed)
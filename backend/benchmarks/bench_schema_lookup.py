@@ -0,0 +1,118 @@
+"""实体查找延迟基准：无索引 vs 模式引导后
+
+在本地 Neo4j 写入一批合成实体，先删除 `schema.SCHEMA_ITEMS` 中的约束和索引，
+测量按 (id, project_id) 查实体、按 (project_id, type) 计数的延迟；再执行
+`Neo4jSchemaManager.apply` 并等待索引上线，重复同样的查询，输出 p50/p95。
+
+会删除并重建模式对象，只应在本地/测试库上运行（需加 --drop-schema 确认）::
+
+    python -m benchmarks.bench_schema_lookup --entities 50000 --lookups 500 --drop-schema
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+from uuid import uuid4
+
+from src.domain.entities.entity import Entity
+from src.domain.value_objects.entity_type import EntityType
+from src.infrastructure.persistence.neo4j import cypher_queries as queries
+from src.infrastructure.persistence.neo4j.client import Neo4jClient
+from src.infrastructure.persistence.neo4j.graph_repository import Neo4jGraphRepository
+from src.infrastructure.persistence.neo4j.schema import SCHEMA_ITEMS, Neo4jSchemaManager
+
+ENTITY_TYPES = [EntityType.ENTERPRISE, EntityType.PERSON, EntityType.PRODUCT]
+
+
+async def _drop_schema() -> None:
+    for item in SCHEMA_ITEMS:
+        kind = "CONSTRAINT" if item.kind == "constraint" else "INDEX"
+        await Neo4jClient.execute_write(f"DROP {kind} {item.name} IF EXISTS")
+
+
+async def _seed(project_id: str, n_entities: int) -> list[str]:
+    repo = Neo4jGraphRepository()
+    entities = [
+        Entity.create(
+            project_id=project_id,
+            external_id=f"实体{i}",
+            type=ENTITY_TYPES[i % len(ENTITY_TYPES)],
+            labels=[],
+        )
+        for i in range(n_entities)
+    ]
+    for i in range(0, len(entities), 1000):
+        await repo.merge_entities_bulk(entities[i:i + 1000])
+    return [entity.id for entity in entities]
+
+
+async def _cleanup(project_id: str) -> None:
+    await Neo4jClient.execute_write(
+        "MATCH (n:Entity {project_id: $project_id}) DETACH DELETE n",
+        {"project_id": project_id},
+    )
+
+
+async def _measure(project_id: str, entity_ids: list[str], lookups: int) -> dict[str, list[float]]:
+    rng = random.Random(0)
+    timings: dict[str, list[float]] = {"by_id": [], "by_type": []}
+    for _ in range(lookups):
+        start = time.perf_counter()
+        await Neo4jClient.execute_read(
+            queries.GET_ENTITY_BY_ID,
+            {"entity_id": rng.choice(entity_ids), "project_id": project_id},
+        )
+        timings["by_id"].append(time.perf_counter() - start)
+
+    for _ in range(max(lookups // 10, 1)):
+        start = time.perf_counter()
+        await Neo4jClient.execute_read(
+            "MATCH (n:Entity {project_id: $project_id, type: $entity_type}) RETURN count(n) as total",
+            {"project_id": project_id, "entity_type": rng.choice(ENTITY_TYPES).value},
+        )
+        timings["by_type"].append(time.perf_counter() - start)
+    return timings
+
+
+def _report(label: str, timings: dict[str, list[float]]) -> None:
+    for name, samples in timings.items():
+        samples = sorted(samples)
+        p95 = samples[min(int(len(samples) * 0.95), len(samples) - 1)]
+        print(
+            f"{label:>10} {name:<8} p50={statistics.median(samples) * 1000:8.2f}ms"
+            f"  p95={p95 * 1000:8.2f}ms"
+        )
+
+
+async def main(n_entities: int, lookups: int) -> None:
+    await Neo4jClient.connect()
+    project_id = f"bench-{uuid4()}"
+    manager = Neo4jSchemaManager()
+    try:
+        await _drop_schema()
+        entity_ids = await _seed(project_id, n_entities)
+
+        _report("no schema", await _measure(project_id, entity_ids, lookups))
+
+        await manager.apply()
+        await manager.await_online()
+        _report("schema", await _measure(project_id, entity_ids, lookups))
+    finally:
+        await _cleanup(project_id)
+        await manager.apply()
+        await Neo4jClient.disconnect()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entities", type=int, default=20000)
+    parser.add_argument("--lookups", type=int, default=500)
+    parser.add_argument("--drop-schema", action="store_true", help="确认删除并重建模式对象")
+    args = parser.parse_args()
+    if not args.drop_schema:
+        parser.error("this benchmark drops Neo4j indexes; pass --drop-schema to confirm")
+    asyncio.run(main(args.entities, args.lookups))
@@ -0,0 +1,113 @@
+"""实体搜索分页延迟基准：计数 + 分页两次查询 vs 单次查询 vs 跳过计数
+
+在本地 Neo4j 写入一批合成实体后，对同一个关键词连续翻页，比较：
+
+- two_queries: 旧实现，先 COUNT 再 SKIP/LIMIT，两次扫描
+- exact: 当前页与总数在一个查询中返回（count_mode="exact"）
+- approximate: 总数取自缓存（count_mode="approximate"，首页之后不再计数）
+- none: 不计数，limit+1 判断 has_more（count_mode="none"）
+
+有关键词时处理器会优先走全文索引，为了与旧实现比较同样的 CONTAINS 谓词，
+本基准直接调用扫描路径。用法（在 backend 目录下）::
+
+    python -m benchmarks.bench_search_count --entities 50000 --pages 20
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import time
+from uuid import uuid4
+
+from src.application.queries.search_entities import SearchEntitiesHandler, SearchEntitiesQuery
+from src.domain.entities.entity import Entity
+from src.domain.value_objects.entity_type import EntityType
+from src.infrastructure.cache.in_memory import InMemoryPreviewCache
+from src.infrastructure.persistence.neo4j import cypher_queries as queries
+from src.infrastructure.persistence.neo4j.client import Neo4jClient
+from src.infrastructure.persistence.neo4j.graph_repository import Neo4jGraphRepository
+
+# 旧实现的计数查询
+LEGACY_COUNT = """
+MATCH (n:Entity {project_id: $project_id})
+WHERE n.external_id CONTAINS $keyword
+   OR n.type CONTAINS $keyword
+   OR any(label IN n.labels WHERE label CONTAINS $keyword)
+   OR n.properties_json CONTAINS $keyword
+RETURN count(n) as total
+"""
+
+
+async def _seed(project_id: str, n_entities: int) -> None:
+    repo = Neo4jGraphRepository()
+    entities = [
+        Entity.create(
+            project_id=project_id,
+            external_id=f"{'华为' if i % 3 == 0 else '腾讯'}科技{i}",
+            type=EntityType.ENTERPRISE,
+            properties={"seq": i},
+        )
+        for i in range(n_entities)
+    ]
+    for i in range(0, len(entities), 1000):
+        await repo.merge_entities_bulk(entities[i:i + 1000])
+
+
+async def _two_queries(project_id: str, keyword: str, offset: int, limit: int) -> None:
+    params = {"project_id": project_id, "keyword": keyword}
+    await Neo4jClient.execute_read(LEGACY_COUNT, params)
+    await Neo4jClient.execute_read(
+        queries.SEARCH_ENTITIES,
+        {**params, "after_updated_at": None, "after_id": None, "offset": offset, "limit": limit},
+    )
+
+
+async def main(n_entities: int, pages: int, limit: int, keyword: str) -> None:
+    await Neo4jClient.connect()
+    project_id = f"bench-{uuid4()}"
+    try:
+        await _seed(project_id, n_entities)
+        handler = SearchEntitiesHandler(totals_cache=InMemoryPreviewCache())
+
+        for mode in ("two_queries", "exact", "approximate", "none"):
+            samples = []
+            for page in range(pages):
+                offset = page * limit
+                start = time.perf_counter()
+                if mode == "two_queries":
+                    await _two_queries(project_id, keyword, offset, limit)
+                else:
+                    # 直接走扫描路径，与旧实现比较同样的谓词
+                    await handler._scan_search(
+                        SearchEntitiesQuery(
+                            project_id=project_id,
+                            owner_id="bench",
+                            keyword=keyword,
+                            offset=offset,
+                            limit=limit,
+                            count_mode=mode,
+                        )
+                    )
+                samples.append(time.perf_counter() - start)
+            print(
+                f"{mode:>12}: p50={statistics.median(samples) * 1000:8.2f}ms"
+                f"  total={sum(samples) * 1000:9.1f}ms over {pages} pages"
+            )
+    finally:
+        await Neo4jClient.execute_write(
+            "MATCH (n:Entity {project_id: $project_id}) DETACH DELETE n",
+            {"project_id": project_id},
+        )
+        await Neo4jClient.disconnect()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entities", type=int, default=20000)
+    parser.add_argument("--pages", type=int, default=20)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--keyword", default="华为")
+    args = parser.parse_args()
+    asyncio.run(main(args.entities, args.pages, args.limit, args.keyword))
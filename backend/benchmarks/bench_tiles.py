@@ -0,0 +1,96 @@
+"""视口瓦片与全图下载对比基准
+
+在合成的幂律图（Barabási–Albert 式优先连接）上构建瓦片索引，对每个规模报告：
+
+- build: 全图布局 + 建索引的耗时
+- full: 一次下载全图的 JSON 字节数和序列化耗时
+- tile zN: 第 N 层各瓦片的平均/最大 JSON 字节数，以及取瓦片 + 序列化的平均耗时
+
+瓦片耗时不含按ID从 Neo4j 读取节点属性（每个瓦片一次至多 GRAPH_TILE_CAPACITY 个
+ID 的索引查找）。节点 JSON 与 /api/visualization/graph 的字段相同。不需要 Neo4j。
+用法（在 backend 目录下）::
+
+    python -m benchmarks.bench_tiles --max-nodes 100000 --iterations 20
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import time
+
+import numpy as np
+
+from src.domain.services.analysis.tiles import build_tile_arrays
+from src.infrastructure.persistence.neo4j.adjacency_snapshot import encode_ids
+from src.infrastructure.persistence.neo4j.tile_index import TileIndex
+
+
+def _power_law_graph(n_nodes: int, edges_per_node: int, seed: int) -> tuple[np.ndarray, np.ndarray]:
+    """每个新节点连向 edges_per_node 个已有节点，按度数（边端点的均匀抽样）选择"""
+    rng = np.random.default_rng(seed)
+    source = np.repeat(np.arange(1, n_nodes), edges_per_node)
+    target = np.empty_like(source)
+    endpoints = np.zeros(2 * len(source), dtype=np.int64)
+    filled = 0
+    for i, node in enumerate(source):
+        # 在已写入的端点中均匀抽样 ≈ 按度数比例选择
+        target[i] = endpoints[rng.integers(0, filled)] if filled else 0
+        endpoints[filled:filled + 2] = (node, target[i])
+        filled += 2
+    return source, target
+
+
+def _payload(node_ids: list[str], x: list[float], y: list[float], edges: list[tuple[str, str]]) -> bytes:
+    nodes = [
+        {"id": i, "name": i, "category": 1, "symbolSize": 45,
+         "value": {"type": "PERSON", "labels": [], "properties": {}, "version": 1},
+         "x": round(px, 1), "y": round(py, 1)}
+        for i, px, py in zip(node_ids, x, y)
+    ]
+    links = [{"source": s, "target": t, "relation": "RELATION", "value": {}} for s, t in edges]
+    return json.dumps({"nodes": nodes, "edges": links}).encode()
+
+
+def main(max_nodes: int, iterations: int, capacity: int, seed: int) -> None:
+    sizes = [size for size in (10_000, 100_000, 1_000_000) if size <= max_nodes]
+    for n_nodes in sizes:
+        source, target = _power_law_graph(n_nodes, 2, seed)
+        ids = [f"entity-{i:08d}" for i in range(n_nodes)]
+        keys, codec = encode_ids(ids)
+
+        start = time.perf_counter()
+        arrays, meta = build_tile_arrays(source, target, n_nodes, capacity=capacity, iterations=iterations)
+        arrays["node_keys"] = keys[arrays.pop("order")]
+        index = TileIndex("bench", 0, arrays, codec, {**meta, "capacity": capacity})
+        build = time.perf_counter() - start
+
+        start = time.perf_counter()
+        full = _payload(ids, [0.0] * n_nodes, [0.0] * n_nodes,
+                        [(ids[s], ids[t]) for s, t in zip(source.tolist(), target.tolist())])
+        full_time = time.perf_counter() - start
+        print(f"\n{n_nodes} nodes, {len(source)} edges, max_zoom {index.max_zoom}, build {build:.1f}s")
+        print(f"  {'':>8}  {'avg':>10}  {'max':>9}  {'latency':>10}")
+        print(f"  {'full':>8}  {len(full) / 1e6:9.2f}MB  {'':>9}  {full_time * 1000:8.1f}ms")
+
+        for z in sorted({0, min(2, index.max_zoom), index.max_zoom}):
+            sizes_z, times_z = [], []
+            for x in range(1 << z):
+                for y in range(1 << z):
+                    start = time.perf_counter()
+                    tile = index.tile(z, x, y, max_edges=capacity * 8)
+                    payload = _payload(tile.node_ids, tile.x, tile.y, tile.edges)
+                    times_z.append(time.perf_counter() - start)
+                    sizes_z.append(len(payload))
+            print(f"  {f'tile z{z}':>8}  {np.mean(sizes_z) / 1e3:8.1f}KB  {max(sizes_z) / 1e3:7.1f}KB  "
+                  f"{np.mean(times_z) * 1000:8.2f}ms  ({len(sizes_z)} tiles)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--max-nodes", type=int, default=100_000)
+    parser.add_argument("--iterations", type=int, default=20, help="布局迭代次数")
+    parser.add_argument("--capacity", type=int, default=256, help="每个瓦片的节点数上限")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    main(args.max_nodes, args.iterations, args.capacity, args.seed)
@@ -0,0 +1,275 @@
+"""图数据响应的内容协商
+
+节点/边列表逐条序列化为 JSON 时，symbolSize、category、value 等重复的键名占了
+大部分字节。客户端可以通过 Accept 请求列式编码：
+
+- application/vnd.apache.arrow.stream: 依次两个 Arrow IPC 流，节点表和边表；其余
+  字段（categories、total_nodes 等）以 JSON 存在节点表 schema 元数据的 meta 键中
+- application/msgpack: 与 JSON 结构相同，节点/边列表换成 {列名: 值数组}
+
+两种列式编码中边的 source/target 都是节点表中的行号（不在节点表中为 -1），
+嵌套的字典列（value、properties）在 Arrow 中为 JSON 字符串。超过
+GRAPH_RESPONSE_MIN_COMPRESS_BYTES 的响应按 Accept-Encoding 用 brotli 或 gzip 压缩。
+节点数与边数之和超过 GRAPH_RESPONSE_THREAD_MIN_ROWS 时编码和压缩在线程中执行。
+pyarrow / msgpack / brotli 为可选依赖（pip install .[binary]），未安装时不参与协商。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import gzip
+from typing import Any
+
+import orjson
+from fastapi import HTTPException, Request, Response, status
+from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel
+
+from src.config import settings
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+JSON_MEDIA_TYPE = "application/json"
+ARROW_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+_MSGPACK_ALIASES = ("application/msgpack", "application/x-msgpack", "application/vnd.msgpack")
+
+
+def _available_media_types() -> dict[str, str]:
+    """可接受的媒体类型 -> 响应使用的媒体类型"""
+    media_types = {JSON_MEDIA_TYPE: JSON_MEDIA_TYPE, "application/*": JSON_MEDIA_TYPE, "*/*": JSON_MEDIA_TYPE}
+    if pa is not None:
+        media_types[ARROW_MEDIA_TYPE] = ARROW_MEDIA_TYPE
+    if msgpack is not None:
+        media_types.update({alias: MSGPACK_MEDIA_TYPE for alias in _MSGPACK_ALIASES})
+    return media_types
+
+
+def _parse_weighted(header: str) -> list[tuple[str, float]]:
+    """解析 Accept / Accept-Encoding 头，按 q 值降序（相同时保持原顺序）"""
+    items = []
+    for part in header.split(","):
+        token, *params = (piece.strip() for piece in part.split(";"))
+        if not token:
+            continue
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        items.append((token.lower(), quality))
+    return sorted(items, key=lambda item: -item[1])
+
+
+def negotiate_media_type(accept: str | None) -> str | None:
+    """按 Accept 选择响应格式
+
+    Returns:
+        响应媒体类型；没有可提供的格式时为 None
+    """
+    if not accept:
+        return JSON_MEDIA_TYPE
+    available = _available_media_types()
+    for token, quality in _parse_weighted(accept):
+        if quality > 0 and token in available:
+            return available[token]
+    return None
+
+
+def negotiate_content_encoding(accept_encoding: str | None) -> str | None:
+    """按 Accept-Encoding 选择压缩方式（br 优先于 gzip），不压缩时为 None"""
+    accepted = {
+        token: quality for token, quality in _parse_weighted(accept_encoding or "")
+    }
+    wildcard = accepted.get("*", 0.0)
+    candidates = [("br", brotli is not None), ("gzip", True)]
+    for encoding, supported in candidates:
+        if supported and accepted.get(encoding, wildcard) > 0:
+            return encoding
+    return None
+
+
+def _get_path(content: dict[str, Any], path: str) -> list[dict[str, Any]]:
+    for key in path.split("."):
+        content = content[key]
+    return content
+
+
+def _replace_path(content: dict[str, Any], path: str, value: Any) -> dict[str, Any]:
+    """返回 path 处替换为 value 的浅拷贝（value 为 None 时删除该键）"""
+    head, _, rest = path.partition(".")
+    copy = dict(content)
+    if rest:
+        copy[head] = _replace_path(content[head], rest, value)
+    elif value is None:
+        copy.pop(head)
+    else:
+        copy[head] = value
+    return copy
+
+
+def to_columns(rows: list[dict[str, Any]]) -> dict[str, list[Any]]:
+    """记录列表转为 {列名: 值数组}，列为所有记录键的并集，缺失的值为 None"""
+    names: dict[str, None] = {}
+    for row in rows:
+        names.update(dict.fromkeys(row))
+    return {name: [row.get(name) for row in rows] for name in names}
+
+
+def edge_columns(edges: list[dict[str, Any]], node_ids: list[Any]) -> dict[str, list[Any]]:
+    """边记录转为列，source/target 换成节点行号（不在节点表中为 -1）"""
+    index = {node_id: i for i, node_id in enumerate(node_ids)}
+    columns = to_columns(edges)
+    for end in ("source", "target"):
+        columns[end] = [index.get(node_id, -1) for node_id in columns.get(end, [])]
+    return columns
+
+
+def _arrow_array(values: list[Any]) -> "pa.Array":
+    """推断列类型；字典或无法推断的混合类型列编码为 JSON 字符串，重复较多的字符串列字典编码"""
+    if any(isinstance(value, dict) for value in values):
+        return pa.array([None if v is None else orjson.dumps(v).decode() for v in values], pa.string())
+    try:
+        array = pa.array(values)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        return pa.array([None if v is None else orjson.dumps(v).decode() for v in values], pa.string())
+    if pa.types.is_string(array.type) and len(set(values)) * 2 < len(values):
+        return array.dictionary_encode()
+    return array
+
+
+def _arrow_table(columns: dict[str, list[Any]], metadata: dict[str, str] | None = None) -> "pa.Table":
+    arrays = {
+        name: pa.array(values, pa.int32()) if name in ("source", "target") else _arrow_array(values)
+        for name, values in columns.items()
+    }
+    return pa.table(arrays, metadata=metadata)
+
+
+def _arrow_stream(table: "pa.Table") -> bytes:
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+class GraphResponseEncoder:
+    """按协商结果编码并压缩图数据响应"""
+
+    def __init__(self, media_type: str = JSON_MEDIA_TYPE, content_encoding: str | None = None):
+        self.media_type = media_type
+        self.content_encoding = content_encoding
+
+    def encode(
+        self,
+        content: BaseModel | dict[str, Any],
+        nodes: str,
+        edges: str | None = None
+    ) -> bytes:
+        """序列化响应体（未压缩）
+
+        Args:
+            content: 响应模型或字典
+            nodes: 节点列表在 content 中的路径（如 "data.nodes"）
+            edges: 边列表的路径，没有边时为 None
+
+        Returns:
+            JSON / Arrow / msgpack 字节
+        """
+        if self.media_type == JSON_MEDIA_TYPE:
+            if isinstance(content, BaseModel):
+                return content.model_dump_json().encode()
+            return orjson.dumps(jsonable_encoder(content))
+
+        # pydantic-core 直接转换，比 jsonable_encoder 逐字段递归快一个数量级
+        content = content.model_dump(mode="json") if isinstance(content, BaseModel) else jsonable_encoder(content)
+        node_columns = to_columns(_get_path(content, nodes))
+        edge_rows = _get_path(content, edges) if edges else []
+        columns = edge_columns(edge_rows, node_columns.get("id", []))
+        if self.media_type == MSGPACK_MEDIA_TYPE:
+            content = _replace_path(content, nodes, node_columns)
+            if edges:
+                content = _replace_path(content, edges, columns)
+            return msgpack.packb(content)
+
+        meta = _replace_path(content, nodes, None)
+        if edges:
+            meta = _replace_path(meta, edges, None)
+        columns.setdefault("source", [])
+        columns.setdefault("target", [])
+        return (
+            _arrow_stream(_arrow_table(node_columns, {"meta": orjson.dumps(meta).decode()}))
+            + _arrow_stream(_arrow_table(columns))
+        )
+
+    def compress(self, body: bytes) -> tuple[bytes, str | None]:
+        """按协商的 Content-Encoding 压缩，小于阈值的响应不压缩"""
+        if self.content_encoding is None or len(body) < settings.graph_response_min_compress_bytes:
+            return body, None
+        if self.content_encoding == "br":
+            return brotli.compress(body, quality=settings.graph_response_brotli_quality), "br"
+        return gzip.compress(body, compresslevel=6), "gzip"
+
+    async def render(
+        self,
+        content: BaseModel | dict[str, Any],
+        nodes: str,
+        edges: str | None = None
+    ) -> Response:
+        """编码、压缩并构造响应（大图在线程中执行，不阻塞事件循环）"""
+        rows = _row_count(content, nodes) + (_row_count(content, edges) if edges else 0)
+        if rows > settings.graph_response_thread_min_rows:
+            body, content_encoding = await asyncio.to_thread(self._encode_compressed, content, nodes, edges)
+        else:
+            body, content_encoding = self._encode_compressed(content, nodes, edges)
+        headers = {"Vary": "Accept, Accept-Encoding"}
+        if content_encoding:
+            headers["Content-Encoding"] = content_encoding
+        return Response(content=body, media_type=self.media_type, headers=headers)
+
+
+    def _encode_compressed(
+        self,
+        content: BaseModel | dict[str, Any],
+        nodes: str,
+        edges: str | None
+    ) -> tuple[bytes, str | None]:
+        return self.compress(self.encode(content, nodes, edges))
+
+
+def _row_count(content: BaseModel | dict[str, Any], path: str) -> int:
+    """path 处列表的长度（响应模型按属性、字典按键逐级取值）"""
+    for key in path.split("."):
+        content = getattr(content, key) if isinstance(content, BaseModel) else content[key]
+    return len(content)
+
+
+def get_graph_encoder(request: Request) -> GraphResponseEncoder:
+    """按请求头协商响应格式和压缩方式
+
+    Raises:
+        HTTPException: 406，Accept 中没有可提供的格式
+    """
+    media_type = negotiate_media_type(request.headers.get("accept"))
+    if media_type is None:
+        raise HTTPException(
+            status_code=status.HTTP_406_NOT_ACCEPTABLE,
+            detail=f"Supported media types: {sorted(set(_available_media_types().values()))}"
+        )
+    return GraphResponseEncoder(media_type, negotiate_content_encoding(request.headers.get("accept-encoding")))
@@ -5,19 +5,21 @@
 
 from __future__ import annotations
 
-from typing import Annotated, Any, List
+from typing import Annotated, Any, List, Literal
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 
 from src.api.dependencies.auth import get_current_user
 from src.api.schemas.graph import GraphEntityCreate, GraphEntityResponse
 from src.application.commands.create_entity import CreateEntityCommand
+from src.application.queries.pagination import InvalidCursorError
 from src.application.queries.search_entities import (
     SearchEntitiesQuery,
     SearchEntitiesHandler
 )
 from src.application.services.graph_service import GraphService
 from src.domain.entities.user import User
+from src.infrastructure.cache.graph_version import get_graph_version_store
 from src.infrastructure.persistence.neo4j.client import Neo4jClient
 from src.infrastructure.persistence.neo4j import cypher_queries as queries
 
@@ -54,6 +56,10 @@ async def search_entities(
     current_user: Annotated[User, Depends(get_current_user)],
     offset: int = Query(0, ge=0, description="分页偏移量"),
     limit: int = Query(20, ge=1, le=100, description="每页数量"),
+    cursor: str | None = Query(None, description="上一页返回的 next_cursor"),
+    count_mode: Literal["exact", "approximate", "none"] = Query(
+        "exact", description="总数计算方式：exact | approximate | none"
+    ),
 ) -> dict[str, Any]:
     """搜索实体
     
@@ -66,17 +72,23 @@ async def search_entities(
         keyword=keyword,
         entity_type=entity_type,
         offset=offset,
-        limit=limit
+        limit=limit,
+        cursor=cursor,
+        count_mode=count_mode
     )
     
-    result = await handler.handle(query)
+    try:
+        result = await handler.handle(query)
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     
     return {
         "entities": result.entities,
         "total": result.total,
         "offset": result.offset,
         "limit": result.limit,
-        "has_more": result.has_more
+        "has_more": result.has_more,
+        "next_cursor": result.next_cursor
     }
 
 
@@ -142,6 +154,7 @@ async def update_entity(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Entity not found"
         )
+    await get_graph_version_store().bump(project_id)
     
     entity_data = result[0].get("entity", {})
     props_json = entity_data.get("properties_json")
@@ -167,6 +180,7 @@ async def delete_entity(
         queries.DELETE_ENTITY,
         {"project_id": project_id, "entity_id": entity_id}
     )
+    await get_graph_version_store().bump(project_id)
 
 
 @router.post("/batch", response_model=BatchOperationResponse)
@@ -260,6 +274,9 @@ async def batch_operation(
             detail=f"Unsupported operation: {payload.operation}"
         )
     
+    # 部分失败时也可能已有写入生效
+    await get_graph_version_store().bump(project_id)
+    
     return BatchOperationResponse(
         success=len(errors) == 0,
         processed_count=processed,
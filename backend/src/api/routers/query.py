@@ -5,23 +5,23 @@
 
 from __future__ import annotations
 
-from typing import Annotated, Any, List
+from typing import Annotated, Any, List, Literal
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from pydantic import BaseModel, Field
 
 from src.api.dependencies.auth import get_current_user
-from src.api.schemas.visualization import PathVisualizationResponse, PathNode, PathEdge
-from src.application.queries.find_paths import (
-    FindShortestPathQuery,
-    FindAllPathsQuery,
-    FindShortestPathHandler,
-    FindAllPathsHandler
-)
-from src.application.queries.search_entities import (
-    SearchEntitiesQuery,
-    SearchEntitiesHandler
+from src.api.dependencies.encoding import GraphResponseEncoder, get_graph_encoder
+from src.api.schemas.visualization import (
+    PathEdge,
+    PathNode,
+    PathSequence,
+    PathVisualizationResponse,
 )
+from src.application.queries.find_paths import FindShortestPathQuery, FindAllPathsQuery
+from src.application.queries.pagination import InvalidCursorError
+from src.application.queries.search_entities import SearchEntitiesQuery
+from src.application.services.query_service import get_query_service
 from src.domain.entities.user import User
 
 router = APIRouter(prefix="/api/query", tags=["query"])
@@ -34,15 +34,20 @@ class SearchRequest(BaseModel):
     entity_type: str | None = Field(default=None, description="实体类型过滤")
     offset: int = Field(default=0, ge=0)
     limit: int = Field(default=20, ge=1, le=100)
+    cursor: str | None = Field(default=None, description="上一页返回的 next_cursor")
+    count_mode: Literal["exact", "approximate", "none"] = Field(
+        default="exact", description="总数计算方式：exact | approximate | none"
+    )
 
 
 class SearchResponse(BaseModel):
     """搜索响应"""
     entities: List[dict[str, Any]]
-    total: int
+    total: int | None
     offset: int
     limit: int
     has_more: bool
+    next_cursor: str | None = None
 
 
 class PathSearchRequest(BaseModel):
@@ -64,24 +69,29 @@ async def advanced_search(
     
     支持关键词和类型过滤的条件搜索
     """
-    handler = SearchEntitiesHandler()
     query = SearchEntitiesQuery(
         project_id=payload.project_id,
         owner_id=current_user.id,
         keyword=payload.keyword,
         entity_type=payload.entity_type,
         offset=payload.offset,
-        limit=payload.limit
+        limit=payload.limit,
+        cursor=payload.cursor,
+        count_mode=payload.count_mode
     )
     
-    result = await handler.handle(query)
+    try:
+        result = await get_query_service().search_entities(query)
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     
     return SearchResponse(
         entities=result.entities,
         total=result.total,
         offset=result.offset,
         limit=result.limit,
-        has_more=result.has_more
+        has_more=result.has_more,
+        next_cursor=result.next_cursor
     )
 
 
@@ -89,16 +99,18 @@ async def advanced_search(
 async def find_paths(
     payload: PathSearchRequest,
     current_user: Annotated[User, Depends(get_current_user)],
-) -> PathVisualizationResponse:
+    encoder: Annotated[GraphResponseEncoder, Depends(get_graph_encoder)],
+) -> Response:
     """路径查找
     
     查找两个实体之间的路径
     
     - shortest: 最短路径算法，返回一条最短路径
     - all: 所有路径算法，返回所有可能的路径（最多path_limit条）
+    
+    Accept 为 Arrow / msgpack 时节点和边按列编码，JSON 按 Accept-Encoding 压缩
     """
     if payload.algorithm == "shortest":
-        handler = FindShortestPathHandler()
         query = FindShortestPathQuery(
             project_id=payload.project_id,
             owner_id=current_user.id,
@@ -106,10 +118,9 @@ async def find_paths(
             end_id=payload.end_id,
             max_depth=payload.max_depth
         )
-        result = await handler.handle(query)
+        result = await get_query_service().find_shortest_path(query)
     
     elif payload.algorithm == "all":
-        handler = FindAllPathsHandler()
         query = FindAllPathsQuery(
             project_id=payload.project_id,
             owner_id=current_user.id,
@@ -118,7 +129,7 @@ async def find_paths(
             max_depth=min(payload.max_depth, 3),  # 限制深度避免性能问题
             path_limit=payload.path_limit
         )
-        result = await handler.handle(query)
+        result = await get_query_service().find_all_paths(query)
     
     else:
         raise HTTPException(
@@ -146,12 +157,14 @@ async def find_paths(
             properties=edge_data.get("properties", {})
         ))
     
-    return PathVisualizationResponse(
+    response = PathVisualizationResponse(
         nodes=nodes,
         edges=edges,
         path_count=result.path_count,
-        found=result.found
+        found=result.found,
+        paths=[PathSequence(**path) for path in result.paths]
     )
+    return await encoder.render(response, nodes="nodes", edges="edges")
 
 
 @router.get("/neighbors")
@@ -159,46 +172,45 @@ async def get_neighbors(
     project_id: Annotated[str, Query(..., description="项目ID")],
     entity_id: Annotated[str, Query(..., description="实体ID")],
     current_user: Annotated[User, Depends(get_current_user)],
+    encoder: Annotated[GraphResponseEncoder, Depends(get_graph_encoder)],
     depth: int = Query(1, ge=1, le=3, description="邻居深度"),
     limit: int = Query(50, ge=1, le=200, description="最大返回数量"),
-) -> dict[str, Any]:
+) -> Response:
     """获取邻居节点
     
-    获取指定实体的N度邻居
+    获取指定实体的N度邻居，响应格式协商同 /paths
     """
-    from src.infrastructure.persistence.neo4j import cypher_queries as queries
-    from src.infrastructure.persistence.neo4j.client import Neo4jClient
+    from src.infrastructure.persistence.neo4j.graph_repository import Neo4jGraphRepository
     
-    query = queries.FIND_N_DEGREE_NEIGHBORS.format(depth=depth)
+    graph = await Neo4jGraphRepository().find_neighbors(
+        project_id, entity_id, depth=depth, limit=limit, include_relations=False
+    )
+    # 第一项为起点本身 (distance 0)
+    neighbors = graph["entities"][1:]
     
-    result = await Neo4jClient.execute_read(
-        query,
+    return await encoder.render(
         {
-            "project_id": project_id,
-            "start_id": entity_id,
-            "offset": 0,
-            "limit": limit
-        }
+            "entity_id": entity_id,
+            "depth": depth,
+            "neighbors": neighbors,
+            "total": len(neighbors)
+        },
+        nodes="neighbors"
     )
+
+
+@router.get("/statistics", response_model=dict[str, Any])
+async def get_query_statistics(
+    current_user: Annotated[User, Depends(get_current_user)],
+) -> dict[str, Any]:
+    """查询统计（运维）
     
-    neighbors = []
-    import json
-    for record in result:
-        entity_data = dict(record.get("entity", {}))
-        entity_data["distance"] = record.get("distance", 0)
-        
-        # 解析properties_json
-        props_json = entity_data.get("properties_json")
-        if props_json:
-            entity_data["properties"] = json.loads(props_json)
-        else:
-            entity_data["properties"] = {}
-        
-        neighbors.append(entity_data)
-    
-    return {
-        "entity_id": entity_id,
-        "depth": depth,
-        "neighbors": neighbors,
-        "total": len(neighbors)
-    }
+    本进程的查询总数、缓存命中率、合并/后台刷新次数，以及按查询类型的
+    延迟分位数（p50/p95/p99，毫秒）
+    """
+    if not current_user.is_superuser:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Superuser required"
+        )
+    return get_query_service().get_statistics()
@@ -5,18 +5,34 @@
 
 from __future__ import annotations
 
+import logging
 from typing import Annotated, Any, List
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 from pydantic import BaseModel, Field
 
 from src.api.dependencies.auth import get_current_user
+from src.application.queries.pagination import (
+    UPDATED_AT_CURSOR,
+    InvalidCursorError,
+    cursor_timestamp,
+    decode_cursor,
+    encode_cursor,
+)
 from src.domain.entities.user import User
+from src.infrastructure.cache.graph_version import get_graph_version_store
+from src.infrastructure.cache.in_memory import InMemoryPreviewCache
 from src.infrastructure.persistence.neo4j.client import Neo4jClient
 from src.infrastructure.persistence.neo4j import cypher_queries as queries
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter(prefix="/api/relations", tags=["relations"])
 
+# 关系总数缓存（按图数据版本失效），游标页复用首页的计数
+_relation_totals_cache = InMemoryPreviewCache()
+RELATION_TOTAL_CACHE_TTL = 60
+
 
 class RelationResponse(BaseModel):
     """关系响应"""
@@ -51,28 +67,55 @@ async def search_relations(
     keyword: Annotated[str | None, Query(default=None, description="搜索关键词")] = None,
     offset: int = Query(0, ge=0),
     limit: int = Query(20, ge=1, le=100),
+    cursor: str | None = Query(None, description="上一页返回的 next_cursor（提供时忽略 offset）"),
 ) -> dict[str, Any]:
     """搜索关系
     
-    支持按类型过滤和关键词搜索
+    支持按类型过滤和关键词搜索；按更新时间倒序，支持偏移量或游标分页。
+    游标页不重新计数，total 为首页的计数（缓存失效后为 null）
     """
+    after_updated_at, after_id = None, None
+    if cursor:
+        try:
+            _, (after_updated_at, after_id) = decode_cursor(cursor, UPDATED_AT_CURSOR)
+        except InvalidCursorError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+        offset = 0
+
+    # 多取一条判断是否还有下一页
     result = await Neo4jClient.execute_read(
         queries.SEARCH_RELATIONS,
         {
             "project_id": project_id,
             "relation_type": relation_type,
             "keyword": keyword,
+            "after_updated_at": after_updated_at,
+            "after_id": after_id,
             "offset": offset,
-            "limit": limit
+            "limit": limit + 1
         }
     )
+    has_more = len(result) > limit
+    result = result[:limit]
     
-    # 获取总数
-    count_result = await Neo4jClient.execute_read(
-        queries.COUNT_RELATIONS,
-        {"project_id": project_id, "relation_type": relation_type}
-    )
-    total = count_result[0].get("total", 0) if count_result else 0
+    # 获取总数：首页计数并缓存，游标页只读缓存；版本号读取失败时不使用缓存
+    try:
+        graph_version = await get_graph_version_store().get(project_id)
+    except Exception as e:
+        logger.warning(f"Graph version lookup failed for relation totals of {project_id}: {e}")
+        graph_version = None
+    cache_key = f"relation_total:{project_id}:v{graph_version}:{relation_type or ''}"
+    total = None
+    if graph_version is not None:
+        total = await _relation_totals_cache.get(cache_key)
+    if total is None and not cursor:
+        count_result = await Neo4jClient.execute_read(
+            queries.COUNT_RELATIONS,
+            {"project_id": project_id, "relation_type": relation_type}
+        )
+        total = count_result[0].get("total", 0) if count_result else 0
+        if graph_version is not None:
+            await _relation_totals_cache.set(cache_key, total, RELATION_TOTAL_CACHE_TTL)
     
     # 解析结果
     relations = []
@@ -90,13 +133,20 @@ async def search_relations(
             rel_data["properties"] = {}
         
         relations.append(rel_data)
+
+    next_cursor = None
+    if has_more and relations:
+        last_updated_at = cursor_timestamp(relations[-1].get("updated_at"))
+        if last_updated_at is not None:
+            next_cursor = encode_cursor(UPDATED_AT_CURSOR, last_updated_at, relations[-1]["id"])
     
     return {
         "relations": relations,
         "total": total,
         "offset": offset,
         "limit": limit,
-        "has_more": (offset + len(relations)) < total
+        "has_more": has_more,
+        "next_cursor": next_cursor
     }
 
 
@@ -149,6 +199,7 @@ async def delete_relation(
         queries.DELETE_RELATION,
         {"project_id": project_id, "relation_id": relation_id}
     )
+    await get_graph_version_store().bump(project_id)
 
 
 @router.post("/batch", response_model=BatchRelationResponse)
@@ -206,6 +257,7 @@ async def batch_create_relations(
             }
         )
         created_count = result[0].get("created_count", 0) if result else 0
+        await get_graph_version_store().bump(project_id)
         
         return BatchRelationResponse(
             success=len(errors) == 0,
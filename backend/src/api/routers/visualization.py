@@ -7,11 +7,13 @@ from __future__ import annotations
 
 from typing import Annotated, Any, List
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, Response, status
 
 from src.api.dependencies.auth import get_current_user
+from src.api.dependencies.encoding import GraphResponseEncoder, get_graph_encoder
 from src.api.schemas.visualization import (
     GraphVisualizationResponse,
+    GraphTileResponse,
     GraphData,
     Node,
     Edge,
@@ -21,20 +23,24 @@ from src.api.schemas.visualization import (
     CommunityItem,
     CommunityMemberItem,
     GraphStatisticsResponse,
+    GraphProjectionCatalogResponse,
+    GraphProjectionItem,
     VisualizationRequest
 )
 from src.application.queries.get_graph_visualization import (
     GetGraphVisualizationQuery,
     GetGraphVisualizationHandler
 )
-from src.application.queries.analyze_centrality import (
-    AnalyzeCentralityQuery,
-    AnalyzeCommunitiesQuery,
-    AnalyzeCentralityHandler,
-    AnalyzeCommunitiesHandler
-)
+from src.application.queries.get_graph_tile import GetGraphTileHandler, GetGraphTileQuery
+from src.application.queries.analyze_centrality import AnalyzeCentralityQuery, AnalyzeCommunitiesQuery
+from src.application.services.query_service import get_query_service
 from src.domain.entities.user import User
+from src.infrastructure.persistence.neo4j.gds_projections import (
+    GraphProjectionError,
+    get_projection_manager,
+)
 from src.infrastructure.persistence.neo4j.graph_algorithms import GraphAlgorithmRunner
+from src.infrastructure.persistence.neo4j.tile_index import TileIndexUnavailableError
 
 router = APIRouter(prefix="/api/visualization", tags=["visualization"])
 
@@ -43,17 +49,31 @@ router = APIRouter(prefix="/api/visualization", tags=["visualization"])
 async def get_graph_data(
     project_id: Annotated[str, Query(..., description="项目ID")],
     current_user: Annotated[User, Depends(get_current_user)],
+    encoder: Annotated[GraphResponseEncoder, Depends(get_graph_encoder)],
     node_limit: int = Query(500, ge=10, le=2000, description="最大节点数"),
     entity_type: str | None = Query(None, description="按实体类型过滤"),
     center_entity_id: str | None = Query(None, description="中心实体ID（ego network）"),
     depth: int = Query(2, ge=1, le=5, description="邻居深度"),
-) -> GraphVisualizationResponse:
+    layout: str = Query(
+        "forceatlas2",
+        pattern="^(forceatlas2|fruchterman_reingold|none)$",
+        description="服务端布局算法，none 表示不返回坐标",
+    ),
+    summarize: bool = Query(True, description="实体数超过 node_limit 时返回超节点摘要"),
+    group_by: str = Query("community", pattern="^(community|type)$", description="超节点分组方式"),
+    group: str | None = Query(None, description="下钻的超节点分组值（超节点 value.group）"),
+) -> Response:
     """获取图可视化数据
     
     返回适配ECharts的图数据（nodes + edges）
     
     - 不指定center_entity_id时，返回项目子图
     - 指定center_entity_id时，返回以该节点为中心的ego network
+    - 项目实体数超过node_limit时返回按社区/类型聚合的超节点（summarized 为 true），
+      用超节点的 value.group_by 和 value.group 作为 group_by、group 参数下钻到成员
+    - 节点带有服务端计算并缓存的布局坐标 x/y，前端可直接使用 layout: 'none'
+    - Accept 为 application/vnd.apache.arrow.stream 或 application/msgpack 时返回
+      列式编码（边的 source/target 为节点行号），JSON 按 Accept-Encoding 压缩
     """
     handler = GetGraphVisualizationHandler()
     query = GetGraphVisualizationQuery(
@@ -62,10 +82,17 @@ async def get_graph_data(
         node_limit=node_limit,
         entity_type=entity_type,
         center_entity_id=center_entity_id,
-        depth=depth
+        depth=depth,
+        layout=None if layout == "none" else layout,
+        summarize=summarize,
+        group_by=group_by,
+        group=group
     )
     
-    result = await handler.handle(query)
+    try:
+        result = await handler.handle(query)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     
     # 转换为响应格式
     nodes = [
@@ -74,7 +101,9 @@ async def get_graph_data(
             name=n.name,
             category=n.category,
             symbolSize=n.symbolSize,
-            value=n.value
+            value=n.value,
+            x=n.x,
+            y=n.y
         )
         for n in result.nodes
     ]
@@ -89,15 +118,93 @@ async def get_graph_data(
         for e in result.edges
     ]
     
-    return GraphVisualizationResponse(
+    response = GraphVisualizationResponse(
         data=GraphData(
             nodes=nodes,
             edges=edges,
             categories=result.categories
         ),
         total_nodes=len(nodes),
-        total_edges=len(edges)
+        total_edges=len(edges),
+        summarized=result.summarized
+    )
+    return await encoder.render(response, nodes="data.nodes", edges="data.edges")
+
+
+@router.get("/tiles/{z}/{x}/{y}", response_model=GraphTileResponse)
+async def get_graph_tile(
+    z: Annotated[int, Path(ge=0, le=24, description="缩放层级")],
+    x: Annotated[int, Path(ge=0, description="瓦片列号")],
+    y: Annotated[int, Path(ge=0, description="瓦片行号")],
+    project_id: Annotated[str, Query(..., description="项目ID")],
+    current_user: Annotated[User, Depends(get_current_user)],
+    encoder: Annotated[GraphResponseEncoder, Depends(get_graph_encoder)],
+) -> Response:
+    """获取视口瓦片
+    
+    在服务端计算并持久化的全图布局上按四叉树瓦片返回节点和边，前端只请求
+    视口内的瓦片。每个瓦片至多 GRAPH_TILE_CAPACITY 个节点，层级越低只保留
+    度数越高的节点；先请求 0/0/0 取得坐标范围 (origin_x, origin_y, size)。
+    列式编码中另一端在相邻瓦片的边，source/target 行号为 -1。
+    """
+    handler = GetGraphTileHandler()
+    query = GetGraphTileQuery(
+        project_id=project_id,
+        owner_id=current_user.id,
+        z=z,
+        x=x,
+        y=y
+    )
+    
+    try:
+        result = await handler.handle(query)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except TileIndexUnavailableError:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Project graph is too large for a tile index, use /graph with node_limit instead"
+        )
+    
+    nodes = [
+        Node(
+            id=n.id,
+            name=n.name,
+            category=n.category,
+            symbolSize=n.symbolSize,
+            value=n.value,
+            x=n.x,
+            y=n.y
+        )
+        for n in result.nodes
+    ]
+    edges = [
+        Edge(
+            source=e.source,
+            target=e.target,
+            relation=e.relation,
+            value=e.value
+        )
+        for e in result.edges
+    ]
+    
+    response = GraphTileResponse(
+        data=GraphData(
+            nodes=nodes,
+            edges=edges,
+            categories=result.categories
+        ),
+        z=z,
+        x=x,
+        y=y,
+        origin_x=result.origin_x,
+        origin_y=result.origin_y,
+        size=result.size,
+        max_zoom=result.max_zoom,
+        graph_version=result.graph_version,
+        truncated=result.truncated
     )
+    return await encoder.render(response, nodes="data.nodes", edges="data.edges")
 
 
 @router.post("/graph", response_model=GraphVisualizationResponse)
@@ -105,10 +212,11 @@ async def get_graph_data_post(
     payload: VisualizationRequest,
     project_id: Annotated[str, Query(..., description="项目ID")],
     current_user: Annotated[User, Depends(get_current_user)],
-) -> GraphVisualizationResponse:
+    encoder: Annotated[GraphResponseEncoder, Depends(get_graph_encoder)],
+) -> Response:
     """获取图可视化数据 (POST方法)
     
-    支持通过请求体传递更多参数
+    支持通过请求体传递更多参数，响应格式协商同 GET
     """
     handler = GetGraphVisualizationHandler()
     query = GetGraphVisualizationQuery(
@@ -117,10 +225,17 @@ async def get_graph_data_post(
         node_limit=payload.node_limit,
         entity_type=payload.entity_type,
         center_entity_id=payload.center_entity_id,
-        depth=payload.depth
+        depth=payload.depth,
+        layout=None if payload.layout == "none" else payload.layout,
+        summarize=payload.summarize,
+        group_by=payload.group_by,
+        group=payload.group
     )
     
-    result = await handler.handle(query)
+    try:
+        result = await handler.handle(query)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     
     nodes = [
         Node(
@@ -128,7 +243,9 @@ async def get_graph_data_post(
             name=n.name,
             category=n.category,
             symbolSize=n.symbolSize,
-            value=n.value
+            value=n.value,
+            x=n.x,
+            y=n.y
         )
         for n in result.nodes
     ]
@@ -143,15 +260,17 @@ async def get_graph_data_post(
         for e in result.edges
     ]
     
-    return GraphVisualizationResponse(
+    response = GraphVisualizationResponse(
         data=GraphData(
             nodes=nodes,
             edges=edges,
             categories=result.categories
         ),
         total_nodes=len(nodes),
-        total_edges=len(edges)
+        total_edges=len(edges),
+        summarized=result.summarized
     )
+    return await encoder.render(response, nodes="data.nodes", edges="data.edges")
 
 
 @router.get("/centrality", response_model=CentralityAnalysisResponse)
@@ -160,12 +279,13 @@ async def analyze_centrality(
     current_user: Annotated[User, Depends(get_current_user)],
     algorithm: str = Query("pagerank", description="算法: pagerank | betweenness | degree"),
     limit: int = Query(100, ge=1, le=500, description="返回数量"),
+    source_ids: list[str] | None = Query(None, description="个性化PageRank的源实体ID"),
 ) -> CentralityAnalysisResponse:
     """中心性分析
     
     计算图中节点的中心性分数
     
-    - pagerank: PageRank算法，识别重要节点
+    - pagerank: PageRank算法，识别重要节点；指定 source_ids 时为个性化PageRank
     - betweenness: Betweenness算法，识别桥梁节点
     - degree: 度中心性，识别连接数多的节点
     """
@@ -175,15 +295,15 @@ async def analyze_centrality(
             detail=f"Unsupported algorithm: {algorithm}"
         )
     
-    handler = AnalyzeCentralityHandler()
     query = AnalyzeCentralityQuery(
         project_id=project_id,
         owner_id=current_user.id,
         algorithm=algorithm,
-        limit=limit
+        limit=limit,
+        source_ids=source_ids
     )
     
-    result = await handler.handle(query)
+    result = await get_query_service().analyze_centrality(query)
     
     scores = [
         CentralityScoreItem(
@@ -223,14 +343,13 @@ async def analyze_communities(
             detail=f"Unsupported algorithm: {algorithm}"
         )
     
-    handler = AnalyzeCommunitiesHandler()
     query = AnalyzeCommunitiesQuery(
         project_id=project_id,
         owner_id=current_user.id,
         algorithm=algorithm
     )
     
-    result = await handler.handle(query)
+    result = await get_query_service().analyze_communities(query)
     
     communities = [
         CommunityItem(
@@ -274,3 +393,31 @@ async def get_statistics(
         entity_type_distribution=stats["entity_type_distribution"],
         relation_type_distribution=stats["relation_type_distribution"]
     )
+
+
+@router.get("/projections", response_model=GraphProjectionCatalogResponse)
+async def list_graph_projections(
+    current_user: Annotated[User, Depends(get_current_user)],
+) -> GraphProjectionCatalogResponse:
+    """GDS图投影目录（运维）
+    
+    列出Neo4j中各项目的图投影、内存占用、投影时的图数据版本以及是否已过期
+    """
+    if not current_user.is_superuser:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Superuser required"
+        )
+    
+    try:
+        catalog = await get_projection_manager().catalog()
+    except GraphProjectionError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e)
+        )
+    
+    return GraphProjectionCatalogResponse(
+        projections=[GraphProjectionItem(**entry) for entry in catalog],
+        total_size_bytes=sum(entry["size_bytes"] or 0 for entry in catalog)
+    )
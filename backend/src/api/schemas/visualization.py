@@ -30,8 +30,8 @@ class Node(BaseModel):
     category: int = Field(default=0, description="节点分类索引，用于ECharts颜色区分")
     symbolSize: int = Field(default=40, description="节点大小")
     value: dict[str, Any] = Field(default_factory=dict, description="附加数据")
-    x: Optional[float] = Field(default=None, description="X坐标（力引导布局时使用）")
-    y: Optional[float] = Field(default=None, description="Y坐标（力引导布局时使用）")
+    x: Optional[float] = Field(default=None, description="X坐标（服务端力引导布局）")
+    y: Optional[float] = Field(default=None, description="Y坐标（服务端力引导布局）")
     fixed: Optional[bool] = Field(default=None, description="是否固定位置")
     
     class Config:
@@ -118,6 +118,14 @@ class VisualizationRequest(BaseModel):
     entity_type: Optional[str] = Field(default=None, description="按实体类型过滤")
     center_entity_id: Optional[str] = Field(default=None, description="中心实体ID（ego network）")
     depth: int = Field(default=2, ge=1, le=5, description="邻居深度")
+    layout: str = Field(
+        default="forceatlas2",
+        pattern="^(forceatlas2|fruchterman_reingold|none)$",
+        description="服务端布局算法，none 表示不返回坐标"
+    )
+    summarize: bool = Field(default=True, description="实体数超过 node_limit 时返回超节点摘要")
+    group_by: str = Field(default="community", pattern="^(community|type)$", description="超节点分组方式")
+    group: Optional[str] = Field(default=None, description="下钻的超节点分组值")
 
 
 class GraphVisualizationResponse(BaseModel):
@@ -125,6 +133,25 @@ class GraphVisualizationResponse(BaseModel):
     data: GraphData
     total_nodes: int = Field(description="节点总数")
     total_edges: int = Field(description="边总数")
+    summarized: bool = Field(default=False, description="节点是否为超节点摘要")
+
+
+class GraphTileResponse(BaseModel):
+    """视口瓦片响应
+
+    第 z 层的瓦片 (x, y) 覆盖 [origin_x + x·size/2^z, origin_x + (x+1)·size/2^z) ×
+    [origin_y + y·size/2^z, origin_y + (y+1)·size/2^z)，前端按视口计算需要的瓦片。
+    """
+    data: GraphData
+    z: int = Field(description="缩放层级")
+    x: int = Field(description="瓦片列号")
+    y: int = Field(description="瓦片行号")
+    origin_x: float = Field(description="第 0 层瓦片的最小X坐标")
+    origin_y: float = Field(description="第 0 层瓦片的最小Y坐标")
+    size: float = Field(description="第 0 层瓦片的边长")
+    max_zoom: int = Field(description="所有节点都已显示的层级")
+    graph_version: int = Field(description="索引构建时的图数据版本号")
+    truncated: bool = Field(default=False, description="边数超过上限被截断")
 
 
 class CentralityScoreItem(BaseModel):
@@ -182,12 +209,19 @@ class PathEdge(BaseModel):
     properties: dict[str, Any]
 
 
+class PathSequence(BaseModel):
+    """单条路径依次经过的节点和关系"""
+    node_ids: List[str]
+    relation_ids: List[str]
+
+
 class PathVisualizationResponse(BaseModel):
     """路径可视化响应"""
     nodes: List[PathNode]
     edges: List[PathEdge]
     path_count: int
     found: bool
+    paths: List[PathSequence] = Field(default_factory=list, description="每条路径（按长度升序）")
 
 
 class GraphStatisticsResponse(BaseModel):
@@ -197,3 +231,24 @@ class GraphStatisticsResponse(BaseModel):
     entity_types: List[str]
     entity_type_distribution: List[dict[str, Any]]
     relation_type_distribution: List[dict[str, Any]]
+
+
+class GraphProjectionItem(BaseModel):
+    """GDS图投影目录项（没有使用记录的投影，项目相关字段为空）"""
+    graph_name: str
+    node_count: Optional[int] = None
+    relationship_count: Optional[int] = None
+    size_bytes: Optional[int] = None
+    created_at: Optional[str] = None
+    project_id: Optional[str] = None
+    graph_version: Optional[int] = Field(None, description="投影时的图数据版本号")
+    current_version: Optional[int] = None
+    stale: Optional[bool] = Field(None, description="投影后图数据是否已变化")
+    last_used_at: Optional[str] = None
+    estimated_bytes: Optional[int] = None
+
+
+class GraphProjectionCatalogResponse(BaseModel):
+    """GDS图投影目录响应"""
+    projections: List[GraphProjectionItem]
+    total_size_bytes: int
@@ -115,9 +115,34 @@ class BackupService:
         )
 
     async def _backup_graph_data(self, project_id: str, output_dir: Path) -> None:
-        """备份图谱数据"""
+        """备份图谱数据
+
+        实体和关系分别流式导出为 JSON Lines 文件，内存占用与项目规模无关
+        """
+        from src.infrastructure.persistence.neo4j import cypher_queries as queries
+
         output_dir.mkdir(parents=True, exist_ok=True)
-        # TODO: 导出Neo4j数据
+        await self._export_jsonl(
+            queries.EXPORT_ENTITIES, project_id, output_dir / "entities.jsonl"
+        )
+        await self._export_jsonl(
+            queries.EXPORT_RELATIONS, project_id, output_dir / "relations.jsonl"
+        )
+
+    async def _export_jsonl(self, query: str, project_id: str, output_path: Path) -> int:
+        """将查询结果逐批写入 JSON Lines 文件，返回导出的记录数"""
+        import json
+        from src.infrastructure.persistence.neo4j.client import Neo4jClient
+
+        exported = 0
+        with output_path.open("w", encoding="utf-8") as f:
+            async for batch in Neo4jClient.iter_read_batches(query, {"project_id": project_id}):
+                f.writelines(
+                    json.dumps(record, ensure_ascii=False, default=str) + "\n"
+                    for record in batch
+                )
+                exported += len(batch)
+        return exported
 
     async def _backup_documents(self, project_id: str, output_dir: Path) -> None:
         """备份文档"""
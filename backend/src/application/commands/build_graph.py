@@ -11,6 +11,10 @@ from uuid import uuid4
 
 from src.domain.entities.entity import Entity
 from src.domain.entities.relation import Relation
+from src.domain.services.matching.similarity_index import (
+    NameSimilarityIndex,
+    SimilarityIndexConfig
+)
 from src.domain.value_objects.entity_type import EntityType
 from src.domain.value_objects.relation_type import RelationType
 
@@ -135,9 +139,16 @@ class GraphBuilder:
     负责将抽取结果转换为图谱数据并持久化
     """
     
-    def __init__(self, normalizer: EntityNormalizer | None = None):
+    def __init__(
+        self,
+        normalizer: EntityNormalizer | None = None,
+        batch_size: int = 100,
+        index_config: SimilarityIndexConfig | None = None
+    ):
         self._normalizer = normalizer or EntityNormalizer()
         self._entity_map: dict[str, str] = {}  # 文本 -> 实体ID 映射
+        self._batch_size = max(batch_size, 1)
+        self._index_config = index_config
     
     async def build(
         self,
@@ -184,6 +195,8 @@ class GraphBuilder:
             实体文本到ID的映射
         """
         entity_id_map = {}
+        duplicate_index: NameSimilarityIndex[str] = NameSimilarityIndex(self._index_config)
+        pending: list[tuple[Entity, dict[str, Any]]] = []
         
         for entity_data in command.entities:
             try:
@@ -197,11 +210,13 @@ class GraphBuilder:
                 if command.merge_duplicates:
                     existing_id = self._find_duplicate(
                         normalized_text,
-                        entity_type,
-                        entity_id_map
+                        entity_id_map,
+                        duplicate_index,
+                        command.duplicate_threshold
                     )
                     if existing_id:
                         entity_id_map[normalized_text] = existing_id
+                        duplicate_index.add(normalized_text, normalized_text)
                         result.merged_entities += 1
                         continue
                 
@@ -219,10 +234,13 @@ class GraphBuilder:
                     properties=entity_data.get("properties", {})
                 )
                 
-                await entity_repo.merge_entity(entity)
-                
                 entity_id_map[normalized_text] = entity.id
-                result.created_entities += 1
+                duplicate_index.add(normalized_text, normalized_text)
+                pending.append((entity, entity_data))
+                
+                if len(pending) >= self._batch_size:
+                    await self._flush_entities(pending, entity_repo, result)
+                    pending = []
                 
             except Exception as e:
                 result.failed_items.append({
@@ -231,8 +249,31 @@ class GraphBuilder:
                     "error": str(e)
                 })
         
+        await self._flush_entities(pending, entity_repo, result)
+        
         return entity_id_map
     
+    async def _flush_entities(
+        self,
+        pending: list[tuple[Entity, dict[str, Any]]],
+        entity_repo: Any,
+        result: BuildGraphResult
+    ) -> None:
+        """批量写入一批实体，整批失败时逐项记录"""
+        if not pending:
+            return
+        
+        try:
+            await entity_repo.merge_entities_bulk([entity for entity, _ in pending])
+            result.created_entities += len(pending)
+        except Exception as e:
+            for _, entity_data in pending:
+                result.failed_items.append({
+                    "type": "entity",
+                    "data": entity_data,
+                    "error": str(e)
+                })
+    
     async def _process_relations(
         self,
         command: BuildGraphCommand,
@@ -241,6 +282,8 @@ class GraphBuilder:
         result: BuildGraphResult
     ) -> None:
         """处理关系创建"""
+        pending: list[tuple[Relation, dict[str, Any]]] = []
+        
         for relation_data in command.relations:
             try:
                 source_text = relation_data.get("source_text", "")
@@ -277,8 +320,11 @@ class GraphBuilder:
                     properties=relation_data.get("properties", {})
                 )
                 
-                await entity_repo.merge_relation(relation)
-                result.created_relations += 1
+                pending.append((relation, relation_data))
+                
+                if len(pending) >= self._batch_size:
+                    await self._flush_relations(pending, entity_repo, result)
+                    pending = []
                 
             except Exception as e:
                 result.failed_items.append({
@@ -286,19 +332,61 @@ class GraphBuilder:
                     "data": relation_data,
                     "error": str(e)
                 })
+        
+        await self._flush_relations(pending, entity_repo, result)
+    
+    async def _flush_relations(
+        self,
+        pending: list[tuple[Relation, dict[str, Any]]],
+        entity_repo: Any,
+        result: BuildGraphResult
+    ) -> None:
+        """批量写入一批关系
+
+        端点实体不存在的关系会被UNWIND查询跳过，按返回的ID逐项记录失败
+        """
+        if not pending:
+            return
+        
+        try:
+            merged_ids = set(
+                await entity_repo.merge_relations_bulk([relation for relation, _ in pending])
+            )
+        except Exception as e:
+            for _, relation_data in pending:
+                result.failed_items.append({
+                    "type": "relation",
+                    "data": relation_data,
+                    "error": str(e)
+                })
+            return
+        
+        for relation, relation_data in pending:
+            if relation.id in merged_ids:
+                result.created_relations += 1
+            else:
+                result.failed_items.append({
+                    "type": "relation",
+                    "data": relation_data,
+                    "error": "Source or target entity not found"
+                })
     
     def _find_duplicate(
         self,
         normalized_text: str,
-        entity_type: str,
-        entity_id_map: dict[str, str]
+        entity_id_map: dict[str, str],
+        duplicate_index: NameSimilarityIndex[str],
+        threshold: float
     ) -> str | None:
-        """查找重复实体"""
-        for existing_text, entity_id in entity_id_map.items():
+        """查找重复实体
+
+        只对相似度索引返回的候选计算编辑距离相似度
+        """
+        for existing_text in duplicate_index.query(normalized_text):
             similarity = self._normalizer.calculate_similarity(
                 normalized_text,
                 existing_text
             )
-            if similarity >= 0.85:  # 阈值
-                return entity_id
+            if similarity >= threshold:
+                return entity_id_map[existing_text]
         return None
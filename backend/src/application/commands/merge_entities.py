@@ -9,6 +9,12 @@ from dataclasses import dataclass, field
 from typing import Any
 from uuid import uuid4
 
+from src.domain.ports.repositories import GraphVersionPort
+from src.domain.services.matching.similarity_index import (
+    NameSimilarityIndex,
+    SimilarityIndexConfig
+)
+
 
 @dataclass
 class EntityMergeCandidate:
@@ -96,6 +102,16 @@ class EntityMergeService:
     
     MERGE_STRATEGIES = ["keep_target", "keep_newest", "merge_all"]
     
+    def __init__(
+        self,
+        index_config: SimilarityIndexConfig | None = None,
+        versions: GraphVersionPort | None = None,
+    ):
+        from src.infrastructure.cache.graph_version import get_graph_version_store
+
+        self._index_config = index_config
+        self._versions = versions or get_graph_version_store()
+    
     async def find_candidates(
         self,
         query: FindMergeCandidatesQuery,
@@ -103,7 +119,7 @@ class EntityMergeService:
     ) -> FindMergeCandidatesResult:
         """查找融合候选
         
-        使用简单的文本相似度算法找出可能重复的实体
+        先用名称相似度索引生成候选，再用文本相似度算法确认可能重复的实体
         
         Args:
             query: 查找查询
@@ -120,37 +136,42 @@ class EntityMergeService:
         cypher_query = """
         MATCH (n:Entity {project_id: $project_id})
         WHERE $entity_type IS NULL OR n.type = $entity_type
-        RETURN n.id as id, n.external_id as text, n.type as type, n.updated_at as updated_at
+        RETURN n.id as id, n.external_id as text, n.type as type
         """
         
-        records = await Neo4jClient.execute_read(
+        # 流式读取并按类型分组，避免一次性物化全部记录
+        entities_by_type: dict[str, list[dict]] = {}
+        async for batch in Neo4jClient.iter_read_batches(
             cypher_query,
             {
                 "project_id": query.project_id,
                 "entity_type": query.entity_type
             }
-        )
-        
-        # 按类型分组
-        entities_by_type: dict[str, list[dict]] = {}
-        for record in records:
-            etype = record.get("type", "OTHER")
-            if etype not in entities_by_type:
-                entities_by_type[etype] = []
-            entities_by_type[etype].append(record)
+        ):
+            for record in batch:
+                etype = record.get("type", "OTHER")
+                if etype not in entities_by_type:
+                    entities_by_type[etype] = []
+                entities_by_type[etype].append(record)
         
         # 在每个类型内查找相似实体
         candidates = []
         
         for etype, entities in entities_by_type.items():
-            # 使用简单的两两比较
+            # 建立相似度索引，只比较索引给出的候选
+            index: NameSimilarityIndex[int] = NameSimilarityIndex(self._index_config)
+            for position, entity in enumerate(entities):
+                index.add(position, entity.get("text") or "")
+            
             n = len(entities)
             for i in range(n):
                 group = []
                 entity_i = entities[i]
                 text_i = entity_i.get("text", "")
                 
-                for j in range(i + 1, n):
+                for j in index.query(text_i or ""):
+                    if j <= i:
+                        continue
                     entity_j = entities[j]
                     text_j = entity_j.get("text", "")
                     
@@ -257,6 +278,9 @@ class EntityMergeService:
         except Exception as e:
             result.success = False
             result.errors.append(str(e))
+        finally:
+            # 属性更新和关系转移不经过仓库，单独使缓存失效（部分失败时也可能已写入）
+            await self._versions.bump(command.project_id)
         
         return result
     
@@ -347,62 +371,52 @@ class EntityMergeService:
     ) -> int:
         """转移关系
         
-        将所有与源实体相关的关系转移到目标实体
+        将所有与源实体相关的关系转移到目标实体，
+        所有源实体的出边/入边转移在同一个事务中完成
         """
         from src.infrastructure.persistence.neo4j.client import Neo4jClient
         
-        transferred = 0
+        # 转移出边
+        out_query = """
+        MATCH (source:Entity {id: $source_id, project_id: $project_id})-[r:RELATION]->(target)
+        MATCH (new_source:Entity {id: $target_id, project_id: $project_id})
+        MERGE (new_source)-[new_r:RELATION {id: r.id}]->(target)
+        SET new_r.type = r.type,
+            new_r.properties_json = r.properties_json,
+            new_r.project_id = r.project_id,
+            new_r.source_id = $target_id,
+            new_r.target_id = r.target_id,
+            new_r.updated_at = datetime()
+        DELETE r
+        """
+        
+        # 转移入边
+        in_query = """
+        MATCH (source)-[r:RELATION]->(target:Entity {id: $source_id, project_id: $project_id})
+        MATCH (new_target:Entity {id: $target_id, project_id: $project_id})
+        MERGE (source)-[new_r:RELATION {id: r.id}]->(new_target)
+        SET new_r.type = r.type,
+            new_r.properties_json = r.properties_json,
+            new_r.project_id = r.project_id,
+            new_r.source_id = r.source_id,
+            new_r.target_id = $target_id,
+            new_r.updated_at = datetime()
+        DELETE r
+        """
         
+        statements = []
         for source_id in source_entity_ids:
-            # 转移出边
-            out_query = """
-            MATCH (source:Entity {id: $source_id, project_id: $project_id})-[r:RELATION]->(target)
-            MATCH (new_source:Entity {id: $target_id, project_id: $project_id})
-            MERGE (new_source)-[new_r:RELATION {id: r.id}]->(target)
-            SET new_r.type = r.type,
-                new_r.properties_json = r.properties_json,
-                new_r.project_id = r.project_id,
-                new_r.source_id = $target_id,
-                new_r.target_id = r.target_id,
-                new_r.updated_at = datetime()
-            DELETE r
-            """
-            
-            await Neo4jClient.execute_write(
-                out_query,
-                {
-                    "project_id": project_id,
-                    "source_id": source_id,
-                    "target_id": target_entity_id
-                }
-            )
-            
-            # 转移入边
-            in_query = """
-            MATCH (source)-[r:RELATION]->(target:Entity {id: $source_id, project_id: $project_id})
-            MATCH (new_target:Entity {id: $target_id, project_id: $project_id})
-            MERGE (source)-[new_r:RELATION {id: r.id}]->(new_target)
-            SET new_r.type = r.type,
-                new_r.properties_json = r.properties_json,
-                new_r.project_id = r.project_id,
-                new_r.source_id = r.source_id,
-                new_r.target_id = $target_id,
-                new_r.updated_at = datetime()
-            DELETE r
-            """
-            
-            await Neo4jClient.execute_write(
-                in_query,
-                {
-                    "project_id": project_id,
-                    "source_id": source_id,
-                    "target_id": target_entity_id
-                }
-            )
-            
-            transferred += 1
+            params = {
+                "project_id": project_id,
+                "source_id": source_id,
+                "target_id": target_entity_id
+            }
+            statements.append((out_query, params))
+            statements.append((in_query, params))
+        
+        await Neo4jClient.execute_write_many(statements)
         
-        return transferred
+        return len(source_entity_ids)
     
     def _calculate_similarity(self, text1: str, text2: str) -> float:
         """计算文本相似度"""
@@ -21,6 +21,11 @@ from src.application.queries.get_graph_visualization import (
     GraphVisualizationResult,
     GetGraphVisualizationHandler
 )
+from src.application.queries.get_graph_tile import (
+    GetGraphTileQuery,
+    GraphTileResult,
+    GetGraphTileHandler
+)
 from src.application.queries.analyze_centrality import (
     AnalyzeCentralityQuery,
     AnalyzeCommunitiesQuery,
@@ -54,6 +59,9 @@ __all__ = [
     "GetGraphVisualizationQuery",
     "GraphVisualizationResult",
     "GetGraphVisualizationHandler",
+    "GetGraphTileQuery",
+    "GraphTileResult",
+    "GetGraphTileHandler",
     # Analysis
     "AnalyzeCentralityQuery",
     "AnalyzeCommunitiesQuery",
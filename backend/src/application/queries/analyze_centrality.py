@@ -12,6 +12,10 @@ from src.infrastructure.persistence.neo4j.graph_algorithms import (
     GraphAlgorithmRunner,
     GraphAlgorithmError
 )
+from src.infrastructure.persistence.neo4j.score_materializer import (
+    ScoreMaterializer,
+    get_score_materializer
+)
 
 
 @dataclass(slots=True)
@@ -23,11 +27,13 @@ class AnalyzeCentralityQuery:
         owner_id: 用户ID（用于权限验证）
         algorithm: 算法类型 (pagerank, betweenness, degree)
         limit: 返回结果数量
+        source_ids: 个性化PageRank的源实体ID（仅 pagerank 有效）
     """
     project_id: str
     owner_id: str
     algorithm: str = "pagerank"  # pagerank, betweenness, degree
     limit: int = 100
+    source_ids: list[str] | None = None
 
 
 @dataclass(slots=True)
@@ -69,8 +75,13 @@ class AnalyzeCentralityHandler:
     
     SUPPORTED_ALGORITHMS = ["pagerank", "betweenness", "degree"]
     
-    def __init__(self, runner: GraphAlgorithmRunner | None = None):
+    def __init__(
+        self,
+        runner: GraphAlgorithmRunner | None = None,
+        scores: ScoreMaterializer | None = None
+    ):
         self._runner = runner or GraphAlgorithmRunner()
+        self._scores = scores or get_score_materializer()
     
     async def handle(self, query: AnalyzeCentralityQuery) -> CentralityAnalysisResult:
         """执行中心性分析
@@ -92,24 +103,14 @@ class AnalyzeCentralityHandler:
         start_time = time.time()
         
         try:
-            if query.algorithm == "pagerank":
-                raw_scores = await self._runner.run_pagerank(
-                    project_id=query.project_id,
-                    limit=query.limit
-                )
-            elif query.algorithm == "betweenness":
-                raw_scores = await self._runner.run_betweenness(
-                    project_id=query.project_id,
-                    limit=query.limit
-                )
-            else:  # degree
-                from src.infrastructure.persistence.neo4j.client import Neo4jClient
-                from src.infrastructure.persistence.neo4j import cypher_queries as queries
-                
-                raw_scores = await Neo4jClient.execute_read(
-                    queries.DEGREE_CENTRALITY,
-                    {"project_id": query.project_id, "limit": query.limit}
+            raw_scores = None
+            if not query.source_ids:
+                # 已物化的分数直接按索引读取，不再运行算法
+                raw_scores = await self._scores.top_entities(
+                    query.project_id, query.algorithm, query.limit
                 )
+            if raw_scores is None:
+                raw_scores = await self._run_algorithm(query)
             
             execution_time = (time.time() - start_time) * 1000
             
@@ -139,6 +140,28 @@ class AnalyzeCentralityHandler:
                 return await self._fallback_to_degree(query)
             raise
     
+    async def _run_algorithm(self, query: AnalyzeCentralityQuery) -> list[dict[str, Any]]:
+        """运行中心性算法"""
+        if query.algorithm == "pagerank":
+            return await self._runner.run_pagerank(
+                project_id=query.project_id,
+                limit=query.limit,
+                source_ids=query.source_ids
+            )
+        if query.algorithm == "betweenness":
+            return await self._runner.run_betweenness(
+                project_id=query.project_id,
+                limit=query.limit
+            )
+        # degree
+        from src.infrastructure.persistence.neo4j.client import Neo4jClient
+        from src.infrastructure.persistence.neo4j import cypher_queries as queries
+        
+        return await Neo4jClient.execute_read(
+            queries.DEGREE_CENTRALITY,
+            {"project_id": query.project_id, "limit": query.limit}
+        )
+    
     async def _fallback_to_degree(
         self,
         query: AnalyzeCentralityQuery
@@ -217,8 +240,13 @@ class CommunityAnalysisResult:
 class AnalyzeCommunitiesHandler:
     """社区发现处理器"""
     
-    def __init__(self, runner: GraphAlgorithmRunner | None = None):
+    def __init__(
+        self,
+        runner: GraphAlgorithmRunner | None = None,
+        scores: ScoreMaterializer | None = None
+    ):
         self._runner = runner or GraphAlgorithmRunner()
+        self._scores = scores or get_score_materializer()
     
     async def handle(self, query: AnalyzeCommunitiesQuery) -> CommunityAnalysisResult:
         """执行社区发现分析
@@ -231,7 +259,13 @@ class AnalyzeCommunitiesHandler:
         """
         try:
             if query.algorithm == "louvain":
-                raw_results = await self._runner.run_louvain(
+                raw_results = await self._scores.communities(query.project_id)
+                if raw_results is None:
+                    raw_results = await self._runner.run_louvain(
+                        project_id=query.project_id
+                    )
+            elif query.algorithm == "label_propagation":
+                raw_results = await self._runner.run_label_propagation(
                     project_id=query.project_id
                 )
             else:
@@ -1,14 +1,25 @@
 """路径查找查询
 
-支持最短路径查找和所有路径查找
+支持最短路径查找和所有路径查找。
+
+优先在进程内邻接快照上搜索（双向 BFS / Yen k 最短路径），取够 path_limit 条即停止，
+再按 ID 回填路径上实体和关系的属性；快照不可用（禁用、项目过大、加载失败）时回退到
+Cypher 变长模式查询。
 """
 
 from __future__ import annotations
 
 import json
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from itertools import islice
 from typing import Any, Type
 
+from src.domain.services.analysis.path_finder import GraphPath, k_shortest_paths, shortest_path
+from src.infrastructure.persistence.neo4j.adjacency_snapshot import (
+    AdjacencySnapshot,
+    AdjacencySnapshotStore,
+    get_adjacency_snapshot_store,
+)
 from src.infrastructure.persistence.neo4j.client import Neo4jClient
 from src.infrastructure.persistence.neo4j import cypher_queries as queries
 
@@ -56,22 +67,77 @@ class PathResult:
     """路径查找结果
     
     Attributes:
-        nodes: 路径中的节点列表
-        relations: 路径中的关系列表
+        nodes: 路径中的节点列表（多条路径去重合并）
+        relations: 路径中的关系列表（多条路径去重合并）
         path_count: 路径数量（所有路径查找时有效）
         found: 是否找到路径
+        paths: 每条路径依次经过的 node_ids 和 relation_ids，按长度升序
     """
     nodes: list[dict[str, Any]]
     relations: list[dict[str, Any]]
     path_count: int = 1
     found: bool = True
+    paths: list[dict[str, list[str]]] = field(default_factory=list)
+
+
+async def load_path_result(
+    client: Type[Neo4jClient],
+    snapshot: AdjacencySnapshot,
+    paths: list[GraphPath],
+) -> PathResult:
+    """把快照中的路径映射回实体/关系 ID，并从 Neo4j 回填属性"""
+    if not paths:
+        return PathResult(nodes=[], relations=[], found=False)
+    
+    id_paths = [
+        {
+            "node_ids": [snapshot.node_id(node) for node in path.nodes],
+            "relation_ids": [snapshot.edge_id(edge) for edge in path.edges],
+        }
+        for path in paths
+    ]
+    node_ids = list(dict.fromkeys(i for path in id_paths for i in path["node_ids"]))
+    relation_ids = list(dict.fromkeys(i for path in id_paths for i in path["relation_ids"]))
+    
+    params = {"project_id": snapshot.project_id}
+    node_records = await client.execute_read(queries.GET_ENTITIES_BY_IDS, {**params, "ids": node_ids})
+    relation_records = await client.execute_read(
+        queries.GET_RELATIONS_BY_IDS, {**params, "ids": relation_ids}
+    )
+    
+    nodes = {node["id"]: node for node in (_with_properties(r["entity"]) for r in node_records)}
+    relations = {}
+    for record in relation_records:
+        rel = _with_properties(record["relation"])
+        relations[rel["id"]] = rel
+    
+    return PathResult(
+        nodes=[nodes[i] for i in node_ids if i in nodes],
+        relations=[relations[i] for i in relation_ids if i in relations],
+        path_count=len(id_paths),
+        found=True,
+        paths=id_paths,
+    )
+
+
+def _with_properties(item: Any) -> dict[str, Any]:
+    """Neo4j 节点/关系 -> dict，并解析 properties_json"""
+    data = dict(item)
+    props_json = data.get("properties_json")
+    data["properties"] = json.loads(props_json) if props_json else {}
+    return data
 
 
 class FindShortestPathHandler:
     """最短路径查找处理器"""
     
-    def __init__(self, client: Type[Neo4jClient] = Neo4jClient):
+    def __init__(
+        self,
+        client: Type[Neo4jClient] = Neo4jClient,
+        snapshots: AdjacencySnapshotStore | None = None
+    ):
         self._client = client
+        self._snapshots = snapshots or get_adjacency_snapshot_store()
     
     async def handle(self, query: FindShortestPathQuery) -> PathResult:
         """查找最短路径
@@ -82,7 +148,20 @@ class FindShortestPathHandler:
         Returns:
             路径结果
         """
-        query_str = queries.FIND_SHORTEST_PATH.format(max_depth=query.max_depth)
+        snapshot = await self._snapshots.get(query.project_id)
+        if snapshot is not None:
+            start = snapshot.index_of(query.start_id)
+            end = snapshot.index_of(query.end_id)
+            path = None
+            if start is not None and end is not None:
+                path = shortest_path(snapshot, start, end, query.max_depth)
+            return await load_path_result(self._client, snapshot, [path] if path else [])
+        
+        return await self._handle_cypher(query)
+    
+    async def _handle_cypher(self, query: FindShortestPathQuery) -> PathResult:
+        """Cypher shortestPath 查询（快照不可用时）"""
+        query_str = queries.with_hops(queries.FIND_SHORTEST_PATH, max_depth=query.max_depth)
         
         result = await self._client.execute_read(
             query_str,
@@ -104,7 +183,11 @@ class FindShortestPathHandler:
             nodes=nodes,
             relations=relations,
             path_count=1,
-            found=len(nodes) > 0
+            found=len(nodes) > 0,
+            paths=[{
+                "node_ids": [node.get("id") for node in nodes],
+                "relation_ids": [rel.get("id") for rel in relations],
+            }] if nodes else []
         )
     
     def _parse_nodes(self, nodes: list[Any]) -> list[dict[str, Any]]:
@@ -150,19 +233,42 @@ class FindShortestPathHandler:
 class FindAllPathsHandler:
     """所有路径查找处理器"""
     
-    def __init__(self, client: Type[Neo4jClient] = Neo4jClient):
+    def __init__(
+        self,
+        client: Type[Neo4jClient] = Neo4jClient,
+        snapshots: AdjacencySnapshotStore | None = None
+    ):
         self._client = client
+        self._snapshots = snapshots or get_adjacency_snapshot_store()
     
     async def handle(self, query: FindAllPathsQuery) -> PathResult:
         """查找所有路径
         
+        在快照上按长度升序逐条生成无环路径，取够 path_limit 条即停止。
+        
         Args:
             query: 路径查找参数
             
         Returns:
             路径结果
         """
-        query_str = queries.FIND_ALL_PATHS.format(max_depth=query.max_depth)
+        snapshot = await self._snapshots.get(query.project_id)
+        if snapshot is not None:
+            start = snapshot.index_of(query.start_id)
+            end = snapshot.index_of(query.end_id)
+            paths: list[GraphPath] = []
+            if start is not None and end is not None:
+                paths = list(islice(
+                    k_shortest_paths(snapshot, start, end, query.max_depth),
+                    query.path_limit
+                ))
+            return await load_path_result(self._client, snapshot, paths)
+        
+        return await self._handle_cypher(query)
+    
+    async def _handle_cypher(self, query: FindAllPathsQuery) -> PathResult:
+        """Cypher 变长模式查询（快照不可用时）"""
+        query_str = queries.with_hops(queries.FIND_ALL_PATHS, max_depth=query.max_depth)
         
         result = await self._client.execute_read(
             query_str,
@@ -180,11 +286,16 @@ class FindAllPathsHandler:
         # 合并所有路径的节点和关系
         all_nodes = {}
         all_relations = {}
+        paths = []
         path_count = len(result)
         
         for record in result:
             nodes = record.get("nodes", [])
             relations = record.get("relations", [])
+            paths.append({
+                "node_ids": [node.get("id") for node in nodes],
+                "relation_ids": [rel.get("id") for rel in relations],
+            })
             
             for node in nodes:
                 node_id = node.get("id") if isinstance(node, dict) else node.get("id")
@@ -200,7 +311,8 @@ class FindAllPathsHandler:
             nodes=list(all_nodes.values()),
             relations=list(all_relations.values()),
             path_count=path_count,
-            found=len(all_nodes) > 0
+            found=len(all_nodes) > 0,
+            paths=paths
         )
     
     def _parse_node(self, node: Any) -> dict[str, Any]:
@@ -0,0 +1,129 @@
+"""视口瓦片查询
+
+按 (z, x, y) 返回项目全图布局中一个瓦片的节点和边（ECharts 格式），前端只加载
+视口内的瓦片，平移/缩放时增量获取。
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Type
+
+from src.config import settings
+from src.application.queries.get_graph_visualization import (
+    GetGraphVisualizationHandler,
+    VisualizationEdge,
+    VisualizationNode
+)
+from src.infrastructure.persistence.neo4j.client import Neo4jClient
+from src.infrastructure.persistence.neo4j import cypher_queries as queries
+from src.infrastructure.persistence.neo4j.tile_index import TileIndexStore, get_tile_index_store
+
+
+@dataclass(slots=True)
+class GetGraphTileQuery:
+    """视口瓦片查询参数
+
+    Attributes:
+        project_id: 项目ID
+        owner_id: 用户ID（用于权限验证）
+        z: 缩放层级
+        x: 瓦片列号（沿布局X轴，0 到 2^z - 1）
+        y: 瓦片行号（沿布局Y轴，0 到 2^z - 1）
+    """
+    project_id: str
+    owner_id: str
+    z: int
+    x: int
+    y: int
+
+
+@dataclass(slots=True)
+class GraphTileResult:
+    """视口瓦片结果
+
+    Attributes:
+        nodes: 瓦片内的节点（带布局坐标）
+        edges: 至少一端在瓦片内的边，另一端可能在相邻瓦片
+        categories: 分类名称列表（对应节点的category索引）
+        origin_x: 第 0 层瓦片左下角的X坐标
+        origin_y: 第 0 层瓦片左下角的Y坐标
+        size: 第 0 层瓦片的边长
+        max_zoom: 所有节点都已显示的层级，更深的层级只是放大
+        graph_version: 索引构建时的图数据版本号
+        truncated: 边数超过上限被截断
+    """
+    nodes: list[VisualizationNode]
+    edges: list[VisualizationEdge]
+    categories: list[str]
+    origin_x: float
+    origin_y: float
+    size: float
+    max_zoom: int
+    graph_version: int
+    truncated: bool = False
+
+
+class GetGraphTileHandler(GetGraphVisualizationHandler):
+    """视口瓦片处理器（节点转换与分类规则同图可视化）"""
+
+    def __init__(
+        self,
+        client: Type[Neo4jClient] = Neo4jClient,
+        tiles: TileIndexStore | None = None,
+        **kwargs
+    ):
+        super().__init__(client, **kwargs)
+        self._tiles = tiles or get_tile_index_store()
+
+    async def handle(self, query: GetGraphTileQuery) -> GraphTileResult:
+        """获取瓦片数据
+
+        坐标和边来自瓦片索引，节点属性按ID从 Neo4j 读取；索引构建后被删除的
+        实体不再返回。
+
+        Args:
+            query: 瓦片查询参数
+
+        Returns:
+            瓦片数据
+
+        Raises:
+            ValueError: 瓦片编号越界
+            TileIndexUnavailableError: 项目没有可用的邻接快照
+        """
+        index = await self._tiles.get(query.project_id)
+        tile = index.tile(query.z, query.x, query.y, settings.graph_tile_max_edges)
+
+        node_map: dict[str, VisualizationNode] = {}
+        entity_types: set[str] = set()
+        if tile.node_ids:
+            records = await self._client.execute_read(
+                queries.GET_ENTITIES_BY_IDS,
+                {"ids": tile.node_ids, "project_id": query.project_id}
+            )
+            for record in records:
+                self._add_node(record.get("entity"), node_map, entity_types)
+
+        nodes = []
+        for node_id, x, y in zip(tile.node_ids, tile.x, tile.y):
+            node = node_map.get(node_id)
+            if node is not None:
+                node.x, node.y = round(x, 1), round(y, 1)
+                nodes.append(node)
+
+        edges = [
+            VisualizationEdge(source=source, target=target, relation="RELATION", value={})
+            for source, target in tile.edges
+        ]
+        return GraphTileResult(
+            nodes=nodes,
+            edges=edges,
+            categories=self._build_categories(entity_types),
+            origin_x=index.origin_x,
+            origin_y=index.origin_y,
+            size=index.size,
+            max_zoom=index.max_zoom,
+            graph_version=index.version,
+            truncated=tile.truncated
+        )
@@ -6,11 +6,34 @@
 from __future__ import annotations
 
 import json
+import math
 from dataclasses import dataclass
 from typing import Any, Type
 
+import numpy as np
+
+from src.config import settings
+from src.domain.services.analysis.layout import LAYOUT_ALGORITHMS, force_layout
+from src.infrastructure.cache.layout_cache import (
+    GraphLayoutCache,
+    Positions,
+    get_graph_layout_cache,
+    layout_digest
+)
+from src.infrastructure.compute import run_in_worker
 from src.infrastructure.persistence.neo4j.client import Neo4jClient
 from src.infrastructure.persistence.neo4j import cypher_queries as queries
+from src.infrastructure.persistence.neo4j.graph_summary import (
+    OTHER_GROUP,
+    SUMMARY_GROUP_BY,
+    GraphSummarizer,
+    GraphSummary,
+    get_graph_summarizer
+)
+from src.infrastructure.persistence.neo4j.score_materializer import (
+    ScoreMaterializer,
+    get_score_materializer
+)
 
 
 @dataclass(slots=True)
@@ -24,6 +47,10 @@ class GetGraphVisualizationQuery:
         entity_type: 实体类型过滤（可选）
         center_entity_id: 中心实体ID（获取 ego network）
         depth: 当指定中心实体时的邻居深度
+        layout: 服务端布局算法 (forceatlas2, fruchterman_reingold)，None 表示不计算坐标
+        summarize: 项目实体数超过 node_limit 时返回超节点摘要
+        group_by: 超节点分组方式 (community, type)
+        group: 下钻的超节点分组值，返回该分组的成员节点
     """
     project_id: str
     owner_id: str
@@ -31,6 +58,10 @@ class GetGraphVisualizationQuery:
     entity_type: str | None = None
     center_entity_id: str | None = None
     depth: int = 2
+    layout: str | None = "forceatlas2"
+    summarize: bool = True
+    group_by: str = "community"
+    group: str | None = None
 
 
 @dataclass(slots=True)
@@ -43,12 +74,16 @@ class VisualizationNode:
         category: 节点分类索引（用于ECharts颜色区分）
         symbolSize: 节点大小
         value: 附加数据
+        x: 服务端布局的X坐标（未计算布局时为None）
+        y: 服务端布局的Y坐标
     """
     id: str
     name: str
     category: int
     symbolSize: int
     value: dict[str, Any]
+    x: float | None = None
+    y: float | None = None
 
 
 @dataclass(slots=True)
@@ -75,10 +110,12 @@ class GraphVisualizationResult:
         nodes: 节点列表
         edges: 边列表
         categories: 分类名称列表（对应节点的category索引）
+        summarized: 节点是否为超节点摘要
     """
     nodes: list[VisualizationNode]
     edges: list[VisualizationEdge]
     categories: list[str]
+    summarized: bool = False
 
 
 class GetGraphVisualizationHandler:
@@ -106,8 +143,21 @@ class GetGraphVisualizationHandler:
         "OTHER": "#9a60b4"
     }
     
-    def __init__(self, client: Type[Neo4jClient] = Neo4jClient):
+    def __init__(
+        self,
+        client: Type[Neo4jClient] = Neo4jClient,
+        scores: ScoreMaterializer | None = None,
+        layouts: GraphLayoutCache | None = None,
+        summaries: GraphSummarizer | None = None
+    ):
         self._client = client
+        self._scores = scores or get_score_materializer()
+        self._layouts = layouts or get_graph_layout_cache()
+        if summaries is None:
+            # 默认客户端共用进程级摘要器，后台刷新才能跨请求去重
+            shared = client is Neo4jClient and scores is None
+            summaries = get_graph_summarizer() if shared else GraphSummarizer(client, scores=self._scores)
+        self._summaries = summaries
     
     async def handle(self, query: GetGraphVisualizationQuery) -> GraphVisualizationResult:
         """获取可视化数据
@@ -117,144 +167,376 @@ class GetGraphVisualizationHandler:
             
         Returns:
             图可视化数据
+            
+        Raises:
+            ValueError: 不支持的布局算法或分组方式，或下钻的分组不可展开
         """
+        if query.layout is not None and query.layout not in LAYOUT_ALGORITHMS:
+            raise ValueError(f"Unsupported layout: {query.layout}. Supported: {list(LAYOUT_ALGORITHMS)}")
+        if query.group_by not in SUMMARY_GROUP_BY:
+            raise ValueError(f"Unsupported group_by: {query.group_by}. Supported: {list(SUMMARY_GROUP_BY)}")
+        
         # 根据参数选择查询策略
         if query.center_entity_id:
             # 获取以某节点为中心的 ego network
             result = await self._get_ego_network(query)
+        elif query.group is not None:
+            # 下钻到某个超节点的成员
+            result = await self._get_group_members(query)
+        elif (
+            query.summarize
+            and query.entity_type is None
+            and await self._summaries.entity_count(query.project_id) > query.node_limit
+        ):
+            # 项目超过节点上限，返回超节点摘要
+            result = await self._get_summary(query)
         else:
             # 获取项目子图
             result = await self._get_subgraph(query)
         
+        if query.layout and result.nodes:
+            await self._apply_layout(query.project_id, query.layout, result)
         return result
     
+    async def _apply_layout(
+        self,
+        project_id: str,
+        algorithm: str,
+        result: GraphVisualizationResult
+    ) -> None:
+        """为节点填充力引导布局坐标
+        
+        坐标按项目和节点/边集合缓存；节点集合只变化了一部分时，从重合最多的
+        缓存布局热启动，已有节点基本保持原位，前端切换视图时不会整体跳动。
+        """
+        node_ids = [node.id for node in result.nodes]
+        edges = [(edge.source, edge.target) for edge in result.edges]
+        digest = layout_digest(node_ids, edges)
+        
+        positions = self._layouts.get(project_id, algorithm, digest)
+        if positions is None:
+            previous = self._layouts.nearest(project_id, algorithm, node_ids)
+            positions = await self._compute_layout(algorithm, node_ids, edges, previous)
+            self._layouts.put(project_id, algorithm, digest, positions)
+        
+        for node in result.nodes:
+            node.x, node.y = positions[node.id]
+    
+    async def _compute_layout(
+        self,
+        algorithm: str,
+        node_ids: list[str],
+        edges: list[tuple[str, str]],
+        previous: Positions | None
+    ) -> Positions:
+        """在工作进程中计算布局"""
+        index = {node_id: i for i, node_id in enumerate(node_ids)}
+        source = np.array([index[s] for s, _ in edges], dtype=np.int64)
+        target = np.array([index[t] for _, t in edges], dtype=np.int64)
+        
+        iterations = settings.graph_layout_iterations
+        initial = None
+        if previous is not None:
+            initial = np.full((len(node_ids), 2), np.nan)
+            for i, node_id in enumerate(node_ids):
+                if node_id in previous:
+                    initial[i] = previous[node_id]
+            iterations = max(iterations // 3, 1)
+        
+        coords = await run_in_worker(
+            force_layout, source, target, len(node_ids),
+            algorithm=algorithm, iterations=iterations, initial=initial
+        )
+        return {
+            node_id: (round(x, 1), round(y, 1))
+            for node_id, (x, y) in zip(node_ids, coords.tolist())
+        }
+    
     async def _get_subgraph(
         self,
         query: GetGraphVisualizationQuery
     ) -> GraphVisualizationResult:
-        """获取项目子图"""
-        # 使用社区子图查询
-        cypher_result = await self._client.execute_read(
-            queries.GET_COMMUNITY_SUBGRAPH,
-            {
-                "project_id": query.project_id,
-                "entity_type": query.entity_type,
-                "label": None,
-                "node_limit": query.node_limit
-            }
+        """获取项目子图
+
+        节点和关系逐行流式读取并立即转换为可视化格式，不在内存中保留原始记录。
+        项目已物化分数时按 PageRank 从高到低取种子节点，优先展示重要节点；
+        种子节点的一跳邻居填满其余名额，返回的节点数不超过 node_limit。
+        """
+        return await self._stream_subgraph(query.project_id, query.entity_type, query.node_limit)
+    
+    async def _get_group_members(
+        self,
+        query: GetGraphVisualizationQuery
+    ) -> GraphVisualizationResult:
+        """获取超节点的成员节点及成员之间的关系（不扩展组外邻居）"""
+        if query.group == OTHER_GROUP:
+            raise ValueError(f"Supernode '{OTHER_GROUP}' cannot be expanded")
+        if query.group_by == "type":
+            return await self._stream_subgraph(
+                query.project_id, query.group, query.node_limit, include_neighbors=False
+            )
+        
+        try:
+            community_id = int(query.group)
+        except ValueError:
+            raise ValueError(f"Invalid community id: {query.group}")
+        return await self._stream_subgraph(
+            query.project_id,
+            None,
+            query.node_limit,
+            include_neighbors=False,
+            nodes_query=queries.GET_COMMUNITY_MEMBER_NODES,
+            extra_params={"community_id": community_id}
+        )
+    
+    async def _get_summary(
+        self,
+        query: GetGraphVisualizationQuery
+    ) -> GraphVisualizationResult:
+        """获取超节点摘要，超节点数不超过 node_limit 和 graph_summary_max_groups"""
+        summary = await self._summaries.summarize(
+            query.project_id,
+            query.group_by,
+            min(query.node_limit, settings.graph_summary_max_groups)
         )
+        return self._convert_summary(summary)
+    
+    def _convert_summary(self, summary: GraphSummary) -> GraphVisualizationResult:
+        """将图摘要转换为ECharts格式：超节点ID为 "分组方式:分组值"，边为聚合关系数"""
+        entity_types: set[str] = set()
+        nodes = []
+        for supernode in summary.nodes:
+            entity_types.add(supernode.dominant_type)
+            nodes.append(VisualizationNode(
+                id=f"{summary.group_by}:{supernode.group}",
+                name=f"{supernode.group} ({supernode.member_count})",
+                category=self._get_category_index(supernode.dominant_type),
+                symbolSize=min(30 + int(math.log10(max(supernode.member_count, 1)) * 10), 80),
+                value={
+                    "supernode": True,
+                    "group_by": summary.group_by,
+                    "group": supernode.group,
+                    "member_count": supernode.member_count,
+                    "internal_edges": supernode.internal_edges,
+                    "expandable": supernode.group != OTHER_GROUP
+                }
+            ))
+        
+        edges = [
+            VisualizationEdge(
+                source=f"{summary.group_by}:{edge.source_group}",
+                target=f"{summary.group_by}:{edge.target_group}",
+                relation="AGGREGATED",
+                value={"weight": edge.weight}
+            )
+            for edge in summary.edges
+        ]
+        return GraphVisualizationResult(
+            nodes=nodes,
+            edges=edges,
+            categories=self._build_categories(entity_types),
+            summarized=True
+        )
+    
+    async def _stream_subgraph(
+        self,
+        project_id: str,
+        entity_type: str | None,
+        node_limit: int,
+        include_neighbors: bool = True,
+        nodes_query: str | None = None,
+        extra_params: dict[str, Any] | None = None
+    ) -> GraphVisualizationResult:
+        """流式读取节点及节点之间的关系
+        
+        Args:
+            project_id: 项目ID
+            entity_type: 实体类型过滤
+            node_limit: 节点数量限制（含扩展的邻居）
+            include_neighbors: 是否扩展一跳邻居；是时一半名额给种子节点，其余由邻居填充
+            nodes_query: 节点查询，None 时按是否已物化分数选择
+            extra_params: 节点查询的附加参数
+        """
+        params = {
+            "project_id": project_id,
+            "entity_type": entity_type,
+            "label": None,
+            "node_limit": max(node_limit // 2, 1) if include_neighbors else node_limit,
+            **(extra_params or {})
+        }
+        
+        node_map: dict[str, VisualizationNode] = {}
+        entity_types: set[str] = set()
         
-        if not cypher_result:
+        if nodes_query is None:
+            nodes_query = queries.GET_COMMUNITY_SUBGRAPH_NODES
+            if await self._scores.is_materialized(project_id):
+                nodes_query = queries.GET_TOP_SCORED_SUBGRAPH_NODES
+        
+        async for record in self._client.iter_read(nodes_query, params):
+            self._add_node(record.get("node"), node_map, entity_types)
+        
+        if not node_map:
             return GraphVisualizationResult(nodes=[], edges=[], categories=[])
         
-        record = cypher_result[0]
-        nodes = record.get("nodes", [])
-        relations = record.get("relations", [])
+        if include_neighbors:
+            await self._expand_frontier(project_id, list(node_map), 1, node_limit, node_map, entity_types)
         
-        return self._convert_to_visualization_format(nodes, relations)
+        return GraphVisualizationResult(
+            nodes=list(node_map.values()),
+            edges=await self._relations_among(project_id, node_map),
+            categories=self._build_categories(entity_types)
+        )
     
     async def _get_ego_network(
         self,
         query: GetGraphVisualizationQuery
     ) -> GraphVisualizationResult:
-        """获取以某节点为中心的 ego network"""
-        query_str = queries.GET_EGO_NETWORK.format(
-            depth=query.depth,
-            limit=query.node_limit - 1  # 减去中心节点
-        )
+        """获取以某节点为中心的 ego network
         
-        cypher_result = await self._client.execute_read(
-            query_str,
-            {
-                "entity_id": query.center_entity_id,
-                "project_id": query.project_id
-            }
+        从中心节点逐层扩展不重复的邻居，每一跳只取剩余名额内的节点，不枚举路径。
+        """
+        records = await self._client.execute_read(
+            queries.GET_ENTITIES_BY_IDS,
+            {"ids": [query.center_entity_id], "project_id": query.project_id}
         )
-        
-        if not cypher_result:
+        if not records:
             return GraphVisualizationResult(nodes=[], edges=[], categories=[])
         
-        record = cypher_result[0]
-        nodes = record.get("nodes", [])
-        relations = record.get("relations", [])
+        node_map: dict[str, VisualizationNode] = {}
+        entity_types: set[str] = set()
+        self._add_node(records[0].get("entity"), node_map, entity_types)
+        await self._expand_frontier(
+            query.project_id, list(node_map), query.depth, query.node_limit, node_map, entity_types
+        )
         
-        return self._convert_to_visualization_format(nodes, relations)
+        return GraphVisualizationResult(
+            nodes=list(node_map.values()),
+            edges=await self._relations_among(query.project_id, node_map),
+            categories=self._build_categories(entity_types)
+        )
     
-    def _convert_to_visualization_format(
+    async def _expand_frontier(
         self,
-        nodes: list[Any],
-        relations: list[Any]
-    ) -> GraphVisualizationResult:
-        """将Neo4j结果转换为ECharts可视化格式"""
-        # 收集所有实体类型
-        entity_types = set()
-        node_map = {}  # 用于快速查找
-        
-        # 处理节点
-        vis_nodes = []
-        for node in nodes:
-            if not node:
-                continue
-            
-            node_data = self._parse_node(node)
-            entity_type = node_data.get("type", "OTHER")
-            entity_types.add(entity_type)
-            
-            category = self._get_category_index(entity_type)
-            
-            # 计算节点大小（基于连接数）
-            symbol_size = self._calculate_node_size(node_data)
-            
-            vis_node = VisualizationNode(
-                id=node_data.get("id", ""),
-                name=node_data.get("external_id", node_data.get("id", "Unknown")),
-                category=category,
-                symbolSize=symbol_size,
-                value={
-                    "type": entity_type,
-                    "labels": node_data.get("labels", []),
-                    "properties": node_data.get("properties", {}),
-                    "version": node_data.get("version", 1)
-                }
-            )
-            vis_nodes.append(vis_node)
-            node_map[vis_node.id] = vis_node
+        project_id: str,
+        frontier: list[str],
+        depth: int,
+        node_limit: int,
+        node_map: dict[str, VisualizationNode],
+        entity_types: set[str]
+    ) -> None:
+        """按层扩展邻居加入节点表，直到达到深度或节点数上限
         
-        # 处理边
-        vis_edges = []
-        for rel in relations:
+        Args:
+            project_id: 项目ID
+            frontier: 起始节点ID
+            depth: 扩展的跳数
+            node_limit: 节点表的总节点数上限
+            node_map: 已选节点（就地追加）
+            entity_types: 已出现的实体类型（就地追加）
+        """
+        for _ in range(depth):
+            remaining = node_limit - len(node_map)
+            if remaining <= 0 or not frontier:
+                return
+            known = len(node_map)
+            async for record in self._client.iter_read(
+                queries.EXPAND_FRONTIER,
+                {
+                    "project_id": project_id,
+                    "frontier": frontier,
+                    "visited": list(node_map),
+                    "limit": remaining
+                }
+            ):
+                self._add_node(record.get("node"), node_map, entity_types)
+            # 节点表按插入顺序排列，新加入的就是下一层
+            frontier = list(node_map)[known:]
+    
+    async def _relations_among(
+        self,
+        project_id: str,
+        node_map: dict[str, VisualizationNode]
+    ) -> list[VisualizationEdge]:
+        """流式读取已选节点之间的关系"""
+        vis_edges: list[VisualizationEdge] = []
+        async for record in self._client.iter_read(
+            queries.GET_RELATIONS_AMONG,
+            {"project_id": project_id, "node_ids": list(node_map)}
+        ):
+            rel = record.get("relation")
             if not rel:
                 continue
-            
             rel_data = self._parse_relation(rel)
-            source_id = rel_data.get("source_id", "")
-            target_id = rel_data.get("target_id", "")
-            
-            # 只添加两个端点都在节点列表中的边
-            if source_id in node_map and target_id in node_map:
-                vis_edge = VisualizationEdge(
-                    source=source_id,
-                    target=target_id,
-                    relation=rel_data.get("type", "RELATION"),
-                    value={
-                        "id": rel_data.get("id", ""),
-                        "properties": rel_data.get("properties", {})
-                    }
-                )
+            rel_data.setdefault("source_id", record.get("source_id", ""))
+            rel_data.setdefault("target_id", record.get("target_id", ""))
+            vis_edge = self._to_visualization_edge(rel_data, node_map)
+            if vis_edge:
                 vis_edges.append(vis_edge)
+        return vis_edges
+    
+    def _add_node(
+        self,
+        node: Any,
+        node_map: dict[str, VisualizationNode],
+        entity_types: set[str]
+    ) -> None:
+        """转换单个节点并加入节点表（已存在的节点忽略）"""
+        if not node:
+            return
+        
+        node_data = self._parse_node(node)
+        node_id = node_data.get("id", "")
+        if node_id in node_map:
+            return
+        
+        entity_type = node_data.get("type", "OTHER")
+        entity_types.add(entity_type)
         
-        # 构建分类列表
+        node_map[node_id] = VisualizationNode(
+            id=node_id,
+            name=node_data.get("external_id", node_data.get("id", "Unknown")),
+            category=self._get_category_index(entity_type),
+            # 计算节点大小（基于连接数）
+            symbolSize=self._calculate_node_size(node_data),
+            value={
+                "type": entity_type,
+                "labels": node_data.get("labels", []),
+                "properties": node_data.get("properties", {}),
+                "version": node_data.get("version", 1)
+            }
+        )
+    
+    def _to_visualization_edge(
+        self,
+        rel_data: dict[str, Any],
+        node_map: dict[str, VisualizationNode]
+    ) -> VisualizationEdge | None:
+        """转换单条关系，只保留两个端点都在节点列表中的边"""
+        source_id = rel_data.get("source_id", "")
+        target_id = rel_data.get("target_id", "")
+        
+        if source_id not in node_map or target_id not in node_map:
+            return None
+        
+        return VisualizationEdge(
+            source=source_id,
+            target=target_id,
+            relation=rel_data.get("type", "RELATION"),
+            value={
+                "id": rel_data.get("id", ""),
+                "properties": rel_data.get("properties", {})
+            }
+        )
+    
+    def _build_categories(self, entity_types: set[str]) -> list[str]:
+        """构建分类列表"""
         categories = sorted(entity_types) if entity_types else ["OTHER"]
         # 确保OTHER在最后
         if "OTHER" in categories:
             categories.remove("OTHER")
             categories.append("OTHER")
-        
-        return GraphVisualizationResult(
-            nodes=vis_nodes,
-            edges=vis_edges,
-            categories=categories
-        )
+        return categories
     
     def _parse_node(self, node: Any) -> dict[str, Any]:
         """解析节点数据"""
@@ -297,7 +579,7 @@ class GetGraphVisualizationHandler:
     def _calculate_node_size(self, node_data: dict[str, Any]) -> int:
         """计算节点大小
         
-        基础大小 + 根据属性动态调整
+        基础大小 + 根据属性动态调整；节点带有物化的 pagerank 时按其对数放大
         """
         base_size = 40
         entity_type = node_data.get("type", "")
@@ -324,4 +606,8 @@ class GetGraphVisualizationHandler:
             except (ValueError, TypeError):
                 pass
         
+        pagerank = node_data.get("pagerank")
+        if isinstance(pagerank, (int, float)) and pagerank > 0:
+            size += min(int(math.log1p(pagerank) * 10), 20)
+        
         return min(size, 80)  # 最大80
@@ -0,0 +1,67 @@
+"""键集分页游标
+
+游标对客户端不透明：把游标类型和排序键的最后一个值（如 ["score", 0.8, id]）
+序列化为 URL 安全的 base64 字符串，下一页查询时解码后作为 WHERE 条件继续扫描，
+翻页代价与页深无关，并发写入也不会导致跳过或重复记录。
+"""
+
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+from typing import Any
+
+# 全文检索：按 (score DESC, id ASC) 排序
+SCORE_CURSOR = "score"
+# 列表/扫描：按 (updated_at DESC, id DESC) 排序
+UPDATED_AT_CURSOR = "updated_at"
+
+_CURSOR_SIZES = {SCORE_CURSOR: 2, UPDATED_AT_CURSOR: 2}
+
+
+class InvalidCursorError(ValueError):
+    """游标格式错误或与当前查询不匹配"""
+
+
+def encode_cursor(kind: str, *values: Any) -> str:
+    """把游标类型和排序键编码为不透明游标"""
+    payload = json.dumps([kind, *values], separators=(",", ":"), ensure_ascii=False)
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: str, *kinds: str) -> tuple[str, list[Any]]:
+    """解码游标
+
+    Args:
+        token: encode_cursor 生成的游标
+        kinds: 当前查询接受的游标类型
+
+    Returns:
+        (游标类型, 排序键列表)
+
+    Raises:
+        InvalidCursorError: 游标无法解码、类型不被接受或键个数不符
+    """
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (ValueError, binascii.Error, UnicodeError) as e:
+        raise InvalidCursorError("Invalid pagination cursor") from e
+    if not isinstance(payload, list) or not payload or payload[0] not in kinds:
+        raise InvalidCursorError("Invalid pagination cursor")
+    kind, values = payload[0], payload[1:]
+    if len(values) != _CURSOR_SIZES.get(kind, -1):
+        raise InvalidCursorError("Invalid pagination cursor")
+    return kind, values
+
+
+def cursor_timestamp(value: Any) -> str | None:
+    """把 Neo4j/Python 时间值转换为可在 Cypher datetime() 中还原的 ISO 字符串"""
+    if value is None:
+        return None
+    if hasattr(value, "iso_format"):
+        return value.iso_format()
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return str(value)
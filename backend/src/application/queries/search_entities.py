@@ -1,15 +1,53 @@
 """实体搜索查询
 
-支持关键词搜索、类型过滤和分页
+支持关键词搜索、类型过滤和分页。
+
+有关键词时优先使用实体全文索引（名称、类型、标签、属性，相关度排序）；全文索引
+不可用、无关键词、关键词只有一个字符（cjk 分析器按二元组切分，单字无法命中）或
+首页没有全文命中（例如英文子串）时使用 CONTAINS 扫描（按更新时间排序）。两种方式都支持偏移量分页和键集游标分页，
+游标记录了它来自哪种排序，翻页过程中不会在两种方式之间切换。
+
+总数有三种计算方式（count_mode）：
+- exact: 总数按图数据版本缓存，命中时偏移页只执行分页查询；未命中时当前页与总数
+  在同一个查询中返回，只扫描一次
+- approximate: 同 exact（版本号存储为进程内存时，其他 worker 的写入不会使缓存失效，
+  总数可能略有滞后）
+- none: 不计算总数，多取一条记录判断 has_more
+
+游标页只执行 LIMIT $limit + 1 的分页查询，每页代价与翻页深度无关；总数取自首页
+缓存的结果，缓存已失效时为 None。
 """
 
 from __future__ import annotations
 
+import json
+import logging
 from dataclasses import dataclass
-from typing import Any, Type
+from typing import Any, Literal, Type
 
+from src.application.queries.pagination import (
+    SCORE_CURSOR,
+    UPDATED_AT_CURSOR,
+    cursor_timestamp,
+    decode_cursor,
+    encode_cursor,
+)
+from src.domain.ports.repositories import GraphVersionPort, PreviewCachePort
+from src.infrastructure.cache.graph_version import get_graph_version_store
+from src.infrastructure.cache.in_memory import InMemoryPreviewCache
 from src.infrastructure.persistence.neo4j.client import Neo4jClient
 from src.infrastructure.persistence.neo4j import cypher_queries as queries
+from src.infrastructure.persistence.neo4j.schema import ENTITY_FULLTEXT_INDEX
+
+logger = logging.getLogger(__name__)
+
+CountMode = Literal["exact", "approximate", "none"]
+
+# 走全文索引的最短关键词长度
+FULLTEXT_MIN_KEYWORD_LENGTH = 2
+
+# 各处理器实例共享的搜索总数缓存（路由每次请求都会新建处理器）
+_search_totals_cache = InMemoryPreviewCache()
 
 
 @dataclass(slots=True)
@@ -23,6 +61,8 @@ class SearchEntitiesQuery:
         entity_type: 实体类型过滤（可选）
         offset: 分页偏移量
         limit: 每页数量
+        cursor: 上一页返回的 next_cursor（提供时忽略 offset）
+        count_mode: 总数计算方式：exact / approximate / none
     """
     project_id: str
     owner_id: str
@@ -30,6 +70,8 @@ class SearchEntitiesQuery:
     entity_type: str | None = None
     offset: int = 0
     limit: int = 20
+    cursor: str | None = None
+    count_mode: CountMode = "exact"
 
 
 @dataclass(slots=True)
@@ -38,23 +80,35 @@ class SearchEntitiesResult:
     
     Attributes:
         entities: 实体列表
-        total: 总数量
+        total: 总数量（count_mode 为 none 时为 None，approximate 时可能略有滞后）
         offset: 当前偏移量
         limit: 每页数量
         has_more: 是否还有更多结果
+        next_cursor: 下一页游标（没有更多结果时为 None）
     """
     entities: list[dict[str, Any]]
-    total: int
+    total: int | None
     offset: int
     limit: int
     has_more: bool
+    next_cursor: str | None = None
 
 
 class SearchEntitiesHandler:
     """实体搜索查询处理器"""
+
+    # 缓存总数的时长（秒）
+    TOTAL_CACHE_TTL = 60
     
-    def __init__(self, client: Type[Neo4jClient] = Neo4jClient):
+    def __init__(
+        self,
+        client: Type[Neo4jClient] = Neo4jClient,
+        totals_cache: PreviewCachePort | None = None,
+        versions: GraphVersionPort | None = None,
+    ):
         self._client = client
+        self._totals_cache = totals_cache or _search_totals_cache
+        self._versions = versions or get_graph_version_store()
     
     async def handle(self, query: SearchEntitiesQuery) -> SearchEntitiesResult:
         """执行实体搜索
@@ -64,65 +118,177 @@ class SearchEntitiesHandler:
             
         Returns:
             搜索结果
+
+        Raises:
+            InvalidCursorError: 游标无效
         """
-        # 构建查询参数
-        search_keyword = query.keyword or ""
-        
-        # 获取总数
-        count_result = await self._client.execute_read(
-            queries.COUNT_ENTITIES,
-            {
+        kind, after = (
+            decode_cursor(query.cursor, SCORE_CURSOR, UPDATED_AT_CURSOR)
+            if query.cursor else (None, None)
+        )
+        keyword = (query.keyword or "").strip()
+        if len(keyword) >= FULLTEXT_MIN_KEYWORD_LENGTH and kind != UPDATED_AT_CURSOR:
+            try:
+                result = await self._fulltext_search(query, after)
+            except Exception as e:
+                logger.warning(f"Fulltext entity search unavailable, falling back to scan: {e}")
+            else:
+                # 首页没有全文命中时按扫描重试，保持与 CONTAINS 子串匹配相同的召回
+                if result.entities or after is not None or query.offset:
+                    return result
+        return await self._scan_search(query, after if kind == UPDATED_AT_CURSOR else None)
+
+    async def _fulltext_search(
+        self, query: SearchEntitiesQuery, after: list[Any] | None
+    ) -> SearchEntitiesResult:
+        """基于全文索引的相关度搜索"""
+        after_score, after_id = after if after else (None, None)
+        offset = 0 if after else query.offset
+        hits, total = await self._fetch_page(
+            query,
+            mode="fulltext",
+            cursor_page=after is not None,
+            page_query=queries.FULLTEXT_SEARCH_ENTITIES,
+            total_query=queries.FULLTEXT_SEARCH_ENTITIES_WITH_TOTAL,
+            params={
+                "index_name": ENTITY_FULLTEXT_INDEX,
+                "search_query": fulltext_phrase(query.keyword),
                 "project_id": query.project_id,
-                "keyword": search_keyword if search_keyword else None,
-                "entity_type": query.entity_type
-            }
+                "entity_type": query.entity_type,
+                "after_score": after_score,
+                "after_id": after_id,
+                "offset": offset,
+            },
         )
-        total = count_result[0].get("total", 0) if count_result else 0
-        
-        # 执行搜索
+        has_more = len(hits) > query.limit
+        hits = hits[:query.limit]
+
+        entities = [_parse_entity(hit.get("entity", {})) for hit in hits]
+        next_cursor = None
+        if has_more and hits:
+            next_cursor = encode_cursor(SCORE_CURSOR, hits[-1]["score"], entities[-1]["id"])
+
+        return SearchEntitiesResult(
+            entities=entities,
+            total=total,
+            offset=offset,
+            limit=query.limit,
+            has_more=has_more,
+            next_cursor=next_cursor
+        )
+
+    async def _scan_search(
+        self, query: SearchEntitiesQuery, after: list[Any] | None = None
+    ) -> SearchEntitiesResult:
+        """基于 CONTAINS 扫描的搜索"""
+        after_updated_at, after_id = after if after else (None, None)
+        offset = 0 if after else query.offset
+        params: dict[str, Any] = {
+            "project_id": query.project_id,
+            "keyword": query.keyword or "",
+            "after_updated_at": after_updated_at,
+            "after_id": after_id,
+            "offset": offset,
+        }
         if query.entity_type:
             # 带类型过滤的搜索
-            results = await self._client.execute_read(
-                queries.SEARCH_ENTITIES_BY_TYPE,
-                {
-                    "project_id": query.project_id,
-                    "keyword": search_keyword,
-                    "entity_type": query.entity_type,
-                    "offset": query.offset,
-                    "limit": query.limit
-                }
-            )
+            params["entity_type"] = query.entity_type
+            page_query = queries.SEARCH_ENTITIES_BY_TYPE
+            total_query = queries.SEARCH_ENTITIES_BY_TYPE_WITH_TOTAL
         else:
             # 通用搜索
-            results = await self._client.execute_read(
-                queries.SEARCH_ENTITIES,
-                {
-                    "project_id": query.project_id,
-                    "keyword": search_keyword,
-                    "offset": query.offset,
-                    "limit": query.limit
-                }
-            )
-        
-        # 提取实体数据
-        entities = []
-        for record in results:
-            entity_data = record.get("entity", {})
-            # 解析properties_json
-            import json
-            props_json = entity_data.get("properties_json")
-            if props_json:
-                entity_data["properties"] = json.loads(props_json)
-            else:
-                entity_data["properties"] = {}
-            entities.append(entity_data)
-        
-        has_more = (query.offset + len(entities)) < total
-        
+            page_query = queries.SEARCH_ENTITIES
+            total_query = queries.SEARCH_ENTITIES_WITH_TOTAL
+
+        hits, total = await self._fetch_page(
+            query,
+            mode="scan",
+            cursor_page=after is not None,
+            page_query=page_query,
+            total_query=total_query,
+            params=params,
+        )
+        has_more = len(hits) > query.limit
+        entities = [_parse_entity(hit.get("entity", {})) for hit in hits[:query.limit]]
+        next_cursor = None
+        if has_more and entities:
+            last_updated_at = cursor_timestamp(entities[-1].get("updated_at"))
+            if last_updated_at is not None:
+                next_cursor = encode_cursor(UPDATED_AT_CURSOR, last_updated_at, entities[-1]["id"])
+
         return SearchEntitiesResult(
             entities=entities,
             total=total,
-            offset=query.offset,
+            offset=offset,
             limit=query.limit,
-            has_more=has_more
+            has_more=has_more,
+            next_cursor=next_cursor
         )
+
+    async def _fetch_page(
+        self,
+        query: SearchEntitiesQuery,
+        *,
+        mode: str,
+        cursor_page: bool,
+        page_query: str,
+        total_query: str,
+        params: dict[str, Any],
+    ) -> tuple[list[dict[str, Any]], int | None]:
+        """按 count_mode 取一页记录（多取一条用于判断 has_more）和总数
+
+        计数查询会收集全部匹配记录，只在总数未缓存时执行；游标页复用首页缓存的总数。
+
+        Returns:
+            (记录列表, 总数)；记录形如 {"entity": ..., "score": ...}
+        """
+        # 多取一条判断是否还有下一页
+        params = {**params, "limit": query.limit + 1}
+        if query.count_mode == "none":
+            return await self._client.execute_read(page_query, params), None
+
+        # 版本号纳入缓存键，项目有写入后重新计数；读取失败时不使用缓存
+        try:
+            graph_version = await self._versions.get(query.project_id)
+        except Exception as e:
+            logger.warning(f"Graph version lookup failed for search totals of {query.project_id}: {e}")
+            graph_version = None
+        cache_key = (
+            f"search_total:{mode}:{query.project_id}:v{graph_version}:"
+            f"{query.entity_type or ''}:{(query.keyword or '').strip()}"
+        )
+        total = None
+        if graph_version is not None:
+            total = await self._totals_cache.get(cache_key)
+        if cursor_page or total is not None:
+            hits = await self._client.execute_read(page_query, params)
+            return hits, total
+
+        # 一次查询同时得到当前页和总数
+        result = await self._client.execute_read(total_query, params)
+        record = result[0] if result else {}
+        total = record.get("total", 0)
+        if graph_version is not None:
+            await self._totals_cache.set(cache_key, total, self.TOTAL_CACHE_TTL)
+        return list(record.get("hits") or []), total
+
+
+def fulltext_phrase(keyword: str) -> str:
+    """把用户关键词转换为 Lucene 短语查询
+
+    短语内只需转义反斜杠和双引号；cjk 分析器把中文切分为相邻二元组，
+    短语匹配要求二元组连续出现，效果接近子串匹配。
+    """
+    escaped = keyword.strip().replace("\\", "\\\\").replace('"', '\\"')
+    return f'"{escaped}"'
+
+
+def _parse_entity(entity_data: dict[str, Any]) -> dict[str, Any]:
+    """解析实体节点的 properties_json"""
+    entity_data = dict(entity_data)
+    props_json = entity_data.get("properties_json")
+    if props_json:
+        entity_data["properties"] = json.loads(props_json)
+    else:
+        entity_data["properties"] = {}
+    return entity_data
@@ -12,7 +12,8 @@ from src.application.services.graph_service import (
 from src.application.services.query_service import (
     QueryService,
     QueryServiceError,
-    QueryLog
+    QueryLog,
+    get_query_service
 )
 from src.application.services.extraction_pipeline import (
     ExtractionPipelineService,
@@ -31,6 +32,7 @@ __all__ = [
     "QueryService",
     "QueryServiceError",
     "QueryLog",
+    "get_query_service",
     # Extraction
     "ExtractionPipelineService",
     "ExtractionPipelineResult",
@@ -28,6 +28,10 @@ from src.application.commands.merge_entities import (
     MergeEntitiesCommand,
     EntityMergeService
 )
+from src.domain.services.matching.similarity_index import (
+    NameSimilarityIndex,
+    SimilarityIndexConfig
+)
 from src.infrastructure.persistence.neo4j.graph_repository import Neo4jGraphRepository
 
 logger = logging.getLogger(__name__)
@@ -41,12 +45,14 @@ class PipelineConfig:
         enable_auto_merge: 是否启用自动实体融合
         merge_threshold: 自动融合相似度阈值
         max_concurrent_jobs: 最大并发任务数
-        batch_size: 批处理大小
+        batch_size: 批处理大小（图谱构建时每次UNWIND写入的实体/关系数）
+        similarity_index: 实体去重候选索引配置（召回率/吞吐权衡）
     """
     enable_auto_merge: bool = True
     merge_threshold: float = 0.9
     max_concurrent_jobs: int = 5
     batch_size: int = 100
+    similarity_index: SimilarityIndexConfig = field(default_factory=SimilarityIndexConfig)
 
 
 @dataclass
@@ -85,8 +91,11 @@ class ExtractionPipelineService:
     ):
         self._config = config or PipelineConfig()
         self._extractor = extractor or MockKnowledgeExtractor()
-        self._builder = GraphBuilder()
-        self._merge_service = EntityMergeService()
+        self._builder = GraphBuilder(
+            batch_size=self._config.batch_size,
+            index_config=self._config.similarity_index
+        )
+        self._merge_service = EntityMergeService(self._config.similarity_index)
         self._jobs: dict[str, ExtractionJob] = {}
         self._semaphore = asyncio.Semaphore(self._config.max_concurrent_jobs)
     
@@ -239,14 +248,16 @@ class ExtractionPipelineService:
         # 创建实体文本到抽取实体的映射
         entity_map = {}
         merged_entities = []
+        index: NameSimilarityIndex[str] = NameSimilarityIndex(self._config.similarity_index)
         
         for entity in extraction_result.entities:
             # 标准化文本
             normalized = entity.text.strip()
             
-            # 查找相似实体
+            # 查找相似实体（仅比较索引给出的候选）
             found_match = False
-            for existing_text, existing_entity in entity_map.items():
+            for existing_text in index.query(normalized):
+                existing_entity = entity_map[existing_text]
                 similarity = self._calculate_similarity(normalized, existing_text)
                 if similarity >= self._config.merge_threshold:
                     # 合并属性
@@ -256,6 +267,7 @@ class ExtractionPipelineService:
             
             if not found_match:
                 entity_map[normalized] = entity
+                index.add(normalized, normalized)
                 merged_entities.append(entity)
         
         # 更新关系中的实体引用
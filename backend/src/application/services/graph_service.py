@@ -78,16 +78,13 @@ class GraphService:
     async def list_neighbors(self, query: ListNeighborsQuery) -> dict[str, list[Any]]:
         await self._require_project(query.project_id, query.owner_id)
         depth = max(0, min(query.depth, 3))
-        raw = await self._graph_entity_repo.find_neighbors(
+        limit = query.limit if query.limit and query.limit > 0 else None
+        return await self._graph_entity_repo.find_neighbors(
             project_id=query.project_id,
             entity_id=query.entity_id,
             depth=depth,
+            limit=limit,
         )
-        limit = query.limit if query.limit and query.limit > 0 else None
-        if limit:
-            raw["entities"] = raw["entities"][:limit]
-            raw["relations"] = raw["relations"][:limit]
-        return raw
 
     async def _require_project(
         self,
@@ -1,14 +1,19 @@
 """查询服务
 
-路由查询到不同处理器，提供结果缓存和查询日志功能
+路由查询到不同处理器，提供结果缓存和查询日志功能。
+
+同一缓存键的并发未命中只执行一次查询（single-flight），其余调用等待同一个结果；
+开启 stale-while-revalidate 后，过期条目在宽限期内继续返回，同时在后台刷新一次。
 """
 
 from __future__ import annotations
 
+import asyncio
 import hashlib
 import json
 import logging
 import time
+from collections import deque
 from dataclasses import dataclass, field
 from datetime import datetime, UTC
 from typing import Any, Callable, TypeVar
@@ -38,7 +43,17 @@ from src.application.queries.analyze_centrality import (
     AnalyzeCentralityHandler,
     AnalyzeCommunitiesHandler
 )
+from src.config import settings
+from src.domain.ports.repositories import GraphVersionPort, PreviewCachePort
+from src.infrastructure.cache.graph_version import get_graph_version_store
 from src.infrastructure.cache.in_memory import InMemoryPreviewCache
+from src.infrastructure.monitoring.metrics import (
+    QUERY_BACKGROUND_REFRESHES,
+    QUERY_COALESCED,
+    QUERY_LATENCY,
+    QUERY_STALE_SERVED,
+)
+from src.infrastructure.monitoring.latency import LatencySketch
 
 logger = logging.getLogger(__name__)
 
@@ -60,6 +75,26 @@ class QueryLog:
     timestamp: datetime = field(default_factory=lambda: datetime.now(UTC))
 
 
+def create_query_cache() -> PreviewCachePort:
+    """按 settings.query_cache_backend 创建查询缓存"""
+    if settings.query_cache_backend == "redis":
+        from src.infrastructure.cache.redis_cache import RedisPreviewCache
+        return RedisPreviewCache()
+    return InMemoryPreviewCache()
+
+
+@dataclass
+class CachedResult:
+    """缓存条目
+    
+    Attributes:
+        value: 查询结果
+        fresh_until: 新鲜期截止时间（epoch 秒），之后在宽限期内按过期结果返回
+    """
+    value: Any
+    fresh_until: float
+
+
 class QueryServiceError(Exception):
     """查询服务错误"""
     pass
@@ -85,14 +120,37 @@ class QueryService:
         "analyze_communities": 3600, # 60分钟
     }
     
+    # 查询日志缓冲区容量
+    MAX_QUERY_LOGS = 1000
+    
     def __init__(
         self,
-        cache: InMemoryPreviewCache | None = None,
-        enable_logging: bool = True
+        cache: PreviewCachePort | None = None,
+        enable_logging: bool = True,
+        versions: GraphVersionPort | None = None,
+        stale_ttl: int | None = None
     ):
-        self._cache = cache or InMemoryPreviewCache()
+        """
+        Args:
+            cache: 结果缓存，默认按配置创建
+            enable_logging: 是否记录查询日志
+            versions: 项目图数据版本号存储
+            stale_ttl: 过期后继续返回旧结果的宽限期（秒），0 表示关闭 stale-while-revalidate，
+                默认取 settings.query_cache_stale_ttl
+        """
+        self._cache = cache or create_query_cache()
+        self._versions = versions or get_graph_version_store()
         self._enable_logging = enable_logging
-        self._query_logs: list[QueryLog] = []
+        # 最近的查询日志（环形缓冲区）与按类型累计的统计
+        self._query_logs: deque[QueryLog] = deque(maxlen=self.MAX_QUERY_LOGS)
+        self._type_stats: dict[str, dict[str, int]] = {}
+        self._latency: dict[str, LatencySketch] = {}
+        self._stale_ttl = settings.query_cache_stale_ttl if stale_ttl is None else stale_ttl
+        
+        # 正在执行的查询（缓存键 -> 任务），用于合并并发的相同查询
+        self._inflight: dict[str, asyncio.Task] = {}
+        self._coalesced_count = 0
+        self._refresh_count = 0
         
         # 初始化处理器
         self._search_handler = SearchEntitiesHandler()
@@ -102,15 +160,26 @@ class QueryService:
         self._centrality_handler = AnalyzeCentralityHandler()
         self._communities_handler = AnalyzeCommunitiesHandler()
     
-    def _generate_cache_key(self, query_type: str, params: dict[str, Any]) -> str:
-        """生成缓存键"""
+    def _generate_cache_key(
+        self,
+        query_type: str,
+        params: dict[str, Any],
+        graph_version: int | None = None
+    ) -> str:
+        """生成缓存键
+        
+        Args:
+            query_type: 查询类型
+            params: 查询参数
+            graph_version: 项目图数据版本号，写入后版本号变化，旧缓存不再命中
+        """
         # 排除某些不需要参与缓存键计算的字段
         exclude_keys = {"owner_id", "user_id", "timestamp"}
         cache_params = {k: v for k, v in params.items() if k not in exclude_keys}
         
         param_str = json.dumps(cache_params, sort_keys=True)
         hash_str = hashlib.md5(f"{query_type}:{param_str}".encode()).hexdigest()
-        return f"query:{query_type}:{hash_str}"
+        return f"query:{query_type}:v{graph_version or 0}:{hash_str}"
     
     async def _get_from_cache(self, cache_key: str) -> Any | None:
         """从缓存获取结果"""
@@ -128,16 +197,17 @@ class QueryService:
             logger.warning(f"Cache set error: {e}")
     
     def _log_query(self, log: QueryLog) -> None:
-        """记录查询日志"""
+        """记录查询日志
+        
+        延迟统计始终更新（每次 O(1)），日志缓冲区和系统日志受 enable_logging 控制。
+        """
+        self._record_latency(log)
         if not self._enable_logging:
             return
         
+        # deque(maxlen) 自动丢弃最早的日志
         self._query_logs.append(log)
         
-        # 保留最近1000条日志
-        if len(self._query_logs) > 1000:
-            self._query_logs = self._query_logs[-1000:]
-        
         # 记录到系统日志
         status = "HIT" if log.cache_hit else "MISS"
         logger.info(
@@ -147,6 +217,21 @@ class QueryService:
             f"Results: {log.result_size}"
         )
     
+    def _record_latency(self, log: QueryLog) -> None:
+        """更新按查询类型的计数和延迟分位数"""
+        stats = self._type_stats.get(log.query_type)
+        if stats is None:
+            stats = self._type_stats[log.query_type] = {"count": 0, "cache_hits": 0}
+            self._latency[log.query_type] = LatencySketch()
+        stats["count"] += 1
+        if log.cache_hit:
+            stats["cache_hits"] += 1
+        self._latency[log.query_type].add(log.execution_time_ms)
+        QUERY_LATENCY.labels(
+            query_type=log.query_type,
+            cache_hit=str(log.cache_hit).lower()
+        ).observe(log.execution_time_ms / 1000)
+    
     async def _execute_with_cache(
         self,
         query_type: str,
@@ -154,23 +239,76 @@ class QueryService:
         executor: Callable[[], Any]
     ) -> Any:
         """带缓存的查询执行"""
-        cache_key = self._generate_cache_key(query_type, params)
+        try:
+            graph_version = await self._versions.get(params["project_id"])
+        except Exception as e:
+            # 无法确认数据版本时不读写缓存，避免返回过期结果
+            logger.warning(f"Graph version lookup failed, bypassing cache: {e}")
+            return await executor(), False
+        
+        cache_key = self._generate_cache_key(query_type, params, graph_version)
         ttl = self.CACHE_TTL.get(query_type, 300)
         
         # 尝试从缓存获取
-        cached_result = await self._get_from_cache(cache_key)
-        if cached_result is not None:
-            return cached_result, True
-        
-        # 执行查询
-        start_time = time.time()
+        cached = await self._get_from_cache(cache_key)
+        if cached is not None:
+            if not isinstance(cached, CachedResult):
+                return cached, True
+            if cached.fresh_until > time.time():
+                return cached.value, True
+            # 已过期但仍在宽限期内：返回旧结果，后台只刷新一次
+            if cache_key not in self._inflight:
+                self._refresh_count += 1
+                QUERY_BACKGROUND_REFRESHES.labels(query_type=query_type).inc()
+                self._start_flight(cache_key, ttl, executor)
+            QUERY_STALE_SERVED.labels(query_type=query_type).inc()
+            return cached.value, True
+        
+        # 相同查询正在执行时等待其结果，而不是重复执行
+        task = self._inflight.get(cache_key)
+        if task is None:
+            task = self._start_flight(cache_key, ttl, executor)
+        else:
+            self._coalesced_count += 1
+            QUERY_COALESCED.labels(query_type=query_type).inc()
+        
+        # shield: 某个调用方被取消不会中断其它调用方共享的查询
+        return await asyncio.shield(task), False
+    
+    def _start_flight(
+        self,
+        cache_key: str,
+        ttl: int,
+        executor: Callable[[], Any]
+    ) -> asyncio.Task:
+        """启动一次共享的查询执行"""
+        task = asyncio.create_task(self._execute_and_store(cache_key, ttl, executor))
+        self._inflight[cache_key] = task
+        task.add_done_callback(lambda done: self._finish_flight(cache_key, done))
+        return task
+    
+    def _finish_flight(self, cache_key: str, task: asyncio.Task) -> None:
+        """查询结束后移出执行表"""
+        if self._inflight.get(cache_key) is task:
+            del self._inflight[cache_key]
+        # 读取异常，避免无人等待的后台刷新失败时产生未处理异常警告
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning(f"Query execution failed for {cache_key}: {task.exception()}")
+    
+    async def _execute_and_store(
+        self,
+        cache_key: str,
+        ttl: int,
+        executor: Callable[[], Any]
+    ) -> Any:
+        """执行查询并写入缓存（缓存保留时间包含宽限期）"""
         result = await executor()
-        execution_time = (time.time() - start_time) * 1000
-        
-        # 存入缓存
-        await self._set_to_cache(cache_key, result, ttl)
-        
-        return result, False
+        await self._set_to_cache(
+            cache_key,
+            CachedResult(value=result, fresh_until=time.time() + ttl),
+            ttl + self._stale_ttl
+        )
+        return result
     
     async def search_entities(
         self,
@@ -189,7 +327,9 @@ class QueryService:
             "keyword": query.keyword,
             "entity_type": query.entity_type,
             "offset": query.offset,
-            "limit": query.limit
+            "limit": query.limit,
+            "cursor": query.cursor,
+            "count_mode": query.count_mode
         }
         
         start_time = time.time()
@@ -351,7 +491,8 @@ class QueryService:
         params = {
             "project_id": query.project_id,
             "algorithm": query.algorithm,
-            "limit": query.limit
+            "limit": query.limit,
+            "source_ids": sorted(query.source_ids) if query.source_ids else None
         }
         
         start_time = time.time()
@@ -433,7 +574,7 @@ class QueryService:
         Returns:
             查询日志列表
         """
-        logs = self._query_logs
+        logs = list(self._query_logs)
         
         if project_id:
             logs = [log for log in logs if log.project_id == project_id]
@@ -444,30 +585,36 @@ class QueryService:
         return logs[-limit:]
     
     def get_statistics(self) -> dict[str, Any]:
-        """获取查询统计信息"""
-        if not self._query_logs:
-            return {
-                "total_queries": 0,
-                "cache_hit_rate": 0,
-                "avg_execution_time_ms": 0
-            }
-        
-        total = len(self._query_logs)
-        cache_hits = sum(1 for log in self._query_logs if log.cache_hit)
-        avg_time = sum(log.execution_time_ms for log in self._query_logs) / total
-        
-        # 按类型统计
-        type_stats = {}
-        for log in self._query_logs:
-            if log.query_type not in type_stats:
-                type_stats[log.query_type] = {"count": 0, "cache_hits": 0}
-            type_stats[log.query_type]["count"] += 1
-            if log.cache_hit:
-                type_stats[log.query_type]["cache_hits"] += 1
+        """获取查询统计信息
+        
+        统计自服务创建以来的全部查询，不受日志缓冲区容量限制；延迟分位数
+        （毫秒）由流式 sketch 估计，相对误差约 1%。
+        """
+        total = sum(stats["count"] for stats in self._type_stats.values())
+        cache_hits = sum(stats["cache_hits"] for stats in self._type_stats.values())
+        total_time = sum(sketch.mean * sketch.count for sketch in self._latency.values())
+        
+        type_stats = {
+            query_type: {**stats, "latency_ms": self._latency[query_type].summary()}
+            for query_type, stats in self._type_stats.items()
+        }
         
         return {
             "total_queries": total,
-            "cache_hit_rate": round(cache_hits / total * 100, 2),
-            "avg_execution_time_ms": round(avg_time, 2),
+            "cache_hit_rate": round(cache_hits / total * 100, 2) if total else 0,
+            "avg_execution_time_ms": round(total_time / total, 2) if total else 0,
+            "coalesced_queries": self._coalesced_count,
+            "background_refreshes": self._refresh_count,
             "type_statistics": type_stats
         }
+
+
+_service: QueryService | None = None
+
+
+def get_query_service() -> QueryService:
+    """获取进程内共享的查询服务（缓存、查询日志和延迟统计在各请求间共享）"""
+    global _service
+    if _service is None:
+        _service = QueryService(stale_ttl=settings.query_cache_stale_ttl)
+    return _service
@@ -15,6 +15,49 @@ class Settings(BaseSettings):
     neo4j_password: str = "password"
     redis_uri: str = "redis://localhost:6379"
 
+    # Neo4j driver
+    neo4j_max_connection_pool_size: int = 100
+    neo4j_connection_acquisition_timeout: float = 60.0  # seconds
+    neo4j_max_transaction_retry_time: float = 30.0  # seconds
+    neo4j_fetch_size: int = 1000
+    neo4j_schema_bootstrap: bool = True  # 启动时创建缺失的索引/约束
+
+    # Query cache
+    query_cache_backend: str = "memory"  # memory | redis
+    query_cache_l1_max_bytes: int = 64 * 1024 * 1024  # 64MB
+    query_cache_l1_ttl: int = 30  # seconds
+    query_cache_stale_ttl: int = 300  # 过期后继续返回旧结果并后台刷新的宽限期（秒），0 关闭
+
+    # Graph snapshot
+    graph_snapshot_max_edges: int = 2_000_000  # 单项目邻接快照关系数上限，0 禁用
+    graph_snapshot_max_projects: int = 8  # 同时缓存快照的项目数
+    graph_snapshot_dir: Path | None = Path("storage/graph_snapshots")  # 仅 redis 版本号时落盘
+    graph_compute_workers: int = 2  # 图算法工作进程数，0 表示在线程中计算
+    graph_neighbor_max_results: int = 1000  # 邻居查询未指定 limit 时返回的邻居/关系数上限
+
+    # GDS projections
+    gds_projection_heap_budget_mb: int = 4096  # 所有项目投影的堆内存预算，0 不检查
+    gds_projection_max_staleness_seconds: int = 300  # 图数据变化后投影最多沿用的时间
+    gds_max_projections: int = 16  # 同时保留的投影数，0 不限制
+    gds_projection_lease_seconds: int = 900  # 投影最近一次使用后视为仍在使用的时间，期间不会被删除
+
+    # Score materialization
+    score_materialize_write_threshold: int = 1000  # 距上次物化累计写入次数达到该值时后台重新计算，0 禁用
+    score_materialize_interval_seconds: int = 3600  # celery beat 刷新过期物化分数的间隔，0 禁用；仅 redis 版本号时生效
+
+    # Graph layout
+    graph_layout_iterations: int = 50  # 冷启动力引导迭代次数，热启动用其 1/3
+    graph_layout_cache_entries: int = 256  # 缓存的布局数（项目 × 节点集合），0 不缓存
+    graph_summary_max_groups: int = 200  # 超节点摘要的分组上限（含 other）
+    graph_summary_cache_ttl: int = 86400  # 摘要缓存时间（秒；版本变化后先返回旧摘要并在后台重算），0 不缓存
+    graph_tile_capacity: int = 256  # 每个视口瓦片的节点数上限
+    graph_tile_max_edges: int = 2048  # 每个视口瓦片的边数上限
+    graph_tile_max_projects: int = 8  # 进程内缓存瓦片索引的项目数
+    graph_tile_dir: Path | None = Path("storage/graph_tiles")  # 瓦片索引文件目录，None 不落盘
+    graph_response_min_compress_bytes: int = 1024  # 图数据响应超过该字节数时按 Accept-Encoding 压缩
+    graph_response_brotli_quality: int = 5  # brotli 压缩级别（0-11，越高越慢）
+    graph_response_thread_min_rows: int = 2000  # 节点数 + 边数超过该值时在线程中编码和压缩，不阻塞事件循环
+
     # Auth
     secret_key: str = "change-this-in-production-use-openssl-rand-hex-32"
     algorithm: str = "HS256"
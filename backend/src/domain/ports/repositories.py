@@ -96,6 +96,16 @@ class PreviewCachePort(ABC):
     async def get(self, key: str) -> Optional[Any]: ...
 
 
+class GraphVersionPort(ABC):
+    """项目图数据版本号：每次写入后递增，读缓存把版本号纳入缓存键"""
+
+    @abstractmethod
+    async def get(self, project_id: str) -> int: ...
+
+    @abstractmethod
+    async def bump(self, project_id: str) -> int: ...
+
+
 class TaskQueuePort(ABC):
     @abstractmethod
     async def enqueue(self, task_name: str, payload: dict[str, Any]) -> str: ...
@@ -122,6 +132,12 @@ class GraphEntityRepository(ABC):
     @abstractmethod
     async def merge_relation(self, relation: Relation) -> Relation: ...
 
+    @abstractmethod
+    async def merge_entities_bulk(self, entities: list[Entity]) -> int: ...
+
+    @abstractmethod
+    async def merge_relations_bulk(self, relations: list[Relation]) -> list[str]: ...
+
     @abstractmethod
     async def delete_entity(self, project_id: str, entity_id: str) -> None: ...
 
@@ -129,4 +145,6 @@ class GraphEntityRepository(ABC):
     async def delete_relation(self, project_id: str, relation_id: str) -> None: ...
 
     @abstractmethod
-    async def find_neighbors(self, project_id: str, entity_id: str, depth: int = 1) -> dict[str, list[Any]]: ...
+    async def find_neighbors(
+        self, project_id: str, entity_id: str, depth: int = 1, limit: int | None = None
+    ) -> dict[str, list[Any]]: ...
@@ -0,0 +1,151 @@
+"""采样 Brandes 中介中心性
+
+在 CSR 邻接数组（indptr / indices）上对每个源节点做一次按层推进的 BFS，统计最短路径数
+sigma，再按层反向累积依赖度 delta（Brandes 2001）。每层的扩展和累积都是一次数组
+gather + np.bincount，不在 Python 里逐节点循环。
+
+精确计算需要以每个节点为源各做一次 BFS，复杂度 O(VE)。采样时只取 k 个源节点，结果乘以
+n / k 作为无偏估计（Brandes & Pich 2007）；单个节点的相对误差大致按 sqrt(n / k) 缩小，
+高分节点的排名最先稳定。误差实测见 benchmarks/bench_betweenness.py。
+
+采样参数与 GDS gds.betweenness 一致：sampling_size 为源节点数，不小于节点数时做精确
+计算；sampling_seed 相同则选中的源节点相同。与 GDS 的无向投影一致，按无向图计算，
+每对节点只计一次（分数为有向累积的一半），不做归一化。
+
+betweenness_partial 为纯函数，可分块提交到工作进程后把结果相加。
+"""
+
+from __future__ import annotations
+
+import numpy as np
+
+
+def undirected_csr(
+    source: np.ndarray,
+    target: np.ndarray,
+    node_count: int,
+) -> tuple[np.ndarray, np.ndarray]:
+    """由边列表构建无向 CSR（每条边正反各存一次）
+
+    Args:
+        source: 每条边的起点编号
+        target: 每条边的终点编号
+        node_count: 节点数
+
+    Returns:
+        (indptr, indices)
+    """
+    heads = np.concatenate([source, target]).astype(np.int64)
+    tails = np.concatenate([target, source]).astype(np.int32)
+    order = np.argsort(heads, kind="stable")
+    indptr = np.zeros(node_count + 1, dtype=np.int64)
+    np.cumsum(np.bincount(heads, minlength=node_count), out=indptr[1:])
+    return indptr, tails[order]
+
+
+def sample_sources(
+    node_count: int,
+    sampling_size: int | None = None,
+    sampling_seed: int | None = None,
+) -> np.ndarray:
+    """选取源节点；sampling_size 为空或不小于节点数时返回全部节点"""
+    if sampling_size is None or sampling_size >= node_count:
+        return np.arange(node_count, dtype=np.int64)
+    if sampling_size < 1:
+        raise ValueError("sampling_size must be positive")
+    rng = np.random.default_rng(sampling_seed)
+    return np.sort(rng.choice(node_count, size=sampling_size, replace=False))
+
+
+def betweenness_partial(
+    indptr: np.ndarray,
+    indices: np.ndarray,
+    sources: np.ndarray,
+) -> np.ndarray:
+    """以给定源节点计算依赖度之和（未缩放、未除以 2）
+
+    Args:
+        indptr: CSR 行指针，长度 node_count + 1
+        indices: CSR 列下标
+        sources: 源节点编号
+
+    Returns:
+        每个节点的依赖度累计
+    """
+    node_count = len(indptr) - 1
+    scores = np.zeros(node_count, dtype=np.float64)
+    dist = np.full(node_count, -1, dtype=np.int64)
+
+    for source in np.asarray(sources, dtype=np.int64).tolist():
+        sigma = np.zeros(node_count, dtype=np.float64)
+        sigma[source] = 1.0
+        dist[source] = 0
+        visited = [np.array([source], dtype=np.int64)]
+        # 每层的最短路径 DAG 边 (前驱, 后继)
+        levels: list[tuple[np.ndarray, np.ndarray]] = []
+
+        frontier = visited[0]
+        depth = 0
+        while len(frontier):
+            starts = indptr[frontier]
+            counts = indptr[frontier + 1] - starts
+            total = int(counts.sum())
+            if not total:
+                break
+            # 把各节点的邻接区间拼成一个下标数组
+            offsets = np.repeat(starts - np.cumsum(counts) + counts, counts) + np.arange(total)
+            parents = np.repeat(frontier, counts)
+            children = indices[offsets].astype(np.int64)
+
+            unseen = children[dist[children] < 0]
+            dist[unseen] = depth + 1
+            on_dag = dist[children] == depth + 1
+            parents, children = parents[on_dag], children[on_dag]
+            if not len(children):
+                break
+            sigma += np.bincount(children, weights=sigma[parents], minlength=node_count)
+            levels.append((parents, children))
+            frontier = np.unique(children)
+            visited.append(frontier)
+            depth += 1
+
+        delta = np.zeros(node_count, dtype=np.float64)
+        for parents, children in reversed(levels):
+            contrib = sigma[parents] / sigma[children] * (1.0 + delta[children])
+            delta += np.bincount(parents, weights=contrib, minlength=node_count)
+        delta[source] = 0.0
+        scores += delta
+
+        for nodes in visited:
+            dist[nodes] = -1
+    return scores
+
+
+def betweenness(
+    indptr: np.ndarray,
+    indices: np.ndarray,
+    *,
+    sampling_size: int | None = None,
+    sampling_seed: int | None = None,
+) -> np.ndarray:
+    """单进程计算（采样）中介中心性
+
+    Args:
+        indptr: 无向 CSR 行指针
+        indices: 无向 CSR 列下标
+        sampling_size: 采样源节点数，None 表示精确计算
+        sampling_seed: 采样随机种子
+
+    Returns:
+        每个节点的中介中心性分数
+    """
+    node_count = len(indptr) - 1
+    sources = sample_sources(node_count, sampling_size, sampling_seed)
+    return scale_scores(betweenness_partial(indptr, indices, sources), node_count, len(sources))
+
+
+def scale_scores(partial_sum: np.ndarray, node_count: int, source_count: int) -> np.ndarray:
+    """把各源依赖度之和换算为最终分数：无向图除以 2，采样时乘以 n / k"""
+    if not source_count:
+        return partial_sum
+    return partial_sum * (node_count / source_count) / 2.0
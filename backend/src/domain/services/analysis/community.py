@@ -0,0 +1,293 @@
+"""进程内社区发现：多层 Louvain 与标签传播
+
+两种算法都在对称的 COO 边数组（每条无向边正反各一条，rows / cols / weights）上按轮
+整体更新：每轮用一次排序 + np.bincount 求出每个节点到各邻居社区的连接权重，再为
+所有节点同时选出最优社区，不在 Python 里逐节点循环。
+
+同步更新会让相邻节点互相交换社区而来回振荡。这里每轮只让随机一半节点移动
+（random_state 固定则结果可复现），这是并行 Louvain / 标签传播的常用做法，效果上
+接近逐节点异步更新。
+
+Louvain（Blondel et al. 2008）：
+    局部移动阶段按模块度增益移动节点，一轮的模块度提升小于 tolerance 或达到
+    max_iterations 时停止；随后把社区聚合为节点进入下一层，直到没有节点移动或达到
+    max_levels。一轮移动后模块度下降则撤销该轮，并减少下一轮移动的节点比例。
+
+标签传播（Raghavan et al. 2007）：
+    每个节点取邻居中权重和最大的标签（平局时保持当前标签，否则取编号最小的标签），
+    直到标签不再变化或达到 max_iterations。
+
+两个函数均为纯函数，返回的社区编号为 0..C-1 的连续整数（与 GDS 的 communityId
+一样只用于分组，不保证跨版本稳定）。
+"""
+
+from __future__ import annotations
+
+import numpy as np
+
+
+def symmetric_edges(
+    source: np.ndarray,
+    target: np.ndarray,
+    weights: np.ndarray | None = None,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """把有向边列表展开为对称的 (rows, cols, weights)，非正权重的边被忽略"""
+    source = np.asarray(source, dtype=np.int64)
+    target = np.asarray(target, dtype=np.int64)
+    if weights is None:
+        weights = np.ones(len(source), dtype=np.float64)
+    else:
+        weights = np.asarray(weights, dtype=np.float64)
+        keep = weights > 0
+        source, target, weights = source[keep], target[keep], weights[keep]
+    return (
+        np.concatenate([source, target]),
+        np.concatenate([target, source]),
+        np.concatenate([weights, weights]),
+    )
+
+
+def modularity(
+    rows: np.ndarray,
+    cols: np.ndarray,
+    weights: np.ndarray,
+    labels: np.ndarray,
+) -> float:
+    """对称边数组上的模块度 Q = Σ_c [in_c / 2m - (tot_c / 2m)^2]"""
+    total = weights.sum()
+    if total <= 0:
+        return 0.0
+    degree = np.bincount(rows, weights=weights, minlength=len(labels))
+    community_degree = np.bincount(labels, weights=degree)
+    internal = weights[labels[rows] == labels[cols]].sum()
+    return float(internal / total - np.square(community_degree / total).sum())
+
+
+def louvain(
+    rows: np.ndarray,
+    cols: np.ndarray,
+    weights: np.ndarray,
+    node_count: int,
+    *,
+    max_levels: int = 10,
+    max_iterations: int = 10,
+    tolerance: float = 0.0001,
+    random_state: int | None = 0,
+) -> tuple[np.ndarray, float, int]:
+    """多层 Louvain 社区发现
+
+    Args:
+        rows: 对称边数组的起点（见 symmetric_edges）
+        cols: 对称边数组的终点
+        weights: 对称边数组的权重
+        node_count: 节点数，编号范围 [0, node_count)
+        max_levels: 最大聚合层数
+        max_iterations: 每层局部移动的最大轮数
+        tolerance: 一轮模块度提升小于该值时结束本层
+        random_state: 选择移动节点的随机种子
+
+    Returns:
+        (每个节点的社区编号, 模块度, 实际层数)
+    """
+    if max_levels < 1 or max_iterations < 1:
+        raise ValueError("max_levels and max_iterations must be positive")
+    rng = np.random.default_rng(random_state)
+    labels = np.arange(node_count, dtype=np.int64)
+    level_rows = np.asarray(rows, dtype=np.int64)
+    level_cols = np.asarray(cols, dtype=np.int64)
+    level_weights = np.asarray(weights, dtype=np.float64)
+    level_count = node_count
+    levels = 0
+
+    while levels < max_levels and level_count > 1:
+        moved = _local_moves(
+            level_rows, level_cols, level_weights, level_count, max_iterations, tolerance, rng
+        )
+        communities, moved = np.unique(moved, return_inverse=True)
+        levels += 1
+        if len(communities) == level_count:
+            break
+        labels = moved[labels]
+        level_rows, level_cols, level_weights = _aggregate(
+            moved[level_rows], moved[level_cols], level_weights, len(communities)
+        )
+        level_count = len(communities)
+
+    return labels, modularity(rows, cols, weights, labels), levels
+
+
+def label_propagation(
+    rows: np.ndarray,
+    cols: np.ndarray,
+    weights: np.ndarray,
+    node_count: int,
+    *,
+    max_iterations: int = 10,
+    random_state: int | None = 0,
+) -> tuple[np.ndarray, int]:
+    """标签传播社区发现
+
+    Args:
+        rows: 对称边数组的起点（见 symmetric_edges）
+        cols: 对称边数组的终点
+        weights: 对称边数组的权重
+        node_count: 节点数
+        max_iterations: 最大轮数
+        random_state: 选择更新节点的随机种子
+
+    Returns:
+        (每个节点的社区编号, 实际轮数)
+    """
+    if max_iterations < 1:
+        raise ValueError("max_iterations must be positive")
+    rng = np.random.default_rng(random_state)
+    rows = np.asarray(rows, dtype=np.int64)
+    cols = np.asarray(cols, dtype=np.int64)
+    weights = np.asarray(weights, dtype=np.float64)
+    not_loop = rows != cols
+    rows, cols, weights = rows[not_loop], cols[not_loop], weights[not_loop]
+
+    labels = np.arange(node_count, dtype=np.int64)
+    iterations = 0
+    for iterations in range(1, max_iterations + 1):
+        nodes, targets, links = _links_by_community(rows, labels[cols], weights, node_count)
+        own_weight = np.zeros(node_count)
+        own = labels[nodes] == targets
+        own_weight[nodes[own]] = links[own]
+        best_node, best_label, best_weight = _argmax_by_node(nodes, targets, links)
+        # 当前标签与最优标签权重相同时保持不变，避免在平局标签之间来回切换
+        changed = best_weight > own_weight[best_node] + 1e-12
+        if not changed.any():
+            break
+        movers = changed & (rng.random(len(best_node)) < 0.5)
+        labels[best_node[movers]] = best_label[movers]
+
+    return np.unique(labels, return_inverse=True)[1], iterations
+
+
+def _local_moves(
+    rows: np.ndarray,
+    cols: np.ndarray,
+    weights: np.ndarray,
+    node_count: int,
+    max_iterations: int,
+    tolerance: float,
+    rng: np.random.Generator,
+) -> np.ndarray:
+    """Louvain 局部移动阶段，返回每个节点的社区编号"""
+    labels = np.arange(node_count, dtype=np.int64)
+    total = weights.sum()
+    if total <= 0:
+        return labels
+    degree = np.bincount(rows, weights=weights, minlength=node_count)
+    not_loop = rows != cols
+    rows, cols, link_weights = rows[not_loop], cols[not_loop], weights[not_loop]
+
+    quality = _level_modularity(rows, cols, link_weights, weights, degree, labels, total)
+    move_fraction = 0.5
+    for _ in range(max_iterations):
+        community_degree = np.bincount(labels, weights=degree, minlength=node_count)
+        nodes, targets, links = _links_by_community(rows, labels[cols], link_weights, node_count)
+        own = labels[nodes] == targets
+        # 把节点自身从所在社区中移除后计算加入各社区的增益
+        target_degree = community_degree[targets] - np.where(own, degree[nodes], 0.0)
+        gain = links - degree[nodes] * target_degree / total
+
+        stay = -degree * (community_degree[labels] - degree) / total
+        stay[nodes[own]] = gain[own]
+        best_node, best_target, best_gain = _argmax_by_node(nodes, targets, gain)
+        better = (best_gain > stay[best_node] + 1e-12) & (best_target != labels[best_node])
+        movers = better & (rng.random(len(best_node)) < move_fraction)
+        if not movers.any():
+            if not better.any():
+                break
+            continue
+
+        previous = labels.copy()
+        labels[best_node[movers]] = best_target[movers]
+        updated = _level_modularity(rows, cols, link_weights, weights, degree, labels, total)
+        if updated < quality:
+            labels = previous
+            move_fraction /= 2
+            if move_fraction < 1e-3:
+                break
+            continue
+        improvement, quality = updated - quality, updated
+        if improvement < tolerance:
+            break
+    return labels
+
+
+def _level_modularity(rows, cols, link_weights, weights, degree, labels, total) -> float:
+    # 自环权重（聚合后社区的内部边）恒在社区内部
+    internal = weights.sum() - link_weights.sum() + link_weights[labels[rows] == labels[cols]].sum()
+    community_degree = np.bincount(labels, weights=degree)
+    return float(internal / total - np.square(community_degree / total).sum())
+
+
+def _links_by_community(
+    rows: np.ndarray,
+    communities: np.ndarray,
+    weights: np.ndarray,
+    node_count: int,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """每个 (节点, 邻居社区) 的连接权重和"""
+    keys = rows * node_count + communities
+    unique_keys, inverse = np.unique(keys, return_inverse=True)
+    links = np.bincount(inverse, weights=weights)
+    return unique_keys // node_count, unique_keys % node_count, links
+
+
+def _argmax_by_node(
+    nodes: np.ndarray,
+    targets: np.ndarray,
+    values: np.ndarray,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """每个节点取 values 最大的 target，平局取编号最小的 target"""
+    order = np.lexsort((targets, -values, nodes))
+    nodes, targets, values = nodes[order], targets[order], values[order]
+    first = np.ones(len(nodes), dtype=bool)
+    first[1:] = nodes[1:] != nodes[:-1]
+    return nodes[first], targets[first], values[first]
+
+
+def _aggregate(
+    rows: np.ndarray,
+    cols: np.ndarray,
+    weights: np.ndarray,
+    node_count: int,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """把社区聚合为节点，合并平行边（社区内部边变为自环）"""
+    keys = rows * node_count + cols
+    unique_keys, inverse = np.unique(keys, return_inverse=True)
+    return unique_keys // node_count, unique_keys % node_count, np.bincount(inverse, weights=weights)
+
+
+def detect_communities(
+    algorithm: str,
+    source: np.ndarray,
+    target: np.ndarray,
+    node_count: int,
+    *,
+    weights: np.ndarray | None = None,
+    **options,
+) -> np.ndarray:
+    """在有向边列表上运行指定算法（按无向图处理），返回每个节点的社区编号
+
+    Args:
+        algorithm: louvain 或 label_propagation
+        source: 每条边的起点编号
+        target: 每条边的终点编号
+        node_count: 节点数
+        weights: 边权重，None 表示全部为 1
+        options: 传给对应算法的参数
+
+    Raises:
+        ValueError: 不支持的算法
+    """
+    rows, cols, symmetric_weights = symmetric_edges(source, target, weights)
+    if algorithm == "louvain":
+        return louvain(rows, cols, symmetric_weights, node_count, **options)[0]
+    if algorithm == "label_propagation":
+        return label_propagation(rows, cols, symmetric_weights, node_count, **options)[0]
+    raise ValueError(f"Unsupported community algorithm: {algorithm}")
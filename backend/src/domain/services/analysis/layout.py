@@ -0,0 +1,277 @@
+"""力引导布局：ForceAtlas2 / Fruchterman-Reingold
+
+两种模型共用同一套迭代，只是引力和质量不同（k 为理想边长）：
+
+- 斥力：C · m_i · m_j / d，C = k²
+- 引力：ForceAtlas2 为 w · d，Fruchterman-Reingold 为 w · d² / k
+- 质量：ForceAtlas2 为 度数 + 1（hub 互相推开），Fruchterman-Reingold 为 1
+- 重力：g · m_i · |x_i|，指向原点（ForceAtlas2 的 strong gravity），布局半径约为
+  k · sqrt(Σm / g)，不连通的部分也不会越飘越远
+
+每轮的位移长度不超过温度 t，t 从 t0 线性降到接近 0。给定 initial 时为热启动：
+已有坐标的节点从原位置出发、t0 取较小值，只做局部调整；没有坐标的节点放到
+已定位邻居的中心附近。
+
+斥力是 O(n²) 的。节点数超过 barnes_hut_threshold 时使用 Barnes-Hut 近似：在隐式
+四叉树的每一层上，节点只与“父格子的邻居的子格子中与自己不相邻的格子”按质心
+相互作用（每层至多 27 个格子，开角约为 1），最细一层相邻格子内的节点精确计算。
+所有计算都是按层、按偏移整体完成的 NumPy 运算，不在 Python 里逐节点循环。
+"""
+
+from __future__ import annotations
+
+import math
+
+import numpy as np
+
+LAYOUT_ALGORITHMS = ("forceatlas2", "fruchterman_reingold")
+
+EDGE_LENGTH = 100.0  # 理想边长 k（坐标单位）
+GRAVITY = 1.0
+# Barnes-Hut 最细一层每个格子的平均节点数
+_LEAF_SIZE = 8
+_MAX_DEPTH = 16
+_EPSILON = 1e-9
+
+
+def force_layout(
+    source: np.ndarray,
+    target: np.ndarray,
+    node_count: int,
+    *,
+    weights: np.ndarray | None = None,
+    algorithm: str = "forceatlas2",
+    iterations: int = 100,
+    initial: np.ndarray | None = None,
+    seed: int | None = 0,
+    barnes_hut_threshold: int = 1000,
+) -> np.ndarray:
+    """计算节点坐标
+
+    Args:
+        source: 每条边的起点编号（按无向图处理）
+        target: 每条边的终点编号
+        node_count: 节点数
+        weights: 边权重，None 表示全部为 1
+        algorithm: forceatlas2 或 fruchterman_reingold
+        iterations: 迭代次数
+        initial: (node_count, 2) 的初始坐标，NaN 行表示没有坐标；给定时为热启动
+        seed: 随机初始坐标的种子
+        barnes_hut_threshold: 节点数超过该值时斥力使用 Barnes-Hut 近似
+
+    Returns:
+        (node_count, 2) 的坐标，中心在原点
+
+    Raises:
+        ValueError: 不支持的算法或迭代次数不为正
+    """
+    if algorithm not in LAYOUT_ALGORITHMS:
+        raise ValueError(f"Unsupported layout algorithm: {algorithm}")
+    if iterations < 1:
+        raise ValueError("iterations must be positive")
+    if node_count == 0:
+        return np.zeros((0, 2))
+
+    source = np.asarray(source, dtype=np.int64)
+    target = np.asarray(target, dtype=np.int64)
+    weights = np.ones(len(source)) if weights is None else np.asarray(weights, dtype=np.float64)
+    not_loop = source != target
+    source, target, weights = source[not_loop], target[not_loop], weights[not_loop]
+
+    degree = np.bincount(source, minlength=node_count) + np.bincount(target, minlength=node_count)
+    mass = degree + 1.0 if algorithm == "forceatlas2" else np.ones(node_count)
+    rng = np.random.default_rng(seed)
+    # 重力与斥力平衡时布局边长约为 k · sqrt(Σm)
+    side = EDGE_LENGTH * math.sqrt(mass.sum())
+    positions, warm = _initial_positions(source, target, node_count, initial, side, rng)
+
+    k = EDGE_LENGTH
+    t0 = k if warm else side / 4
+    for i in range(iterations):
+        if node_count > barnes_hut_threshold:
+            forces = _repulsion_barnes_hut(positions, mass, k * k)
+        else:
+            forces = _repulsion_exact(positions, mass, k * k)
+        forces += _attraction(positions, source, target, weights, algorithm, k)
+        forces += _gravity(positions, mass)
+
+        temperature = t0 * (1 - i / iterations) + k / 100
+        length = np.sqrt(np.square(forces).sum(axis=1)) + _EPSILON
+        positions += forces * (np.minimum(length, temperature) / length)[:, None]
+
+    return positions - positions.mean(axis=0)
+
+
+def _initial_positions(
+    source: np.ndarray,
+    target: np.ndarray,
+    node_count: int,
+    initial: np.ndarray | None,
+    side: float,
+    rng: np.random.Generator,
+) -> tuple[np.ndarray, bool]:
+    """边长为 side 的正方形内的随机坐标；热启动时沿用已有坐标，新节点放到已定位邻居的中心附近"""
+    positions = rng.uniform(-side / 2, side / 2, size=(node_count, 2))
+    if initial is None:
+        return positions, False
+
+    initial = np.asarray(initial, dtype=np.float64)
+    known = ~np.isnan(initial).any(axis=1)
+    if not known.any():
+        return positions, False
+    positions[known] = initial[known]
+
+    # 新节点：已定位邻居坐标的平均值 + 抖动
+    rows = np.concatenate([source, target])
+    cols = np.concatenate([target, source])
+    keep = ~known[rows] & known[cols]
+    count = np.bincount(rows[keep], minlength=node_count)
+    placed = count > 0
+    for axis in range(2):
+        total = np.bincount(rows[keep], weights=positions[cols[keep], axis], minlength=node_count)
+        positions[placed, axis] = total[placed] / count[placed]
+    jitter = rng.normal(scale=EDGE_LENGTH / 2, size=(int(placed.sum()), 2))
+    positions[placed] += jitter
+    return positions, True
+
+
+def _pair_forces(delta: np.ndarray, strength: np.ndarray) -> np.ndarray:
+    """斥力 strength / d，方向沿 delta（delta 为 x_i - x_j）"""
+    d2 = delta[:, 0] * delta[:, 0] + delta[:, 1] * delta[:, 1] + _EPSILON
+    return delta * (strength / d2)[:, None]
+
+
+def _repulsion_exact(positions: np.ndarray, mass: np.ndarray, constant: float) -> np.ndarray:
+    """两两精确计算斥力，按行分块控制内存
+
+    Σ_j f_ij (x_i - x_j) = x_i · Σ_j f_ij - (F · X)_i，距离和合力都用矩阵乘法计算。
+    """
+    n = len(positions)
+    forces = np.empty_like(positions)
+    squared = np.square(positions).sum(axis=1)
+    chunk = max(1, 4_000_000 // n)
+    for start in range(0, n, chunk):
+        rows = slice(start, min(start + chunk, n))
+        d2 = squared[rows, None] + squared[None, :] - 2 * (positions[rows] @ positions.T)
+        np.maximum(d2, _EPSILON, out=d2)
+        strength = np.outer(constant * mass[rows], mass)
+        strength /= d2
+        # 去掉自身
+        strength[np.arange(rows.stop - start), np.arange(start, rows.stop)] = 0
+        forces[rows] = positions[rows] * strength.sum(axis=1)[:, None] - strength @ positions
+    return forces
+
+
+def _repulsion_barnes_hut(positions: np.ndarray, mass: np.ndarray, constant: float) -> np.ndarray:
+    """隐式四叉树上的 Barnes-Hut 斥力近似
+
+    只保存有节点的格子（排序后的格子编号 + searchsorted 查找），最细一层的深度按
+    实际分布加深，直到每个格子的节点数不超过 _LEAF_SIZE 的 4 倍。
+    """
+    n = len(positions)
+    origin = positions.min(axis=0)
+    size = float((positions.max(axis=0) - origin).max()) + _EPSILON
+    depth = min(max(2, math.ceil(math.log(max(n / _LEAF_SIZE, 1), 4))), _MAX_DEPTH)
+    while depth < _MAX_DEPTH:
+        cells = _Cells(positions, origin, size, depth)
+        if cells.counts.max() <= 4 * _LEAF_SIZE:
+            break
+        depth += 1
+    forces = np.zeros_like(positions)
+
+    # 远场：第 2..depth 层，第 0、1 层的格子彼此都相邻
+    for level in range(2, depth + 1):
+        cells = _Cells(positions, origin, size, level)
+        cell_mass = np.bincount(cells.inverse, weights=mass)
+        centre = np.stack([
+            np.bincount(cells.inverse, weights=mass * positions[:, axis]) / cell_mass
+            for axis in range(2)
+        ], axis=1)
+        base_x, base_y = (cells.x >> 1) * 2 - 2, (cells.y >> 1) * 2 - 2
+        for a in range(6):
+            qx = base_x + a
+            for b in range(6):
+                qy = base_y + b
+                far = (np.abs(qx - cells.x) > 1) | (np.abs(qy - cells.y) > 1)
+                nodes, q = cells.lookup(qx, qy, far)
+                if not len(nodes):
+                    continue
+                strength = constant * mass[nodes] * cell_mass[q]
+                forces[nodes] += _pair_forces(positions[nodes] - centre[q], strength)
+
+    # 近场：最细一层自身及相邻格子内的节点精确计算
+    cells = _Cells(positions, origin, size, depth)
+    order = np.argsort(cells.inverse, kind="stable")
+    starts = np.concatenate([[0], np.cumsum(cells.counts)[:-1]])
+    for ox in (-1, 0, 1):
+        for oy in (-1, 0, 1):
+            nodes, q = cells.lookup(cells.x + ox, cells.y + oy)
+            # 按邻居格子节点数降序排列，处理第 j 个成员时只涉及前缀
+            by_count = np.argsort(-cells.counts[q], kind="stable")
+            nodes, q = nodes[by_count], q[by_count]
+            q_counts = cells.counts[q]
+            for j in range(int(q_counts[0]) if len(q_counts) else 0):
+                active = int(np.searchsorted(-q_counts, -j, side="left"))
+                others = order[starts[q[:active]] + j]
+                members = nodes[:active]
+                strength = constant * mass[members] * mass[others]
+                forces[members] += _pair_forces(positions[members] - positions[others], strength)
+    return forces
+
+
+class _Cells:
+    """某一层四叉树中有节点的格子"""
+
+    def __init__(self, positions: np.ndarray, origin: np.ndarray, size: float, level: int):
+        self.grid = 1 << level
+        scaled = np.clip(((positions - origin) / size * self.grid).astype(np.int64), 0, self.grid - 1)
+        self.x, self.y = scaled[:, 0], scaled[:, 1]
+        self.keys, self.inverse, self.counts = np.unique(
+            self.x * self.grid + self.y, return_inverse=True, return_counts=True
+        )
+
+    def lookup(
+        self,
+        qx: np.ndarray,
+        qy: np.ndarray,
+        mask: np.ndarray | None = None,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """每个节点对应的格子 (qx, qy) 若存在，返回 (节点编号, 格子序号)"""
+        valid = (qx >= 0) & (qx < self.grid) & (qy >= 0) & (qy < self.grid)
+        if mask is not None:
+            valid &= mask
+        nodes = np.flatnonzero(valid)
+        keys = qx[nodes] * self.grid + qy[nodes]
+        index = np.minimum(np.searchsorted(self.keys, keys), len(self.keys) - 1)
+        found = self.keys[index] == keys
+        return nodes[found], index[found]
+
+
+def _attraction(
+    positions: np.ndarray,
+    source: np.ndarray,
+    target: np.ndarray,
+    weights: np.ndarray,
+    algorithm: str,
+    k: float,
+) -> np.ndarray:
+    """沿边的引力"""
+    n = len(positions)
+    delta = positions[target] - positions[source]
+    if algorithm == "forceatlas2":
+        pull = delta * weights[:, None]
+    else:
+        distance = np.sqrt(np.square(delta).sum(axis=1))
+        pull = delta * (weights * distance / k)[:, None]
+    forces = np.zeros_like(positions)
+    for axis in range(2):
+        forces[:, axis] = (
+            np.bincount(source, weights=pull[:, axis], minlength=n)
+            - np.bincount(target, weights=pull[:, axis], minlength=n)
+        )
+    return forces
+
+
+def _gravity(positions: np.ndarray, mass: np.ndarray) -> np.ndarray:
+    """指向原点、与距离成正比的重力"""
+    return -positions * (GRAVITY * mass)[:, None]
@@ -0,0 +1,199 @@
+"""内存路径搜索
+
+在项目邻接快照上做无向路径搜索，与 Cypher 中 (a)-[:RELATION*1..n]-(b) 的语义一致：
+
+- shortest_path: 双向 BFS，两端交替扩展较小的一侧前沿，访问节点数约为单向 BFS 的平方根
+- k_shortest_paths: Yen 算法（无权），按长度从短到长逐条产出无环路径，调用方取够即停
+
+节点和关系都以快照内的整数下标表示，结果由调用方映射回实体/关系 ID。
+"""
+
+from __future__ import annotations
+
+import heapq
+from dataclasses import dataclass
+from itertools import count
+from typing import Iterable, Iterator, Protocol
+
+
+class AdjacencyView(Protocol):
+    """路径搜索所需的邻接访问接口"""
+
+    def neighbors(self, node: int) -> Iterable[tuple[int, int]]:
+        """返回 (邻居下标, 关系下标)，两个方向的关系都包含在内"""
+        ...
+
+
+@dataclass(frozen=True, slots=True)
+class GraphPath:
+    """一条路径
+
+    Attributes:
+        nodes: 依次经过的节点下标（含起点和终点）
+        edges: 依次经过的关系下标，len(edges) == len(nodes) - 1
+    """
+    nodes: tuple[int, ...]
+    edges: tuple[int, ...]
+
+    def __len__(self) -> int:
+        return len(self.edges)
+
+
+def shortest_path(
+    graph: AdjacencyView,
+    source: int,
+    target: int,
+    max_depth: int,
+    *,
+    blocked_nodes: frozenset[int] | set[int] = frozenset(),
+    blocked_edges: frozenset[int] | set[int] = frozenset(),
+) -> GraphPath | None:
+    """双向 BFS 查找最短路径
+
+    Args:
+        graph: 邻接快照
+        source: 起点下标
+        target: 终点下标
+        max_depth: 路径最大长度（关系数）
+        blocked_nodes: 不允许经过的节点（Yen 算法中的根路径）
+        blocked_edges: 不允许经过的关系
+
+    Returns:
+        最短路径；起点等于终点、超出 max_depth 或不连通时返回 None
+    """
+    if source == target or max_depth < 1:
+        return None
+    if source in blocked_nodes or target in blocked_nodes:
+        return None
+
+    # 节点 -> (父节点, 关系, 深度)
+    forward: dict[int, tuple[int, int, int]] = {source: (-1, -1, 0)}
+    backward: dict[int, tuple[int, int, int]] = {target: (-1, -1, 0)}
+    forward_frontier = [source]
+    backward_frontier = [target]
+    forward_depth = backward_depth = 0
+
+    while forward_frontier and backward_frontier and forward_depth + backward_depth < max_depth:
+        # 扩展较小的一侧
+        expand_forward = len(forward_frontier) <= len(backward_frontier)
+        if expand_forward:
+            visited, other, frontier = forward, backward, forward_frontier
+            depth = forward_depth = forward_depth + 1
+        else:
+            visited, other, frontier = backward, forward, backward_frontier
+            depth = backward_depth = backward_depth + 1
+
+        next_frontier: list[int] = []
+        best: tuple[int, int] | None = None  # (总长度, 相遇节点)
+        for node in frontier:
+            for neighbor, edge in graph.neighbors(node):
+                if edge in blocked_edges or neighbor in visited or neighbor in blocked_nodes:
+                    continue
+                visited[neighbor] = (node, edge, depth)
+                next_frontier.append(neighbor)
+                if neighbor in other:
+                    total = depth + other[neighbor][2]
+                    if total <= max_depth and (best is None or total < best[0]):
+                        best = (total, neighbor)
+
+        if best is not None:
+            return _join(forward, backward, best[1])
+        if expand_forward:
+            forward_frontier = next_frontier
+        else:
+            backward_frontier = next_frontier
+
+    return None
+
+
+def k_shortest_paths(
+    graph: AdjacencyView,
+    source: int,
+    target: int,
+    max_depth: int,
+) -> Iterator[GraphPath]:
+    """Yen 算法：按长度升序产出起点到终点的无环路径
+
+    生成器是惰性的，每取一条路径才计算下一条，调用方取到 path_limit 条后停止迭代即可。
+    平行关系（同一对节点间的多条关系）视为不同路径。
+
+    Args:
+        graph: 邻接快照
+        source: 起点下标
+        target: 终点下标
+        max_depth: 路径最大长度（关系数）
+    """
+    first = shortest_path(graph, source, target, max_depth)
+    if first is None:
+        return
+    accepted = [first]
+    seen = {first.edges}
+    candidates: list[tuple[int, int, GraphPath]] = []
+    tie_breaker = count()
+    yield first
+
+    while True:
+        previous = accepted[-1]
+        for i in range(len(previous.edges)):
+            spur_node = previous.nodes[i]
+            root_nodes = previous.nodes[:i + 1]
+            root_edges = previous.edges[:i]
+            # 禁止与已有路径共享根路径后走同一条关系，禁止回到根路径上的节点
+            blocked_edges = {
+                path.edges[i]
+                for path in accepted
+                if len(path.edges) > i and path.nodes[:i + 1] == root_nodes
+            }
+            spur = shortest_path(
+                graph,
+                spur_node,
+                target,
+                max_depth - i,
+                blocked_nodes=set(root_nodes[:-1]),
+                blocked_edges=blocked_edges,
+            )
+            if spur is None:
+                continue
+            candidate = GraphPath(
+                nodes=root_nodes[:-1] + spur.nodes,
+                edges=root_edges + spur.edges,
+            )
+            if candidate.edges not in seen:
+                seen.add(candidate.edges)
+                heapq.heappush(candidates, (len(candidate), next(tie_breaker), candidate))
+
+        if not candidates:
+            return
+        _, _, path = heapq.heappop(candidates)
+        accepted.append(path)
+        yield path
+
+
+def _join(
+    forward: dict[int, tuple[int, int, int]],
+    backward: dict[int, tuple[int, int, int]],
+    meeting: int,
+) -> GraphPath:
+    """从相遇节点向两端回溯拼接路径"""
+    nodes = [meeting]
+    edges: list[int] = []
+    node = meeting
+    while True:
+        parent, edge, _ = forward[node]
+        if parent < 0:
+            break
+        nodes.append(parent)
+        edges.append(edge)
+        node = parent
+    nodes.reverse()
+    edges.reverse()
+
+    node = meeting
+    while True:
+        parent, edge, _ = backward[node]
+        if parent < 0:
+            break
+        nodes.append(parent)
+        edges.append(edge)
+        node = parent
+    return GraphPath(nodes=tuple(nodes), edges=tuple(edges))
@@ -0,0 +1,165 @@
+"""视口瓦片：布局坐标上的线性四叉树与分级显示
+
+把布局坐标量化到 2^TILE_DEPTH × 2^TILE_DEPTH 的网格并按 Morton（Z 序）编码排序，
+四叉树第 z 层的每个格子（瓦片 (z, x, y)）恰好对应排序后的一段连续区间，按视口
+取节点只需要两次二分查找，不需要保存树结构。
+
+分级显示：节点按重要性（度数）在每层格子内排名，第一次进入所在格子前 capacity
+名的层级记为 min_zoom。第 z 层瓦片只返回 min_zoom ≤ z 的节点；节点在子格子中
+的排名不低于在父格子中的排名，因此每个瓦片至多 capacity 个节点，缩放时已显示的
+节点不会消失。
+"""
+
+from __future__ import annotations
+
+import numpy as np
+
+from src.domain.services.analysis.layout import force_layout
+
+TILE_DEPTH = 16
+
+
+def morton_encode(ix: np.ndarray, iy: np.ndarray) -> np.ndarray:
+    """把两个 TILE_DEPTH 位整数交错为 Morton 编码（x 占偶数位，y 占奇数位）"""
+    return _spread(np.asarray(ix, dtype=np.uint64)) | (_spread(np.asarray(iy, dtype=np.uint64)) << np.uint64(1))
+
+
+def _spread(v: np.ndarray) -> np.ndarray:
+    """在每一位之间插入一个 0（16 位 -> 32 位）"""
+    v = v & np.uint64(0xFFFF)
+    v = (v | (v << np.uint64(8))) & np.uint64(0x00FF00FF)
+    v = (v | (v << np.uint64(4))) & np.uint64(0x0F0F0F0F)
+    v = (v | (v << np.uint64(2))) & np.uint64(0x33333333)
+    v = (v | (v << np.uint64(1))) & np.uint64(0x55555555)
+    return v
+
+
+def tile_bounds(positions: np.ndarray) -> tuple[float, float, float]:
+    """包含所有坐标的正方形 (origin_x, origin_y, size)"""
+    if len(positions) == 0:
+        return 0.0, 0.0, 1.0
+    origin = positions.min(axis=0)
+    size = float((positions.max(axis=0) - origin).max())
+    # 留出余量，最大坐标也落在最后一个格子内
+    size = size * (1 + 1e-6) + 1e-6
+    return float(origin[0]), float(origin[1]), size
+
+
+def quantize(positions: np.ndarray, origin_x: float, origin_y: float, size: float) -> np.ndarray:
+    """坐标对应的最细一层格子的 Morton 编码"""
+    grid = 1 << TILE_DEPTH
+    scaled = (positions - np.array([origin_x, origin_y])) / size * grid
+    cells = np.clip(scaled.astype(np.int64), 0, grid - 1)
+    return morton_encode(cells[:, 0], cells[:, 1])
+
+
+def tile_key_range(z: int, x: int, y: int) -> tuple[int, int]:
+    """瓦片 (z, x, y) 覆盖的 Morton 编码区间 [lo, hi)
+
+    z 超过 TILE_DEPTH 时取所在的最细一层格子。
+
+    Raises:
+        ValueError: 瓦片编号越界
+    """
+    if z < 0 or not (0 <= x < (1 << z) and 0 <= y < (1 << z)):
+        raise ValueError(f"Tile ({z}, {x}, {y}) is out of range")
+    if z > TILE_DEPTH:
+        x, y, z = x >> (z - TILE_DEPTH), y >> (z - TILE_DEPTH), TILE_DEPTH
+    shift = 2 * (TILE_DEPTH - z)
+    code = int(morton_encode(np.array([x]), np.array([y]))[0])
+    return code << shift, (code + 1) << shift
+
+
+def assign_min_zoom(morton: np.ndarray, importance: np.ndarray, capacity: int) -> tuple[np.ndarray, int]:
+    """计算每个节点开始显示的层级
+
+    Args:
+        morton: 节点的 Morton 编码
+        importance: 节点重要性，越大越先显示（相同时编号小的优先）
+        capacity: 每个瓦片的节点数上限
+
+    Returns:
+        (min_zoom, max_zoom)：max_zoom 为所有节点都已显示的层级，更深的瓦片不再细分
+    """
+    n = len(morton)
+    min_zoom = np.full(n, TILE_DEPTH, dtype=np.int8)
+    if n == 0:
+        return min_zoom, 0
+    by_importance = np.argsort(-np.asarray(importance, dtype=np.float64), kind="stable")
+    assigned = np.zeros(n, dtype=bool)
+    for z in range(TILE_DEPTH + 1):
+        cells = morton[by_importance] >> np.uint64(2 * (TILE_DEPTH - z))
+        order = np.argsort(cells, kind="stable")
+        grouped = cells[order]
+        starts = np.flatnonzero(np.concatenate([[True], grouped[1:] != grouped[:-1]]))
+        counts = np.diff(np.append(starts, n))
+        rank = np.arange(n) - np.repeat(starts, counts)
+        top = by_importance[order[rank < capacity]]
+        newly = top[~assigned[top]]
+        min_zoom[newly] = z
+        assigned[newly] = True
+        if counts.max() <= capacity:
+            min_zoom[~assigned] = z
+            return min_zoom, z
+    return min_zoom, TILE_DEPTH
+
+
+def build_tile_arrays(
+    source: np.ndarray,
+    target: np.ndarray,
+    node_count: int,
+    *,
+    capacity: int,
+    algorithm: str = "forceatlas2",
+    iterations: int = 50,
+    initial: np.ndarray | None = None,
+) -> tuple[dict[str, np.ndarray], dict[str, float | int]]:
+    """计算布局并构建瓦片索引数组（在工作进程中运行）
+
+    Args:
+        source: 每条关系的起点编号
+        target: 每条关系的终点编号
+        node_count: 节点数
+        capacity: 每个瓦片的节点数上限
+        algorithm: 布局算法
+        iterations: 布局迭代次数
+        initial: 热启动坐标，NaN 行表示新节点
+
+    Returns:
+        (arrays, meta)。arrays 中的节点按 Morton 编码排序：order（排序位置 -> 原编号）、
+        x / y、morton、min_zoom，以及去重后的无向邻接 indptr / indices（排序位置）；
+        meta 为 origin_x、origin_y、size 和 max_zoom
+    """
+    source = np.asarray(source, dtype=np.int64)
+    target = np.asarray(target, dtype=np.int64)
+    positions = force_layout(
+        source, target, node_count,
+        algorithm=algorithm, iterations=iterations, initial=initial,
+    )
+    origin_x, origin_y, size = tile_bounds(positions)
+    morton = quantize(positions, origin_x, origin_y, size)
+    order = np.argsort(morton, kind="stable")
+    rank = np.empty(node_count, dtype=np.int64)
+    rank[order] = np.arange(node_count)
+
+    # 去重后的无向邻接（排序位置），重复关系和自环不影响瓦片中的边
+    heads, tails = rank[source], rank[target]
+    not_loop = heads != tails
+    heads, tails = heads[not_loop], tails[not_loop]
+    pairs = np.unique(np.concatenate([heads * node_count + tails, tails * node_count + heads]))
+    heads, tails = np.divmod(pairs, node_count)
+    indptr = np.zeros(node_count + 1, dtype=np.int64)
+    np.cumsum(np.bincount(heads, minlength=node_count), out=indptr[1:])
+
+    min_zoom, max_zoom = assign_min_zoom(morton[order], np.diff(indptr), capacity)
+    arrays = {
+        "order": order,
+        "x": positions[order, 0].astype(np.float32),
+        "y": positions[order, 1].astype(np.float32),
+        "morton": morton[order],
+        "min_zoom": min_zoom,
+        "indptr": indptr,
+        "indices": tails.astype(np.int32),
+    }
+    meta = {"origin_x": origin_x, "origin_y": origin_y, "size": size, "max_zoom": max_zoom}
+    return arrays, meta
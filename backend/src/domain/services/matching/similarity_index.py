@@ -0,0 +1,125 @@
+"""实体名称相似度索引
+
+基于字符 n-gram 的 MinHash LSH 分桶，用于在实体融合/去重时以亚二次复杂度
+生成候选对，再由调用方用精确相似度（编辑距离等）确认。
+"""
+
+from __future__ import annotations
+
+import random
+import zlib
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Generic, Hashable, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+# 企业名称中区分度很低的通用后缀，参与分桶会让几乎所有企业互为候选
+COMMON_NAME_SUFFIXES = ("股份有限公司", "有限责任公司", "有限公司", "集团", "公司")
+
+
+def blocking_key(text: str) -> str:
+    """生成用于分桶的名称键：去空白、小写、去通用企业后缀"""
+    key = "".join(text.split()).lower()
+    for suffix in COMMON_NAME_SUFFIXES:
+        if key.endswith(suffix):
+            return key[:-len(suffix)] or key
+    return key
+
+
+@dataclass
+class SimilarityIndexConfig:
+    """相似度索引配置
+
+    召回率与吞吐的权衡：每个 band 的行数 r = num_perm / bands，
+    Jaccard 相似度为 s 的两个名称成为候选的概率为 1 - (1 - s^r)^bands。
+    bands 越多（r 越小）召回越高、候选越多；num_perm 越大签名越准、建索引越慢。
+
+    Attributes:
+        ngram_size: 字符 n-gram 长度（中文名称建议2）
+        num_perm: MinHash 签名长度
+        bands: LSH band 数，必须整除 num_perm
+        exact_below: 索引规模小于该值时退化为全量比较，保证小数据集结果与两两比较一致
+        seed: 哈希函数随机种子
+    """
+    ngram_size: int = 2
+    num_perm: int = 32
+    bands: int = 16
+    exact_below: int = 200
+    seed: int = 1
+
+
+class NameSimilarityIndex(Generic[K]):
+    """名称相似度候选索引
+
+    Example:
+        >>> index = NameSimilarityIndex()
+        >>> index.add("e1", "北京华为科技有限公司")
+        >>> index.query("北京华为科技公司")
+        ['e1']
+    """
+
+    def __init__(self, config: SimilarityIndexConfig | None = None):
+        self._config = config or SimilarityIndexConfig()
+        if self._config.num_perm % self._config.bands != 0:
+            raise ValueError("num_perm must be divisible by bands")
+        self._rows = self._config.num_perm // self._config.bands
+
+        rng = random.Random(self._config.seed)
+        self._perms = [
+            (rng.randrange(1, _MERSENNE_PRIME), rng.randrange(0, _MERSENNE_PRIME))
+            for _ in range(self._config.num_perm)
+        ]
+        self._buckets: list[dict[tuple[int, ...], list[K]]] = [
+            defaultdict(list) for _ in range(self._config.bands)
+        ]
+        self._order: dict[K, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._order
+
+    def add(self, key: K, text: str) -> None:
+        """加入一个名称；同一键重复加入会被忽略"""
+        if key in self._order:
+            return
+        self._order[key] = len(self._order)
+        for band, band_key in enumerate(self._band_keys(text)):
+            self._buckets[band][band_key].append(key)
+
+    def query(self, text: str) -> list[K]:
+        """返回与名称可能相似的候选键，按加入顺序排列"""
+        if len(self._order) < self._config.exact_below:
+            return list(self._order)
+
+        candidates: set[K] = set()
+        for band, band_key in enumerate(self._band_keys(text)):
+            bucket = self._buckets[band].get(band_key)
+            if bucket:
+                candidates.update(bucket)
+        return sorted(candidates, key=self._order.__getitem__)
+
+    def _band_keys(self, text: str) -> list[tuple[int, ...]]:
+        signature = self._signature(blocking_key(text))
+        rows = self._rows
+        return [
+            tuple(signature[band * rows:(band + 1) * rows])
+            for band in range(self._config.bands)
+        ]
+
+    def _signature(self, text: str) -> list[int]:
+        n = self._config.ngram_size
+        if len(text) <= n:
+            shingles = {text}
+        else:
+            shingles = {text[i:i + n] for i in range(len(text) - n + 1)}
+        hashes = [zlib.crc32(shingle.encode("utf-8")) for shingle in shingles]
+        return [
+            min((a * h + b) % _MERSENNE_PRIME for h in hashes) & _MAX_HASH
+            for a, b in self._perms
+        ]
@@ -5,5 +5,6 @@ from . import persistence
 from . import queue
 from . import storage
 from . import nlp
+from . import compute
 
-__all__ = ["cache", "persistence", "queue", "storage", "nlp"]
+__all__ = ["cache", "persistence", "queue", "storage", "nlp", "compute"]
@@ -0,0 +1,75 @@
+"""项目图数据版本号
+
+每个项目维护一个单调递增的版本号，所有图写入路径在写入成功后调用 bump，
+QueryService 把当前版本号纳入缓存键。写入后旧键不再被命中，缓存 TTL 可以放长
+而不会返回过期结果。
+
+版本号的存储与查询缓存后端一致（settings.query_cache_backend）：redis 后端下
+多个 worker 共享版本号，memory 后端下只在当前进程内有效。
+"""
+
+from __future__ import annotations
+
+import logging
+from collections import defaultdict
+
+from redis.asyncio import Redis
+
+from src.config import settings
+from src.domain.ports.repositories import GraphVersionPort
+
+logger = logging.getLogger(__name__)
+
+
+class InMemoryGraphVersionStore(GraphVersionPort):
+    """进程内版本号（开发/测试及单 worker 部署）"""
+
+    def __init__(self) -> None:
+        self._versions: dict[str, int] = defaultdict(int)
+
+    async def get(self, project_id: str) -> int:
+        return self._versions[project_id]
+
+    async def bump(self, project_id: str) -> int:
+        self._versions[project_id] += 1
+        return self._versions[project_id]
+
+
+class RedisGraphVersionStore(GraphVersionPort):
+    """基于 Redis INCR 的共享版本号"""
+
+    def __init__(
+        self,
+        redis_uri: str | None = None,
+        *,
+        client: Redis | None = None,
+        key_prefix: str = "kg:graph_version:",
+    ):
+        self._redis = client or Redis.from_url(redis_uri or settings.redis_uri)
+        self._prefix = key_prefix
+
+    async def get(self, project_id: str) -> int:
+        value = await self._redis.get(self._prefix + project_id)
+        return int(value) if value is not None else 0
+
+    async def bump(self, project_id: str) -> int:
+        # 写入已经提交，递增失败不能让写请求失败；缓存最迟在 TTL 后更新
+        try:
+            return int(await self._redis.incr(self._prefix + project_id))
+        except Exception as e:
+            logger.warning(f"Failed to bump graph version for project {project_id}: {e}")
+            return -1
+
+
+_store: GraphVersionPort | None = None
+
+
+def get_graph_version_store() -> GraphVersionPort:
+    """获取进程内共享的版本号存储"""
+    global _store
+    if _store is None:
+        if settings.query_cache_backend == "redis":
+            _store = RedisGraphVersionStore()
+        else:
+            _store = InMemoryGraphVersionStore()
+    return _store
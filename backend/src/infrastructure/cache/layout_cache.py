@@ -0,0 +1,88 @@
+"""可视化布局坐标缓存
+
+按 (项目ID, 布局算法, 节点与边集合的摘要) 缓存节点坐标，最近使用的在末尾，超过
+graph_layout_cache_entries 时淘汰最久未用的。节点集合只变化了一部分时，
+nearest 返回同一项目中重合节点最多的一份坐标作为热启动的初始值。
+"""
+
+from __future__ import annotations
+
+import hashlib
+from collections import OrderedDict
+from typing import Iterable
+
+from src.config import settings
+
+Positions = dict[str, tuple[float, float]]
+
+
+def layout_digest(node_ids: Iterable[str], edges: Iterable[tuple[str, str]]) -> str:
+    """节点集合与边集合的摘要（与顺序无关）"""
+    digest = hashlib.blake2b(digest_size=16)
+    for node_id in sorted(node_ids):
+        digest.update(node_id.encode())
+        digest.update(b"\0")
+    digest.update(b"\1")
+    for source, target in sorted(edges):
+        digest.update(f"{source}\0{target}\0".encode())
+    return digest.hexdigest()
+
+
+class GraphLayoutCache:
+    """进程内布局坐标 LRU 缓存"""
+
+    def __init__(self, max_entries: int | None = None):
+        self._max_entries = settings.graph_layout_cache_entries if max_entries is None else max_entries
+        self._entries: OrderedDict[tuple[str, str, str], Positions] = OrderedDict()
+
+    def get(self, project_id: str, algorithm: str, digest: str) -> Positions | None:
+        key = (project_id, algorithm, digest)
+        positions = self._entries.get(key)
+        if positions is not None:
+            self._entries.move_to_end(key)
+        return positions
+
+    def put(self, project_id: str, algorithm: str, digest: str, positions: Positions) -> None:
+        if self._max_entries <= 0:
+            return
+        self._entries[(project_id, algorithm, digest)] = positions
+        self._entries.move_to_end((project_id, algorithm, digest))
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+    def nearest(
+        self,
+        project_id: str,
+        algorithm: str,
+        node_ids: list[str],
+        min_overlap: float = 0.5,
+    ) -> Positions | None:
+        """同一项目中与 node_ids 重合最多的缓存坐标
+
+        Returns:
+            重合节点数不少于 min_overlap · len(node_ids) 时返回该份坐标，否则 None
+        """
+        best, best_overlap = None, 0
+        for (cached_project, cached_algorithm, _), positions in reversed(self._entries.items()):
+            if cached_project != project_id or cached_algorithm != algorithm:
+                continue
+            overlap = sum(1 for node_id in node_ids if node_id in positions)
+            if overlap > best_overlap:
+                best, best_overlap = positions, overlap
+        if best is None or best_overlap < min_overlap * len(node_ids):
+            return None
+        return best
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+_cache: GraphLayoutCache | None = None
+
+
+def get_graph_layout_cache() -> GraphLayoutCache:
+    """获取进程内共享的布局缓存"""
+    global _cache
+    if _cache is None:
+        _cache = GraphLayoutCache()
+    return _cache
@@ -0,0 +1,146 @@
+"""Redis 查询缓存
+
+两级缓存：进程内 L1（按字节数限制的 LRU）+ Redis L2（多个 worker 共享）。
+值统一序列化为字节后存储，L1 命中时也会反序列化出新对象，调用方修改返回值
+不会污染缓存。Redis 不可用时只记录日志和指标，按未命中处理，不影响查询。
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from collections import OrderedDict
+from typing import Any
+
+from redis.asyncio import Redis
+
+from src.config import settings
+from src.domain.ports.repositories import PreviewCachePort
+from src.infrastructure.cache import serialization
+from src.infrastructure.monitoring.metrics import (
+    QUERY_CACHE_ERRORS,
+    QUERY_CACHE_EVICTIONS,
+    QUERY_CACHE_HITS,
+    QUERY_CACHE_L1_BYTES,
+    QUERY_CACHE_MISSES,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class LruBytesCache:
+    """按总字节数限制容量的 LRU 缓存（非线程安全，单个事件循环内使用）
+
+    所有操作都是同步的，在 asyncio 中不需要加锁。
+    """
+
+    def __init__(self, max_bytes: int):
+        self._max_bytes = max_bytes
+        self._entries: OrderedDict[str, tuple[bytes, float]] = OrderedDict()
+        self._bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def size_bytes(self) -> int:
+        return self._bytes
+
+    def get(self, key: str) -> bytes | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        data, expires_at = entry
+        if expires_at <= time.monotonic():
+            self._remove(key, reason="expired")
+            return None
+        self._entries.move_to_end(key)
+        return data
+
+    def set(self, key: str, data: bytes, ttl_seconds: float) -> None:
+        if key in self._entries:
+            self._remove(key, reason=None)
+        if len(data) > self._max_bytes or ttl_seconds <= 0:
+            return
+        self._entries[key] = (data, time.monotonic() + ttl_seconds)
+        self._resize(len(data))
+        while self._bytes > self._max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest, reason="size")
+
+    def clear(self) -> None:
+        self._resize(-self._bytes)
+        self._entries.clear()
+
+    def _remove(self, key: str, reason: str | None) -> None:
+        data, _ = self._entries.pop(key)
+        self._resize(-len(data))
+        if reason:
+            QUERY_CACHE_EVICTIONS.labels(reason=reason).inc()
+
+    def _resize(self, delta: int) -> None:
+        self._bytes += delta
+        QUERY_CACHE_L1_BYTES.inc(delta)
+
+
+class RedisPreviewCache(PreviewCachePort):
+    """Redis 查询缓存（带本地 L1）
+
+    Args:
+        redis_uri: Redis 连接地址，默认 settings.redis_uri
+        client: 已创建的 Redis 客户端（测试时注入）
+        key_prefix: Redis 键前缀
+        l1_max_bytes: L1 最大字节数，0 表示禁用 L1
+        l1_ttl_seconds: L1 条目的最长存活时间；其它 worker 的写入要等 L1 过期后才可见
+    """
+
+    def __init__(
+        self,
+        redis_uri: str | None = None,
+        *,
+        client: Redis | None = None,
+        key_prefix: str = "kg:query:",
+        l1_max_bytes: int | None = None,
+        l1_ttl_seconds: int | None = None,
+    ):
+        self._redis = client or Redis.from_url(redis_uri or settings.redis_uri)
+        self._prefix = key_prefix
+        self._l1 = LruBytesCache(
+            settings.query_cache_l1_max_bytes if l1_max_bytes is None else l1_max_bytes
+        )
+        self._l1_ttl = settings.query_cache_l1_ttl if l1_ttl_seconds is None else l1_ttl_seconds
+
+    async def get(self, key: str) -> Any | None:
+        data = self._l1.get(key)
+        if data is not None:
+            QUERY_CACHE_HITS.labels(tier="l1").inc()
+            return serialization.loads(data)
+
+        try:
+            data = await self._redis.get(self._prefix + key)
+        except Exception as e:
+            QUERY_CACHE_ERRORS.labels(operation="get").inc()
+            logger.warning(f"Redis cache get failed: {e}")
+            data = None
+
+        if data is None:
+            QUERY_CACHE_MISSES.inc()
+            return None
+
+        QUERY_CACHE_HITS.labels(tier="redis").inc()
+        self._l1.set(key, data, self._l1_ttl)
+        return serialization.loads(data)
+
+    async def set(self, key: str, value: Any, ttl_seconds: int) -> None:
+        data = serialization.dumps(value)
+        self._l1.set(key, data, min(ttl_seconds, self._l1_ttl))
+        try:
+            await self._redis.set(self._prefix + key, data, ex=ttl_seconds)
+        except Exception as e:
+            QUERY_CACHE_ERRORS.labels(operation="set").inc()
+            logger.warning(f"Redis cache set failed: {e}")
+
+    async def close(self) -> None:
+        """关闭 Redis 连接并清空 L1"""
+        self._l1.clear()
+        await self._redis.aclose()
@@ -0,0 +1,82 @@
+"""缓存值序列化
+
+查询结果是由 dataclass、list、dict 和基本类型组成的对象树。写入共享缓存前
+用 orjson 序列化为字节，dataclass 以 {"__dataclass__": "模块:类名", "fields": {...}}
+标记，读取时还原为原类型。只允许还原 src 包内的 dataclass。
+
+Neo4j/Python 的时间值会被序列化为 ISO 字符串，读取后不再还原为时间类型。
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import importlib
+from typing import Any
+
+import orjson
+
+_DATACLASS_TAG = "__dataclass__"
+_ALLOWED_MODULE_PREFIX = "src."
+
+
+def dumps(value: Any) -> bytes:
+    """序列化缓存值
+
+    Raises:
+        TypeError: 值中包含无法序列化的对象
+    """
+    return orjson.dumps(_encode(value), default=_default)
+
+
+def loads(data: bytes) -> Any:
+    """反序列化缓存值"""
+    return _decode(orjson.loads(data))
+
+
+def _encode(value: Any) -> Any:
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        cls = type(value)
+        return {
+            _DATACLASS_TAG: f"{cls.__module__}:{cls.__qualname__}",
+            "fields": {
+                f.name: _encode(getattr(value, f.name)) for f in dataclasses.fields(value)
+            },
+        }
+    if isinstance(value, dict):
+        return {key: _encode(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_encode(item) for item in value]
+    return value
+
+
+def _decode(value: Any) -> Any:
+    if isinstance(value, dict):
+        tag = value.get(_DATACLASS_TAG)
+        if tag is not None:
+            cls = _resolve_dataclass(tag)
+            return cls(**{key: _decode(item) for key, item in value["fields"].items()})
+        return {key: _decode(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_decode(item) for item in value]
+    return value
+
+
+def _resolve_dataclass(tag: str) -> type:
+    module_name, _, qualname = tag.partition(":")
+    if not module_name.startswith(_ALLOWED_MODULE_PREFIX):
+        raise ValueError(f"Refusing to load dataclass from {module_name}")
+    target: Any = importlib.import_module(module_name)
+    for part in qualname.split("."):
+        target = getattr(target, part)
+    if not dataclasses.is_dataclass(target):
+        raise ValueError(f"{tag} is not a dataclass")
+    return target
+
+
+def _default(value: Any) -> Any:
+    # neo4j.time.DateTime / Date 等
+    if hasattr(value, "iso_format"):
+        return value.iso_format()
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    raise TypeError(f"Type is not cache serializable: {type(value).__name__}")
@@ -0,0 +1,12 @@
+"""CPU 密集计算（图算法等）的进程池"""
+
+from src.infrastructure.compute.shared_arrays import SharedArray, call_with_shared, share_arrays
+from src.infrastructure.compute.worker_pool import run_in_worker, shutdown_worker_pool
+
+__all__ = [
+    "SharedArray",
+    "call_with_shared",
+    "share_arrays",
+    "run_in_worker",
+    "shutdown_worker_pool",
+]
@@ -0,0 +1,88 @@
+"""通过共享内存把 NumPy 数组交给工作进程
+
+按源节点分块的图算法（如中介中心性）会把同一份邻接数组提交给多个任务，逐个 pickle
+会把整张图复制 N 次。share_arrays 把数组各复制一次到 SharedMemory，任务只传递
+SharedArray 句柄，工作进程里用 call_with_shared 映射为只读数组后调用纯函数。
+"""
+
+from __future__ import annotations
+
+from contextlib import contextmanager
+from dataclasses import dataclass
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Callable, Iterator, TypeVar
+
+import numpy as np
+
+T = TypeVar("T")
+
+
+@dataclass(frozen=True, slots=True)
+class SharedArray:
+    """共享内存中的数组句柄（可 pickle）
+
+    Attributes:
+        name: SharedMemory 名称
+        shape: 数组形状
+        dtype: 数组 dtype 字符串
+    """
+    name: str
+    shape: tuple[int, ...]
+    dtype: str
+
+
+@contextmanager
+def share_arrays(*arrays: np.ndarray) -> Iterator[tuple[SharedArray, ...]]:
+    """把数组复制到共享内存，退出时释放
+
+    Args:
+        arrays: 要共享的数组
+
+    Yields:
+        与 arrays 一一对应的句柄
+    """
+    blocks: list[SharedMemory] = []
+    try:
+        handles = []
+        for array in arrays:
+            array = np.ascontiguousarray(array)
+            # SharedMemory 不允许 size=0
+            block = SharedMemory(create=True, size=max(array.nbytes, 1))
+            blocks.append(block)
+            np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[...] = array
+            handles.append(SharedArray(block.name, array.shape, array.dtype.str))
+        yield tuple(handles)
+    finally:
+        for block in blocks:
+            block.close()
+            block.unlink()
+
+
+def call_with_shared(
+    fn: Callable[..., T],
+    handles: tuple[SharedArray, ...],
+    *args: Any
+) -> T:
+    """映射共享数组后调用 fn(*arrays, *args)
+
+    在工作进程中执行。fn 的返回值不能引用共享数组（需返回新数组），
+    否则共享内存关闭后会失效。
+    """
+    blocks = [SharedMemory(name=handle.name) for handle in handles]
+    arrays = [_attach(handle, block) for handle, block in zip(handles, blocks)]
+    try:
+        return fn(*arrays, *args)
+    finally:
+        del arrays
+        for block in blocks:
+            try:
+                block.close()
+            except BufferError:
+                # fn 抛出异常时回溯帧仍引用数组，映射随回溯一起回收
+                pass
+
+
+def _attach(handle: SharedArray, block: SharedMemory) -> np.ndarray:
+    array = np.ndarray(handle.shape, dtype=np.dtype(handle.dtype), buffer=block.buf)
+    array.flags.writeable = False
+    return array
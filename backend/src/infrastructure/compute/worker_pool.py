@@ -0,0 +1,58 @@
+"""图算法工作进程池
+
+PageRank 等整图迭代会长时间占用 CPU，在事件循环线程里执行会阻塞所有请求，在线程池里
+执行又受 GIL 限制。这里维护一个进程内共享的 ProcessPoolExecutor，把纯函数和 NumPy
+数组交给工作进程计算。settings.graph_compute_workers 为 0 时改用线程执行（测试、
+单核部署）。
+
+提交的函数必须是模块级函数，参数和返回值必须可 pickle。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, TypeVar
+
+from src.config import settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_pool: ProcessPoolExecutor | None = None
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        # spawn: 工作进程不继承事件循环、数据库连接等父进程状态
+        _pool = ProcessPoolExecutor(
+            max_workers=settings.graph_compute_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _pool
+
+
+async def run_in_worker(fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """在工作进程中执行 fn(*args, **kwargs)"""
+    if settings.graph_compute_workers <= 0:
+        return await asyncio.to_thread(fn, *args, **kwargs)
+    loop = asyncio.get_running_loop()
+    if kwargs:
+        return await loop.run_in_executor(_get_pool(), _call, fn, args, kwargs)
+    return await loop.run_in_executor(_get_pool(), fn, *args)
+
+
+def shutdown_worker_pool() -> None:
+    """关闭进程池（应用退出时调用）"""
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+def _call(fn: Callable[..., T], args: tuple, kwargs: dict) -> T:
+    return fn(*args, **kwargs)
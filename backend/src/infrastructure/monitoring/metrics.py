@@ -37,6 +37,59 @@ DB_CONNECTIONS = Gauge(
     ['db_type']
 )
 
+QUERY_CACHE_HITS = Counter(
+    'query_cache_hits_total',
+    'Query cache hits',
+    ['tier']
+)
+
+QUERY_CACHE_MISSES = Counter(
+    'query_cache_misses_total',
+    'Query cache misses'
+)
+
+QUERY_CACHE_EVICTIONS = Counter(
+    'query_cache_evictions_total',
+    'Entries evicted from the local query cache tier',
+    ['reason']
+)
+
+QUERY_CACHE_ERRORS = Counter(
+    'query_cache_errors_total',
+    'Query cache backend errors',
+    ['operation']
+)
+
+QUERY_COALESCED = Counter(
+    'query_coalesced_total',
+    'Queries that awaited an identical in-flight execution instead of running',
+    ['query_type']
+)
+
+QUERY_STALE_SERVED = Counter(
+    'query_stale_served_total',
+    'Expired cache entries served while a background refresh runs',
+    ['query_type']
+)
+
+QUERY_BACKGROUND_REFRESHES = Counter(
+    'query_background_refreshes_total',
+    'Background refreshes started for stale cache entries',
+    ['query_type']
+)
+
+QUERY_LATENCY = Histogram(
+    'query_duration_seconds',
+    'QueryService query latency including cache lookups',
+    ['query_type', 'cache_hit'],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+)
+
+QUERY_CACHE_L1_BYTES = Gauge(
+    'query_cache_l1_bytes',
+    'Bytes held by the local query cache tier'
+)
+
 
 class MetricsCollector:
     """指标收集器"""
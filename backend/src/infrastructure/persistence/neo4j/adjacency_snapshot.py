@@ -0,0 +1,735 @@
+"""项目邻接快照
+
+把一个项目的关系拓扑（实体/关系 ID 和关系类型，不含属性）加载到进程内，供路径搜索、
+邻居查询和图算法等需要反复遍历整个项目图的场景共用，避免每次都在 Neo4j 中展开变长模式。
+
+存储格式（NumPy 数组，约 42 字节/关系）：
+
+- node_keys / edge_keys: 排好序的定长字节 ID（UUID 存 16 字节，其它 ID 存 UTF-8），
+  下标即节点/关系编号，按 ID 查编号用二分查找，不需要 Python 字典
+- edge_source / edge_target / edge_types: 每条关系的有向端点和类型编码
+- indptr / indices / slot_edges: 无向 CSR 邻接表，每条关系在两端各占一个槽位
+
+写入通过 SnapshotDelta 增量应用到覆盖层（新增节点/关系、删除标记），覆盖层超过
+阈值时在后台线程中压缩重建 CSR。快照可以保存为 .npy 文件并以 mmap 方式打开，worker 启动时
+直接复用磁盘上同版本的快照。
+
+快照按项目缓存，并记录图数据版本号（GraphVersionPort）；版本号与快照不一致
+（其它写入路径或其它 worker 写入）时重新加载。关系数超过
+settings.graph_snapshot_max_edges 的项目不做快照，调用方应回退到 Cypher 查询。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import re
+import shutil
+import uuid
+from collections import OrderedDict
+from contextlib import aclosing
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Iterable, Sequence, Type
+
+import numpy as np
+
+from src.config import settings
+from src.domain.ports.repositories import GraphVersionPort
+from src.infrastructure.cache.graph_version import RedisGraphVersionStore, get_graph_version_store
+from src.infrastructure.persistence.neo4j import cypher_queries as queries
+from src.infrastructure.persistence.neo4j.client import Neo4jClient
+
+logger = logging.getLogger(__name__)
+
+# 快照文件格式版本，格式变化时旧文件被忽略
+SNAPSHOT_FORMAT = 1
+
+_ARRAYS = ("node_keys", "edge_keys", "edge_source", "edge_target", "edge_types",
+           "indptr", "indices", "slot_edges")
+
+UUID_CODEC = "uuid"
+UTF8_CODEC = "utf8"
+_UUID_HYPHENS = [8, 13, 18, 23]
+
+# 项目ID用作落盘目录或文件名，只接受这些字符（拒绝 "..", "/" 等路径穿越）
+_PROJECT_PATH_SEGMENT = re.compile(r"[A-Za-z0-9_-]{1,128}")
+
+
+def project_path_segment(project_id: str) -> str | None:
+    """项目ID可以安全地用作路径的一段时原样返回，否则返回 None（调用方不落盘）"""
+    if _PROJECT_PATH_SEGMENT.fullmatch(project_id):
+        return project_id
+    logger.warning(f"Project id {project_id!r} is not a safe path segment, skipping disk cache")
+    return None
+
+
+def encode_ids(ids: Sequence[str]) -> tuple[np.ndarray, str]:
+    """把字符串 ID 编码为定长字节数组
+
+    全部是规范 UUID 字符串（小写、带连字符）时每个 ID 占 16 字节，否则按 UTF-8 编码，
+    宽度取最长 ID。UUID 的判断和转换对整批 ID 一次完成，不逐个构造 uuid.UUID。
+    """
+    joined = "".join(ids)
+    if ids and len(joined) == 36 * len(ids) and joined.isascii() and joined == joined.lower():
+        chars = np.frombuffer(joined.encode("ascii"), dtype="S1").reshape(-1, 36)
+        if (chars[:, _UUID_HYPHENS] == b"-").all():
+            try:
+                raw = bytes.fromhex(joined.replace("-", ""))
+            except ValueError:
+                pass
+            else:
+                return np.frombuffer(raw, dtype="S16").copy(), UUID_CODEC
+    encoded = [i.encode("utf-8") for i in ids]
+    width = max((len(b) for b in encoded), default=1) or 1
+    return np.array(encoded, dtype=f"S{width}"), UTF8_CODEC
+
+
+def decode_ids(keys: Iterable[bytes], codec: str) -> list[str]:
+    """encode_ids 的逆变换"""
+    return [_decode_one(key, codec) for key in keys]
+
+
+def _encode_one(value: str, codec: str) -> bytes | None:
+    if codec == UUID_CODEC:
+        try:
+            parsed = uuid.UUID(value)
+        except (ValueError, TypeError, AttributeError):
+            return None
+        return parsed.bytes if str(parsed) == value else None
+    return value.encode("utf-8")
+
+
+def _decode_one(key: bytes, codec: str) -> str:
+    if codec == UUID_CODEC:
+        # 定长字节数组会去掉末尾的 \x00
+        return str(uuid.UUID(bytes=key.ljust(16, b"\0")))
+    return key.decode("utf-8")
+
+
+@dataclass
+class SnapshotDelta:
+    """一次写入对拓扑的影响
+
+    Attributes:
+        added_relations: 新增或更新的关系 (source_id, target_id, relation_id, relation_type)
+        removed_relation_ids: 删除的关系ID
+        removed_entity_ids: 删除的实体ID（连带删除其所有关系）
+    """
+    added_relations: list[tuple[str, str, str, str]] = field(default_factory=list)
+    removed_relation_ids: list[str] = field(default_factory=list)
+    removed_entity_ids: list[str] = field(default_factory=list)
+
+
+class AdjacencySnapshot:
+    """项目拓扑快照（CSR + 增量覆盖层）
+
+    节点和关系以整数编号表示。neighbors 同时返回两个方向的关系，与 Cypher 无向模式
+    一致；edge_source / edge_target 保留关系方向，供有向算法使用。
+
+    Attributes:
+        project_id: 项目ID
+        version: 快照对应的图数据版本号
+    """
+
+    def __init__(
+        self,
+        project_id: str,
+        version: int,
+        arrays: dict[str, np.ndarray],
+        node_codec: str,
+        edge_codec: str,
+        type_names: list[str],
+    ):
+        self.project_id = project_id
+        self.version = version
+        self.node_keys = arrays["node_keys"]
+        self.edge_keys = arrays["edge_keys"]
+        self.edge_source = arrays["edge_source"]
+        self.edge_target = arrays["edge_target"]
+        self.edge_types = arrays["edge_types"]
+        self.indptr = arrays["indptr"]
+        self.indices = arrays["indices"]
+        self.slot_edges = arrays["slot_edges"]
+        self._node_codec = node_codec
+        self._edge_codec = edge_codec
+        self.type_names = list(type_names)
+        self._type_codes = {name: code for code, name in enumerate(self.type_names)}
+
+        # 增量覆盖层：编号接在 CSR 部分之后
+        self._base_nodes = len(self.node_keys)
+        self._base_edges = len(self.edge_keys)
+        self._extra_node_ids: list[str] = []
+        self._extra_node_index: dict[str, int] = {}
+        self._extra_edges: list[tuple[int, int, str, int]] = []  # (source, target, id, type)
+        self._extra_edge_index: dict[str, int] = {}
+        self._extra_adjacency: dict[int, list[tuple[int, int]]] = {}
+        self._removed_edges: set[int] = set()
+        self._removed_nodes: set[int] = set()
+
+    # ------------------------------------------------------------------
+    # 构建 / 持久化
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def from_edges(
+        cls,
+        project_id: str,
+        version: int,
+        edges: Iterable[tuple[str, str, str, str]],
+    ) -> AdjacencySnapshot:
+        """由 (source_id, target_id, relation_id, relation_type) 序列构建快照"""
+        sources: list[str] = []
+        targets: list[str] = []
+        edge_ids: list[str] = []
+        types: list[str] = []
+        for source_id, target_id, relation_id, relation_type in edges:
+            sources.append(source_id)
+            targets.append(target_id)
+            edge_ids.append(relation_id)
+            types.append(relation_type or "")
+
+        endpoint_keys, node_codec = encode_ids(sources + targets)
+        node_keys = np.unique(endpoint_keys)
+        endpoints = np.searchsorted(node_keys, endpoint_keys).astype(np.int32)
+        edge_keys, edge_codec = encode_ids(edge_ids)
+
+        order = np.argsort(edge_keys, kind="stable")
+        edge_keys = edge_keys[order]
+        edge_source = endpoints[:len(sources)][order]
+        edge_target = endpoints[len(sources):][order]
+        type_names, type_codes = np.unique(np.array(types, dtype=object), return_inverse=True)
+        edge_types = type_codes.astype(np.int16)[order]
+
+        arrays = {
+            "node_keys": node_keys,
+            "edge_keys": edge_keys,
+            "edge_source": edge_source,
+            "edge_target": edge_target,
+            "edge_types": edge_types,
+            **_build_csr(len(node_keys), edge_source, edge_target),
+        }
+        return cls(project_id, version, arrays, node_codec, edge_codec, [str(t) for t in type_names])
+
+    def save(self, directory: Path) -> None:
+        """保存为 .npy 文件（先写临时目录再改名，读方不会看到写了一半的快照）
+
+        覆盖层会先压缩进 CSR。
+        """
+        snapshot = self.compacted() if self.has_delta else self
+        directory = Path(directory)
+        tmp = directory.with_name(f"{directory.name}.tmp-{os.getpid()}")
+        shutil.rmtree(tmp, ignore_errors=True)
+        tmp.mkdir(parents=True)
+        for name in _ARRAYS:
+            np.save(tmp / f"{name}.npy", getattr(snapshot, name))
+        (tmp / "meta.json").write_text(json.dumps({
+            "format": SNAPSHOT_FORMAT,
+            "project_id": snapshot.project_id,
+            "version": snapshot.version,
+            "node_codec": snapshot._node_codec,
+            "edge_codec": snapshot._edge_codec,
+            "type_names": snapshot.type_names,
+        }, ensure_ascii=False))
+        shutil.rmtree(directory, ignore_errors=True)
+        os.replace(tmp, directory)
+
+    @classmethod
+    def load(cls, directory: Path, *, mmap: bool = True) -> AdjacencySnapshot:
+        """从 save 写出的目录加载（默认 mmap，只读共享页缓存）
+
+        Raises:
+            ValueError: 文件格式不兼容
+            FileNotFoundError: 快照不存在
+        """
+        directory = Path(directory)
+        meta = json.loads((directory / "meta.json").read_text())
+        if meta.get("format") != SNAPSHOT_FORMAT:
+            raise ValueError(f"Unsupported snapshot format: {meta.get('format')}")
+        mode = "r" if mmap else None
+        arrays = {name: np.load(directory / f"{name}.npy", mmap_mode=mode) for name in _ARRAYS}
+        return cls(
+            meta["project_id"], meta["version"], arrays,
+            meta["node_codec"], meta["edge_codec"], meta["type_names"],
+        )
+
+    @property
+    def node_codec(self) -> str:
+        """node_keys 的编码方式（见 encode_ids）"""
+        return self._node_codec
+
+    @property
+    def nbytes(self) -> int:
+        """CSR 部分占用的字节数（不含覆盖层）"""
+        return sum(getattr(self, name).nbytes for name in _ARRAYS)
+
+    # ------------------------------------------------------------------
+    # 查询
+    # ------------------------------------------------------------------
+
+    @property
+    def node_count(self) -> int:
+        return self._base_nodes + len(self._extra_node_ids) - len(self._removed_nodes)
+
+    @property
+    def edge_count(self) -> int:
+        return self._base_edges + len(self._extra_edges) - len(self._removed_edges)
+
+    @property
+    def has_delta(self) -> bool:
+        return bool(self._extra_edges or self._removed_edges or self._removed_nodes)
+
+    def index_of(self, node_id: str) -> int | None:
+        """实体ID -> 节点编号；没有任何关系的实体不在快照中"""
+        node = self._extra_node_index.get(node_id)
+        if node is None:
+            node = _lookup(self.node_keys, _encode_one(node_id, self._node_codec))
+        if node is None or node in self._removed_nodes:
+            return None
+        return node
+
+    def edge_index_of(self, relation_id: str) -> int | None:
+        """关系ID -> 关系编号"""
+        edge = self._extra_edge_index.get(relation_id)
+        if edge is None:
+            edge = _lookup(self.edge_keys, _encode_one(relation_id, self._edge_codec))
+        if edge is None or edge in self._removed_edges:
+            return None
+        return edge
+
+    def node_id(self, node: int) -> str:
+        if node < self._base_nodes:
+            return _decode_one(self.node_keys[node], self._node_codec)
+        return self._extra_node_ids[node - self._base_nodes]
+
+    def edge_id(self, edge: int) -> str:
+        if edge < self._base_edges:
+            return _decode_one(self.edge_keys[edge], self._edge_codec)
+        return self._extra_edges[edge - self._base_edges][2]
+
+    def edge_type(self, edge: int) -> str:
+        if edge < self._base_edges:
+            return self.type_names[self.edge_types[edge]]
+        return self.type_names[self._extra_edges[edge - self._base_edges][3]]
+
+    def edge_endpoints(self, edge: int) -> tuple[int, int]:
+        """关系的 (source, target) 节点编号"""
+        if edge < self._base_edges:
+            return int(self.edge_source[edge]), int(self.edge_target[edge])
+        source, target, _, _ = self._extra_edges[edge - self._base_edges]
+        return source, target
+
+    def neighbors(self, node: int) -> list[tuple[int, int]]:
+        """(邻居编号, 关系编号) 列表，包含两个方向"""
+        result: list[tuple[int, int]] = []
+        if node < self._base_nodes:
+            start, end = int(self.indptr[node]), int(self.indptr[node + 1])
+            result = list(zip(self.indices[start:end].tolist(), self.slot_edges[start:end].tolist()))
+        extra = self._extra_adjacency.get(node)
+        if extra:
+            result.extend(extra)
+        if self._removed_edges:
+            result = [(n, e) for n, e in result if e not in self._removed_edges]
+        return result
+
+    def coo(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """所有现存关系的 (source, target, 关系编号) 数组，供有向图算法使用"""
+        if not self.has_delta:
+            return self.edge_source, self.edge_target, np.arange(self._base_edges, dtype=np.int64)
+        live = np.ones(self._base_edges, dtype=bool)
+        base_removed = [e for e in self._removed_edges if e < self._base_edges]
+        live[base_removed] = False
+        extra = [
+            (source, target, self._base_edges + i)
+            for i, (source, target, _, _) in enumerate(self._extra_edges)
+            if self._base_edges + i not in self._removed_edges
+        ]
+        extra_array = np.array(extra, dtype=np.int64).reshape(-1, 3)
+        return (
+            np.concatenate([self.edge_source[live], extra_array[:, 0]]).astype(np.int32),
+            np.concatenate([self.edge_target[live], extra_array[:, 1]]).astype(np.int32),
+            np.concatenate([np.flatnonzero(live), extra_array[:, 2]]),
+        )
+
+    def is_live(self, node: int) -> bool:
+        """节点编号是否对应现存实体（未被增量删除）"""
+        return node < self.node_capacity and node not in self._removed_nodes
+
+    @property
+    def node_capacity(self) -> int:
+        """节点编号上限（含已删除节点），用于按编号分配数组"""
+        return self._base_nodes + len(self._extra_node_ids)
+
+    # ------------------------------------------------------------------
+    # 增量更新
+    # ------------------------------------------------------------------
+
+    @property
+    def delta_size(self) -> int:
+        return len(self._extra_edges) + len(self._removed_edges) + len(self._removed_nodes)
+
+    def apply(self, delta: SnapshotDelta) -> None:
+        """把一次写入的拓扑变化应用到覆盖层"""
+        for entity_id in delta.removed_entity_ids:
+            self._remove_node(entity_id)
+        for relation_id in delta.removed_relation_ids:
+            edge = self.edge_index_of(relation_id)
+            if edge is not None:
+                self._removed_edges.add(edge)
+        for source_id, target_id, relation_id, relation_type in delta.added_relations:
+            existing = self.edge_index_of(relation_id)
+            if existing is not None:
+                self._removed_edges.add(existing)
+            self._add_edge(source_id, target_id, relation_id, relation_type or "")
+
+    def compacted(self) -> AdjacencySnapshot:
+        """把覆盖层合并进 CSR，返回新快照"""
+        return self.compaction()()
+
+    def compaction(self) -> Callable[[], AdjacencySnapshot]:
+        """冻结当前拓扑，返回构建压缩快照的函数
+
+        冻结只取现存关系的编号数组并复制覆盖层中的 ID 列表；返回的函数只读取冻结的
+        数据，可以在线程中执行，期间快照可以继续应用增量。
+        """
+        project_id, version, type_names = self.project_id, self.version, list(self.type_names)
+        source, target, edges = self.coo()
+        base_nodes, base_edges = self.node_keys, self.edge_keys
+        extra_node_ids = list(self._extra_node_ids)
+        extra_edge_ids = [edge[2] for edge in self._extra_edges]
+        edge_types = np.concatenate([
+            self.edge_types, np.array([edge[3] for edge in self._extra_edges], dtype=np.int16)
+        ])
+        node_codec, edge_codec = self._node_codec, self._edge_codec
+
+        def build() -> AdjacencySnapshot:
+            node_keys, new_node_codec = _extend_keys(base_nodes, node_codec, extra_node_ids)
+            edge_keys, new_edge_codec = _extend_keys(base_edges, edge_codec, extra_edge_ids)
+
+            # 只保留仍有关系的节点，按字节 ID 重新排序编号
+            used, endpoints = np.unique(np.concatenate([source, target]), return_inverse=True)
+            keys = node_keys[used]
+            node_order = np.argsort(keys, kind="stable")
+            rank = np.empty(len(node_order), dtype=np.int32)
+            rank[node_order] = np.arange(len(node_order), dtype=np.int32)
+            endpoints = rank[endpoints.reshape(-1)]
+
+            live_keys = edge_keys[edges]
+            order = np.argsort(live_keys, kind="stable")
+            edge_source = endpoints[:len(edges)][order]
+            edge_target = endpoints[len(edges):][order]
+            used_types, codes = np.unique(edge_types[edges][order], return_inverse=True)
+            arrays = {
+                "node_keys": keys[node_order],
+                "edge_keys": live_keys[order],
+                "edge_source": edge_source,
+                "edge_target": edge_target,
+                "edge_types": codes.reshape(-1).astype(np.int16),
+                **_build_csr(len(used), edge_source, edge_target),
+            }
+            names = [type_names[code] for code in used_types.tolist()]
+            return AdjacencySnapshot(project_id, version, arrays, new_node_codec, new_edge_codec, names)
+
+        return build
+
+    def _intern_node(self, node_id: str) -> int:
+        node = _lookup(self.node_keys, _encode_one(node_id, self._node_codec))
+        if node is None:
+            node = self._extra_node_index.get(node_id)
+        if node is None:
+            node = self._base_nodes + len(self._extra_node_ids)
+            self._extra_node_ids.append(node_id)
+            self._extra_node_index[node_id] = node
+        self._removed_nodes.discard(node)
+        return node
+
+    def _add_edge(self, source_id: str, target_id: str, relation_id: str, relation_type: str) -> None:
+        source, target = self._intern_node(source_id), self._intern_node(target_id)
+        code = self._type_codes.get(relation_type)
+        if code is None:
+            code = self._type_codes[relation_type] = len(self.type_names)
+            self.type_names.append(relation_type)
+        edge = self._base_edges + len(self._extra_edges)
+        self._extra_edges.append((source, target, relation_id, code))
+        self._extra_edge_index[relation_id] = edge
+        self._extra_adjacency.setdefault(source, []).append((target, edge))
+        if target != source:
+            self._extra_adjacency.setdefault(target, []).append((source, edge))
+
+    def _remove_node(self, node_id: str) -> None:
+        node = self.index_of(node_id)
+        if node is None:
+            return
+        for _, edge in self.neighbors(node):
+            self._removed_edges.add(edge)
+        self._removed_nodes.add(node)
+
+
+def _extend_keys(keys: np.ndarray, codec: str, extra_ids: list[str]) -> tuple[np.ndarray, str]:
+    """在定长字节数组后追加按同一方式编码的 ID
+
+    追加的 ID 无法按原方式编码时（如 UUID 快照中新增了非 UUID 的实体），全部解码后
+    用 encode_ids 重新编码。
+
+    Returns:
+        (字节数组, 编码方式)，下标与追加前一致
+    """
+    extra = [_encode_one(value, codec) for value in extra_ids]
+    if None in extra:
+        return encode_ids(decode_ids(keys, codec) + extra_ids)
+    if not extra:
+        return np.asarray(keys), codec
+    width = max(keys.dtype.itemsize, max(len(key) for key in extra))
+    return np.concatenate([keys.astype(f"S{width}"), np.array(extra, dtype=f"S{width}")]), codec
+
+
+def _lookup(keys: np.ndarray, key: bytes | None) -> int | None:
+    """在排好序的定长字节数组中二分查找"""
+    if key is None or len(keys) == 0 or len(key) > keys.dtype.itemsize:
+        return None
+    position = int(np.searchsorted(keys, key))
+    if position < len(keys) and keys[position] == key.rstrip(b"\0"):
+        return position
+    return None
+
+
+def _build_csr(
+    node_count: int,
+    edge_source: np.ndarray,
+    edge_target: np.ndarray,
+) -> dict[str, np.ndarray]:
+    """由有向边构建无向 CSR（自环只占一个槽位）"""
+    edge_count = len(edge_source)
+    edges = np.arange(edge_count, dtype=np.int32)
+    reverse = edge_source != edge_target
+    heads = np.concatenate([edge_source, edge_target[reverse]])
+    tails = np.concatenate([edge_target, edge_source[reverse]])
+    slot_edges = np.concatenate([edges, edges[reverse]])
+
+    order = np.argsort(heads, kind="stable")
+    indptr = np.zeros(node_count + 1, dtype=np.int64)
+    np.cumsum(np.bincount(heads, minlength=node_count), out=indptr[1:])
+    return {
+        "indptr": indptr,
+        "indices": tails[order].astype(np.int32),
+        "slot_edges": slot_edges[order].astype(np.int32),
+    }
+
+
+class SnapshotTooLargeError(Exception):
+    """项目关系数超过快照上限"""
+    pass
+
+
+class AdjacencySnapshotStore:
+    """按项目缓存邻接快照
+
+    Args:
+        client: Neo4j 客户端
+        versions: 项目图数据版本号存储
+        max_edges: 单个项目快照的最大关系数，0 表示禁用快照
+        max_projects: 同时缓存的项目数，超出时淘汰最久未使用的项目
+        directory: 快照文件目录，None 表示不落盘。只有版本号跨进程共享且持久
+            （Redis）时，磁盘上的版本号才可信
+    """
+
+    def __init__(
+        self,
+        client: Type[Neo4jClient] = Neo4jClient,
+        versions: GraphVersionPort | None = None,
+        max_edges: int | None = None,
+        max_projects: int | None = None,
+        directory: Path | None = None,
+    ):
+        self._client = client
+        self._versions = versions or get_graph_version_store()
+        self._max_edges = settings.graph_snapshot_max_edges if max_edges is None else max_edges
+        self._max_projects = (
+            settings.graph_snapshot_max_projects if max_projects is None else max_projects
+        )
+        self._directory = Path(directory) if directory else None
+        self._snapshots: OrderedDict[str, AdjacencySnapshot] = OrderedDict()
+        # 超过上限的项目及当时的版本号，版本不变时不再重复尝试加载
+        self._oversized: dict[str, int] = {}
+        self._locks: dict[str, asyncio.Lock] = {}
+        self._compacting: dict[str, asyncio.Task] = {}
+
+    async def get(self, project_id: str) -> AdjacencySnapshot | None:
+        """获取与当前图数据版本一致的快照
+
+        Returns:
+            快照；禁用、项目过大或加载失败时返回 None（调用方回退到 Cypher）
+        """
+        if self._max_edges <= 0:
+            return None
+        try:
+            version = await self._versions.get(project_id)
+        except Exception as e:
+            logger.warning(f"Graph version lookup failed, skipping snapshot: {e}")
+            return None
+
+        snapshot = self._fresh(project_id, version)
+        if snapshot is not None or self._oversized.get(project_id) == version:
+            return snapshot
+
+        # 同一项目只加载一次，并发请求等待同一次加载
+        lock = self._locks.setdefault(project_id, asyncio.Lock())
+        async with lock:
+            snapshot = self._fresh(project_id, version)
+            if snapshot is not None or self._oversized.get(project_id) == version:
+                return snapshot
+            try:
+                snapshot = self._read_disk(project_id, version)
+                if snapshot is None:
+                    snapshot = await self._load(project_id, version)
+                    await self._write_disk(snapshot)
+            except SnapshotTooLargeError:
+                logger.info(
+                    f"Project {project_id} exceeds {self._max_edges} relations, "
+                    f"using Cypher path queries"
+                )
+                self._oversized[project_id] = version
+                return None
+            except Exception as e:
+                logger.warning(f"Failed to load adjacency snapshot for {project_id}: {e}")
+                return None
+
+            self._oversized.pop(project_id, None)
+            self._put(snapshot)
+            return snapshot
+
+    def apply_delta(self, project_id: str, version: int, delta: SnapshotDelta) -> None:
+        """把一次写入应用到已缓存的快照
+
+        只有快照恰好处于写入前的版本（version - 1）时才能增量更新；否则说明期间有
+        未经过这里的写入，直接丢弃快照，下次访问时重新加载。覆盖层超过阈值时安排
+        后台压缩，不阻塞写入所在的事件循环。
+
+        Args:
+            project_id: 项目ID
+            version: 写入后 GraphVersionPort.bump 返回的版本号（-1 表示递增失败）
+            delta: 拓扑变化
+        """
+        snapshot = self._snapshots.get(project_id)
+        if snapshot is None:
+            return
+        if version < 0 or snapshot.version != version - 1:
+            self.invalidate(project_id)
+            return
+        snapshot.apply(delta)
+        snapshot.version = version
+        if snapshot.edge_count > self._max_edges:
+            self.invalidate(project_id)
+        elif snapshot.delta_size > max(1000, snapshot.edge_count // 10):
+            self._schedule_compaction(snapshot)
+
+    def invalidate(self, project_id: str) -> None:
+        """丢弃项目快照"""
+        self._snapshots.pop(project_id, None)
+        self._oversized.pop(project_id, None)
+
+    def _schedule_compaction(self, snapshot: AdjacencySnapshot) -> None:
+        project_id = snapshot.project_id
+        if project_id in self._compacting:
+            return
+        task = asyncio.create_task(self._compact(snapshot))
+        self._compacting[project_id] = task
+        task.add_done_callback(lambda t: self._compaction_done(project_id, t))
+
+    async def _compact(self, snapshot: AdjacencySnapshot) -> None:
+        """在线程中压缩，完成时快照仍是缓存中的同一版本才替换"""
+        version = snapshot.version
+        compacted = await asyncio.to_thread(snapshot.compaction())
+        if self._snapshots.get(snapshot.project_id) is snapshot and snapshot.version == version:
+            self._put(compacted)
+
+    def _compaction_done(self, project_id: str, task: asyncio.Task) -> None:
+        self._compacting.pop(project_id, None)
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning(f"Background snapshot compaction for {project_id} failed: {task.exception()}")
+
+    def _put(self, snapshot: AdjacencySnapshot) -> None:
+        self._snapshots[snapshot.project_id] = snapshot
+        self._snapshots.move_to_end(snapshot.project_id)
+        while len(self._snapshots) > self._max_projects:
+            self._snapshots.popitem(last=False)
+
+    def _fresh(self, project_id: str, version: int) -> AdjacencySnapshot | None:
+        snapshot = self._snapshots.get(project_id)
+        if snapshot is None or snapshot.version != version:
+            return None
+        self._snapshots.move_to_end(project_id)
+        return snapshot
+
+    def _project_dir(self, project_id: str) -> Path | None:
+        segment = project_path_segment(project_id) if self._directory is not None else None
+        return None if segment is None else self._directory / segment
+
+    def _read_disk(self, project_id: str, version: int) -> AdjacencySnapshot | None:
+        project_dir = self._project_dir(project_id)
+        if project_dir is None:
+            return None
+        path = project_dir / f"v{version}"
+        if not path.exists():
+            return None
+        try:
+            snapshot = AdjacencySnapshot.load(path)
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable snapshot {path}: {e}")
+            return None
+        if snapshot.edge_count > self._max_edges:
+            raise SnapshotTooLargeError(project_id)
+        return snapshot
+
+    async def _write_disk(self, snapshot: AdjacencySnapshot) -> None:
+        project_dir = self._project_dir(snapshot.project_id)
+        if project_dir is None:
+            return
+        target = project_dir / f"v{snapshot.version}"
+        try:
+            await asyncio.to_thread(snapshot.save, target)
+            # 只保留最新版本
+            for stale in project_dir.iterdir():
+                if stale != target and stale.name.startswith("v"):
+                    shutil.rmtree(stale, ignore_errors=True)
+        except Exception as e:
+            logger.warning(f"Failed to persist snapshot for {snapshot.project_id}: {e}")
+
+    async def _load(self, project_id: str, version: int) -> AdjacencySnapshot:
+        edges: list[tuple[str, str, str, str]] = []
+        async with aclosing(
+            self._client.iter_read_batches(
+                queries.GET_PROJECT_ADJACENCY,
+                {"project_id": project_id},
+                batch_size=settings.neo4j_fetch_size,
+            )
+        ) as batches:
+            async for batch in batches:
+                edges.extend(
+                    (row["source_id"], row["target_id"], row["id"], row.get("type") or "")
+                    for row in batch
+                )
+                if len(edges) > self._max_edges:
+                    raise SnapshotTooLargeError(project_id)
+        return await asyncio.to_thread(AdjacencySnapshot.from_edges, project_id, version, edges)
+
+
+_store: AdjacencySnapshotStore | None = None
+
+
+def get_adjacency_snapshot_store() -> AdjacencySnapshotStore:
+    """获取进程内共享的快照存储
+
+    快照只在版本号存储为 Redis 时落盘：内存版本号在进程重启后从 0 开始，
+    无法判断磁盘上的快照是否过期。
+    """
+    global _store
+    if _store is None:
+        versions = get_graph_version_store()
+        directory = None
+        if settings.graph_snapshot_dir and isinstance(versions, RedisGraphVersionStore):
+            directory = settings.graph_snapshot_dir
+        _store = AdjacencySnapshotStore(versions=versions, directory=directory)
+    return _store
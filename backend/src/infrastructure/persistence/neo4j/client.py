@@ -1,13 +1,28 @@
-from contextlib import asynccontextmanager
-from typing import Any, AsyncGenerator
+from contextlib import aclosing, asynccontextmanager
+from typing import Any, AsyncGenerator, AsyncIterator, Sequence
 
-from neo4j import AsyncGraphDatabase, AsyncDriver, AsyncSession
+from neo4j import (
+    READ_ACCESS,
+    WRITE_ACCESS,
+    AsyncGraphDatabase,
+    AsyncDriver,
+    AsyncManagedTransaction,
+    AsyncSession,
+)
 
 from src.config import settings
 
+# 事务内的一条语句：(cypher, 参数)
+Statement = tuple[str, dict[str, Any] | None]
+
 
 class Neo4jClient:
-    """Neo4j 异步客户端"""
+    """Neo4j 异步客户端
+
+    连接由驱动的连接池复用，池大小、获取超时、fetch size 与事务重试时长均来自 Settings。
+    execute_read / execute_write 使用托管事务函数，遇到瞬时错误（死锁、主节点切换、
+    连接中断等）时由驱动自动重试，因此传入的语句必须是幂等的。
+    """
     _driver: AsyncDriver | None = None
 
     @classmethod
@@ -16,10 +31,13 @@ class Neo4jClient:
         cls._driver = AsyncGraphDatabase.driver(
             settings.neo4j_uri,
             auth=(settings.neo4j_user, settings.neo4j_password),
+            max_connection_pool_size=settings.neo4j_max_connection_pool_size,
+            connection_acquisition_timeout=settings.neo4j_connection_acquisition_timeout,
+            max_transaction_retry_time=settings.neo4j_max_transaction_retry_time,
+            fetch_size=settings.neo4j_fetch_size,
         )
         # 验证连接
-        async with cls._driver.session() as session:
-            await session.run("RETURN 1")
+        await cls._driver.verify_connectivity()
 
     @classmethod
     async def disconnect(cls) -> None:
@@ -30,27 +48,97 @@ class Neo4jClient:
 
     @classmethod
     @asynccontextmanager
-    async def session(cls) -> AsyncGenerator[AsyncSession, None]:
-        """获取 Neo4j 会话"""
+    async def session(
+        cls, *, access_mode: str = WRITE_ACCESS, fetch_size: int | None = None
+    ) -> AsyncGenerator[AsyncSession, None]:
+        """获取 Neo4j 会话（底层连接取自驱动连接池）"""
         if not cls._driver:
             raise RuntimeError("Neo4j client not connected")
-        async with cls._driver.session() as session:
+        config: dict[str, Any] = {"default_access_mode": access_mode}
+        if fetch_size:
+            config["fetch_size"] = fetch_size
+        async with cls._driver.session(**config) as session:
             yield session
 
     @classmethod
     async def execute_read(
         cls, query: str, parameters: dict[str, Any] | None = None
     ) -> list[dict[str, Any]]:
-        """执行读取查询"""
-        async with cls.session() as session:
+        """在托管读事务中执行查询"""
+        async with cls.session(access_mode=READ_ACCESS) as session:
+            return await session.execute_read(_run_statement, query, parameters)
+
+    @classmethod
+    async def iter_read(
+        cls,
+        query: str,
+        parameters: dict[str, Any] | None = None,
+        *,
+        fetch_size: int | None = None,
+    ) -> AsyncIterator[dict[str, Any]]:
+        """流式读取查询结果，逐条产出记录
+
+        驱动每次只从服务端拉取 fetch_size 条记录，消费方处理完当前批次后才会拉取下一批，
+        因此内存占用与结果集大小无关。流式读取使用自动提交事务，不做瞬时错误重试。
+        提前退出迭代时应配合 contextlib.aclosing 使用以及时释放连接。
+        """
+        async with cls.session(access_mode=READ_ACCESS, fetch_size=fetch_size) as session:
             result = await session.run(query, parameters or {})
-            return [dict(record) async for record in result]
+            async for record in result:
+                yield dict(record)
+
+    @classmethod
+    async def iter_read_batches(
+        cls,
+        query: str,
+        parameters: dict[str, Any] | None = None,
+        *,
+        batch_size: int = 1000,
+    ) -> AsyncIterator[list[dict[str, Any]]]:
+        """流式读取查询结果，按固定大小分批产出记录（最后一批可能不足 batch_size）"""
+        batch: list[dict[str, Any]] = []
+        async with aclosing(cls.iter_read(query, parameters, fetch_size=batch_size)) as records:
+            async for record in records:
+                batch.append(record)
+                if len(batch) >= batch_size:
+                    yield batch
+                    batch = []
+        if batch:
+            yield batch
 
     @classmethod
     async def execute_write(
         cls, query: str, parameters: dict[str, Any] | None = None
     ) -> list[dict[str, Any]]:
-        """执行写入查询"""
-        async with cls.session() as session:
-            result = await session.run(query, parameters or {})
-            return [dict(record) async for record in result]
+        """在托管写事务中执行查询"""
+        async with cls.session(access_mode=WRITE_ACCESS) as session:
+            return await session.execute_write(_run_statement, query, parameters)
+
+    @classmethod
+    async def execute_write_many(
+        cls, statements: Sequence[Statement]
+    ) -> list[list[dict[str, Any]]]:
+        """在同一个托管写事务中依次执行多条语句（工作单元）
+
+        所有语句一起提交或一起回滚，瞬时错误时整体重试。
+
+        Returns:
+            与 statements 顺序一致的每条语句结果
+        """
+        if not statements:
+            return []
+        async with cls.session(access_mode=WRITE_ACCESS) as session:
+            return await session.execute_write(_run_statements, list(statements))
+
+
+async def _run_statement(
+    tx: AsyncManagedTransaction, query: str, parameters: dict[str, Any] | None
+) -> list[dict[str, Any]]:
+    result = await tx.run(query, parameters or {})
+    return [dict(record) async for record in result]
+
+
+async def _run_statements(
+    tx: AsyncManagedTransaction, statements: list[Statement]
+) -> list[list[dict[str, Any]]]:
+    return [await _run_statement(tx, query, parameters) for query, parameters in statements]
@@ -5,39 +5,115 @@
 
 from __future__ import annotations
 
+
+def with_hops(template: str, **hops: int) -> str:
+    """把变长模式的跳数代入查询模板
+
+    Cypher 不支持参数化的跳数范围，模板中以 {max_depth} 等占位。模板里还有
+    {id: $id} 这类属性映射，不能用 str.format，这里只替换给定名称的占位符，
+    并强制转换为整数。
+    """
+    for name, value in hops.items():
+        template = template.replace("{" + name + "}", str(int(value)))
+    return template
+
+
 # =============================================================================
 # 实体搜索查询
 # =============================================================================
 
+# 实体搜索的关键词条件对分页查询和计数查询保持一致：
+# external_id、类型、标签或属性 JSON 包含关键词（空关键词匹配全部）。
+# 扫描结果按 (updated_at DESC, id DESC) 排序，$after_updated_at/$after_id
+# 为键集游标（均为 NULL 时从头开始），可与 SKIP 偏移量二选一。
+# *_WITH_TOTAL 变体在一次扫描中同时返回命中总数（不受游标影响）和当前页，
+# 当前页以 hits 列表返回，元素形如 {entity: n}（全文检索另带 score）。
+
 # 基于关键词搜索实体
 SEARCH_ENTITIES = """
 MATCH (n:Entity {project_id: $project_id})
-WHERE n.external_id CONTAINS $keyword 
-   OR n.type CONTAINS $keyword
-   OR any(label IN n.labels WHERE label CONTAINS $keyword)
-   OR n.properties_json CONTAINS $keyword
+WHERE (n.external_id CONTAINS $keyword 
+       OR n.type CONTAINS $keyword
+       OR any(label IN n.labels WHERE label CONTAINS $keyword)
+       OR n.properties_json CONTAINS $keyword)
+  AND ($after_updated_at IS NULL
+       OR n.updated_at < datetime($after_updated_at)
+       OR (n.updated_at = datetime($after_updated_at) AND n.id < $after_id))
 RETURN n as entity
-ORDER BY n.updated_at DESC
+ORDER BY n.updated_at DESC, n.id DESC
 SKIP $offset LIMIT $limit
 """
 
 # 带类型过滤的实体搜索
 SEARCH_ENTITIES_BY_TYPE = """
 MATCH (n:Entity {project_id: $project_id, type: $entity_type})
+WHERE (n.external_id CONTAINS $keyword 
+       OR any(label IN n.labels WHERE label CONTAINS $keyword)
+       OR n.properties_json CONTAINS $keyword)
+  AND ($after_updated_at IS NULL
+       OR n.updated_at < datetime($after_updated_at)
+       OR (n.updated_at = datetime($after_updated_at) AND n.id < $after_id))
+RETURN n as entity
+ORDER BY n.updated_at DESC, n.id DESC
+SKIP $offset LIMIT $limit
+"""
+
+# 基于关键词搜索实体（同时返回总数）
+SEARCH_ENTITIES_WITH_TOTAL = """
+MATCH (n:Entity {project_id: $project_id})
 WHERE n.external_id CONTAINS $keyword 
+   OR n.type CONTAINS $keyword
    OR any(label IN n.labels WHERE label CONTAINS $keyword)
    OR n.properties_json CONTAINS $keyword
-RETURN n as entity
-ORDER BY n.updated_at DESC
+WITH n ORDER BY n.updated_at DESC, n.id DESC
+WITH collect(n) as matched
+WITH size(matched) as total,
+     [m IN matched WHERE $after_updated_at IS NULL
+          OR m.updated_at < datetime($after_updated_at)
+          OR (m.updated_at = datetime($after_updated_at) AND m.id < $after_id)] as remaining
+RETURN total, [m IN remaining[$offset..$offset + $limit] | {entity: m}] as hits
+"""
+
+# 带类型过滤的实体搜索（同时返回总数）
+SEARCH_ENTITIES_BY_TYPE_WITH_TOTAL = """
+MATCH (n:Entity {project_id: $project_id, type: $entity_type})
+WHERE n.external_id CONTAINS $keyword 
+   OR any(label IN n.labels WHERE label CONTAINS $keyword)
+   OR n.properties_json CONTAINS $keyword
+WITH n ORDER BY n.updated_at DESC, n.id DESC
+WITH collect(n) as matched
+WITH size(matched) as total,
+     [m IN matched WHERE $after_updated_at IS NULL
+          OR m.updated_at < datetime($after_updated_at)
+          OR (m.updated_at = datetime($after_updated_at) AND m.id < $after_id)] as remaining
+RETURN total, [m IN remaining[$offset..$offset + $limit] | {entity: m}] as hits
+"""
+
+# 全文索引实体搜索：按相关度降序、id 升序排列，(score, id) 作为键集分页游标
+FULLTEXT_SEARCH_ENTITIES = """
+CALL db.index.fulltext.queryNodes($index_name, $search_query) YIELD node, score
+WHERE node.project_id = $project_id
+  AND ($entity_type IS NULL OR node.type = $entity_type)
+  AND ($after_score IS NULL
+       OR score < $after_score
+       OR (score = $after_score AND node.id > $after_id))
+RETURN node as entity, score
+ORDER BY score DESC, node.id ASC
 SKIP $offset LIMIT $limit
 """
 
-# 获取实体总数
-COUNT_ENTITIES = """
-MATCH (n:Entity {project_id: $project_id})
-WHERE ($keyword IS NULL OR n.external_id CONTAINS $keyword)
-   AND ($entity_type IS NULL OR n.type = $entity_type)
-RETURN count(n) as total
+# 全文索引实体搜索（同时返回总数，总数不受游标影响）
+FULLTEXT_SEARCH_ENTITIES_WITH_TOTAL = """
+CALL db.index.fulltext.queryNodes($index_name, $search_query) YIELD node, score
+WHERE node.project_id = $project_id
+  AND ($entity_type IS NULL OR node.type = $entity_type)
+WITH node, score ORDER BY score DESC, node.id ASC
+WITH collect({entity: node, score: score}) as matched
+WITH size(matched) as total,
+     [h IN matched WHERE $after_score IS NULL
+          OR h.score < $after_score
+          OR (h.score = $after_score AND h.entity.id > $after_id)] as remaining
+RETURN total, remaining[$offset..$offset + $limit] as hits
 """
 
 # 获取单个实体详情
@@ -81,18 +157,23 @@ RETURN count(n) as created_count
 # =============================================================================
 
 # 搜索关系
+# 按 (updated_at DESC, id DESC) 排序，$after_updated_at/$after_id 为键集游标。
+# 使用有向匹配，每条关系只返回一次；按 r.project_id 过滤以便使用关系索引。
 SEARCH_RELATIONS = """
-MATCH (source:Entity {project_id: $project_id})-[r:RELATION]-(target:Entity {project_id: $project_id})
+MATCH (source:Entity)-[r:RELATION {project_id: $project_id}]->(target:Entity)
 WHERE ($relation_type IS NULL OR r.type = $relation_type)
    AND ($keyword IS NULL OR source.external_id CONTAINS $keyword OR target.external_id CONTAINS $keyword)
+   AND ($after_updated_at IS NULL
+        OR r.updated_at < datetime($after_updated_at)
+        OR (r.updated_at = datetime($after_updated_at) AND r.id < $after_id))
 RETURN r as relation, source.id as source_id, target.id as target_id
-ORDER BY r.updated_at DESC
+ORDER BY r.updated_at DESC, r.id DESC
 SKIP $offset LIMIT $limit
 """
 
 # 获取关系总数
 COUNT_RELATIONS = """
-MATCH (:Entity {project_id: $project_id})-[r:RELATION]-(:Entity {project_id: $project_id})
+MATCH (:Entity)-[r:RELATION {project_id: $project_id}]->(:Entity)
 WHERE ($relation_type IS NULL OR r.type = $relation_type)
 RETURN count(r) as total
 """
@@ -110,7 +191,7 @@ SET r.type = rel.type,
     r.source_id = rel.source_id,
     r.target_id = rel.target_id,
     r.updated_at = datetime()
-RETURN count(r) as created_count
+RETURN count(r) as created_count, collect(r.id) as merged_ids
 """
 
 # 删除关系
@@ -123,84 +204,152 @@ DELETE r
 # 路径查找查询
 # =============================================================================
 
-# 最短路径查找 (使用Neo4j内置算法)
+# 最短路径查找 (使用Neo4j内置算法，{max_depth} 由 with_hops 代入)
 FIND_SHORTEST_PATH = """
 MATCH (start:Entity {id: $start_id, project_id: $project_id})
 MATCH (end:Entity {id: $end_id, project_id: $project_id})
 MATCH path = shortestPath((start)-[:RELATION*1..{max_depth}]-(end))
-WITH path, nodes(path) as path_nodes, relationships(path) as path_rels
-UNWIND path_nodes as node
-WITH path, collect(DISTINCT node) as nodes, path_rels
-UNWIND path_rels as rel
-RETURN nodes, collect(DISTINCT rel) as relations
+RETURN nodes(path) as nodes, relationships(path) as relations
 """
 
-# 所有路径查找
+# 所有路径查找 (每条路径一行，{max_depth} 由 with_hops 代入)
 FIND_ALL_PATHS = """
 MATCH (start:Entity {id: $start_id, project_id: $project_id})
 MATCH (end:Entity {id: $end_id, project_id: $project_id})
 MATCH path = (start)-[:RELATION*1..{max_depth}]-(end)
-WITH path, nodes(path) as path_nodes, relationships(path) as path_rels
-UNWIND path_nodes as node
-WITH path, collect(DISTINCT node) as nodes, path_rels
-UNWIND path_rels as rel
-RETURN nodes, collect(DISTINCT rel) as relations
+RETURN nodes(path) as nodes, relationships(path) as relations
 LIMIT $path_limit
 """
 
-# N度邻居查找
-FIND_N_DEGREE_NEIGHBORS = """
-MATCH path = (start:Entity {id: $start_id, project_id: $project_id})-[:RELATION*1..{depth}]-(neighbor:Entity {project_id: $project_id})
-WHERE neighbor.id <> $start_id
-WITH neighbor, min(length(path)) as distance
-ORDER BY distance
-RETURN neighbor as entity, distance
-SKIP $offset LIMIT $limit
+# 项目拓扑 (只含ID和关系类型，用于构建进程内邻接快照，流式读取)
+GET_PROJECT_ADJACENCY = """
+MATCH (source:Entity {project_id: $project_id})-[r:RELATION]->(target:Entity {project_id: $project_id})
+RETURN source.id as source_id, target.id as target_id, r.id as id, r.type as type
+"""
+
+# 项目全部关系的属性 (进程内算法读取边权重，流式读取)
+GET_PROJECT_RELATION_PROPERTIES = """
+MATCH (:Entity {project_id: $project_id})-[r:RELATION]->(:Entity {project_id: $project_id})
+RETURN r.id as id, r.properties_json as properties_json
+"""
+
+# 项目全部实体的名称和类型 (进程内社区发现结果回填，流式读取)
+GET_PROJECT_ENTITY_LABELS = """
+MATCH (n:Entity {project_id: $project_id})
+RETURN n.id as entity_id, n.external_id as name, n.type as entity_type
+"""
+
+# 按ID批量获取实体 (路径结果回填属性)
+GET_ENTITIES_BY_IDS = """
+UNWIND $ids as entity_id
+MATCH (n:Entity {id: entity_id, project_id: $project_id})
+RETURN n as entity
+"""
+
+# 按ID批量获取关系 (路径结果回填属性)
+GET_RELATIONS_BY_IDS = """
+UNWIND $ids as relation_id
+MATCH ()-[r:RELATION {id: relation_id}]->()
+WHERE r.project_id = $project_id
+RETURN r as relation
+"""
+
+# N度邻居查找：START + depth 个 HOP + RETURN 拼成一个查询 (广度优先，不枚举路径)
+# 每一跳只展开上一层不重复的新节点，距离即所在层数；邻居达到 $limit 后不再展开
+NEIGHBOR_EXPANSION_START = """
+MATCH (start:Entity {id: $entity_id, project_id: $project_id})
+WITH start, [start] as visited, [start] as frontier, [] as found, 0 as hop
+"""
+
+NEIGHBOR_EXPANSION_HOP = """
+CALL {
+    WITH frontier, visited, found
+    WITH frontier, visited, found
+    WHERE size(found) < $limit
+    UNWIND frontier as f
+    MATCH (f)-[:RELATION]-(m:Entity {project_id: $project_id})
+    WHERE NOT m IN visited
+    WITH DISTINCT m
+    LIMIT $limit
+    RETURN collect(m) as next
+}
+WITH start, visited, found, hop + 1 as hop, next[0..($limit - size(found))] as next
+WITH start, visited + next as visited, next as frontier,
+     found + [m IN next | {node: m, distance: hop}] as found, hop
+"""
+
+# 起点按距离 0 排在最前；$include_relations 时返回所选节点之间的关系 (至多 $limit 条)
+NEIGHBOR_EXPANSION_RETURN = """
+CALL {
+    WITH start, found
+    WITH [start] + [row IN found | row.node] as nodes
+    WHERE $include_relations
+    UNWIND nodes as n
+    MATCH (n)-[r:RELATION]->(m:Entity {project_id: $project_id})
+    WHERE m IN nodes
+    WITH r, n, m
+    LIMIT $limit
+    RETURN collect({relation: r, source_id: n.id, target_id: m.id}) as relations
+}
+RETURN [{entity: start, distance: 0}] + [row IN found | {entity: row.node, distance: row.distance}] as neighbors,
+       relations
 """
 
 # =============================================================================
 # 子图获取查询
 # =============================================================================
 
-# 获取项目完整子图 (带节点数限制)
-GET_SUBGRAPH = """
-MATCH (n:Entity {project_id: $project_id})
-WITH n LIMIT $node_limit
-OPTIONAL MATCH (n)-[r:RELATION]-(m:Entity {project_id: $project_id})
-WHERE m in [(n)] OR m in [(n)-->() | endNode(n)] OR m in [(n)<--() | startNode(n)]
-WITH collect(DISTINCT n) + collect(DISTINCT m) as all_nodes, collect(DISTINCT r) as all_relations
-UNWIND all_nodes as node
-WITH collect(DISTINCT node) as nodes, all_relations
-UNWIND all_relations as rel
-RETURN nodes, collect(DISTINCT rel) as relations
-"""
-
-# 获取以某节点为中心的子图
-GET_EGO_NETWORK = """
-MATCH (center:Entity {id: $entity_id, project_id: $project_id})
-OPTIONAL MATCH path = (center)-[:RELATION*1..{depth}]-(neighbor:Entity {project_id: $project_id})
-WITH center, neighbor, path
-ORDER BY length(path)
-WITH center, collect(DISTINCT neighbor)[0..{limit}] as neighbors, collect(DISTINCT path) as paths
-UNWIND paths as p
-UNWIND relationships(p) as rel
-WITH center, neighbors, collect(DISTINCT rel) as relations
-UNWIND ([center] + neighbors) as node
-RETURN collect(DISTINCT node) as nodes, relations
-"""
-
-# 获取社区子图 (基于节点类型或标签)
-GET_COMMUNITY_SUBGRAPH = """
+# 逐层扩展：当前层节点的、尚未选中的不重复邻居 (每一跳一次查询，不枚举路径)
+# 按节点去重后流式返回，达到 $limit 即停止扩展，hub 节点不会展开全部路径
+EXPAND_FRONTIER = """
+UNWIND $frontier as node_id
+MATCH (:Entity {id: node_id, project_id: $project_id})-[:RELATION]-(m:Entity {project_id: $project_id})
+WHERE NOT m.id IN $visited
+RETURN DISTINCT m as node
+LIMIT $limit
+"""
+
+# 已选节点之间的关系 (每条关系只从起点匹配一次，逐行返回以便流式读取)
+GET_RELATIONS_AMONG = """
+UNWIND $node_ids as node_id
+MATCH (n:Entity {id: node_id, project_id: $project_id})-[r:RELATION]->(m:Entity {project_id: $project_id})
+WHERE m.id IN $node_ids
+RETURN r as relation, n.id as source_id, m.id as target_id
+"""
+
+# 获取社区子图节点 (基于节点类型或标签，逐行返回以便流式读取)
+GET_COMMUNITY_SUBGRAPH_NODES = """
 MATCH (n:Entity {project_id: $project_id})
 WHERE ($entity_type IS NULL OR n.type = $entity_type)
    AND ($label IS NULL OR $label IN n.labels)
-WITH n LIMIT $node_limit
-OPTIONAL MATCH (n)-[r:RELATION]-(m:Entity {project_id: $project_id})
-WITH collect(DISTINCT n) + collect(DISTINCT m) as all_nodes, collect(DISTINCT r) as all_relations
-UNWIND all_nodes as node
-WITH collect(DISTINCT node) as nodes, all_relations
-UNWIND all_relations as rel
-RETURN nodes, collect(DISTINCT rel) as relations
+RETURN n as node
+LIMIT $node_limit
+"""
+
+# 项目实体数 (判断是否需要返回超节点摘要)
+COUNT_PROJECT_ENTITIES = """
+MATCH (n:Entity {project_id: $project_id})
+RETURN count(n) as entity_count
+"""
+
+# 按节点属性分组的成员数与类型分布 ($group_property 为 type 或已物化的 community_id)
+SUMMARIZE_ENTITY_GROUPS = """
+MATCH (n:Entity {project_id: $project_id})
+RETURN n[$group_property] as group, n.type as entity_type, count(*) as members
+"""
+
+# 分组之间的关系数 (超节点之间的聚合边)
+SUMMARIZE_RELATION_GROUPS = """
+MATCH (a:Entity {project_id: $project_id})-[r:RELATION]->(b:Entity {project_id: $project_id})
+RETURN a[$group_property] as source_group, b[$group_property] as target_group, count(r) as weight
+"""
+
+# 已物化社区的成员节点 (超节点下钻，重要节点优先，逐行返回以便流式读取)
+GET_COMMUNITY_MEMBER_NODES = """
+MATCH (n:Entity {project_id: $project_id, community_id: $community_id})
+RETURN n as node
+ORDER BY coalesce(n.pagerank, 0.0) DESC
+LIMIT $node_limit
 """
 
 # =============================================================================
@@ -212,7 +361,27 @@ PAGERANK = """
 CALL gds.pageRank.stream($graph_name, {
     maxIterations: $max_iterations,
     dampingFactor: $damping_factor,
-    relationshipWeightProperty: $weight_property
+    tolerance: $tolerance
+})
+YIELD nodeId, score
+RETURN gds.util.asNode(nodeId).id as entity_id,
+       gds.util.asNode(nodeId).external_id as name,
+       gds.util.asNode(nodeId).type as entity_type,
+       score
+ORDER BY score DESC
+LIMIT $limit
+"""
+
+# 个性化 PageRank (随机游走只跳回源节点)
+PERSONALIZED_PAGERANK = """
+MATCH (source:Entity {project_id: $project_id})
+WHERE source.id IN $source_ids
+WITH collect(source) as source_nodes
+CALL gds.pageRank.stream($graph_name, {
+    maxIterations: $max_iterations,
+    dampingFactor: $damping_factor,
+    tolerance: $tolerance,
+    sourceNodes: source_nodes
 })
 YIELD nodeId, score
 RETURN gds.util.asNode(nodeId).id as entity_id,
@@ -260,8 +429,7 @@ LOUVAIN_COMMUNITY = """
 CALL gds.louvain.stream($graph_name, {
     maxLevels: $max_levels,
     maxIterations: $max_iterations,
-    tolerance: $tolerance,
-    relationshipWeightProperty: $weight_property
+    tolerance: $tolerance
 })
 YIELD nodeId, communityId, intermediateCommunityIds
 RETURN gds.util.asNode(nodeId).id as entity_id,
@@ -274,8 +442,7 @@ ORDER BY communityId DESC
 # Label Propagation 社区发现
 LABEL_PROPAGATION = """
 CALL gds.labelPropagation.stream($graph_name, {
-    maxIterations: $max_iterations,
-    relationshipWeightProperty: $weight_property
+    maxIterations: $max_iterations
 })
 YIELD nodeId, communityId
 RETURN gds.util.asNode(nodeId).id as entity_id,
@@ -285,27 +452,155 @@ RETURN gds.util.asNode(nodeId).id as entity_id,
 ORDER BY communityId DESC
 """
 
+# =============================================================================
+# 分数物化查询 (节点属性 pagerank / betweenness / community_id)
+# =============================================================================
+
+# GDS write 模式：把分数直接写回投影对应的实体节点
+PAGERANK_WRITE = """
+CALL gds.pageRank.write($graph_name, {
+    maxIterations: $max_iterations,
+    dampingFactor: $damping_factor,
+    writeProperty: 'pagerank'
+})
+YIELD nodePropertiesWritten
+RETURN nodePropertiesWritten as written
+"""
+
+BETWEENNESS_WRITE = """
+CALL gds.betweenness.write($graph_name, {
+    samplingSize: $sampling_size,
+    samplingSeed: $sampling_seed,
+    writeProperty: 'betweenness'
+})
+YIELD nodePropertiesWritten
+RETURN nodePropertiesWritten as written
+"""
+
+LOUVAIN_WRITE = """
+CALL gds.louvain.write($graph_name, {
+    writeProperty: 'community_id'
+})
+YIELD nodePropertiesWritten
+RETURN nodePropertiesWritten as written
+"""
+
+# GDS 写回后为项目全部实体打上计算时间
+STAMP_ENTITY_SCORES = """
+MATCH (n:Entity {project_id: $project_id})
+SET n.scores_computed_at = $computed_at
+RETURN count(n) as stamped
+"""
+
+# 进程内计算的分数按批写回
+WRITE_ENTITY_SCORES = """
+UNWIND $rows as row
+MATCH (n:Entity {id: row.entity_id, project_id: $project_id})
+SET n.pagerank = row.pagerank,
+    n.betweenness = row.betweenness,
+    n.community_id = row.community_id,
+    n.scores_computed_at = $computed_at
+"""
+
+# 项目分数物化标记：计算时的图数据版本号和时间
+GET_SCORE_MATERIALIZATION = """
+MATCH (m:ScoreMaterialization {project_id: $project_id})
+RETURN m.graph_version as graph_version, m.computed_at as computed_at
+"""
+
+SET_SCORE_MATERIALIZATION = """
+MERGE (m:ScoreMaterialization {project_id: $project_id})
+SET m.graph_version = $graph_version, m.computed_at = $computed_at
+"""
+
+LIST_SCORE_MATERIALIZATIONS = """
+MATCH (m:ScoreMaterialization)
+RETURN m.project_id as project_id, m.graph_version as graph_version, m.computed_at as computed_at
+"""
+
+# 按物化分数取前 N 个实体 (走 (project_id, pagerank/betweenness) 索引)
+TOP_ENTITIES_BY_PAGERANK = """
+MATCH (n:Entity {project_id: $project_id})
+WHERE n.pagerank IS NOT NULL
+RETURN n.id as entity_id, n.external_id as name, n.type as entity_type, n.pagerank as score
+ORDER BY n.pagerank DESC
+LIMIT $limit
+"""
+
+TOP_ENTITIES_BY_BETWEENNESS = """
+MATCH (n:Entity {project_id: $project_id})
+WHERE n.betweenness IS NOT NULL
+RETURN n.id as entity_id, n.external_id as name, n.type as entity_type, n.betweenness as score
+ORDER BY n.betweenness DESC
+LIMIT $limit
+"""
+
+# 物化的社区归属 (与 LOUVAIN_COMMUNITY 的返回格式一致)
+GET_MATERIALIZED_COMMUNITIES = """
+MATCH (n:Entity {project_id: $project_id})
+WHERE n.community_id IS NOT NULL
+RETURN n.id as entity_id, n.external_id as name, n.type as entity_type, n.community_id as community_id
+ORDER BY n.community_id DESC
+"""
+
+# 按 PageRank 取子图节点 (可视化优先展示重要节点，逐行返回以便流式读取)
+GET_TOP_SCORED_SUBGRAPH_NODES = """
+MATCH (n:Entity {project_id: $project_id})
+WHERE n.pagerank IS NOT NULL
+   AND ($entity_type IS NULL OR n.type = $entity_type)
+   AND ($label IS NULL OR $label IN n.labels)
+RETURN n as node
+ORDER BY n.pagerank DESC
+LIMIT $node_limit
+"""
+
 # =============================================================================
 # 图投影管理查询 (GDS)
 # =============================================================================
 
-# 创建图投影
+# 创建项目图投影 (Cypher 聚合投影，只包含本项目的实体和关系；无向)
+# 不投影关系属性：关系属性只保存在 properties_json 中，带权重的算法在进程内计算
 CREATE_GRAPH_PROJECTION = """
-CALL gds.graph.project(
+MATCH (source:Entity {project_id: $project_id})
+OPTIONAL MATCH (source)-[r:RELATION]->(target:Entity {project_id: $project_id})
+WITH gds.graph.project(
     $graph_name,
-    ['Entity'],
-    {
-        RELATION: {
-            orientation: 'UNDIRECTED'
-        }
-    },
-    {
-        nodeProperties: ['type', 'external_id'],
-        relationshipProperties: $weight_property
-    }
-)
-YIELD graphName, nodeCount, relationshipCount
-RETURN graphName, nodeCount, relationshipCount
+    source,
+    target,
+    {},
+    {undirectedRelationshipTypes: ['*']}
+) as g
+RETURN g.graphName as graphName, g.nodeCount as nodeCount, g.relationshipCount as relationshipCount
+"""
+
+# 项目实体数与关系数 (投影内存估算)
+COUNT_PROJECT_GRAPH = """
+MATCH (n:Entity {project_id: $project_id})
+WITH count(n) as node_count
+OPTIONAL MATCH (:Entity {project_id: $project_id})-[r:RELATION]->(:Entity {project_id: $project_id})
+RETURN node_count, count(r) as relationship_count
+"""
+
+# 按节点数/关系数估算投影所需堆内存
+ESTIMATE_GRAPH_PROJECTION = """
+CALL gds.graph.project.estimate('*', '*', {
+    nodeCount: $node_count,
+    relationshipCount: $relationship_count
+})
+YIELD bytesMin, bytesMax
+RETURN bytesMin, bytesMax
+"""
+
+# 列出名称以 $prefix 开头的投影
+LIST_GRAPH_PROJECTIONS = """
+CALL gds.graph.list()
+YIELD graphName, nodeCount, relationshipCount, sizeInBytes, creationTime
+WHERE graphName STARTS WITH $prefix
+RETURN graphName as graph_name,
+       nodeCount as node_count,
+       relationshipCount as relationship_count,
+       sizeInBytes as size_bytes,
+       creationTime.epochMillis as created_at_ms
 """
 
 # 删除图投影
@@ -347,3 +642,32 @@ MATCH (:Entity {project_id: $project_id})-[r:RELATION]-(:Entity {project_id: $pr
 RETURN r.type as type, count(r) as count
 ORDER BY count DESC
 """
+
+# =============================================================================
+# 导出查询
+# =============================================================================
+
+# 导出项目全部实体 (流式读取)
+EXPORT_ENTITIES = """
+MATCH (n:Entity {project_id: $project_id})
+RETURN n.id as id,
+       n.external_id as external_id,
+       n.type as type,
+       n.labels as labels,
+       n.properties_json as properties_json,
+       n.version as version,
+       n.created_at as created_at,
+       n.updated_at as updated_at
+"""
+
+# 导出项目全部关系 (流式读取)
+EXPORT_RELATIONS = """
+MATCH (source:Entity {project_id: $project_id})-[r:RELATION]->(target:Entity {project_id: $project_id})
+RETURN r.id as id,
+       source.id as source_id,
+       target.id as target_id,
+       r.type as type,
+       r.properties_json as properties_json,
+       r.created_at as created_at,
+       r.updated_at as updated_at
+"""
@@ -0,0 +1,463 @@
+"""GDS 图投影管理
+
+GDS 算法运行在内存中的图投影上。投影是创建时图数据的副本，之后的写入不会反映到
+投影里，且每个投影都常驻 Neo4j 堆内存。GdsProjectionManager 负责：
+
+- 投影名称包含创建时的项目图数据版本号（graph_{项目}_v{版本}），同一版本的投影
+  由所有 worker 共用
+- 图数据版本变化后，创建不超过 gds_projection_max_staleness_seconds 的旧版本投影
+  继续沿用，否则按新版本重新投影
+- 创建前用 gds.graph.project.estimate 估算内存，超过 gds_projection_heap_budget_mb
+  时按最近使用时间淘汰投影；单个投影就超出预算、或没有可淘汰的投影时拒绝创建
+  （GraphProjectionError，调用方改用进程内算法）
+- 投影数超过 gds_max_projections 时同样按最近使用时间淘汰
+- catalog() 列出当前投影及其状态，供运维查看
+
+投影保存在 Neo4j 中，创建时间取自 GDS 图目录；项目、权重属性和最近使用时间记录在
+与查询缓存相同的后端中（redis 时多个 worker 共享）。被新版本取代或为腾出空间而
+淘汰的投影，只有在 gds_projection_lease_seconds 内没有被任何 worker 使用、也不是
+在此期间创建的，才会被删除，避免删掉其他 worker 正在运行算法的投影。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import re
+import time
+from dataclasses import dataclass, replace
+from datetime import datetime, timezone
+from typing import Any, Type
+
+from src.config import settings
+from src.domain.ports.repositories import GraphVersionPort, PreviewCachePort
+from src.infrastructure.cache.graph_version import get_graph_version_store
+from src.infrastructure.cache.in_memory import InMemoryPreviewCache
+from src.infrastructure.persistence.neo4j.client import Neo4jClient
+from src.infrastructure.persistence.neo4j import cypher_queries as queries
+
+logger = logging.getLogger(__name__)
+
+# 使用记录在共享缓存中的保留时间（超过后按创建时间排序淘汰）
+USAGE_TTL_SECONDS = 7 * 24 * 3600
+
+
+class GraphAlgorithmError(Exception):
+    """图算法执行错误"""
+    pass
+
+
+class GraphProjectionError(GraphAlgorithmError):
+    """图投影创建/管理错误"""
+    pass
+
+
+@dataclass(slots=True)
+class ProjectionUsage:
+    """投影的使用记录（保存在共享缓存中）
+
+    Attributes:
+        project_id: 项目ID
+        graph_version: 投影时的项目图数据版本号
+        last_used_at: 最近使用时间（Unix 时间戳）
+        estimated_bytes: 创建前估算的内存上限（未估算时为0）
+    """
+    project_id: str
+    graph_version: int
+    last_used_at: float
+    estimated_bytes: int = 0
+
+
+class GdsProjectionManager:
+    """按项目管理GDS图投影
+
+    Args:
+        client: Neo4j 客户端
+        versions: 项目图数据版本号存储
+        heap_budget_bytes: 所有投影的堆内存预算，0 表示不估算
+        max_staleness_seconds: 图数据变化后投影最多沿用的秒数
+        max_projections: 同时保留的投影数，0 表示不限制
+        lease_seconds: 投影最近一次使用后视为仍在使用的秒数
+        usage: 投影使用记录的存储，默认与查询缓存后端相同
+    """
+
+    GRAPH_PREFIX = "graph_"
+    USAGE_KEY_PREFIX = "gds_projection:"
+
+    def __init__(
+        self,
+        client: Type[Neo4jClient] = Neo4jClient,
+        versions: GraphVersionPort | None = None,
+        heap_budget_bytes: int | None = None,
+        max_staleness_seconds: float | None = None,
+        max_projections: int | None = None,
+        lease_seconds: float | None = None,
+        usage: PreviewCachePort | None = None
+    ):
+        self._client = client
+        self._versions = versions or get_graph_version_store()
+        self._heap_budget = (
+            settings.gds_projection_heap_budget_mb * 1024 * 1024
+            if heap_budget_bytes is None else heap_budget_bytes
+        )
+        self._max_staleness = (
+            settings.gds_projection_max_staleness_seconds
+            if max_staleness_seconds is None else max_staleness_seconds
+        )
+        self._max_projections = (
+            settings.gds_max_projections if max_projections is None else max_projections
+        )
+        self._lease = settings.gds_projection_lease_seconds if lease_seconds is None else lease_seconds
+        self._usage = usage or _usage_cache()
+        self._locks: dict[str, asyncio.Lock] = {}
+
+    @classmethod
+    def graph_name(cls, project_id: str, version: int) -> str:
+        """生成投影名称（按图数据版本号区分）"""
+        return f"{cls._project_prefix(project_id)}{version}"
+
+    @classmethod
+    def _project_prefix(cls, project_id: str) -> str:
+        return f"{cls.GRAPH_PREFIX}{project_id.replace('-', '_')}_v"
+
+    async def ensure(self, project_id: str) -> str:
+        """返回可用的投影名称，不存在或已过期时按当前版本创建
+
+        投影只包含拓扑，不含关系属性（关系属性保存在 properties_json 中）。
+
+        Args:
+            project_id: 项目ID
+
+        Returns:
+            投影名称
+
+        Raises:
+            GraphProjectionError: GDS不可用、超出内存预算或创建失败
+        """
+        version = await self._current_version(project_id)
+        graph_name = await self._usable(project_id, version)
+        if graph_name is None:
+            if version < 0:
+                raise GraphProjectionError(
+                    f"Graph version of project {project_id} is unavailable, not projecting"
+                )
+            target = self.graph_name(project_id, version)
+            # 同一投影在本进程只创建一次，并发请求等待同一次创建
+            lock = self._locks.setdefault(target, asyncio.Lock())
+            async with lock:
+                graph_name = await self._usable(project_id, version)
+                if graph_name is None:
+                    await self._project(target, project_id, version)
+                    await self._drop_superseded(project_id, version)
+                    return target
+        await self._touch(graph_name, project_id)
+        return graph_name
+
+    async def drop(self, project_id: str) -> int:
+        """删除项目的所有投影
+
+        Returns:
+            删除的投影数
+        """
+        dropped = 0
+        for name, _, _ in self._project_graphs(await self._list(), project_id):
+            if await self._drop_graph(name):
+                dropped += 1
+        return dropped
+
+    async def catalog(self) -> list[dict[str, Any]]:
+        """列出当前的项目投影（按最近使用时间降序）
+
+        Returns:
+            投影列表；没有使用记录的投影 project_id、graph_version 等字段为 None
+        """
+        rows = await self._list()
+        usage = await self._usages(rows)
+        result = []
+        for row in sorted(rows, key=lambda row: self._last_used(row, usage), reverse=True):
+            info = usage.get(row["graph_name"])
+            entry = {
+                "graph_name": row["graph_name"],
+                "node_count": row.get("node_count"),
+                "relationship_count": row.get("relationship_count"),
+                "size_bytes": row.get("size_bytes"),
+                "created_at": _iso(row["created_at_ms"] / 1000) if row.get("created_at_ms") else None,
+                "project_id": None,
+                "graph_version": None,
+                "current_version": None,
+                "stale": None,
+                "last_used_at": None,
+                "estimated_bytes": None,
+            }
+            if info is not None:
+                current = await self._current_version(info.project_id)
+                entry.update(
+                    project_id=info.project_id,
+                    graph_version=info.graph_version,
+                    current_version=current,
+                    stale=current != info.graph_version,
+                    last_used_at=_iso(info.last_used_at),
+                    estimated_bytes=info.estimated_bytes,
+                )
+            result.append(entry)
+        return result
+
+    async def _usable(self, project_id: str, version: int) -> str | None:
+        """可以直接使用的投影：当前版本的投影，或仍在沿用期内的最新旧版本投影"""
+        graphs = [
+            (graph_version, row)
+            for _, graph_version, row in self._project_graphs(await self._list(), project_id)
+        ]
+        if not graphs:
+            return None
+        if version < 0:
+            # 取不到版本号时沿用最新的投影，不因此重新投影
+            return max(graphs, key=lambda graph: graph[0])[1]["graph_name"]
+        older = []
+        for graph_version, row in graphs:
+            if graph_version == version:
+                return row["graph_name"]
+            if graph_version < version:
+                older.append((graph_version, row))
+        if not older:
+            return None
+        _, row = max(older, key=lambda graph: graph[0])
+        if time.time() - (row.get("created_at_ms") or 0) / 1000 < self._max_staleness:
+            return row["graph_name"]
+        logger.info(f"Graph projection {row['graph_name']} is stale, re-projecting")
+        return None
+
+    async def _project(
+        self,
+        graph_name: str,
+        project_id: str,
+        version: int
+    ) -> None:
+        """估算内存、腾出空间后创建投影"""
+        counts = await self._client.execute_read(queries.COUNT_PROJECT_GRAPH, {"project_id": project_id})
+        node_count = counts[0]["node_count"] if counts else 0
+        # 无向投影每条关系存两份
+        relationship_count = (counts[0]["relationship_count"] if counts else 0) * 2
+
+        estimated = await self._estimate(node_count, relationship_count)
+        if self._heap_budget and estimated > self._heap_budget:
+            raise GraphProjectionError(
+                f"Projection {graph_name} needs ~{estimated // (1024 * 1024)}MB, "
+                f"over the GDS heap budget of {self._heap_budget // (1024 * 1024)}MB"
+            )
+        await self._make_room(graph_name, estimated)
+
+        try:
+            await self._client.execute_write(
+                queries.CREATE_GRAPH_PROJECTION,
+                {"graph_name": graph_name, "project_id": project_id}
+            )
+        except Exception as e:
+            error_msg = str(e)
+            # 其他 worker 同时创建了同名投影
+            if await self._exists(graph_name):
+                logger.info(f"Graph projection {graph_name} was created by another worker")
+            # 检查是否是GDS未安装的错误
+            elif "gds" in error_msg.lower() or "procedure" in error_msg.lower():
+                raise GraphProjectionError(
+                    f"GDS plugin not installed or not available. "
+                    f"Please install Neo4j Graph Data Science library. Error: {e}"
+                )
+            else:
+                raise GraphProjectionError(f"Failed to create graph projection: {e}")
+
+        await self._record(graph_name, ProjectionUsage(
+            project_id=project_id,
+            graph_version=version,
+            last_used_at=time.time(),
+            estimated_bytes=estimated,
+        ))
+        logger.info(
+            f"Created graph projection: {graph_name} "
+            f"(v{version}, {node_count} nodes, ~{estimated // (1024 * 1024)}MB)"
+        )
+
+    async def _make_room(self, graph_name: str, estimated: int) -> None:
+        """按最近使用时间淘汰空闲的投影，直到新投影放得下
+
+        Raises:
+            GraphProjectionError: 其余投影都在使用中，腾不出空间
+        """
+        others = [row for row in await self._list() if row["graph_name"] != graph_name]
+        usage = await self._usages(others)
+        used = sum(row.get("size_bytes") or 0 for row in others)
+        count = len(others)
+
+        def full() -> bool:
+            return bool(
+                (self._heap_budget and used + estimated > self._heap_budget)
+                or (self._max_projections and count >= self._max_projections)
+            )
+
+        for victim in sorted(others, key=lambda row: self._last_used(row, usage)):
+            if not full():
+                return
+            if not self._idle(victim, usage):
+                # 按最近使用时间排序，之后的投影都在租约内
+                break
+            logger.info(f"Evicting graph projection {victim['graph_name']}")
+            if await self._drop_graph(victim["graph_name"]):
+                used -= victim.get("size_bytes") or 0
+                count -= 1
+        if full():
+            raise GraphProjectionError(
+                f"No idle graph projection to evict for {graph_name}: "
+                f"GDS heap budget or projection limit reached"
+            )
+
+    async def _drop_superseded(self, project_id: str, version: int) -> None:
+        """删除被新版本取代、且已经空闲的同项目投影"""
+        rows = [
+            row for _, graph_version, row in self._project_graphs(await self._list(), project_id)
+            if graph_version < version
+        ]
+        usage = await self._usages(rows)
+        for row in rows:
+            if self._idle(row, usage):
+                await self._drop_graph(row["graph_name"])
+
+    async def _estimate(self, node_count: int, relationship_count: int) -> int:
+        """估算投影内存上限（字节），不检查预算或估算失败时返回0"""
+        if not self._heap_budget:
+            return 0
+        try:
+            result = await self._client.execute_read(
+                queries.ESTIMATE_GRAPH_PROJECTION,
+                {"node_count": node_count, "relationship_count": relationship_count}
+            )
+        except Exception as e:
+            logger.warning(f"Graph projection estimate failed, skipping budget check: {e}")
+            return 0
+        return int(result[0]["bytesMax"]) if result else 0
+
+    async def _exists(self, graph_name: str) -> bool:
+        # 未安装GDS时 gds.graph.exists 函数不存在
+        try:
+            result = await self._client.execute_read(
+                queries.CHECK_GRAPH_EXISTS,
+                {"graph_name": graph_name}
+            )
+        except Exception as e:
+            raise GraphProjectionError(f"GDS plugin not available: {e}")
+        return bool(result[0].get("exists", False)) if result else False
+
+    async def _list(self) -> list[dict[str, Any]]:
+        try:
+            return await self._client.execute_read(
+                queries.LIST_GRAPH_PROJECTIONS,
+                {"prefix": self.GRAPH_PREFIX}
+            )
+        except Exception as e:
+            raise GraphProjectionError(f"GDS plugin not available: {e}")
+
+    def _project_graphs(
+        self,
+        rows: list[dict[str, Any]],
+        project_id: str
+    ) -> list[tuple[str, int, dict[str, Any]]]:
+        """从投影目录中挑出项目的投影：(名称, 图数据版本号, 目录行)"""
+        prefix = self._project_prefix(project_id)
+        graphs = []
+        for row in rows:
+            name = row["graph_name"]
+            match = re.fullmatch(r"\d+", name[len(prefix):]) if name.startswith(prefix) else None
+            if match:
+                graphs.append((name, int(match.group()), row))
+        return graphs
+
+    async def _drop_graph(self, graph_name: str) -> bool:
+        try:
+            await self._client.execute_write(
+                queries.DROP_GRAPH_PROJECTION,
+                {"graph_name": graph_name}
+            )
+            logger.info(f"Dropped graph projection: {graph_name}")
+            return True
+        except Exception as e:
+            logger.warning(f"Failed to drop graph projection {graph_name}: {e}")
+            return False
+
+    async def _current_version(self, project_id: str) -> int:
+        try:
+            return await self._versions.get(project_id)
+        except Exception as e:
+            logger.warning(f"Graph version lookup failed for project {project_id}: {e}")
+            return -1
+
+    async def _touch(self, graph_name: str, project_id: str) -> None:
+        """记录一次使用（其他 worker 据此判断投影是否在使用中）"""
+        usage = await self._get_usage(graph_name)
+        if usage is None:
+            match = self._project_graphs([{"graph_name": graph_name}], project_id)
+            usage = ProjectionUsage(project_id, match[0][1] if match else -1, 0)
+        await self._record(graph_name, replace(usage, last_used_at=time.time()))
+
+    async def _record(self, graph_name: str, usage: ProjectionUsage) -> None:
+        try:
+            await self._usage.set(self.USAGE_KEY_PREFIX + graph_name, usage, USAGE_TTL_SECONDS)
+        except Exception as e:
+            logger.warning(f"Failed to record use of graph projection {graph_name}: {e}")
+
+    async def _get_usage(self, graph_name: str) -> ProjectionUsage | None:
+        try:
+            return await self._usage.get(self.USAGE_KEY_PREFIX + graph_name)
+        except Exception as e:
+            logger.warning(f"Failed to read use of graph projection {graph_name}: {e}")
+            return None
+
+    async def _usages(self, rows: list[dict[str, Any]]) -> dict[str, ProjectionUsage]:
+        usage = {}
+        for row in rows:
+            info = await self._get_usage(row["graph_name"])
+            if info is not None:
+                usage[row["graph_name"]] = info
+        return usage
+
+    @staticmethod
+    def _last_used(row: dict[str, Any], usage: dict[str, ProjectionUsage]) -> float:
+        """最近使用时间：使用记录和创建时间中较晚的一个"""
+        info = usage.get(row["graph_name"])
+        created_at = (row.get("created_at_ms") or 0) / 1000
+        return max(created_at, info.last_used_at) if info is not None else created_at
+
+    def _idle(self, row: dict[str, Any], usage: dict[str, ProjectionUsage]) -> bool:
+        """租约期内没有被任何 worker 使用（也不是在此期间创建的）"""
+        return time.time() - self._last_used(row, usage) >= self._lease
+
+
+def _iso(timestamp: float) -> str:
+    return datetime.fromtimestamp(timestamp, tz=timezone.utc).isoformat()
+
+
+_usage: PreviewCachePort | None = None
+
+
+def _usage_cache() -> PreviewCachePort:
+    """进程内共享的投影使用记录，后端与查询缓存相同：redis 时多个 worker 共享
+
+    Redis 后端不启用本地 L1，读到的总是其他 worker 最新写入的使用时间。
+    """
+    global _usage
+    if _usage is None:
+        if settings.query_cache_backend == "redis":
+            from src.infrastructure.cache.redis_cache import RedisPreviewCache
+            _usage = RedisPreviewCache(l1_max_bytes=0)
+        else:
+            _usage = InMemoryPreviewCache()
+    return _usage
+
+
+_manager: GdsProjectionManager | None = None
+
+
+def get_projection_manager() -> GdsProjectionManager:
+    """获取进程内共享的投影管理器"""
+    global _manager
+    if _manager is None:
+        _manager = GdsProjectionManager()
+    return _manager
@@ -5,23 +5,46 @@
 
 from __future__ import annotations
 
+import asyncio
+import json
 import logging
+from collections import OrderedDict
+from contextlib import aclosing
+from datetime import datetime
+from itertools import islice
 from typing import Any, Type
 
+import numpy as np
+
+from src.config import settings
+from src.domain.services.analysis.betweenness import (
+    betweenness_partial,
+    sample_sources,
+    scale_scores,
+    undirected_csr,
+)
+from src.domain.services.analysis.community import detect_communities
+from src.domain.services.analysis.pagerank import pagerank
+from src.domain.services.analysis.path_finder import GraphPath, k_shortest_paths, shortest_path
+from src.infrastructure.compute import call_with_shared, run_in_worker, share_arrays
+from src.infrastructure.persistence.neo4j.adjacency_snapshot import (
+    AdjacencySnapshot,
+    AdjacencySnapshotStore,
+    get_adjacency_snapshot_store,
+)
 from src.infrastructure.persistence.neo4j.client import Neo4jClient
+from src.infrastructure.persistence.neo4j.gds_projections import (
+    GdsProjectionManager,
+    GraphAlgorithmError,
+    GraphProjectionError,
+    get_projection_manager,
+)
 from src.infrastructure.persistence.neo4j import cypher_queries as queries
 
 logger = logging.getLogger(__name__)
 
-
-class GraphAlgorithmError(Exception):
-    """图算法执行错误"""
-    pass
-
-
-class GraphProjectionError(GraphAlgorithmError):
-    """图投影创建/管理错误"""
-    pass
+# 进程内社区发现结果：(项目ID, 图数据版本号, 算法, 参数...) -> 结果行，最近使用的在末尾
+_community_results: OrderedDict[tuple, list[dict[str, Any]]] = OrderedDict()
 
 
 class GraphAlgorithmRunner:
@@ -29,23 +52,31 @@ class GraphAlgorithmRunner:
     
     封装了常用的图分析算法，包括：
     - 中心性分析：PageRank, Betweenness
-    - 社区发现：Louvain
-    - 路径查找：最短路径、所有路径
+    - 社区发现：Louvain, Label Propagation
+    - 路径查找：最短路径、所有路径（优先使用进程内邻接快照）
+    
+    GDS不可用时，中心性和社区发现在工作进程中基于邻接快照计算。
     """
     
-    def __init__(self, client: Type[Neo4jClient] = Neo4jClient):
+    def __init__(
+        self,
+        client: Type[Neo4jClient] = Neo4jClient,
+        snapshots: AdjacencySnapshotStore | None = None,
+        projections: GdsProjectionManager | None = None
+    ):
         self._client = client
-    
-    def _get_graph_name(self, project_id: str) -> str:
-        """生成图投影名称"""
-        return f"graph_{project_id.replace('-', '_')}"
+        self._snapshots = snapshots or get_adjacency_snapshot_store()
+        self._projections = projections or get_projection_manager()
     
     async def _ensure_graph_projection(
         self,
         project_id: str,
         weight_property: str | None = None
     ) -> str:
-        """确保图投影存在，如果不存在则创建
+        """确保图投影存在且未过期，必要时（重新）创建
+        
+        关系属性只保存在 properties_json 中，投影里没有数值权重；指定权重属性时
+        不使用GDS，由调用方在进程内按 _edge_weights 读取的权重计算。
         
         Args:
             project_id: 项目ID
@@ -53,43 +84,18 @@ class GraphAlgorithmRunner:
             
         Returns:
             图投影名称
+            
+        Raises:
+            GraphProjectionError: GDS不可用或指定了权重属性
         """
-        graph_name = self._get_graph_name(project_id)
-        
-        # 检查投影是否存在
-        exists_result = await self._client.execute_read(
-            queries.CHECK_GRAPH_EXISTS,
-            {"graph_name": graph_name}
-        )
-        
-        exists = exists_result[0].get("exists", False) if exists_result else False
-        
-        if not exists:
-            # 创建新投影
-            try:
-                weight_prop = weight_property if weight_property else None
-                await self._client.execute_write(
-                    queries.CREATE_GRAPH_PROJECTION,
-                    {
-                        "graph_name": graph_name,
-                        "weight_property": weight_prop
-                    }
-                )
-                logger.info(f"Created graph projection: {graph_name}")
-            except Exception as e:
-                error_msg = str(e)
-                # 检查是否是GDS未安装的错误
-                if "gds" in error_msg.lower() or "procedure" in error_msg.lower():
-                    raise GraphProjectionError(
-                        f"GDS plugin not installed or not available. "
-                        f"Please install Neo4j Graph Data Science library. Error: {e}"
-                    )
-                raise GraphProjectionError(f"Failed to create graph projection: {e}")
-        
-        return graph_name
+        if weight_property:
+            raise GraphProjectionError(
+                f"Relation property {weight_property!r} is not projected, weighted runs use the in-process path"
+            )
+        return await self._projections.ensure(project_id)
     
     async def drop_graph_projection(self, project_id: str) -> bool:
-        """删除图投影
+        """删除项目的图投影
         
         Args:
             project_id: 项目ID
@@ -97,19 +103,10 @@ class GraphAlgorithmRunner:
         Returns:
             是否成功删除
         """
-        graph_name = self._get_graph_name(project_id)
-        
         try:
-            await self._client.execute_write(
-                queries.DROP_GRAPH_PROJECTION,
-                {"graph_name": graph_name}
-            )
-            logger.info(f"Dropped graph projection: {graph_name}")
-            return True
-        except Exception as e:
-            if "not found" in str(e).lower():
-                return False
-            logger.warning(f"Failed to drop graph projection {graph_name}: {e}")
+            return await self._projections.drop(project_id) > 0
+        except GraphProjectionError as e:
+            logger.warning(f"Failed to drop graph projections for {project_id}: {e}")
             return False
     
     async def run_pagerank(
@@ -118,12 +115,19 @@ class GraphAlgorithmRunner:
         limit: int = 100,
         max_iterations: int = 20,
         damping_factor: float = 0.85,
-        weight_property: str | None = None
+        weight_property: str | None = None,
+        source_ids: list[str] | None = None,
+        tolerance: float = 1e-7
     ) -> list[dict[str, Any]]:
         """运行PageRank中心性算法
         
         PageRank是一种链接分析算法，用于衡量图中节点的重要性。
         常用于识别关键实体（如关键企业、关键人物等）。
+        给定 source_ids 时计算个性化PageRank，衡量各节点与这些实体的关联程度。
+        
+        GDS不可用或指定了 weight_property 时在工作进程中用NumPy在邻接快照上计算，
+        分数与GDS一致；
+        快照也不可用时降级为degree centrality。
         
         Args:
             project_id: 项目ID
@@ -131,6 +135,8 @@ class GraphAlgorithmRunner:
             max_iterations: 最大迭代次数
             damping_factor: 阻尼系数（通常为0.85）
             weight_property: 关系权重属性名
+            source_ids: 个性化PageRank的源实体ID
+            tolerance: 收敛容忍度
             
         Returns:
             节点PageRank分数列表，按分数降序排列
@@ -140,29 +146,202 @@ class GraphAlgorithmRunner:
             >>> results = await runner.run_pagerank("proj-123", limit=10)
             >>> # [{"entity_id": "...", "name": "公司A", "entity_type": "ENTERPRISE", "score": 0.0523}, ...]
         """
+        params = {
+            "limit": limit,
+            "max_iterations": max_iterations,
+            "damping_factor": damping_factor,
+            "tolerance": tolerance
+        }
         try:
             graph_name = await self._ensure_graph_projection(project_id, weight_property)
             
-            result = await self._client.execute_read(
-                queries.PAGERANK,
-                {
-                    "graph_name": graph_name,
-                    "limit": limit,
-                    "max_iterations": max_iterations,
-                    "damping_factor": damping_factor,
-                    "weight_property": weight_property
-                }
-            )
-            return result
-        except GraphProjectionError:
-            # GDS不可用，使用简单的degree centrality作为替代
-            logger.warning("GDS not available, falling back to degree centrality")
+            if source_ids:
+                return await self._client.execute_read(
+                    queries.PERSONALIZED_PAGERANK,
+                    {**params, "graph_name": graph_name, "project_id": project_id,
+                     "source_ids": source_ids}
+                )
             return await self._client.execute_read(
-                queries.DEGREE_CENTRALITY,
-                {"project_id": project_id, "limit": limit}
+                queries.PAGERANK, {**params, "graph_name": graph_name}
             )
+        except GraphProjectionError as e:
+            logger.info(f"Computing PageRank in process: {e}")
+        except Exception as e:
+            raise GraphAlgorithmError(f"PageRank calculation failed: {e}")
+        
+        try:
+            snapshot = await self._snapshots.get(project_id)
+            if snapshot is not None:
+                return await self._pagerank_in_process(
+                    snapshot, limit, max_iterations, damping_factor,
+                    weight_property, source_ids, tolerance
+                )
         except Exception as e:
             raise GraphAlgorithmError(f"PageRank calculation failed: {e}")
+        
+        # 快照不可用（项目过大或已禁用），使用简单的degree centrality作为替代
+        logger.warning("Adjacency snapshot not available, falling back to degree centrality")
+        return await self._client.execute_read(
+            queries.DEGREE_CENTRALITY,
+            {"project_id": project_id, "limit": limit}
+        )
+    
+    async def _pagerank_in_process(
+        self,
+        snapshot: AdjacencySnapshot,
+        limit: int,
+        max_iterations: int,
+        damping_factor: float,
+        weight_property: str | None,
+        source_ids: list[str] | None,
+        tolerance: float
+    ) -> list[dict[str, Any]]:
+        """在工作进程中计算PageRank（与GDS投影一致，按无向图计算）
+
+        快照只包含有关系的实体，没有关系的实体按GDS的结果补上：分数为
+        1 - damping_factor（个性化PageRank时只有源实体如此，其余为0）。它们的分数
+        不高于任何有关系的实体，只在结果不足 limit 条或源实体本身孤立时才需要读取。
+        """
+        seeds = None
+        if source_ids:
+            seeds = np.array(
+                [i for i in map(snapshot.index_of, source_ids) if i is not None],
+                dtype=np.int64
+            )
+        
+        rows = []
+        if seeds is None or len(seeds):
+            scores = await self._pagerank_scores(
+                snapshot, max_iterations, damping_factor, weight_property, tolerance, seeds
+            )
+            rows = await self._score_rows(snapshot, scores, limit)
+        if len(rows) < limit or (seeds is not None and len(seeds) < len(set(source_ids))):
+            rows = await self._with_isolated_entities(snapshot, rows, limit, damping_factor, source_ids)
+        return rows
+    
+    async def _with_isolated_entities(
+        self,
+        snapshot: AdjacencySnapshot,
+        rows: list[dict[str, Any]],
+        limit: int,
+        damping_factor: float,
+        source_ids: list[str] | None
+    ) -> list[dict[str, Any]]:
+        """把快照中没有的实体按GDS的分数并入结果，按分数降序取前 limit 条"""
+        sources = set(source_ids or [])
+        isolated = []
+        zeros = 0
+        async with aclosing(self._client.iter_read_batches(
+            queries.GET_PROJECT_ENTITY_LABELS,
+            {"project_id": snapshot.project_id},
+            batch_size=settings.neo4j_fetch_size
+        )) as batches:
+            async for batch in batches:
+                for record in batch:
+                    if snapshot.index_of(record["entity_id"]) is not None:
+                        continue
+                    score = 1 - damping_factor if not sources or record["entity_id"] in sources else 0.0
+                    # 分数相同的孤立实体最多只需要 limit 个
+                    if score == 0.0:
+                        if zeros >= limit:
+                            continue
+                        zeros += 1
+                    elif not sources and len(isolated) >= limit:
+                        continue
+                    isolated.append({**record, "score": score})
+        merged = sorted(rows + isolated, key=lambda row: row["score"], reverse=True)
+        return merged[:limit]
+    
+    async def _pagerank_scores(
+        self,
+        snapshot: AdjacencySnapshot,
+        max_iterations: int,
+        damping_factor: float,
+        weight_property: str | None,
+        tolerance: float,
+        seeds: np.ndarray | None = None
+    ) -> np.ndarray:
+        """快照全部节点的PageRank分数（按快照节点编号）"""
+        source, target, edges = snapshot.coo()
+        weights = None
+        if weight_property:
+            weights = await self._edge_weights(snapshot, edges, weight_property)
+            weights = np.concatenate([weights, weights])
+        
+        scores, iterations = await run_in_worker(
+            pagerank,
+            np.concatenate([source, target]),
+            np.concatenate([target, source]),
+            snapshot.node_capacity,
+            weights=weights,
+            damping_factor=damping_factor,
+            max_iterations=max_iterations,
+            tolerance=tolerance,
+            source_nodes=seeds
+        )
+        logger.debug(f"PageRank for {snapshot.project_id} ran {iterations} iterations")
+        return scores
+    
+    async def _edge_weights(
+        self,
+        snapshot: AdjacencySnapshot,
+        edges: np.ndarray,
+        weight_property: str
+    ) -> np.ndarray:
+        """读取关系属性中的权重，与 edges 顺序对齐（缺失或非数值时为1.0）"""
+        by_edge: dict[int, float] = {}
+        async with aclosing(self._client.iter_read_batches(
+            queries.GET_PROJECT_RELATION_PROPERTIES,
+            {"project_id": snapshot.project_id},
+            batch_size=settings.neo4j_fetch_size
+        )) as batches:
+            async for batch in batches:
+                for row in batch:
+                    edge = snapshot.edge_index_of(row["id"])
+                    if edge is None or not row.get("properties_json"):
+                        continue
+                    value = json.loads(row["properties_json"]).get(weight_property)
+                    if isinstance(value, (int, float)) and not isinstance(value, bool):
+                        by_edge[edge] = float(value)
+        return np.array([by_edge.get(int(edge), 1.0) for edge in edges], dtype=np.float64)
+    
+    async def _score_rows(
+        self,
+        snapshot: AdjacencySnapshot,
+        scores: np.ndarray,
+        limit: int
+    ) -> list[dict[str, Any]]:
+        """取分数最高的节点，回填名称和类型（与GDS结果格式一致）"""
+        if limit < len(scores):
+            # 多取一些，弥补已删除但仍占编号的节点
+            candidates = np.argpartition(-scores, min(limit * 2, len(scores) - 1))[:limit * 2]
+        else:
+            candidates = np.arange(len(scores))
+        candidates = candidates[np.argsort(-scores[candidates], kind="stable")]
+        
+        ids = []
+        for node in candidates.tolist():
+            if snapshot.is_live(node):
+                ids.append(snapshot.node_id(node))
+            if len(ids) >= limit:
+                break
+        score_by_id = {snapshot.node_id(int(n)): float(scores[n]) for n in candidates}
+        
+        records = await self._client.execute_read(
+            queries.GET_ENTITIES_BY_IDS,
+            {"project_id": snapshot.project_id, "ids": ids}
+        )
+        entities = {record["entity"].get("id"): record["entity"] for record in records}
+        return [
+            {
+                "entity_id": entity_id,
+                "name": entities[entity_id].get("external_id"),
+                "entity_type": entities[entity_id].get("type"),
+                "score": score_by_id[entity_id]
+            }
+            for entity_id in ids
+            if entity_id in entities
+        ]
     
     async def run_betweenness(
         self,
@@ -176,6 +355,9 @@ class GraphAlgorithmRunner:
         Betweenness中心性衡量一个节点作为图中其他节点之间桥梁的程度。
         高betweenness的节点通常是信息流动的关键中介。
         
+        GDS不可用时在邻接快照上运行采样Brandes算法，源节点分块后由工作进程
+        并行计算，邻接数组通过共享内存传递。
+        
         Args:
             project_id: 项目ID
             limit: 返回结果数量限制
@@ -198,11 +380,53 @@ class GraphAlgorithmRunner:
             result = await self._client.execute_read(queries.BETWEENNESS, params)
             return result
         except GraphProjectionError:
-            logger.warning("GDS not available, betweenness calculation skipped")
-            return []
+            logger.info("GDS not available, computing betweenness in process")
+        except Exception as e:
+            raise GraphAlgorithmError(f"Betweenness calculation failed: {e}")
+        
+        try:
+            snapshot = await self._snapshots.get(project_id)
+            if snapshot is None:
+                logger.warning("Adjacency snapshot not available, betweenness calculation skipped")
+                return []
+            return await self._betweenness_in_process(snapshot, limit, sampling_size, sampling_seed)
         except Exception as e:
             raise GraphAlgorithmError(f"Betweenness calculation failed: {e}")
     
+    async def _betweenness_in_process(
+        self,
+        snapshot: AdjacencySnapshot,
+        limit: int,
+        sampling_size: int | None,
+        sampling_seed: int | None
+    ) -> list[dict[str, Any]]:
+        """按源节点分块，在工作进程中并行计算采样Brandes"""
+        scores = await self._betweenness_scores(snapshot, sampling_size, sampling_seed)
+        return await self._score_rows(snapshot, scores, limit)
+    
+    async def _betweenness_scores(
+        self,
+        snapshot: AdjacencySnapshot,
+        sampling_size: int | None,
+        sampling_seed: int | None
+    ) -> np.ndarray:
+        """快照全部节点的Betweenness分数（按快照节点编号）"""
+        source, target, _ = snapshot.coo()
+        node_count = snapshot.node_capacity
+        indptr, indices = undirected_csr(source, target, node_count)
+        sources = sample_sources(node_count, sampling_size, sampling_seed)
+        if len(sources) == 0:
+            return np.zeros(node_count)
+        
+        chunk_count = min(len(sources), max(settings.graph_compute_workers, 1) * 4)
+        with share_arrays(indptr, indices) as handles:
+            partials = await asyncio.gather(*(
+                run_in_worker(call_with_shared, betweenness_partial, handles, chunk)
+                for chunk in np.array_split(sources, chunk_count)
+            ))
+        total = np.sum(partials, axis=0) if partials else np.zeros(node_count)
+        return scale_scores(total, node_count, len(sources))
+    
     async def run_louvain(
         self,
         project_id: str,
@@ -216,6 +440,9 @@ class GraphAlgorithmRunner:
         Louvain算法是一种基于模块度的社区发现算法，
         能够识别图中紧密连接的节点群组（社区）。
         
+        GDS不可用或指定了 weight_property 时在工作进程中基于邻接快照计算，
+        结果按项目图数据版本缓存。
+        
         Args:
             project_id: 项目ID
             max_levels: 最大层级数
@@ -235,17 +462,213 @@ class GraphAlgorithmRunner:
                     "graph_name": graph_name,
                     "max_levels": max_levels,
                     "max_iterations": max_iterations,
-                    "tolerance": tolerance,
-                    "weight_property": weight_property
+                    "tolerance": tolerance
                 }
             )
             return result
-        except GraphProjectionError:
-            logger.warning("GDS not available, Louvain community detection skipped")
-            return []
+        except GraphProjectionError as e:
+            logger.info(f"Running Louvain in process: {e}")
+        except Exception as e:
+            raise GraphAlgorithmError(f"Louvain community detection failed: {e}")
+        
+        try:
+            return await self._communities_in_process(
+                project_id, "louvain", weight_property,
+                max_levels=max_levels, max_iterations=max_iterations, tolerance=tolerance
+            )
         except Exception as e:
             raise GraphAlgorithmError(f"Louvain community detection failed: {e}")
     
+    async def run_label_propagation(
+        self,
+        project_id: str,
+        max_iterations: int = 10,
+        weight_property: str | None = None
+    ) -> list[dict[str, Any]]:
+        """运行Label Propagation社区发现算法
+        
+        每个节点反复采用邻居中最多的标签，速度快于Louvain，适合大图的快速分组。
+        GDS不可用或指定了 weight_property 时在工作进程中基于邻接快照计算，
+        结果按项目图数据版本缓存。
+        
+        Args:
+            project_id: 项目ID
+            max_iterations: 最大迭代次数
+            weight_property: 关系权重属性名
+            
+        Returns:
+            节点社区归属列表
+        """
+        try:
+            graph_name = await self._ensure_graph_projection(project_id, weight_property)
+            
+            result = await self._client.execute_read(
+                queries.LABEL_PROPAGATION,
+                {
+                    "graph_name": graph_name,
+                    "max_iterations": max_iterations
+                }
+            )
+            return result
+        except GraphProjectionError as e:
+            logger.info(f"Running label propagation in process: {e}")
+        except Exception as e:
+            raise GraphAlgorithmError(f"Label propagation failed: {e}")
+        
+        try:
+            return await self._communities_in_process(
+                project_id, "label_propagation", weight_property,
+                max_iterations=max_iterations
+            )
+        except Exception as e:
+            raise GraphAlgorithmError(f"Label propagation failed: {e}")
+    
+    async def _communities_in_process(
+        self,
+        project_id: str,
+        algorithm: str,
+        weight_property: str | None,
+        **options: Any
+    ) -> list[dict[str, Any]]:
+        """在工作进程中运行社区发现，返回与GDS相同格式的结果
+        
+        没有任何关系的实体不在快照中，与GDS一样各自成为单独的社区。
+        """
+        snapshot = await self._snapshots.get(project_id)
+        if snapshot is None:
+            logger.warning("Adjacency snapshot not available, community detection skipped")
+            return []
+        
+        cache_key = (project_id, snapshot.version, algorithm, weight_property,
+                     tuple(sorted(options.items())))
+        cached = _community_results.get(cache_key)
+        if cached is not None:
+            _community_results.move_to_end(cache_key)
+            return cached
+        
+        source, target, edges = snapshot.coo()
+        weights = None
+        if weight_property:
+            weights = await self._edge_weights(snapshot, edges, weight_property)
+        labels = await run_in_worker(
+            detect_communities, algorithm, source, target, snapshot.node_capacity,
+            weights=weights, **options
+        )
+        
+        next_id = int(labels.max()) + 1 if len(labels) else 0
+        rows = []
+        async with aclosing(self._client.iter_read_batches(
+            queries.GET_PROJECT_ENTITY_LABELS,
+            {"project_id": project_id},
+            batch_size=settings.neo4j_fetch_size
+        )) as batches:
+            async for batch in batches:
+                for record in batch:
+                    node = snapshot.index_of(record["entity_id"])
+                    if node is None:
+                        community_id, next_id = next_id, next_id + 1
+                    else:
+                        community_id = int(labels[node])
+                    rows.append({**record, "community_id": community_id})
+        rows.sort(key=lambda row: row["community_id"], reverse=True)
+        
+        _community_results[cache_key] = rows
+        while len(_community_results) > max(settings.graph_snapshot_max_projects, 1):
+            _community_results.popitem(last=False)
+        return rows
+    
+    async def write_scores(
+        self,
+        project_id: str,
+        computed_at: datetime,
+        damping_factor: float = 0.85,
+        sampling_size: int = 10000,
+        batch_size: int = 5000
+    ) -> int:
+        """计算PageRank、Betweenness和Louvain社区，写回实体节点属性
+        
+        写入 pagerank、betweenness、community_id 和 scores_computed_at（= computed_at），
+        之后的 top-k 和可视化查询直接按属性读取（有索引），不必再运行算法。
+        
+        GDS可用时使用 write 模式；否则在工作进程中基于邻接快照计算后按批写回。
+        没有任何关系的实体与GDS一样：pagerank 为 1 - damping_factor，betweenness 为 0，
+        各自成为单独的社区。
+        
+        Args:
+            project_id: 项目ID
+            computed_at: 计算时间（写入 scores_computed_at）
+            damping_factor: PageRank阻尼系数
+            sampling_size: Betweenness采样大小
+            batch_size: 进程内计算时每批写回的实体数
+            
+        Returns:
+            写入分数的实体数
+            
+        Raises:
+            GraphAlgorithmError: 计算或写回失败
+        """
+        try:
+            graph_name = await self._ensure_graph_projection(project_id)
+            params = {"graph_name": graph_name}
+            await self._client.execute_write(queries.PAGERANK_WRITE, {
+                **params, "max_iterations": 20, "damping_factor": damping_factor
+            })
+            await self._client.execute_write(queries.BETWEENNESS_WRITE, {
+                **params, "sampling_size": sampling_size, "sampling_seed": None
+            })
+            await self._client.execute_write(queries.LOUVAIN_WRITE, params)
+            result = await self._client.execute_write(
+                queries.STAMP_ENTITY_SCORES,
+                {"project_id": project_id, "computed_at": computed_at}
+            )
+            return result[0]["stamped"] if result else 0
+        except GraphProjectionError:
+            logger.info("GDS not available, computing scores in process")
+        except Exception as e:
+            raise GraphAlgorithmError(f"Score materialization failed: {e}")
+        
+        try:
+            snapshot = await self._snapshots.get(project_id)
+            if snapshot is None:
+                raise GraphAlgorithmError("Adjacency snapshot not available")
+            source, target, _ = snapshot.coo()
+            pageranks = await self._pagerank_scores(snapshot, 20, damping_factor, None, 1e-7)
+            betweenness = await self._betweenness_scores(snapshot, sampling_size, None)
+            labels = await run_in_worker(
+                detect_communities, "louvain", source, target, snapshot.node_capacity
+            )
+            
+            written = 0
+            next_id = int(labels.max()) + 1 if len(labels) else 0
+            async with aclosing(self._client.iter_read_batches(
+                queries.GET_PROJECT_ENTITY_LABELS,
+                {"project_id": project_id},
+                batch_size=batch_size
+            )) as batches:
+                async for batch in batches:
+                    rows = []
+                    for record in batch:
+                        node = snapshot.index_of(record["entity_id"])
+                        if node is None:
+                            row = {"pagerank": 1 - damping_factor, "betweenness": 0.0,
+                                   "community_id": next_id}
+                            next_id += 1
+                        else:
+                            row = {"pagerank": float(pageranks[node]),
+                                   "betweenness": float(betweenness[node]),
+                                   "community_id": int(labels[node])}
+                        rows.append({"entity_id": record["entity_id"], **row})
+                    await self._client.execute_write(
+                        queries.WRITE_ENTITY_SCORES,
+                        {"project_id": project_id, "rows": rows, "computed_at": computed_at}
+                    )
+                    written += len(rows)
+            return written
+        except GraphAlgorithmError:
+            raise
+        except Exception as e:
+            raise GraphAlgorithmError(f"Score materialization failed: {e}")
+    
     async def find_shortest_paths(
         self,
         project_id: str,
@@ -255,7 +678,7 @@ class GraphAlgorithmRunner:
     ) -> dict[str, list[Any]]:
         """查找两个实体之间的最短路径
         
-        使用Neo4j内置的shortestPath算法，找到连接两个实体的最短关系链。
+        优先在进程内邻接快照上做双向BFS，快照不可用时使用Neo4j内置的shortestPath算法。
         
         Args:
             project_id: 项目ID
@@ -270,7 +693,16 @@ class GraphAlgorithmRunner:
             >>> result = await runner.find_shortest_paths("proj-123", "ent-1", "ent-10")
             >>> # {"nodes": [{...}, {...}], "relations": [{...}, {...}]}
         """
-        query = queries.FIND_SHORTEST_PATH.format(max_depth=max_depth)
+        snapshot = await self._snapshots.get(project_id)
+        if snapshot is not None:
+            start = snapshot.index_of(start_id)
+            end = snapshot.index_of(end_id)
+            path = None
+            if start is not None and end is not None:
+                path = shortest_path(snapshot, start, end, max_depth)
+            return await self._load_path_elements(snapshot, [path] if path else [])
+        
+        query = queries.with_hops(queries.FIND_SHORTEST_PATH, max_depth=max_depth)
         
         result = await self._client.execute_read(
             query,
@@ -301,6 +733,7 @@ class GraphAlgorithmRunner:
         """查找两个实体之间的所有路径
         
         找到连接两个实体的所有可能路径，适用于小范围子图分析。
+        快照可用时按长度升序逐条生成，取够 path_limit 条即停止。
         
         Args:
             project_id: 项目ID
@@ -312,7 +745,16 @@ class GraphAlgorithmRunner:
         Returns:
             包含nodes和relations的字典
         """
-        query = queries.FIND_ALL_PATHS.format(max_depth=max_depth)
+        snapshot = await self._snapshots.get(project_id)
+        if snapshot is not None:
+            start = snapshot.index_of(start_id)
+            end = snapshot.index_of(end_id)
+            paths: list[GraphPath] = []
+            if start is not None and end is not None:
+                paths = list(islice(k_shortest_paths(snapshot, start, end, max_depth), path_limit))
+            return await self._load_path_elements(snapshot, paths)
+        
+        query = queries.with_hops(queries.FIND_ALL_PATHS, max_depth=max_depth)
         
         result = await self._client.execute_read(
             query,
@@ -351,6 +793,34 @@ class GraphAlgorithmRunner:
             "relations": all_relations
         }
     
+    async def _load_path_elements(
+        self,
+        snapshot: AdjacencySnapshot,
+        paths: list[GraphPath]
+    ) -> dict[str, list[Any]]:
+        """按ID取回路径上的实体和关系（去重，保持路径顺序）"""
+        if not paths:
+            return {"nodes": [], "relations": []}
+        
+        node_ids = list(dict.fromkeys(snapshot.node_id(n) for path in paths for n in path.nodes))
+        relation_ids = list(dict.fromkeys(snapshot.edge_id(e) for path in paths for e in path.edges))
+        
+        node_records = await self._client.execute_read(
+            queries.GET_ENTITIES_BY_IDS,
+            {"project_id": snapshot.project_id, "ids": node_ids}
+        )
+        relation_records = await self._client.execute_read(
+            queries.GET_RELATIONS_BY_IDS,
+            {"project_id": snapshot.project_id, "ids": relation_ids}
+        )
+        nodes = {record["entity"].get("id"): record["entity"] for record in node_records}
+        relations = {record["relation"].get("id"): record["relation"] for record in relation_records}
+        
+        return {
+            "nodes": [nodes[i] for i in node_ids if i in nodes],
+            "relations": [relations[i] for i in relation_ids if i in relations]
+        }
+    
     async def get_graph_statistics(self, project_id: str) -> dict[str, Any]:
         """获取图谱统计信息
         
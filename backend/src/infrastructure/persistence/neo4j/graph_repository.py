@@ -5,15 +5,45 @@ from typing import Any, Dict, List, Type
 
 from neo4j.graph import Node, Relationship
 
+from src.config import settings
 from src.domain.entities.entity import Entity
 from src.domain.entities.relation import Relation
-from src.domain.ports.repositories import GraphEntityRepository
+from src.domain.ports.repositories import GraphEntityRepository, GraphVersionPort
+from src.infrastructure.cache.graph_version import get_graph_version_store
+from src.infrastructure.persistence.neo4j import cypher_queries as queries
+from src.infrastructure.persistence.neo4j.adjacency_snapshot import (
+    AdjacencySnapshotStore,
+    SnapshotDelta,
+    get_adjacency_snapshot_store,
+)
 from src.infrastructure.persistence.neo4j.client import Neo4jClient
+from src.infrastructure.persistence.neo4j.score_materializer import (
+    ScoreMaterializer,
+    get_score_materializer,
+)
 
 
 class Neo4jGraphRepository(GraphEntityRepository):
-    def __init__(self, client: Type[Neo4jClient] = Neo4jClient):
+    def __init__(
+        self,
+        client: Type[Neo4jClient] = Neo4jClient,
+        versions: GraphVersionPort | None = None,
+        snapshots: AdjacencySnapshotStore | None = None,
+        scores: ScoreMaterializer | None = None,
+    ):
         self._client = client
+        # 每次写入成功后递增项目版本号，使查询缓存失效
+        self._versions = versions or get_graph_version_store()
+        # 并把拓扑变化增量应用到进程内邻接快照
+        self._snapshots = snapshots or get_adjacency_snapshot_store()
+        # 累计写入达到阈值时安排重新物化中心性/社区分数
+        self._scores = scores or get_score_materializer()
+
+    async def _committed(self, project_id: str, delta: SnapshotDelta | None = None) -> None:
+        """写入提交后：递增版本号、更新邻接快照，必要时安排分数重新物化"""
+        version = await self._versions.bump(project_id)
+        self._snapshots.apply_delta(project_id, version, delta or SnapshotDelta())
+        await self._scores.notify_write(project_id, version)
 
     async def merge_entity(self, entity: Entity) -> Entity:
         query = """
@@ -37,6 +67,7 @@ class Neo4jGraphRepository(GraphEntityRepository):
             "version": entity.version,
         }
         await self._client.execute_write(query, params)
+        await self._committed(entity.project_id)
         return entity
 
     async def merge_relation(self, relation: Relation) -> Relation:
@@ -64,14 +95,75 @@ class Neo4jGraphRepository(GraphEntityRepository):
         result = await self._client.execute_write(query, params)
         if not result:
             raise ValueError("Source or target entity not found for relation merge")
+        await self._committed(relation.project_id, SnapshotDelta(
+            added_relations=[(relation.source_id, relation.target_id, relation.id, params["type"])]
+        ))
         return relation
 
+    async def merge_entities_bulk(self, entities: list[Entity]) -> int:
+        """Merge a batch of entities with a single UNWIND round trip.
+
+        All entities must belong to the same project. Returns the number of merged nodes.
+        """
+        if not entities:
+            return 0
+        project_id = _single_project_id(entities)
+        rows = [
+            {
+                "id": entity.id,
+                "external_id": entity.external_id,
+                "type": entity.type.value if hasattr(entity.type, "value") else entity.type,
+                "labels": entity.labels,
+                "properties_json": json.dumps(entity.properties),
+                "version": entity.version,
+            }
+            for entity in entities
+        ]
+        result = await self._client.execute_write(
+            queries.BATCH_CREATE_ENTITIES, {"project_id": project_id, "entities": rows}
+        )
+        await self._committed(project_id)
+        return result[0].get("created_count", 0) if result else 0
+
+    async def merge_relations_bulk(self, relations: list[Relation]) -> list[str]:
+        """Merge a batch of relations with a single UNWIND round trip.
+
+        Relations whose source or target entity does not exist are skipped by the
+        query; the ids of the relations that were actually merged are returned so
+        callers can report the missing ones.
+        """
+        if not relations:
+            return []
+        project_id = _single_project_id(relations)
+        rows = [
+            {
+                "id": relation.id,
+                "source_id": relation.source_id,
+                "target_id": relation.target_id,
+                "type": relation.type.value if hasattr(relation.type, "value") else relation.type,
+                "properties_json": json.dumps(relation.properties),
+            }
+            for relation in relations
+        ]
+        result = await self._client.execute_write(
+            queries.BATCH_CREATE_RELATIONS, {"project_id": project_id, "relations": rows}
+        )
+        merged_ids = list(result[0].get("merged_ids", [])) if result else []
+        merged = set(merged_ids)
+        await self._committed(project_id, SnapshotDelta(added_relations=[
+            (row["source_id"], row["target_id"], row["id"], row["type"])
+            for row in rows
+            if row["id"] in merged
+        ]))
+        return merged_ids
+
     async def delete_entity(self, project_id: str, entity_id: str) -> None:
         query = """
         MATCH (n:Entity {id: $entity_id, project_id: $project_id})
         DETACH DELETE n
         """
         await self._client.execute_write(query, {"entity_id": entity_id, "project_id": project_id})
+        await self._committed(project_id, SnapshotDelta(removed_entity_ids=[entity_id]))
 
     async def delete_relation(self, project_id: str, relation_id: str) -> None:
         query = """
@@ -79,45 +171,61 @@ class Neo4jGraphRepository(GraphEntityRepository):
         DELETE r
         """
         await self._client.execute_write(query, {"relation_id": relation_id, "project_id": project_id})
-
-    async def find_neighbors(self, project_id: str, entity_id: str, depth: int = 1) -> dict[str, list[Any]]:
-        depth = max(depth, 0)
-        node_pattern = self._pattern(depth, include_zero=True)
-        nodes_query = f"""
-        MATCH path = (start:Entity {{id: $entity_id, project_id: $project_id}})-[:RELATION{node_pattern}]-(neighbor:Entity {{project_id: $project_id}})
-        RETURN DISTINCT neighbor AS node
+        await self._committed(project_id, SnapshotDelta(removed_relation_ids=[relation_id]))
+
+    async def find_neighbors(
+        self,
+        project_id: str,
+        entity_id: str,
+        depth: int = 1,
+        limit: int | None = None,
+        *,
+        include_relations: bool = True,
+    ) -> dict[str, list[Any]]:
+        """Breadth-first neighbourhood of an entity in a single query.
+
+        Each hop expands only the distinct nodes first reached on the previous hop,
+        so distance is the hop number and no paths are enumerated. ``limit`` caps the
+        neighbours (excluding the start entity) and the relations inside the database;
+        it defaults to ``GRAPH_NEIGHBOR_MAX_RESULTS``. Entities carry their
+        ``distance``, with the start entity first at distance 0.
         """
-        nodes_records = await self._client.execute_read(
-            nodes_query, {"entity_id": entity_id, "project_id": project_id}
+        depth = max(depth, 0)
+        limit = limit if limit and limit > 0 else settings.graph_neighbor_max_results
+        query = (
+            queries.NEIGHBOR_EXPANSION_START
+            + queries.NEIGHBOR_EXPANSION_HOP * depth
+            + queries.NEIGHBOR_EXPANSION_RETURN
         )
-
-        entities = [_node_to_dict(record["node"]) for record in nodes_records]
-
-        relations: List[Dict[str, Any]] = []
-        if depth > 0:
-            rel_pattern = self._pattern(depth, include_zero=False)
-            rel_query = f"""
-            MATCH path = (start:Entity {{id: $entity_id, project_id: $project_id}})-[:RELATION{rel_pattern}]-(neighbor:Entity {{project_id: $project_id}})
-            UNWIND relationships(path) AS rel
-            WITH DISTINCT rel
-            RETURN rel AS rel, startNode(rel).id AS source_id, endNode(rel).id AS target_id
-            """
-            rel_records = await self._client.execute_read(
-                rel_query, {"entity_id": entity_id, "project_id": project_id}
-            )
-            relations = [
-                _relation_to_dict(record["rel"], record["source_id"], record["target_id"])
-                for record in rel_records
-            ]
-
+        records = await self._client.execute_read(
+            query,
+            {
+                "entity_id": entity_id,
+                "project_id": project_id,
+                "limit": limit,
+                "include_relations": include_relations and depth > 0,
+            },
+        )
+        if not records:
+            return {"entities": [], "relations": []}
+
+        record = records[0]
+        entities = [
+            {**_node_to_dict(row["entity"]), "distance": row["distance"]}
+            for row in record["neighbors"]
+        ]
+        relations = [
+            _relation_to_dict(row["relation"], row["source_id"], row["target_id"])
+            for row in record["relations"]
+        ]
         return {"entities": entities, "relations": relations}
 
-    @staticmethod
-    def _pattern(depth: int, *, include_zero: bool) -> str:
-        if include_zero:
-            return f"*0..{depth}"
-        upper = max(depth, 1)
-        return f"*1..{upper}"
+
+def _single_project_id(items: List[Entity] | List[Relation]) -> str:
+    project_ids = {item.project_id for item in items}
+    if len(project_ids) != 1:
+        raise ValueError("Bulk merge requires all items to belong to the same project")
+    return project_ids.pop()
 
 
 def _node_to_dict(node: Node) -> Dict[str, Any]:
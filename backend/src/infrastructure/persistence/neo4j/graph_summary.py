@@ -0,0 +1,315 @@
+"""大图的多分辨率摘要：按社区或实体类型聚合的超节点
+
+项目实体数超过可视化节点上限时，可视化接口返回超节点而不是任意截取的一部分
+节点：每个超节点是一个分组（已物化的 Louvain 社区 community_id，或实体类型），
+带有成员数、组内关系数和主要实体类型；超节点之间的边是两组之间的关系数。
+
+只保留成员最多的 max_groups - 1 个分组，其余（以及尚未分配社区的新实体）合并为
+一个不可下钻的 "other" 超节点；超节点之间的边按权重保留前 max_groups · 4 条。
+首屏数据量因此只取决于 max_groups，与项目规模无关。
+
+摘要按 (项目ID, 分组方式, 分组上限) 连同计算时的图数据版本号写入查询缓存。写入后
+版本号变化时先返回上一版摘要，同时在后台重新计算（stale-while-revalidate），只有
+没有任何缓存时请求才等待计算。缓存后端为 redis 时，分数物化任务完成后会预先计算
+默认上限的摘要，各 worker 的首屏直接命中。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from typing import Any
+
+from redis.exceptions import RedisError
+
+from src.config import settings
+from src.domain.ports.repositories import GraphVersionPort, PreviewCachePort
+from src.infrastructure.cache.graph_version import get_graph_version_store
+from src.infrastructure.cache.in_memory import InMemoryPreviewCache
+from src.infrastructure.persistence.neo4j import cypher_queries as queries
+from src.infrastructure.persistence.neo4j.client import Neo4jClient
+from src.infrastructure.persistence.neo4j.score_materializer import (
+    ScoreMaterializer,
+    get_score_materializer,
+)
+
+logger = logging.getLogger(__name__)
+
+# 版本号存储和缓存（redis 后端）可能出现的错误：连接失败、（反）序列化失败
+_STORE_ERRORS = (RedisError, OSError, TypeError, ValueError)
+
+SUMMARY_GROUP_BY = ("community", "type")
+
+OTHER_GROUP = "other"
+
+# 分组方式 -> 节点属性
+_GROUP_PROPERTIES = {"community": "community_id", "type": "type"}
+
+
+@dataclass(slots=True)
+class SuperNode:
+    """超节点
+
+    Attributes:
+        group: 分组值（社区ID或实体类型，合并的剩余分组为 "other"）
+        member_count: 成员实体数
+        internal_edges: 组内关系数
+        dominant_type: 成员中最多的实体类型
+    """
+    group: str
+    member_count: int
+    internal_edges: int
+    dominant_type: str
+
+
+@dataclass(slots=True)
+class SuperEdge:
+    """超节点之间的聚合边
+
+    Attributes:
+        source_group: 起点分组
+        target_group: 终点分组
+        weight: 两组之间的关系数
+    """
+    source_group: str
+    target_group: str
+    weight: int
+
+
+@dataclass(slots=True)
+class GraphSummary:
+    """项目图摘要
+
+    Attributes:
+        group_by: 实际使用的分组方式（社区未物化时为 type）
+        entity_count: 项目实体总数
+        nodes: 超节点，按成员数降序
+        edges: 超节点之间的边，按权重降序
+        truncated_groups: 合并进 "other" 的分组数
+    """
+    group_by: str
+    entity_count: int
+    nodes: list[SuperNode]
+    edges: list[SuperEdge]
+    truncated_groups: int = 0
+
+
+@dataclass(slots=True)
+class CachedSummary:
+    """缓存的摘要及计算时的图数据版本号"""
+    version: int
+    summary: GraphSummary
+
+
+class GraphSummarizer:
+    """计算并缓存项目图摘要"""
+
+    def __init__(
+        self,
+        client: type[Neo4jClient] = Neo4jClient,
+        cache: PreviewCachePort | None = None,
+        versions: GraphVersionPort | None = None,
+        scores: ScoreMaterializer | None = None,
+        ttl_seconds: int | None = None,
+    ):
+        self._client = client
+        self._cache = cache or _summary_cache()
+        self._versions = versions or get_graph_version_store()
+        self._scores = scores or get_score_materializer()
+        self._ttl = settings.graph_summary_cache_ttl if ttl_seconds is None else ttl_seconds
+        self._refreshing: dict[str, asyncio.Task] = {}
+
+    async def entity_count(self, project_id: str) -> int:
+        """项目实体数（按图数据版本缓存；版本号读取失败时直接计数）"""
+        version = await self._version(project_id)
+        key = f"graph_summary:{project_id}:v{version}:count"
+        if version is not None:
+            cached = await self._cache_get(key)
+            if cached is not None:
+                return cached
+        records = await self._client.execute_read(
+            queries.COUNT_PROJECT_ENTITIES, {"project_id": project_id}
+        )
+        count = records[0]["entity_count"] if records else 0
+        if version is not None:
+            await self._cache_set(key, count)
+        return count
+
+    async def summarize(
+        self,
+        project_id: str,
+        group_by: str = "community",
+        max_groups: int | None = None,
+    ) -> GraphSummary:
+        """获取项目图摘要
+
+        缓存的摘要落后于当前图数据版本时照常返回，并在后台重新计算；版本号读取失败时
+        跳过缓存直接计算。
+
+        Args:
+            project_id: 项目ID
+            group_by: community 或 type；社区尚未物化时按 type 分组
+            max_groups: 超节点数上限（含 "other"），None 使用 graph_summary_max_groups
+
+        Returns:
+            图摘要
+
+        Raises:
+            ValueError: 不支持的分组方式或上限小于 2
+        """
+        if group_by not in SUMMARY_GROUP_BY:
+            raise ValueError(f"Unsupported group_by: {group_by}. Supported: {list(SUMMARY_GROUP_BY)}")
+        max_groups = settings.graph_summary_max_groups if max_groups is None else max_groups
+        if max_groups < 2:
+            raise ValueError("max_groups must be at least 2")
+        if group_by == "community" and not await self._scores.is_materialized(project_id):
+            group_by = "type"
+
+        version = await self._version(project_id)
+        if version is None:
+            return await self._compute(project_id, group_by, max_groups)
+        key = f"graph_summary:{project_id}:{group_by}:{max_groups}"
+        cached = await self._cache_get(key)
+        if cached is None:
+            return await self._refresh(key, project_id, group_by, max_groups)
+        if cached.version != version:
+            self._schedule_refresh(key, project_id, group_by, max_groups)
+        return cached.summary
+
+    async def _refresh(self, key: str, project_id: str, group_by: str, max_groups: int) -> GraphSummary:
+        """按当前版本重新计算并写入缓存（版本号读取失败时只计算）"""
+        version = await self._version(project_id)
+        summary = await self._compute(project_id, group_by, max_groups)
+        if version is None:
+            return summary
+        await self._cache_set(key, CachedSummary(version=version, summary=summary))
+        await self._cache_set(f"graph_summary:{project_id}:v{version}:count", summary.entity_count)
+        return summary
+
+    def _schedule_refresh(self, key: str, project_id: str, group_by: str, max_groups: int) -> None:
+        if key in self._refreshing:
+            return
+        task = asyncio.create_task(self._refresh(key, project_id, group_by, max_groups))
+        self._refreshing[key] = task
+        task.add_done_callback(lambda t: self._refresh_done(key, t))
+
+    def _refresh_done(self, key: str, task: asyncio.Task) -> None:
+        self._refreshing.pop(key, None)
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning(f"Background graph summary refresh for {key} failed: {task.exception()}")
+
+    async def _compute(self, project_id: str, group_by: str, max_groups: int) -> GraphSummary:
+        params = {"project_id": project_id, "group_property": _GROUP_PROPERTIES[group_by]}
+
+        members: Counter[str] = Counter()
+        types: dict[str, Counter[str]] = defaultdict(Counter)
+        async for record in self._client.iter_read(queries.SUMMARIZE_ENTITY_GROUPS, params):
+            group = _group_key(record["group"])
+            members[group] += record["members"]
+            types[group][record["entity_type"] or "OTHER"] += record["members"]
+
+        kept = {group for group, _ in members.most_common(max_groups - 1) if group != OTHER_GROUP}
+        other_groups = [group for group in members if group not in kept]
+
+        def bucket(group: Any) -> str:
+            group = _group_key(group)
+            return group if group in kept else OTHER_GROUP
+
+        internal: Counter[str] = Counter()
+        between: Counter[tuple[str, str]] = Counter()
+        async for record in self._client.iter_read(queries.SUMMARIZE_RELATION_GROUPS, params):
+            source, target = bucket(record["source_group"]), bucket(record["target_group"])
+            if source == target:
+                internal[source] += record["weight"]
+            else:
+                between[(source, target)] += record["weight"]
+
+        nodes = [
+            SuperNode(
+                group=group,
+                member_count=members[group],
+                internal_edges=internal[group],
+                dominant_type=types[group].most_common(1)[0][0],
+            )
+            for group in sorted(kept, key=lambda g: (-members[g], g))
+        ]
+        if other_groups:
+            other_types: Counter[str] = Counter()
+            for group in other_groups:
+                other_types.update(types[group])
+            nodes.append(SuperNode(
+                group=OTHER_GROUP,
+                member_count=sum(members[group] for group in other_groups),
+                internal_edges=internal[OTHER_GROUP],
+                dominant_type=other_types.most_common(1)[0][0],
+            ))
+
+        # 两次读取之间新增的实体可能落在没有超节点的分组里
+        groups = {node.group for node in nodes}
+        edges = [
+            SuperEdge(source_group=source, target_group=target, weight=weight)
+            for (source, target), weight in between.most_common()
+            if source in groups and target in groups
+        ][:max_groups * 4]
+        return GraphSummary(
+            group_by=group_by,
+            entity_count=sum(members.values()),
+            nodes=nodes,
+            edges=edges,
+            truncated_groups=len([g for g in other_groups if g != OTHER_GROUP]),
+        )
+
+    async def _version(self, project_id: str) -> int | None:
+        try:
+            return await self._versions.get(project_id)
+        except _STORE_ERRORS as e:
+            logger.warning(f"Graph version lookup failed for summary of {project_id}: {e}")
+            return None
+
+    async def _cache_get(self, key: str) -> Any | None:
+        try:
+            return await self._cache.get(key)
+        except _STORE_ERRORS as e:
+            logger.warning(f"Graph summary cache get error: {e}")
+            return None
+
+    async def _cache_set(self, key: str, value: Any) -> None:
+        if self._ttl <= 0:
+            return
+        try:
+            await self._cache.set(key, value, self._ttl)
+        except _STORE_ERRORS as e:
+            logger.warning(f"Graph summary cache set error: {e}")
+
+
+_cache: PreviewCachePort | None = None
+
+
+def _summary_cache() -> PreviewCachePort:
+    """进程内共享的摘要缓存，后端与查询缓存相同：redis 时多个 worker 与后台任务共享"""
+    global _cache
+    if _cache is None:
+        if settings.query_cache_backend == "redis":
+            from src.infrastructure.cache.redis_cache import RedisPreviewCache
+            _cache = RedisPreviewCache()
+        else:
+            _cache = InMemoryPreviewCache()
+    return _cache
+
+
+def _group_key(value: Any) -> str:
+    """分组值统一为字符串；没有分组（新实体尚未分配社区）归入 other"""
+    return OTHER_GROUP if value is None else str(value)
+
+
+_summarizer: GraphSummarizer | None = None
+
+
+def get_graph_summarizer() -> GraphSummarizer:
+    """获取进程内共享的图摘要器"""
+    global _summarizer
+    if _summarizer is None:
+        _summarizer = GraphSummarizer()
+    return _summarizer
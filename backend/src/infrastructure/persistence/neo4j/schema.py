@@ -0,0 +1,269 @@
+"""Neo4j 索引与约束管理
+
+所有 Cypher 模板都按 (:Entity {id, project_id}) 匹配或按 project_id/type 过滤，
+没有索引时 MATCH/MERGE 会退化为标签扫描。本模块以幂等方式（IF NOT EXISTS）
+创建所需的约束和索引，并能检查缺失或未就绪的项。
+
+应用启动时由 main.py 的 lifespan 调用 bootstrap_schema；也可以手动执行::
+
+    python -m src.infrastructure.persistence.neo4j.schema apply
+    python -m src.infrastructure.persistence.neo4j.schema check
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import Type
+
+from src.infrastructure.persistence.neo4j.client import Neo4jClient
+
+logger = logging.getLogger(__name__)
+
+# 实体搜索全文索引，覆盖 CONTAINS 扫描匹配的名称、类型、标签和属性；
+# cjk 分析器按二元组切分中日韩文本。标签为字符串列表，需要 Neo4j 5.18+ 才会被索引
+ENTITY_FULLTEXT_INDEX = "entity_search_fulltext"
+
+
+@dataclass(frozen=True, slots=True)
+class SchemaItem:
+    """一个需要存在的约束或索引"""
+    name: str
+    kind: str  # constraint, index
+    statement: str
+
+
+SCHEMA_ITEMS: tuple[SchemaItem, ...] = (
+    # 唯一约束同时提供 (id, project_id) 上的复合索引，MERGE/MATCH 按此定位实体
+    SchemaItem(
+        name="entity_id_project_unique",
+        kind="constraint",
+        statement=(
+            "CREATE CONSTRAINT entity_id_project_unique IF NOT EXISTS "
+            "FOR (n:Entity) REQUIRE (n.id, n.project_id) IS UNIQUE"
+        ),
+    ),
+    SchemaItem(
+        name="entity_project_id",
+        kind="index",
+        statement=(
+            "CREATE INDEX entity_project_id IF NOT EXISTS "
+            "FOR (n:Entity) ON (n.project_id)"
+        ),
+    ),
+    SchemaItem(
+        name="entity_project_type",
+        kind="index",
+        statement=(
+            "CREATE INDEX entity_project_type IF NOT EXISTS "
+            "FOR (n:Entity) ON (n.project_id, n.type)"
+        ),
+    ),
+    SchemaItem(
+        name="entity_project_external_id",
+        kind="index",
+        statement=(
+            "CREATE INDEX entity_project_external_id IF NOT EXISTS "
+            "FOR (n:Entity) ON (n.project_id, n.external_id)"
+        ),
+    ),
+    # 列表接口按 (updated_at, id) 键集分页
+    SchemaItem(
+        name="entity_project_updated_at",
+        kind="index",
+        statement=(
+            "CREATE INDEX entity_project_updated_at IF NOT EXISTS "
+            "FOR (n:Entity) ON (n.project_id, n.updated_at)"
+        ),
+    ),
+    SchemaItem(
+        name="relation_id",
+        kind="index",
+        statement=(
+            "CREATE INDEX relation_id IF NOT EXISTS "
+            "FOR ()-[r:RELATION]-() ON (r.id)"
+        ),
+    ),
+    SchemaItem(
+        name="relation_project_type",
+        kind="index",
+        statement=(
+            "CREATE INDEX relation_project_type IF NOT EXISTS "
+            "FOR ()-[r:RELATION]-() ON (r.project_id, r.type)"
+        ),
+    ),
+    SchemaItem(
+        name="relation_project_updated_at",
+        kind="index",
+        statement=(
+            "CREATE INDEX relation_project_updated_at IF NOT EXISTS "
+            "FOR ()-[r:RELATION]-() ON (r.project_id, r.updated_at)"
+        ),
+    ),
+    # 物化分数的 top-k 读取和按社区分组
+    SchemaItem(
+        name="entity_project_pagerank",
+        kind="index",
+        statement=(
+            "CREATE INDEX entity_project_pagerank IF NOT EXISTS "
+            "FOR (n:Entity) ON (n.project_id, n.pagerank)"
+        ),
+    ),
+    SchemaItem(
+        name="entity_project_betweenness",
+        kind="index",
+        statement=(
+            "CREATE INDEX entity_project_betweenness IF NOT EXISTS "
+            "FOR (n:Entity) ON (n.project_id, n.betweenness)"
+        ),
+    ),
+    SchemaItem(
+        name="entity_project_community",
+        kind="index",
+        statement=(
+            "CREATE INDEX entity_project_community IF NOT EXISTS "
+            "FOR (n:Entity) ON (n.project_id, n.community_id)"
+        ),
+    ),
+    SchemaItem(
+        name="score_materialization_project",
+        kind="index",
+        statement=(
+            "CREATE INDEX score_materialization_project IF NOT EXISTS "
+            "FOR (m:ScoreMaterialization) ON (m.project_id)"
+        ),
+    ),
+    SchemaItem(
+        name=ENTITY_FULLTEXT_INDEX,
+        kind="index",
+        statement=(
+            f"CREATE FULLTEXT INDEX {ENTITY_FULLTEXT_INDEX} IF NOT EXISTS "
+            "FOR (n:Entity) ON EACH [n.external_id, n.type, n.labels, n.properties_json] "
+            "OPTIONS {indexConfig: {`fulltext.analyzer`: 'cjk'}}"
+        ),
+    ),
+)
+
+SHOW_INDEXES = """
+SHOW INDEXES YIELD name, state
+RETURN name, state
+"""
+
+SHOW_CONSTRAINTS = """
+SHOW CONSTRAINTS YIELD name
+RETURN name
+"""
+
+AWAIT_INDEXES = "CALL db.awaitIndexes($timeout_seconds)"
+
+
+class Neo4jSchemaManager:
+    """Neo4j 约束/索引管理器"""
+
+    def __init__(
+        self,
+        client: Type[Neo4jClient] = Neo4jClient,
+        items: tuple[SchemaItem, ...] = SCHEMA_ITEMS,
+    ):
+        self._client = client
+        self._items = items
+
+    @property
+    def items(self) -> tuple[SchemaItem, ...]:
+        return self._items
+
+    async def apply(self) -> list[str]:
+        """创建全部约束和索引（已存在的跳过）
+
+        Returns:
+            创建失败的项名称列表（例如已有数据违反唯一约束）
+        """
+        failed = []
+        for item in self._items:
+            # 模式变更不能与其它语句共用事务，逐条执行
+            try:
+                await self._client.execute_write(item.statement)
+            except Exception as e:
+                logger.error(f"Failed to create Neo4j {item.kind} {item.name}: {e}")
+                failed.append(item.name)
+        return failed
+
+    async def find_missing(self) -> dict[str, str]:
+        """检查缺失或未就绪的约束/索引
+
+        Returns:
+            名称 -> 状态（"MISSING" 或索引的非 ONLINE 状态，如 POPULATING/FAILED）
+        """
+        index_states = {
+            record["name"]: record["state"]
+            for record in await self._client.execute_read(SHOW_INDEXES)
+        }
+        constraints = {
+            record["name"]
+            for record in await self._client.execute_read(SHOW_CONSTRAINTS)
+        }
+
+        problems = {}
+        for item in self._items:
+            if item.kind == "constraint":
+                if item.name not in constraints:
+                    problems[item.name] = "MISSING"
+                continue
+            state = index_states.get(item.name)
+            if state is None:
+                problems[item.name] = "MISSING"
+            elif state != "ONLINE":
+                problems[item.name] = state
+        return problems
+
+    async def await_online(self, timeout_seconds: int = 300) -> None:
+        """等待所有索引完成填充"""
+        await self._client.execute_read(AWAIT_INDEXES, {"timeout_seconds": timeout_seconds})
+
+
+async def bootstrap_schema(manager: Neo4jSchemaManager | None = None) -> dict[str, str]:
+    """启动时确保模式存在并报告缺失项
+
+    失败不会阻止应用启动，只记录日志。
+
+    Returns:
+        find_missing 的结果
+    """
+    manager = manager or Neo4jSchemaManager()
+    await manager.apply()
+    try:
+        problems = await manager.find_missing()
+    except Exception as e:
+        logger.error(f"Failed to inspect Neo4j schema: {e}")
+        return {item.name: "UNKNOWN" for item in manager.items}
+    if problems:
+        details = ", ".join(f"{name}={state}" for name, state in problems.items())
+        logger.warning(f"Neo4j schema incomplete, queries may fall back to label scans: {details}")
+    else:
+        logger.info("Neo4j schema check passed")
+    return problems
+
+
+async def _main(command: str) -> int:
+    await Neo4jClient.connect()
+    try:
+        manager = Neo4jSchemaManager()
+        if command == "apply":
+            failed = await manager.apply()
+            for name in failed:
+                print(f"FAILED  {name}")
+        problems = await manager.find_missing()
+        for item in manager.items:
+            print(f"{problems.get(item.name, 'ONLINE'):<10} {item.kind:<10} {item.name}")
+        return 1 if problems else 0
+    finally:
+        await Neo4jClient.disconnect()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Manage Neo4j indexes and constraints")
+    parser.add_argument("command", choices=["apply", "check"])
+    args = parser.parse_args()
+    raise SystemExit(asyncio.run(_main(args.command)))
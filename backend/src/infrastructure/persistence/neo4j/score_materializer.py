@@ -0,0 +1,220 @@
+"""中心性与社区分数物化
+
+把 PageRank、Betweenness 和 Louvain 社区写成实体节点属性（pagerank、betweenness、
+community_id，附带 scores_computed_at），top-k、社区和可视化查询改为按属性读取，
+不必每次请求都运行算法。
+
+每个项目有一个 (:ScoreMaterialization {project_id}) 标记节点，记录计算时的图数据
+版本号。重新计算的时机：
+
+- 写入阈值：距上次物化累计写入 score_materialize_write_threshold 次后，写入路径
+  把后台任务 graph.materialize_scores 放入队列
+- 定时：celery beat 每 score_materialize_interval_seconds 秒调用
+  graph.refresh_stale_scores，重新计算版本号已变化的项目。只在版本号跨进程共享
+  （query_cache_backend=redis）时启用：内存版本号只反映 beat worker 自己的写入，
+  无法判断其它进程写入后项目是否过期
+
+物化分数可能落后于最新写入，读取方只把它用作排序和展示依据。
+"""
+
+from __future__ import annotations
+
+import logging
+from datetime import datetime, timezone
+from typing import Any, Type
+
+from src.config import settings
+from src.domain.ports.repositories import GraphVersionPort, TaskQueuePort
+from src.infrastructure.cache.graph_version import RedisGraphVersionStore, get_graph_version_store
+from src.infrastructure.persistence.neo4j import cypher_queries as queries
+from src.infrastructure.persistence.neo4j.client import Neo4jClient
+from src.infrastructure.persistence.neo4j.graph_algorithms import GraphAlgorithmRunner
+
+logger = logging.getLogger(__name__)
+
+MATERIALIZE_TASK = "graph.materialize_scores"
+
+_TOP_QUERIES = {
+    "pagerank": queries.TOP_ENTITIES_BY_PAGERANK,
+    "betweenness": queries.TOP_ENTITIES_BY_BETWEENNESS,
+}
+
+
+class ScoreMaterializer:
+    """项目分数的物化、过期判断与读取
+
+    Args:
+        client: Neo4j 客户端
+        versions: 项目图数据版本号存储
+        queue: 后台任务队列，None 时不按写入阈值入队
+        runner: 图算法执行器
+        write_threshold: 触发重新计算的累计写入次数
+        shared_versions: 版本号是否跨进程共享，默认按 versions 是否为 Redis 判断；
+            不共享时无法得知其它进程中的当前版本号，不按版本号判断过期
+    """
+
+    def __init__(
+        self,
+        client: Type[Neo4jClient] = Neo4jClient,
+        versions: GraphVersionPort | None = None,
+        queue: TaskQueuePort | None = None,
+        runner: GraphAlgorithmRunner | None = None,
+        write_threshold: int | None = None,
+        shared_versions: bool | None = None,
+    ):
+        self._client = client
+        self._versions = versions or get_graph_version_store()
+        self._queue = queue
+        self._runner = runner
+        self._write_threshold = (
+            settings.score_materialize_write_threshold if write_threshold is None else write_threshold
+        )
+        self._shared_versions = (
+            isinstance(self._versions, RedisGraphVersionStore) if shared_versions is None else shared_versions
+        )
+        # 项目ID -> 已知的物化版本号 / 已入队的版本号
+        self._materialized: dict[str, int] = {}
+        self._enqueued: dict[str, int] = {}
+
+    async def materialize(
+        self,
+        project_id: str,
+        graph_version: int | None = None,
+        force: bool = False,
+    ) -> dict[str, Any] | None:
+        """计算并写回项目分数
+
+        Args:
+            project_id: 项目ID
+            graph_version: 入队时的图数据版本号，None 表示读取当前版本号
+            force: 版本号未变化时也重新计算
+
+        Returns:
+            物化摘要；分数已是该版本、或版本号不共享而无法得知当前版本时返回 None
+
+        Raises:
+            GraphAlgorithmError: 计算或写回失败
+        """
+        if graph_version is None:
+            if not self._shared_versions:
+                logger.info(f"Graph version of {project_id} is not shared, skipping score materialization")
+                return None
+            graph_version = await self._versions.get(project_id)
+        # 其它进程可能已经物化过，以标记节点为准
+        self._materialized.pop(project_id, None)
+        if not force and await self._marker_version(project_id) == graph_version:
+            return None
+
+        computed_at = datetime.now(timezone.utc)
+        runner = self._runner or GraphAlgorithmRunner(self._client)
+        written = await runner.write_scores(project_id, computed_at)
+        await self._client.execute_write(
+            queries.SET_SCORE_MATERIALIZATION,
+            {"project_id": project_id, "graph_version": graph_version, "computed_at": computed_at},
+        )
+        self._materialized[project_id] = graph_version
+        logger.info(f"Materialized scores of {written} entities for project {project_id}")
+        return {
+            "project_id": project_id,
+            "graph_version": graph_version,
+            "entities": written,
+            "computed_at": computed_at.isoformat(),
+        }
+
+    async def stale_projects(self) -> list[str]:
+        """已物化但图数据版本号已变化的项目（版本号不共享时无法判断，返回空列表）"""
+        if not self._shared_versions:
+            return []
+        records = await self._client.execute_read(queries.LIST_SCORE_MATERIALIZATIONS)
+        stale = []
+        for record in records:
+            project_id = record["project_id"]
+            if record["graph_version"] != await self._versions.get(project_id):
+                stale.append(project_id)
+        return stale
+
+    async def notify_write(self, project_id: str, graph_version: int) -> None:
+        """写入提交后调用：累计写入达到阈值时把重新计算放入后台队列
+
+        只在可能达到阈值时才读取标记节点，失败只记录日志，不影响写入。
+        """
+        if self._write_threshold <= 0 or self._queue is None or graph_version < 0:
+            return
+        if not self._due(project_id, graph_version):
+            return
+        try:
+            self._materialized.pop(project_id, None)
+            await self._marker_version(project_id)
+            if not self._due(project_id, graph_version):
+                return
+            await self._queue.enqueue(
+                MATERIALIZE_TASK, {"project_id": project_id, "graph_version": graph_version}
+            )
+            self._enqueued[project_id] = graph_version
+        except Exception as e:
+            logger.warning(f"Failed to schedule score materialization for {project_id}: {e}")
+
+    def _due(self, project_id: str, graph_version: int) -> bool:
+        baseline = max(self._materialized.get(project_id, 0), self._enqueued.get(project_id, 0))
+        if baseline > graph_version:
+            # 内存版本号在重启后从 0 开始
+            baseline = 0
+        return graph_version - baseline >= self._write_threshold
+
+    async def is_materialized(self, project_id: str) -> bool:
+        """项目是否已有物化分数（查询失败时视为没有）"""
+        try:
+            return await self._marker_version(project_id) is not None
+        except Exception as e:
+            logger.warning(f"Failed to read score materialization of {project_id}: {e}")
+            return False
+
+    async def top_entities(
+        self,
+        project_id: str,
+        algorithm: str,
+        limit: int,
+    ) -> list[dict[str, Any]] | None:
+        """按物化分数取前 limit 个实体（格式同 run_pagerank）
+
+        Returns:
+            结果行；算法不支持物化或项目尚未物化时返回 None
+        """
+        query = _TOP_QUERIES.get(algorithm)
+        if query is None or not await self.is_materialized(project_id):
+            return None
+        return await self._client.execute_read(query, {"project_id": project_id, "limit": limit})
+
+    async def communities(self, project_id: str) -> list[dict[str, Any]] | None:
+        """物化的 Louvain 社区归属（格式同 run_louvain），未物化时返回 None"""
+        if not await self.is_materialized(project_id):
+            return None
+        return await self._client.execute_read(
+            queries.GET_MATERIALIZED_COMMUNITIES, {"project_id": project_id}
+        )
+
+    async def _marker_version(self, project_id: str) -> int | None:
+        """标记节点记录的版本号，已知的直接返回"""
+        if project_id in self._materialized:
+            return self._materialized[project_id]
+        records = await self._client.execute_read(
+            queries.GET_SCORE_MATERIALIZATION, {"project_id": project_id}
+        )
+        if not records:
+            return None
+        self._materialized[project_id] = records[0]["graph_version"]
+        return self._materialized[project_id]
+
+
+_materializer: ScoreMaterializer | None = None
+
+
+def get_score_materializer() -> ScoreMaterializer:
+    """获取进程内共享的分数物化器（后台任务通过 Celery 入队）"""
+    global _materializer
+    if _materializer is None:
+        from src.infrastructure.queue.celery_app import celery_app
+        from src.infrastructure.queue.celery_queue import CeleryTaskQueue
+
+        _materializer = ScoreMaterializer(queue=CeleryTaskQueue(celery_app))
+    return _materializer
@@ -0,0 +1,346 @@
+"""项目视口瓦片索引
+
+对项目邻接快照计算全图力引导布局，按坐标建立线性四叉树（见
+src.domain.services.analysis.tiles），前端平移/缩放时只按视口取 (z, x, y) 瓦片内的
+节点和边，不必一次下载整个图。
+
+索引保存为每个项目一个 .npz 文件（settings.graph_tile_dir），进程内缓存最近使用的
+项目。图数据版本号变化后继续返回旧索引，同时在后台以旧坐标热启动重新布局，已有
+节点基本保持原位，前端已加载的瓦片不会整体错位。索引只包含有关系的实体。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import zipfile
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+from redis.exceptions import RedisError
+
+from src.config import settings
+from src.domain.ports.repositories import GraphVersionPort
+from src.domain.services.analysis.tiles import build_tile_arrays, tile_key_range
+from src.infrastructure.cache.graph_version import get_graph_version_store
+from src.infrastructure.compute import run_in_worker
+from src.infrastructure.persistence.neo4j.adjacency_snapshot import (
+    AdjacencySnapshotStore,
+    decode_ids,
+    get_adjacency_snapshot_store,
+    project_path_segment,
+)
+
+logger = logging.getLogger(__name__)
+
+# 索引文件格式版本，格式变化时旧文件被忽略
+TILE_INDEX_FORMAT = 1
+
+_ARRAYS = ("node_keys", "x", "y", "morton", "min_zoom", "indptr", "indices")
+
+
+class TileIndexUnavailableError(Exception):
+    """项目没有可用的邻接快照（快照被禁用或关系数超过上限）"""
+
+
+@dataclass(slots=True)
+class Tile:
+    """一个瓦片的内容
+
+    Attributes:
+        node_ids: 瓦片内在当前层级显示的实体ID（按 Morton 顺序）
+        x: 节点X坐标
+        y: 节点Y坐标
+        edges: 关系 (source_id, target_id)，至少一端在瓦片内，另一端在该层级可见
+            （可能位于相邻瓦片，同一条边会出现在两个瓦片中）
+        truncated: 边数超过上限被截断
+    """
+    node_ids: list[str]
+    x: list[float]
+    y: list[float]
+    edges: list[tuple[str, str]]
+    truncated: bool = False
+
+
+class TileIndex:
+    """按 Morton 编码排序的节点坐标、显示层级和无向邻接
+
+    Attributes:
+        project_id: 项目ID
+        version: 构建时的图数据版本号
+        origin_x / origin_y / size: 第 0 层瓦片覆盖的正方形
+        max_zoom: 所有节点都已显示的层级
+        capacity: 每个瓦片的节点数上限
+    """
+
+    def __init__(
+        self,
+        project_id: str,
+        version: int,
+        arrays: dict[str, np.ndarray],
+        node_codec: str,
+        meta: dict,
+    ):
+        self.project_id = project_id
+        self.version = version
+        self.node_keys = arrays["node_keys"]
+        self.x = arrays["x"]
+        self.y = arrays["y"]
+        self.morton = arrays["morton"]
+        self.min_zoom = arrays["min_zoom"]
+        self.indptr = arrays["indptr"]
+        self.indices = arrays["indices"]
+        self.node_codec = node_codec
+        self.origin_x = float(meta["origin_x"])
+        self.origin_y = float(meta["origin_y"])
+        self.size = float(meta["size"])
+        self.max_zoom = int(meta["max_zoom"])
+        self.capacity = int(meta["capacity"])
+
+    @property
+    def node_count(self) -> int:
+        return len(self.node_keys)
+
+    def tile(self, z: int, x: int, y: int, max_edges: int) -> Tile:
+        """取瓦片 (z, x, y) 的节点和边
+
+        瓦片 x 沿布局X轴、y 沿布局Y轴递增，第 z 层共 2^z × 2^z 个瓦片。
+
+        Raises:
+            ValueError: 瓦片编号越界
+        """
+        lo_key, hi_key = tile_key_range(z, x, y)
+        lo = int(np.searchsorted(self.morton, np.uint64(lo_key)))
+        hi = int(np.searchsorted(self.morton, np.uint64(hi_key)))
+        visible_zoom = min(z, self.max_zoom)
+        nodes = lo + np.flatnonzero(self.min_zoom[lo:hi] <= visible_zoom)
+
+        # 展开瓦片内节点的邻接，保留另一端在该层级可见的边；两端都在瓦片内时只保留一次
+        starts = self.indptr[nodes]
+        counts = self.indptr[nodes + 1] - starts
+        heads = np.repeat(nodes, counts)
+        offsets = np.repeat(starts - np.concatenate([[0], np.cumsum(counts)[:-1]]), counts)
+        tails = self.indices[offsets + np.arange(len(heads))].astype(np.int64)
+        inside = (tails >= lo) & (tails < hi)
+        keep = (self.min_zoom[tails] <= visible_zoom) & (~inside | (heads < tails))
+        heads, tails = heads[keep], tails[keep]
+
+        truncated = len(heads) > max_edges
+        if truncated:
+            # 优先保留连向更重要（更早显示）节点的边
+            order = np.argsort(self.min_zoom[tails], kind="stable")[:max_edges]
+            heads, tails = heads[order], tails[order]
+
+        endpoints, inverse = np.unique(np.concatenate([nodes, heads, tails]), return_inverse=True)
+        ids = decode_ids(self.node_keys[endpoints], self.node_codec)
+        node_ids = [ids[i] for i in inverse[:len(nodes)]]
+        edge_source = inverse[len(nodes):len(nodes) + len(heads)]
+        edge_target = inverse[len(nodes) + len(heads):]
+        return Tile(
+            node_ids=node_ids,
+            x=self.x[nodes].tolist(),
+            y=self.y[nodes].tolist(),
+            edges=[(ids[s], ids[t]) for s, t in zip(edge_source.tolist(), edge_target.tolist())],
+            truncated=truncated,
+        )
+
+    def save(self, path: Path) -> None:
+        """保存为 .npz（先写临时文件再改名，读方不会看到写了一半的索引）"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{path.stem}.tmp-{os.getpid()}.npz")
+        meta = {
+            "format": TILE_INDEX_FORMAT,
+            "project_id": self.project_id,
+            "version": self.version,
+            "node_codec": self.node_codec,
+            "origin_x": self.origin_x,
+            "origin_y": self.origin_y,
+            "size": self.size,
+            "max_zoom": self.max_zoom,
+            "capacity": self.capacity,
+        }
+        np.savez(
+            tmp,
+            meta=np.array(json.dumps(meta, ensure_ascii=False)),
+            **{name: getattr(self, name) for name in _ARRAYS},
+        )
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: Path) -> TileIndex:
+        """加载 save 写出的索引
+
+        Raises:
+            ValueError: 文件格式不兼容
+            FileNotFoundError: 索引不存在
+        """
+        with np.load(Path(path)) as data:
+            meta = json.loads(str(data["meta"]))
+            if meta.get("format") != TILE_INDEX_FORMAT:
+                raise ValueError(f"Unsupported tile index format: {meta.get('format')}")
+            arrays = {name: data[name] for name in _ARRAYS}
+        return cls(meta["project_id"], meta["version"], arrays, meta["node_codec"], meta)
+
+
+class TileIndexStore:
+    """按项目构建、持久化和缓存瓦片索引
+
+    Args:
+        snapshots: 邻接快照存储
+        versions: 项目图数据版本号存储
+        directory: 索引文件目录，None 表示不落盘
+        max_projects: 进程内缓存的项目数
+        capacity: 每个瓦片的节点数上限
+    """
+
+    def __init__(
+        self,
+        snapshots: AdjacencySnapshotStore | None = None,
+        versions: GraphVersionPort | None = None,
+        directory: Path | None = None,
+        max_projects: int | None = None,
+        capacity: int | None = None,
+    ):
+        self._snapshots = snapshots or get_adjacency_snapshot_store()
+        self._versions = versions or get_graph_version_store()
+        self._directory = Path(directory) if directory else None
+        self._max_projects = settings.graph_tile_max_projects if max_projects is None else max_projects
+        self._capacity = settings.graph_tile_capacity if capacity is None else capacity
+        self._indexes: OrderedDict[str, TileIndex] = OrderedDict()
+        self._locks: dict[str, asyncio.Lock] = {}
+        self._rebuilding: dict[str, asyncio.Task] = {}
+
+    async def get(self, project_id: str) -> TileIndex:
+        """获取项目瓦片索引
+
+        没有索引时构建；索引落后于当前图数据版本时照常返回，并在后台重新构建。
+        版本号读取失败时返回已有索引，不触发重新构建。
+
+        Raises:
+            TileIndexUnavailableError: 项目没有可用的邻接快照
+        """
+        index = self._cached(project_id)
+        if index is None:
+            lock = self._locks.setdefault(project_id, asyncio.Lock())
+            async with lock:
+                index = self._cached(project_id)
+                if index is None:
+                    index = self._read_disk(project_id)
+                    if index is None:
+                        index = await self.rebuild(project_id)
+                    self._put(index)
+
+        try:
+            version = await self._versions.get(project_id)
+        except (RedisError, OSError, ValueError) as e:
+            logger.warning(f"Graph version lookup failed for tile index of {project_id}: {e}")
+            return index
+        if index.version != version:
+            self._schedule_rebuild(project_id)
+        return index
+
+    async def rebuild(self, project_id: str) -> TileIndex:
+        """按当前快照重新布局并保存索引（有旧索引时热启动）
+
+        Raises:
+            TileIndexUnavailableError: 项目没有可用的邻接快照
+        """
+        snapshot = await self._snapshots.get(project_id)
+        if snapshot is None:
+            raise TileIndexUnavailableError(project_id)
+        if snapshot.has_delta:
+            snapshot = await asyncio.to_thread(snapshot.compacted)
+
+        previous = self._cached(project_id) or self._read_disk(project_id)
+        iterations = settings.graph_layout_iterations
+        initial = None
+        if previous is not None and previous.node_codec == snapshot.node_codec and len(snapshot.node_keys):
+            initial = _carry_positions(previous, snapshot.node_keys)
+            iterations = max(iterations // 3, 1)
+
+        source, target, _ = snapshot.coo()
+        arrays, meta = await run_in_worker(
+            build_tile_arrays, source, target, len(snapshot.node_keys),
+            capacity=self._capacity, iterations=iterations, initial=initial,
+        )
+        arrays["node_keys"] = snapshot.node_keys[arrays.pop("order")]
+        meta["capacity"] = self._capacity
+        index = TileIndex(project_id, snapshot.version, arrays, snapshot.node_codec, meta)
+
+        path = self._path(project_id)
+        if path is not None:
+            try:
+                await asyncio.to_thread(index.save, path)
+            except OSError as e:
+                logger.warning(f"Failed to persist tile index for {project_id}: {e}")
+        self._put(index)
+        logger.info(f"Built tile index of {index.node_count} entities for project {project_id}")
+        return index
+
+    def invalidate(self, project_id: str) -> None:
+        """丢弃进程内缓存的索引（磁盘文件保留，用于热启动）"""
+        self._indexes.pop(project_id, None)
+
+    def _schedule_rebuild(self, project_id: str) -> None:
+        if project_id in self._rebuilding:
+            return
+        task = asyncio.create_task(self.rebuild(project_id))
+        self._rebuilding[project_id] = task
+        task.add_done_callback(lambda t: self._rebuild_done(project_id, t))
+
+    def _rebuild_done(self, project_id: str, task: asyncio.Task) -> None:
+        self._rebuilding.pop(project_id, None)
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning(f"Background tile index rebuild for {project_id} failed: {task.exception()}")
+
+    def _cached(self, project_id: str) -> TileIndex | None:
+        index = self._indexes.get(project_id)
+        if index is not None:
+            self._indexes.move_to_end(project_id)
+        return index
+
+    def _put(self, index: TileIndex) -> None:
+        self._indexes[index.project_id] = index
+        self._indexes.move_to_end(index.project_id)
+        while len(self._indexes) > self._max_projects:
+            self._indexes.popitem(last=False)
+
+    def _path(self, project_id: str) -> Path | None:
+        segment = project_path_segment(project_id) if self._directory is not None else None
+        return None if segment is None else self._directory / f"{segment}.npz"
+
+    def _read_disk(self, project_id: str) -> TileIndex | None:
+        path = self._path(project_id)
+        if path is None or not path.exists():
+            return None
+        try:
+            return TileIndex.load(path)
+        except (OSError, ValueError, KeyError, zipfile.BadZipFile) as e:
+            logger.warning(f"Ignoring unreadable tile index {path}: {e}")
+            return None
+
+
+def _carry_positions(previous: TileIndex, node_keys: np.ndarray) -> np.ndarray:
+    """旧索引中仍然存在的节点的坐标，按 node_keys（已排序）的编号排列，新节点为 NaN"""
+    initial = np.full((len(node_keys), 2), np.nan)
+    positions = np.minimum(np.searchsorted(node_keys, previous.node_keys), len(node_keys) - 1)
+    found = node_keys[positions] == previous.node_keys
+    initial[positions[found], 0] = previous.x[found]
+    initial[positions[found], 1] = previous.y[found]
+    return initial
+
+
+_store: TileIndexStore | None = None
+
+
+def get_tile_index_store() -> TileIndexStore:
+    """获取进程内共享的瓦片索引存储"""
+    global _store
+    if _store is None:
+        _store = TileIndexStore(directory=settings.graph_tile_dir)
+    return _store
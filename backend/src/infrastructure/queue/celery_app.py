@@ -14,6 +14,14 @@ celery_app.conf.update(
     task_default_queue="ingestion",
     worker_send_task_events=True,
 )
+# 过期判断依赖跨进程共享的图数据版本号（见 ScoreMaterializer）
+if settings.score_materialize_interval_seconds > 0 and settings.query_cache_backend == "redis":
+    celery_app.conf.beat_schedule = {
+        "refresh-stale-scores": {
+            "task": "graph.refresh_stale_scores",
+            "schedule": settings.score_materialize_interval_seconds,
+        },
+    }
 celery_app.autodiscover_tasks(["src.infrastructure.queue.tasks"])
 
 __all__ = ["celery_app"]
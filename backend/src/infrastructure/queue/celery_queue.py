@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import asyncio
 from typing import Any
 
 from celery import Celery
@@ -14,5 +15,6 @@ class CeleryTaskQueue(TaskQueuePort):
         self._celery = celery_app
 
     async def enqueue(self, task_name: str, payload: dict[str, Any]) -> str:
-        result = self._celery.send_task(task_name, kwargs=payload)
+        # send_task blocks on the broker connection, keep it off the event loop
+        result = await asyncio.to_thread(self._celery.send_task, task_name, kwargs=payload)
         return result.id
@@ -1,3 +1,4 @@
 from .ingestion_task import run_async_job
+from .score_task import materialize_scores, refresh_stale_scores
 
-__all__ = ["run_async_job"]
+__all__ = ["run_async_job", "materialize_scores", "refresh_stale_scores"]
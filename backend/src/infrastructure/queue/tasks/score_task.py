@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Coroutine
+from typing import Any, TypeVar
+
+from celery.utils.log import get_task_logger
+
+from src.config import settings
+from src.infrastructure.persistence.neo4j.client import Neo4jClient
+from src.infrastructure.persistence.neo4j.graph_summary import get_graph_summarizer
+from src.infrastructure.persistence.neo4j.score_materializer import get_score_materializer
+from src.infrastructure.queue.celery_app import celery_app
+
+logger = get_task_logger(__name__)
+
+T = TypeVar("T")
+
+# The materializer, summarizer and their Redis clients are process-wide singletons whose
+# connections are bound to the event loop that first used them, so every task in this worker
+# process runs on the same long-lived loop instead of a fresh asyncio.run() loop.
+_loop: asyncio.AbstractEventLoop | None = None
+
+
+def _run(coro: Coroutine[Any, Any, T]) -> T:
+    global _loop
+    if _loop is None or _loop.is_closed():
+        _loop = asyncio.new_event_loop()
+    return _loop.run_until_complete(coro)
+
+
+@celery_app.task(name="graph.materialize_scores")
+def materialize_scores(project_id: str, graph_version: int | None = None) -> dict[str, Any] | None:
+    """Recompute and write back pagerank/betweenness/community_id for one project."""
+    return _run(_materialize(project_id, graph_version))
+
+
+@celery_app.task(name="graph.refresh_stale_scores")
+def refresh_stale_scores() -> list[str]:
+    """Periodic task: recompute materialized scores whose graph version has moved on."""
+    return _run(_refresh_stale())
+
+
+async def _materialize(project_id: str, graph_version: int | None) -> dict[str, Any] | None:
+    await Neo4jClient.connect()
+    try:
+        summary = await get_score_materializer().materialize(project_id, graph_version)
+        if summary is not None:
+            await _warm_summary(project_id)
+        return summary
+    finally:
+        await Neo4jClient.disconnect()
+
+
+async def _refresh_stale() -> list[str]:
+    await Neo4jClient.connect()
+    try:
+        materializer = get_score_materializer()
+        refreshed = []
+        for project_id in await materializer.stale_projects():
+            try:
+                if await materializer.materialize(project_id) is not None:
+                    refreshed.append(project_id)
+                    await _warm_summary(project_id)
+            except Exception:  # pragma: no cover - one project failing must not stop the rest
+                logger.exception("Score materialization for project %s failed", project_id)
+        return refreshed
+    finally:
+        await Neo4jClient.disconnect()
+
+
+async def _warm_summary(project_id: str) -> None:
+    """Precompute the default supernode summary so the first visualization request hits the cache.
+
+    Only with the redis cache backend: the memory backend would warm this Celery worker's own cache,
+    which the API processes never read.
+    """
+    if settings.query_cache_backend != "redis":
+        return
+    try:
+        await get_graph_summarizer().summarize(project_id)
+    except Exception:  # pragma: no cover - a cold summary is only slower, not wrong
+        logger.exception("Graph summary for project %s failed", project_id)
@@ -6,15 +6,20 @@ from fastapi.middleware.cors import CORSMiddleware
 from src.api.routers import auth, graph, projects, ingestion
 from src.api.routers import entities, relations, query, visualization, extraction
 from src.config import settings
+from src.infrastructure.compute import shutdown_worker_pool
 from src.infrastructure.persistence.neo4j.client import Neo4jClient
+from src.infrastructure.persistence.neo4j.schema import bootstrap_schema
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     await Neo4jClient.connect()
+    if settings.neo4j_schema_bootstrap:
+        await bootstrap_schema()
     try:
         yield
     finally:
+        shutdown_worker_pool()
         await Neo4jClient.disconnect()
 
 
@@ -0,0 +1,180 @@
+from __future__ import annotations
+
+import gzip
+import json
+import threading
+from typing import Annotated
+
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from pydantic import BaseModel
+
+from src.api.dependencies import encoding
+from src.api.dependencies.encoding import (
+    ARROW_MEDIA_TYPE,
+    JSON_MEDIA_TYPE,
+    MSGPACK_MEDIA_TYPE,
+    GraphResponseEncoder,
+    get_graph_encoder,
+    negotiate_content_encoding,
+    negotiate_media_type,
+)
+
+
+class Node(BaseModel):
+    id: str
+    name: str
+    category: int = 0
+    value: dict = {}
+    x: float | None = None
+
+
+class Edge(BaseModel):
+    source: str
+    target: str
+    relation: str = "RELATION"
+
+
+class GraphData(BaseModel):
+    nodes: list[Node]
+    edges: list[Edge]
+    categories: list[str]
+
+
+class GraphResponse(BaseModel):
+    """与 GraphVisualizationResponse 结构相同"""
+    data: GraphData
+    total_nodes: int
+    summarized: bool = False
+
+
+def _response() -> GraphResponse:
+    return GraphResponse(
+        data=GraphData(
+            nodes=[
+                Node(id="a", name="公司A", value={"type": "ENTERPRISE"}, x=1.0),
+                Node(id="b", name="张三", category=1, value={"type": "PERSON"}),
+            ],
+            edges=[Edge(source="a", target="b", relation="OWNS"), Edge(source="b", target="z")],
+            categories=["ENTERPRISE", "PERSON"],
+        ),
+        total_nodes=2,
+    )
+
+
+def test_negotiates_media_type_by_quality(monkeypatch):
+    monkeypatch.setattr(encoding, "msgpack", object())
+    monkeypatch.setattr(encoding, "pa", None)
+
+    assert negotiate_media_type(None) == JSON_MEDIA_TYPE
+    assert negotiate_media_type("application/json, text/plain, */*") == JSON_MEDIA_TYPE
+    assert negotiate_media_type("application/json;q=0.5, application/x-msgpack") == MSGPACK_MEDIA_TYPE
+    # Arrow 未安装时退回到下一个可接受的格式
+    assert negotiate_media_type(f"{ARROW_MEDIA_TYPE}, application/json;q=0.1") == JSON_MEDIA_TYPE
+    assert negotiate_media_type(ARROW_MEDIA_TYPE) is None
+    assert negotiate_media_type("application/json;q=0, text/html") is None
+
+
+def test_negotiates_content_encoding(monkeypatch):
+    monkeypatch.setattr(encoding, "brotli", None)
+    assert negotiate_content_encoding("gzip, deflate, br") == "gzip"
+    assert negotiate_content_encoding("identity") is None
+    assert negotiate_content_encoding(None) is None
+
+    monkeypatch.setattr(encoding, "brotli", object())
+    assert negotiate_content_encoding("gzip, deflate, br") == "br"
+    assert negotiate_content_encoding("br;q=0, *") == "gzip"
+
+
+def test_edge_endpoints_become_node_row_indices():
+    columns = encoding.edge_columns(
+        [{"source": "a", "target": "b", "relation": "OWNS"}, {"source": "b", "target": "z"}],
+        ["a", "b"],
+    )
+
+    assert columns == {"source": [0, 1], "target": [1, -1], "relation": ["OWNS", None]}
+
+
+@pytest.mark.asyncio
+async def test_json_is_gzipped_above_threshold(monkeypatch):
+    monkeypatch.setattr(encoding.settings, "graph_response_min_compress_bytes", 10)
+    response = await GraphResponseEncoder(JSON_MEDIA_TYPE, "gzip").render(
+        _response(), nodes="data.nodes", edges="data.edges"
+    )
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert json.loads(gzip.decompress(response.body)) == _response().model_dump(mode="json")
+
+    monkeypatch.setattr(encoding.settings, "graph_response_min_compress_bytes", 1 << 20)
+    response = await GraphResponseEncoder(JSON_MEDIA_TYPE, "gzip").render(
+        _response(), nodes="data.nodes", edges="data.edges"
+    )
+    assert "content-encoding" not in response.headers
+
+
+@pytest.mark.asyncio
+async def test_large_graphs_are_encoded_off_the_event_loop(monkeypatch):
+    threads = []
+    encoder = GraphResponseEncoder(JSON_MEDIA_TYPE)
+    encode = encoder.encode
+
+    def recording_encode(*args, **kwargs):
+        threads.append(threading.current_thread())
+        return encode(*args, **kwargs)
+
+    monkeypatch.setattr(encoder, "encode", recording_encode)
+    monkeypatch.setattr(encoding.settings, "graph_response_thread_min_rows", 10)
+    await encoder.render(_response(), nodes="data.nodes", edges="data.edges")
+    monkeypatch.setattr(encoding.settings, "graph_response_thread_min_rows", 3)
+    response = await encoder.render(_response(), nodes="data.nodes", edges="data.edges")
+
+    assert threads[0] is threading.main_thread() and threads[1] is not threading.main_thread()
+    assert json.loads(response.body) == _response().model_dump(mode="json")
+
+
+def test_msgpack_replaces_record_lists_with_columns():
+    msgpack = pytest.importorskip("msgpack")
+
+    body = GraphResponseEncoder(MSGPACK_MEDIA_TYPE).encode(_response(), nodes="data.nodes", edges="data.edges")
+    content = msgpack.unpackb(body)
+
+    assert content["data"]["nodes"]["id"] == ["a", "b"]
+    assert content["data"]["nodes"]["value"] == [{"type": "ENTERPRISE"}, {"type": "PERSON"}]
+    assert content["data"]["edges"]["source"] == [0, 1]
+    assert content["data"]["edges"]["target"] == [1, -1]
+    assert content["data"]["categories"] == ["ENTERPRISE", "PERSON"]
+    assert content["total_nodes"] == 2
+
+
+def test_arrow_writes_node_and_edge_streams():
+    pa = pytest.importorskip("pyarrow")
+
+    body = GraphResponseEncoder(ARROW_MEDIA_TYPE).encode(_response(), nodes="data.nodes", edges="data.edges")
+    reader = pa.BufferReader(body)
+    nodes = pa.ipc.open_stream(reader).read_all()
+    edges = pa.ipc.open_stream(reader).read_all()
+
+    assert nodes.column("id").to_pylist() == ["a", "b"]
+    assert json.loads(nodes.column("value")[0].as_py()) == {"type": "ENTERPRISE"}
+    meta = json.loads(nodes.schema.metadata[b"meta"])
+    assert meta == {"data": {"categories": ["ENTERPRISE", "PERSON"]}, "total_nodes": 2, "summarized": False}
+    assert edges.column("source").to_pylist() == [0, 1]
+    assert edges.column("target").to_pylist() == [1, -1]
+
+
+def test_dependency_rejects_unacceptable_media_type(monkeypatch):
+    monkeypatch.setattr(encoding, "pa", None)
+    app = FastAPI()
+
+    @app.get("/graph")
+    async def graph(encoder: Annotated[GraphResponseEncoder, Depends(get_graph_encoder)]):
+        return await encoder.render({"neighbors": [{"id": "a"}], "total": 1}, nodes="neighbors")
+
+    client = TestClient(app)
+    response = client.get("/graph", headers={"Accept": ARROW_MEDIA_TYPE})
+    assert response.status_code == 406
+
+    response = client.get("/graph")
+    assert response.json() == {"neighbors": [{"id": "a"}], "total": 1}
+    assert response.headers["vary"] == "Accept, Accept-Encoding"
@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import pytest
+
+from src.application.commands.build_graph import BuildGraphCommand, GraphBuilder
+
+
+def _command(entities: list[dict], relations: list[dict] | None = None) -> BuildGraphCommand:
+    return BuildGraphCommand(
+        project_id="proj-1",
+        owner_id="owner-1",
+        entities=entities,
+        relations=relations or [],
+        merge_duplicates=False,
+    )
+
+
+@pytest.fixture
+def entity_repo(mocker):
+    repo = mocker.AsyncMock()
+
+    async def merge_relations_bulk(relations):
+        return [relation.id for relation in relations]
+
+    repo.merge_entities_bulk.side_effect = lambda entities: len(entities)
+    repo.merge_relations_bulk.side_effect = merge_relations_bulk
+    return repo
+
+
+@pytest.mark.asyncio
+async def test_build_writes_entities_in_chunks(entity_repo):
+    entities = [{"text": f"企业{i}", "entity_type": "ENTERPRISE"} for i in range(5)]
+    builder = GraphBuilder(batch_size=2)
+
+    result = await builder.build(_command(entities), entity_repo)
+
+    assert result.success
+    assert result.created_entities == 5
+    chunk_sizes = [len(call.args[0]) for call in entity_repo.merge_entities_bulk.await_args_list]
+    assert chunk_sizes == [2, 2, 1]
+    entity_repo.merge_entity.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_failed_chunk_is_reported_per_item(entity_repo):
+    entities = [{"text": f"企业{i}", "entity_type": "ENTERPRISE"} for i in range(4)]
+    entity_repo.merge_entities_bulk.side_effect = [2, RuntimeError("deadlock")]
+    builder = GraphBuilder(batch_size=2)
+
+    result = await builder.build(_command(entities), entity_repo)
+
+    assert result.created_entities == 2
+    assert [item["data"]["text"] for item in result.failed_items] == ["企业2", "企业3"]
+    assert all(item["error"] == "deadlock" for item in result.failed_items)
+
+
+@pytest.mark.asyncio
+async def test_relations_missing_from_bulk_result_are_failed(entity_repo):
+    entities = [
+        {"text": "甲公司", "entity_type": "ENTERPRISE"},
+        {"text": "乙公司", "entity_type": "ENTERPRISE"},
+        {"text": "丙公司", "entity_type": "ENTERPRISE"},
+    ]
+    relations = [
+        {"source_text": "甲公司", "target_text": "乙公司", "relation_type": "OWNS"},
+        {"source_text": "乙公司", "target_text": "丙公司", "relation_type": "OWNS"},
+    ]
+
+    async def drop_last(batch):
+        return [relation.id for relation in batch[:-1]]
+
+    entity_repo.merge_relations_bulk.side_effect = drop_last
+    builder = GraphBuilder(batch_size=10)
+
+    result = await builder.build(_command(entities, relations), entity_repo)
+
+    assert result.created_relations == 1
+    assert len(result.failed_items) == 1
+    assert result.failed_items[0]["type"] == "relation"
+    assert result.failed_items[0]["data"]["source_text"] == "乙公司"
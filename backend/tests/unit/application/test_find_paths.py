@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import pytest
+
+from src.application.queries.find_paths import (
+    FindAllPathsHandler,
+    FindAllPathsQuery,
+    FindShortestPathHandler,
+    FindShortestPathQuery,
+)
+from src.infrastructure.persistence.neo4j import cypher_queries as queries
+from src.infrastructure.persistence.neo4j.adjacency_snapshot import AdjacencySnapshot
+
+EDGES = [
+    ("a", "b", "r1", "HOLDS"),
+    ("b", "c", "r2", "HOLDS"),
+    ("a", "d", "r3", "HOLDS"),
+    ("d", "c", "r4", "HOLDS"),
+    ("c", "e", "r5", "HOLDS"),
+]
+
+
+class FakeClient:
+    calls: list[str] = []
+
+    @classmethod
+    async def execute_read(cls, query, parameters=None):
+        cls.calls.append(query)
+        if query == queries.GET_ENTITIES_BY_IDS:
+            return [{"entity": {"id": i, "external_id": i.upper(), "properties_json": "{}"}} for i in parameters["ids"]]
+        if query == queries.GET_RELATIONS_BY_IDS:
+            return [{"relation": {"id": i, "type": "HOLDS", "properties_json": '{"w": 1}'}} for i in parameters["ids"]]
+        return []
+
+
+class FakeSnapshots:
+    def __init__(self, snapshot):
+        self.snapshot = snapshot
+
+    async def get(self, project_id):
+        return self.snapshot
+
+
+@pytest.fixture(autouse=True)
+def reset_client():
+    FakeClient.calls = []
+
+
+@pytest.mark.asyncio
+async def test_shortest_path_runs_in_memory_and_backfills_properties():
+    handler = FindShortestPathHandler(FakeClient, FakeSnapshots(AdjacencySnapshot.from_edges("p1", 0, EDGES)))
+
+    result = await handler.handle(FindShortestPathQuery("p1", "u1", "a", "e"))
+
+    assert result.found and result.path_count == 1
+    assert len(result.paths[0]["relation_ids"]) == 3
+    assert [node["id"] for node in result.nodes] == result.paths[0]["node_ids"]
+    assert result.relations[0]["properties"] == {"w": 1}
+    assert queries.FIND_SHORTEST_PATH not in FakeClient.calls
+
+
+@pytest.mark.asyncio
+async def test_all_paths_returns_each_path_and_stops_at_limit():
+    handler = FindAllPathsHandler(FakeClient, FakeSnapshots(AdjacencySnapshot.from_edges("p1", 0, EDGES)))
+
+    result = await handler.handle(FindAllPathsQuery("p1", "u1", "a", "c", max_depth=3, path_limit=1))
+    both = await handler.handle(FindAllPathsQuery("p1", "u1", "a", "c", max_depth=3, path_limit=10))
+
+    assert result.path_count == 1 and len(result.paths) == 1
+    assert sorted(p["relation_ids"] for p in both.paths) == [["r1", "r2"], ["r3", "r4"]]
+    assert {node["id"] for node in both.nodes} == {"a", "b", "c", "d"}
+
+
+@pytest.mark.asyncio
+async def test_unknown_endpoint_is_not_found_without_backfill():
+    handler = FindShortestPathHandler(FakeClient, FakeSnapshots(AdjacencySnapshot.from_edges("p1", 0, EDGES)))
+
+    result = await handler.handle(FindShortestPathQuery("p1", "u1", "a", "missing"))
+
+    assert not result.found
+    assert FakeClient.calls == []
+
+
+@pytest.mark.asyncio
+async def test_falls_back_to_cypher_without_snapshot():
+    handler = FindAllPathsHandler(FakeClient, FakeSnapshots(None))
+
+    result = await handler.handle(FindAllPathsQuery("p1", "u1", "a", "c"))
+
+    assert not result.found
+    assert FakeClient.calls == [queries.with_hops(queries.FIND_ALL_PATHS, max_depth=3)]
@@ -110,8 +110,8 @@ async def test_list_neighbors_clamps_depth_and_limit(
     project = _project("owner-1")
     graph_project_repo.get.return_value = project
     graph_entity_repo.find_neighbors.return_value = {
-        "entities": [{"id": "a"}, {"id": "b"}],
-        "relations": [{"id": "r1"}, {"id": "r2"}],
+        "entities": [{"id": "a", "distance": 0}],
+        "relations": [],
     }
 
     query = ListNeighborsQuery(
@@ -127,9 +127,9 @@ async def test_list_neighbors_clamps_depth_and_limit(
         project_id=project.id,
         entity_id="a",
         depth=3,
+        limit=1,
     )
-    assert len(neighbors["entities"]) == 1
-    assert len(neighbors["relations"]) == 1
+    assert neighbors["entities"] == [{"id": "a", "distance": 0}]
 
 
 @pytest.mark.asyncio
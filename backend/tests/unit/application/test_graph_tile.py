@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import pytest
+
+from src.application.queries.get_graph_tile import GetGraphTileHandler, GetGraphTileQuery
+from src.infrastructure.persistence.neo4j import cypher_queries as queries
+from src.infrastructure.persistence.neo4j.tile_index import Tile
+
+
+class FakeClient:
+    calls: list[tuple[str, dict]] = []
+
+    @classmethod
+    async def execute_read(cls, query, parameters=None, **kwargs):
+        cls.calls.append((query, parameters))
+        # b 已被删除
+        return [
+            {"entity": {"id": node_id, "external_id": node_id.upper(), "type": "PERSON", "labels": []}}
+            for node_id in parameters["ids"]
+            if node_id != "b"
+        ]
+
+
+class FakeIndex:
+    origin_x, origin_y, size, max_zoom, version = -10.0, -10.0, 20.0, 3, 4
+
+    def tile(self, z, x, y, max_edges):
+        self.requested = (z, x, y, max_edges)
+        return Tile(node_ids=["a", "b", "c"], x=[1.04, 2.0, 3.0], y=[-1.0, 0.0, 1.0], edges=[("a", "z")])
+
+
+class FakeTiles:
+    def __init__(self):
+        self.index = FakeIndex()
+
+    async def get(self, project_id):
+        return self.index
+
+
+class FakeScores:
+    async def is_materialized(self, project_id):
+        return False
+
+
+@pytest.mark.asyncio
+async def test_tile_nodes_carry_index_coordinates_and_skip_deleted_entities():
+    FakeClient.calls = []
+    tiles = FakeTiles()
+    handler = GetGraphTileHandler(client=FakeClient, tiles=tiles, scores=FakeScores())
+
+    result = await handler.handle(GetGraphTileQuery(project_id="p1", owner_id="u1", z=2, x=1, y=3))
+
+    assert tiles.index.requested[:3] == (2, 1, 3)
+    assert FakeClient.calls == [(queries.GET_ENTITIES_BY_IDS, {"ids": ["a", "b", "c"], "project_id": "p1"})]
+    assert [(n.id, n.name, n.x, n.y) for n in result.nodes] == [("a", "A", 1.0, -1.0), ("c", "C", 3.0, 1.0)]
+    assert [(e.source, e.target) for e in result.edges] == [("a", "z")]
+    assert (result.size, result.max_zoom, result.graph_version) == (20.0, 3, 4)
+    assert result.categories == ["PERSON"]
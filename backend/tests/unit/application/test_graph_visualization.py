@@ -0,0 +1,289 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from src.application.queries import get_graph_visualization
+from src.application.queries.get_graph_visualization import (
+    GetGraphVisualizationHandler,
+    GetGraphVisualizationQuery,
+)
+from src.config import settings
+from src.infrastructure.cache.in_memory import InMemoryPreviewCache
+from src.infrastructure.cache.layout_cache import GraphLayoutCache
+from src.infrastructure.persistence.neo4j import cypher_queries as queries
+from src.infrastructure.persistence.neo4j import graph_summary
+
+
+def _node(node_id: str, entity_type: str = "ENTERPRISE") -> dict:
+    return {"id": node_id, "external_id": f"name-{node_id}", "type": entity_type, "labels": []}
+
+
+def _relation(rel_id: str, source_id: str, target_id: str) -> dict:
+    return {"id": rel_id, "type": "OWNS", "source_id": source_id, "target_id": target_id}
+
+
+class FakeClient:
+    streams: dict[str, list[dict]] = {}
+    calls: list[tuple[str, dict]] = []
+    entity_count = 0
+    entities: dict[str, dict] = {}
+    # EXPAND_FRONTIER 每次调用依次返回的一层邻居
+    hops: list[list[dict]] = []
+
+    @classmethod
+    async def execute_read(cls, query, parameters=None, **kwargs):
+        if query == queries.GET_ENTITIES_BY_IDS:
+            return [{"entity": cls.entities[i]} for i in parameters["ids"] if i in cls.entities]
+        assert query == queries.COUNT_PROJECT_ENTITIES
+        return [{"entity_count": cls.entity_count}]
+
+    @classmethod
+    async def iter_read(cls, query, parameters=None, **kwargs):
+        cls.calls.append((query, parameters))
+        records = cls.streams.get(query, [])
+        if query == queries.EXPAND_FRONTIER and cls.hops:
+            records = cls.hops.pop(0)
+        for record in records:
+            yield record
+
+
+class FakeScores:
+    def __init__(self, materialized: bool = False):
+        self.materialized = materialized
+
+    async def is_materialized(self, project_id):
+        return self.materialized
+
+
+@pytest.fixture(autouse=True)
+def in_thread_layout(mocker):
+    mocker.patch.object(settings, "graph_compute_workers", 0)
+    mocker.patch.object(graph_summary, "_cache", InMemoryPreviewCache())
+
+
+@pytest.fixture
+def client():
+    FakeClient.calls = []
+    FakeClient.streams = {}
+    FakeClient.entity_count = 0
+    FakeClient.entities = {}
+    FakeClient.hops = []
+    return FakeClient
+
+
+@pytest.mark.asyncio
+async def test_subgraph_seeds_half_the_limit_and_fills_with_neighbors(client):
+    client.streams = {
+        queries.GET_COMMUNITY_SUBGRAPH_NODES: [{"node": _node("a")}, {"node": _node("b", "PERSON")}],
+        queries.EXPAND_FRONTIER: [{"node": _node("c", "OTHER")}, {"node": _node("d")}],
+        queries.GET_RELATIONS_AMONG: [
+            {"relation": _relation("r1", "a", "b"), "source_id": "a", "target_id": "b"},
+            {"relation": _relation("r2", "b", "c"), "source_id": "b", "target_id": "c"},
+            {"relation": _relation("r3", "c", "x"), "source_id": "c", "target_id": "x"},
+        ],
+    }
+    handler = GetGraphVisualizationHandler(client=client, scores=FakeScores())
+
+    result = await handler.handle(GetGraphVisualizationQuery(project_id="p1", owner_id="u1", node_limit=4))
+
+    assert [node.id for node in result.nodes] == ["a", "b", "c", "d"]
+    assert [edge.value["id"] for edge in result.edges] == ["r1", "r2"]
+    assert result.categories == ["ENTERPRISE", "PERSON", "OTHER"]
+    (_, seeds), (_, expand), (_, among) = client.calls
+    assert seeds["node_limit"] == 2
+    assert expand["frontier"] == expand["visited"] == ["a", "b"] and expand["limit"] == 2
+    assert among["node_ids"] == ["a", "b", "c", "d"]
+
+
+@pytest.mark.asyncio
+async def test_ego_network_expands_level_by_level_within_the_limit(client):
+    client.entities = {"center": _node("center")}
+    client.hops = [
+        [{"node": _node("n1")}, {"node": _node("n2")}],
+        [{"node": _node("n3")}],
+    ]
+    client.streams = {
+        queries.GET_RELATIONS_AMONG: [
+            {"relation": _relation("r1", "center", "n1"), "source_id": "center", "target_id": "n1"},
+            {"relation": _relation("r2", "n1", "n3"), "source_id": "n1", "target_id": "n3"},
+        ],
+    }
+    handler = GetGraphVisualizationHandler(client=client, scores=FakeScores())
+
+    result = await handler.handle(GetGraphVisualizationQuery(
+        project_id="p1", owner_id="u1", center_entity_id="center", depth=3, node_limit=4, layout=None
+    ))
+
+    assert [node.id for node in result.nodes] == ["center", "n1", "n2", "n3"]
+    assert [edge.value["id"] for edge in result.edges] == ["r1", "r2"]
+    hops = [params for query, params in client.calls if query == queries.EXPAND_FRONTIER]
+    # 第三跳之前已达到节点上限
+    assert [(h["frontier"], h["limit"]) for h in hops] == [(["center"], 3), (["n1", "n2"], 1)]
+    assert hops[1]["visited"] == ["center", "n1", "n2"]
+
+
+@pytest.mark.asyncio
+async def test_ego_network_of_missing_entity_is_empty(client):
+    handler = GetGraphVisualizationHandler(client=client, scores=FakeScores())
+
+    result = await handler.handle(GetGraphVisualizationQuery(project_id="p1", owner_id="u1", center_entity_id="x"))
+
+    assert result.nodes == [] and client.calls == []
+
+
+@pytest.mark.asyncio
+async def test_subgraph_empty_project_skips_relation_query(client):
+    handler = GetGraphVisualizationHandler(client=client, scores=FakeScores())
+
+    result = await handler.handle(GetGraphVisualizationQuery(project_id="p1", owner_id="u1"))
+
+    assert result.nodes == [] and result.edges == []
+    assert len(client.calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_materialized_project_orders_nodes_by_pagerank_and_sizes_by_score(client):
+    client.streams = {
+        queries.GET_TOP_SCORED_SUBGRAPH_NODES: [
+            {"node": {**_node("hub", "PERSON"), "pagerank": 6.0}},
+            {"node": {**_node("leaf", "PERSON"), "pagerank": 0.15}},
+        ],
+    }
+    handler = GetGraphVisualizationHandler(client=client, scores=FakeScores(materialized=True))
+
+    result = await handler.handle(GetGraphVisualizationQuery(project_id="p1", owner_id="u1"))
+
+    assert client.calls[0][0] == queries.GET_TOP_SCORED_SUBGRAPH_NODES
+    hub, leaf = result.nodes
+    assert hub.symbolSize > leaf.symbolSize > 45
+
+
+def _star_streams(leaves):
+    return {
+        queries.GET_COMMUNITY_SUBGRAPH_NODES: [{"node": _node("hub")}],
+        queries.EXPAND_FRONTIER: [{"node": _node(leaf)} for leaf in leaves],
+        queries.GET_RELATIONS_AMONG: [
+            {"relation": _relation(f"r{leaf}", "hub", leaf), "source_id": "hub", "target_id": leaf}
+            for leaf in leaves
+        ],
+    }
+
+
+@pytest.mark.asyncio
+async def test_layout_coordinates_are_cached_and_warm_started(client, mocker):
+    layouts = GraphLayoutCache(max_entries=8)
+    handler = GetGraphVisualizationHandler(client=client, scores=FakeScores(), layouts=layouts)
+    compute = mocker.spy(get_graph_visualization, "force_layout")
+    query = GetGraphVisualizationQuery(project_id="p1", owner_id="u1")
+
+    client.streams = _star_streams(["a", "b", "c"])
+    first = await handler.handle(query)
+    again = await handler.handle(query)
+    client.streams = _star_streams(["a", "b", "c", "d"])
+    grown = await handler.handle(query)
+
+    assert all(node.x is not None and node.y is not None for node in first.nodes)
+    assert [(n.x, n.y) for n in again.nodes] == [(n.x, n.y) for n in first.nodes]
+    assert compute.call_count == 2
+    initial = compute.call_args.kwargs["initial"]
+    assert initial[:4].tolist() == [[n.x, n.y] for n in first.nodes]
+    assert np.isnan(initial[4]).all()  # 新节点 d 没有初始坐标
+    assert len(grown.nodes) == 5
+
+
+@pytest.mark.asyncio
+async def test_layout_none_skips_coordinates(client):
+    client.streams = _star_streams(["a"])
+    handler = GetGraphVisualizationHandler(client=client, scores=FakeScores(), layouts=GraphLayoutCache())
+
+    result = await handler.handle(GetGraphVisualizationQuery(project_id="p1", owner_id="u1", layout=None))
+
+    assert all(node.x is None for node in result.nodes)
+
+
+@pytest.mark.asyncio
+async def test_oversized_project_returns_supernodes(client):
+    client.entity_count = 5000
+    client.streams = {
+        queries.SUMMARIZE_ENTITY_GROUPS: [
+            {"group": "PERSON", "entity_type": "PERSON", "members": 3000},
+            {"group": "ENTERPRISE", "entity_type": "ENTERPRISE", "members": 2000},
+        ],
+        queries.SUMMARIZE_RELATION_GROUPS: [
+            {"source_group": "PERSON", "target_group": "ENTERPRISE", "weight": 700},
+            {"source_group": "PERSON", "target_group": "PERSON", "weight": 40},
+        ],
+    }
+    handler = GetGraphVisualizationHandler(client=client, scores=FakeScores(), layouts=GraphLayoutCache())
+
+    result = await handler.handle(GetGraphVisualizationQuery(project_id="p1", owner_id="u1", node_limit=100))
+
+    assert result.summarized
+    person, enterprise = result.nodes
+    assert person.id == "type:PERSON" and person.value["member_count"] == 3000
+    assert person.value["group_by"] == "type"  # 社区未物化时按类型分组
+    assert person.value["internal_edges"] == 40
+    assert person.symbolSize > enterprise.symbolSize
+    assert person.x is not None
+    (edge,) = result.edges
+    assert (edge.source, edge.target, edge.value) == ("type:PERSON", "type:ENTERPRISE", {"weight": 700})
+
+
+@pytest.mark.asyncio
+async def test_small_project_and_filtered_views_are_not_summarized(client):
+    client.entity_count = 50
+    handler = GetGraphVisualizationHandler(client=client, scores=FakeScores())
+
+    small = await handler.handle(GetGraphVisualizationQuery(project_id="p1", owner_id="u1", node_limit=100))
+    client.entity_count = 5000
+    filtered = await handler.handle(
+        GetGraphVisualizationQuery(project_id="p2", owner_id="u1", node_limit=100, entity_type="PERSON")
+    )
+
+    assert not small.summarized and not filtered.summarized
+    assert [query for query, _ in client.calls] == [queries.GET_COMMUNITY_SUBGRAPH_NODES] * 2
+
+
+@pytest.mark.asyncio
+async def test_drill_into_community_returns_members_without_outside_neighbors(client):
+    client.streams = {
+        queries.GET_COMMUNITY_MEMBER_NODES: [{"node": _node("a")}, {"node": _node("b")}],
+        queries.EXPAND_FRONTIER: [{"node": _node("x")}],
+        queries.GET_RELATIONS_AMONG: [
+            {"relation": _relation("r1", "a", "b"), "source_id": "a", "target_id": "b"},
+        ],
+    }
+    handler = GetGraphVisualizationHandler(client=client, scores=FakeScores(materialized=True))
+
+    result = await handler.handle(
+        GetGraphVisualizationQuery(project_id="p1", owner_id="u1", group_by="community", group="7")
+    )
+
+    assert client.calls[0][1]["community_id"] == 7
+    assert [node.id for node in result.nodes] == ["a", "b"]
+    assert [edge.value["id"] for edge in result.edges] == ["r1"]
+
+
+@pytest.mark.asyncio
+async def test_other_supernode_cannot_be_expanded(client):
+    handler = GetGraphVisualizationHandler(client=client, scores=FakeScores())
+
+    with pytest.raises(ValueError):
+        await handler.handle(GetGraphVisualizationQuery(project_id="p1", owner_id="u1", group="other"))
+
+
+def test_default_handlers_share_the_process_wide_summarizer(monkeypatch):
+    shared = object()
+    monkeypatch.setattr(
+        "src.application.queries.get_graph_visualization.get_graph_summarizer", lambda: shared
+    )
+
+    first = GetGraphVisualizationHandler(scores=FakeScores(), layouts=GraphLayoutCache())
+
+    assert first._summaries is not shared
+    monkeypatch.setattr(
+        "src.application.queries.get_graph_visualization.get_score_materializer", lambda: FakeScores()
+    )
+    assert GetGraphVisualizationHandler(layouts=GraphLayoutCache())._summaries is shared
+    assert GetGraphVisualizationHandler(layouts=GraphLayoutCache())._summaries is shared
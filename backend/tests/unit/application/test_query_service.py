@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from src.application.services.query_service import QueryService
+from src.infrastructure.cache.graph_version import InMemoryGraphVersionStore
+from src.infrastructure.cache.in_memory import InMemoryPreviewCache
+
+
+class CountingExecutor:
+    def __init__(self, gate: asyncio.Event | None = None):
+        self.calls = 0
+        self.gate = gate
+
+    async def __call__(self):
+        self.calls += 1
+        calls = self.calls
+        if self.gate is not None:
+            await self.gate.wait()
+        return {"calls": calls}
+
+
+@pytest.fixture
+def versions():
+    return InMemoryGraphVersionStore()
+
+
+@pytest.fixture
+def service(versions):
+    return QueryService(cache=InMemoryPreviewCache(), enable_logging=False, versions=versions)
+
+
+@pytest.mark.asyncio
+async def test_results_are_cached_until_project_version_changes(service, versions):
+    executor = CountingExecutor()
+    params = {"project_id": "p1", "limit": 10}
+
+    first, first_hit = await service._execute_with_cache("analyze_centrality", params, executor)
+    second, second_hit = await service._execute_with_cache("analyze_centrality", params, executor)
+    await versions.bump("p2")
+    third, _ = await service._execute_with_cache("analyze_centrality", params, executor)
+    await versions.bump("p1")
+    fourth, fourth_hit = await service._execute_with_cache("analyze_centrality", params, executor)
+
+    assert (first_hit, second_hit, fourth_hit) == (False, True, False)
+    assert first == second == third == {"calls": 1}
+    assert fourth == {"calls": 2}
+
+
+@pytest.mark.asyncio
+async def test_version_lookup_failure_bypasses_cache(service, versions, mocker):
+    mocker.patch.object(versions, "get", side_effect=ConnectionError("redis down"))
+    executor = CountingExecutor()
+
+    for _ in range(2):
+        _, cache_hit = await service._execute_with_cache("search_entities", {"project_id": "p1"}, executor)
+        assert not cache_hit
+
+    assert executor.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_concurrent_identical_queries_execute_once(service):
+    gate = asyncio.Event()
+    executor = CountingExecutor(gate)
+    params = {"project_id": "p1"}
+
+    pending = asyncio.gather(
+        *(service._execute_with_cache("find_path", params, executor) for _ in range(20))
+    )
+    await asyncio.sleep(0)
+    gate.set()
+    results = await pending
+
+    assert executor.calls == 1
+    assert all(result == ({"calls": 1}, False) for result in results)
+    assert service._inflight == {}
+    assert service.get_statistics()["coalesced_queries"] == 19
+
+
+@pytest.mark.asyncio
+async def test_shared_failure_reaches_every_caller_and_is_not_cached(service):
+    class FailingExecutor(CountingExecutor):
+        async def __call__(self):
+            await super().__call__()
+            raise RuntimeError("neo4j down")
+
+    executor = FailingExecutor()
+    results = await asyncio.gather(
+        *(service._execute_with_cache("find_path", {"project_id": "p1"}, executor) for _ in range(3)),
+        return_exceptions=True,
+    )
+
+    assert executor.calls == 1
+    assert all(isinstance(result, RuntimeError) for result in results)
+    with pytest.raises(RuntimeError):
+        await service._execute_with_cache("find_path", {"project_id": "p1"}, executor)
+    assert executor.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_stale_entries_are_served_while_refreshing_once(versions):
+    service = QueryService(
+        cache=InMemoryPreviewCache(), enable_logging=False, versions=versions, stale_ttl=60
+    )
+    service.CACHE_TTL = {"analyze_centrality": 0}
+    gate = asyncio.Event()
+    gate.set()
+    executor = CountingExecutor(gate)
+    params = {"project_id": "p1"}
+
+    await service._execute_with_cache("analyze_centrality", params, executor)
+    gate.clear()
+    stale = [await service._execute_with_cache("analyze_centrality", params, executor) for _ in range(3)]
+    await asyncio.sleep(0)
+    assert executor.calls == 2
+    gate.set()
+    await asyncio.gather(*service._inflight.values())
+    refreshed, hit = await service._execute_with_cache("analyze_centrality", params, executor)
+
+    assert stale == [({"calls": 1}, True)] * 3
+    assert (refreshed, hit) == ({"calls": 2}, True)
+
+
+def test_stale_ttl_defaults_to_setting(versions, mocker):
+    mocker.patch("src.application.services.query_service.settings.query_cache_stale_ttl", 42)
+
+    assert QueryService(cache=InMemoryPreviewCache(), versions=versions)._stale_ttl == 42
+    assert QueryService(cache=InMemoryPreviewCache(), versions=versions, stale_ttl=0)._stale_ttl == 0
+
+
+def test_get_query_service_is_shared(mocker):
+    from src.application.services import query_service
+
+    mocker.patch.object(query_service, "_service", None)
+    mocker.patch.object(query_service.settings, "query_cache_stale_ttl", 42)
+
+    service = query_service.get_query_service()
+
+    assert query_service.get_query_service() is service
+    assert service._stale_ttl == 42
+
+
+def test_query_log_is_bounded_and_statistics_cover_all_queries(versions):
+    from src.application.services.query_service import QueryLog
+
+    class SmallLogQueryService(QueryService):
+        MAX_QUERY_LOGS = 5
+
+    service = SmallLogQueryService(cache=InMemoryPreviewCache(), enable_logging=True, versions=versions)
+
+    for i in range(100):
+        service._log_query(QueryLog(
+            query_id=str(i),
+            query_type="search_entities",
+            project_id="p1",
+            user_id="u1",
+            parameters={},
+            execution_time_ms=float(i + 1),
+            result_size=0,
+            cache_hit=i % 4 == 0,
+        ))
+
+    stats = service.get_statistics()
+    latency = stats["type_statistics"]["search_entities"]["latency_ms"]
+
+    assert [log.query_id for log in service.get_query_logs(limit=3)] == ["97", "98", "99"]
+    assert len(service.get_query_logs()) == 5
+    assert stats["total_queries"] == 100
+    assert stats["cache_hit_rate"] == 25.0
+    assert stats["avg_execution_time_ms"] == 50.5
+    assert latency["p50"] == pytest.approx(50, rel=0.03)
+    assert latency["p99"] == pytest.approx(99, rel=0.03)
@@ -0,0 +1,277 @@
+from __future__ import annotations
+
+import pytest
+
+from src.application.queries.pagination import (
+    SCORE_CURSOR,
+    UPDATED_AT_CURSOR,
+    InvalidCursorError,
+    decode_cursor,
+    encode_cursor,
+)
+from src.application.queries.search_entities import (
+    SearchEntitiesHandler,
+    SearchEntitiesQuery,
+    fulltext_phrase,
+)
+from src.infrastructure.cache.in_memory import InMemoryPreviewCache
+from src.infrastructure.persistence.neo4j import cypher_queries as queries
+
+
+def _node(entity_id: str, updated_at: str = "2026-01-01T00:00:00Z") -> dict:
+    return {
+        "id": entity_id,
+        "external_id": entity_id,
+        "properties_json": '{"k": 1}',
+        "updated_at": updated_at,
+    }
+
+
+class FakeClient:
+    calls: list[tuple[str, dict]] = []
+    fulltext_error: Exception | None = None
+    hits: list[dict] = []
+
+    @classmethod
+    async def execute_read(cls, query, parameters=None):
+        cls.calls.append((query, parameters))
+        if query in (queries.FULLTEXT_SEARCH_ENTITIES, queries.FULLTEXT_SEARCH_ENTITIES_WITH_TOTAL):
+            if cls.fulltext_error:
+                raise cls.fulltext_error
+            rows = cls.hits
+            if parameters["after_score"] is not None:
+                key = (-parameters["after_score"], parameters["after_id"])
+                rows = [row for row in rows if (-row["score"], row["entity"]["id"]) > key]
+            start = parameters["offset"]
+            page = [dict(row) for row in rows[start:start + parameters["limit"]]]
+            if query == queries.FULLTEXT_SEARCH_ENTITIES:
+                return page
+            return [{"total": len(cls.hits), "hits": page}]
+        if query == queries.SEARCH_ENTITIES_WITH_TOTAL:
+            return [{"total": 1, "hits": [{"entity": _node("scanned")}]}]
+        if query == queries.SEARCH_ENTITIES:
+            rows = [{"entity": _node(f"s{i}", f"2026-01-0{9 - i}T00:00:00Z")} for i in range(5)]
+            if parameters["after_updated_at"] is not None:
+                key = (parameters["after_updated_at"], parameters["after_id"])
+                rows = [
+                    row for row in rows
+                    if (row["entity"]["updated_at"], row["entity"]["id"]) < key
+                ]
+            start = parameters["offset"]
+            return rows[start:start + parameters["limit"]]
+        return []
+
+
+@pytest.fixture
+def client():
+    FakeClient.calls = []
+    FakeClient.fulltext_error = None
+    FakeClient.hits = [
+        {"entity": _node(f"e{i}"), "score": score}
+        for i, score in enumerate([3.0, 2.0, 2.0, 1.0])
+    ]
+    return FakeClient
+
+
+@pytest.mark.asyncio
+async def test_keyword_search_uses_fulltext_with_keyset_cursor(client):
+    handler = SearchEntitiesHandler(client, totals_cache=InMemoryPreviewCache())
+
+    first = await handler.handle(
+        SearchEntitiesQuery(project_id="p1", owner_id="u1", keyword="华为", limit=3)
+    )
+    assert [e["id"] for e in first.entities] == ["e0", "e1", "e2"]
+    assert first.entities[0]["properties"] == {"k": 1}
+    assert first.total == 4
+    assert first.has_more
+    assert decode_cursor(first.next_cursor, SCORE_CURSOR) == (SCORE_CURSOR, [2.0, "e2"])
+
+    second = await handler.handle(
+        SearchEntitiesQuery(
+            project_id="p1", owner_id="u1", keyword="华为", limit=3, cursor=first.next_cursor
+        )
+    )
+    assert [e["id"] for e in second.entities] == ["e3"]
+    assert not second.has_more
+    assert second.next_cursor is None
+    # 游标页不再收集全部匹配计数，总数来自首页
+    assert second.total == 4
+
+    assert [q for q, _ in client.calls] == [
+        queries.FULLTEXT_SEARCH_ENTITIES_WITH_TOTAL,
+        queries.FULLTEXT_SEARCH_ENTITIES,
+    ]
+    assert client.calls[0][1]["search_query"] == '"华为"'
+
+
+@pytest.mark.asyncio
+async def test_cursor_page_without_cached_total_skips_count(client):
+    cursor = encode_cursor(SCORE_CURSOR, 2.0, "e2")
+
+    result = await SearchEntitiesHandler(client, totals_cache=InMemoryPreviewCache()).handle(
+        SearchEntitiesQuery(project_id="p1", owner_id="u1", keyword="华为", limit=3, cursor=cursor)
+    )
+
+    assert [e["id"] for e in result.entities] == ["e3"]
+    assert result.total is None
+    assert [q for q, _ in client.calls] == [queries.FULLTEXT_SEARCH_ENTITIES]
+
+
+@pytest.mark.asyncio
+async def test_count_mode_none_skips_total(client):
+    result = await SearchEntitiesHandler(client).handle(
+        SearchEntitiesQuery(project_id="p1", owner_id="u1", keyword="华为", limit=3, count_mode="none")
+    )
+
+    assert result.total is None
+    assert result.has_more
+    assert [q for q, _ in client.calls] == [queries.FULLTEXT_SEARCH_ENTITIES]
+
+
+@pytest.mark.asyncio
+async def test_count_mode_approximate_reuses_cached_total(client):
+    handler = SearchEntitiesHandler(client, totals_cache=InMemoryPreviewCache())
+    query = SearchEntitiesQuery(
+        project_id="p1", owner_id="u1", keyword="华为", limit=2, count_mode="approximate"
+    )
+
+    first = await handler.handle(query)
+    client.hits = client.hits[:3]
+    second = await handler.handle(query)
+
+    assert first.total == second.total == 4
+    assert [q for q, _ in client.calls] == [
+        queries.FULLTEXT_SEARCH_ENTITIES_WITH_TOTAL,
+        queries.FULLTEXT_SEARCH_ENTITIES,
+    ]
+
+
+@pytest.mark.asyncio
+async def test_exact_offset_pages_reuse_the_cached_total(client):
+    handler = SearchEntitiesHandler(client, totals_cache=InMemoryPreviewCache())
+
+    first = await handler.handle(SearchEntitiesQuery(project_id="p1", owner_id="u1", keyword="华为", limit=2))
+    second = await handler.handle(
+        SearchEntitiesQuery(project_id="p1", owner_id="u1", keyword="华为", limit=2, offset=2)
+    )
+
+    assert first.total == second.total == 4
+    assert [e["id"] for e in second.entities] == ["e2", "e3"]
+    assert [q for q, _ in client.calls] == [
+        queries.FULLTEXT_SEARCH_ENTITIES_WITH_TOTAL,
+        queries.FULLTEXT_SEARCH_ENTITIES,
+    ]
+
+
+class BrokenVersions:
+    async def get(self, project_id):
+        raise ConnectionError("redis down")
+
+
+@pytest.mark.asyncio
+async def test_version_lookup_failure_counts_without_cache(client):
+    totals = InMemoryPreviewCache()
+    handler = SearchEntitiesHandler(client, totals_cache=totals, versions=BrokenVersions())
+    query = SearchEntitiesQuery(
+        project_id="p1", owner_id="u1", keyword="华为", limit=2, count_mode="approximate"
+    )
+
+    first = await handler.handle(query)
+    second = await handler.handle(query)
+
+    assert first.total == second.total == 4
+    assert [q for q, _ in client.calls] == [queries.FULLTEXT_SEARCH_ENTITIES_WITH_TOTAL] * 2
+    assert totals._store == {}
+
+
+@pytest.mark.asyncio
+async def test_falls_back_to_scan_when_fulltext_index_unavailable(client):
+    client.fulltext_error = RuntimeError("There is no such fulltext schema index")
+
+    result = await SearchEntitiesHandler(client).handle(
+        SearchEntitiesQuery(project_id="p1", owner_id="u1", keyword="华为")
+    )
+
+    assert [e["id"] for e in result.entities] == ["scanned"]
+    assert result.next_cursor is None
+    assert client.calls[-1][0] == queries.SEARCH_ENTITIES_WITH_TOTAL
+
+
+@pytest.mark.asyncio
+async def test_single_character_keyword_uses_scan(client):
+    result = await SearchEntitiesHandler(client).handle(
+        SearchEntitiesQuery(project_id="p1", owner_id="u1", keyword=" 华 ")
+    )
+
+    assert [q for q, _ in client.calls] == [queries.SEARCH_ENTITIES_WITH_TOTAL]
+    assert [e["id"] for e in result.entities] == ["scanned"]
+
+
+@pytest.mark.asyncio
+async def test_no_fulltext_hits_falls_back_to_scan(client):
+    client.hits = []
+
+    result = await SearchEntitiesHandler(client).handle(
+        SearchEntitiesQuery(project_id="p1", owner_id="u1", keyword="tech")
+    )
+
+    assert [q for q, _ in client.calls] == [
+        queries.FULLTEXT_SEARCH_ENTITIES_WITH_TOTAL,
+        queries.SEARCH_ENTITIES_WITH_TOTAL,
+    ]
+    assert [e["id"] for e in result.entities] == ["scanned"]
+    assert result.total == 1
+
+
+@pytest.mark.asyncio
+async def test_empty_keyword_uses_scan(client):
+    await SearchEntitiesHandler(client).handle(SearchEntitiesQuery(project_id="p1", owner_id="u1"))
+
+    assert all(q != queries.FULLTEXT_SEARCH_ENTITIES for q, _ in client.calls)
+
+
+@pytest.mark.asyncio
+async def test_invalid_cursor_is_rejected(client):
+    with pytest.raises(InvalidCursorError):
+        await SearchEntitiesHandler(client).handle(
+            SearchEntitiesQuery(project_id="p1", owner_id="u1", keyword="x", cursor="not-a-cursor")
+        )
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(encode_cursor(SCORE_CURSOR, 1.0), SCORE_CURSOR)
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(encode_cursor(UPDATED_AT_CURSOR, "t", "e1"), SCORE_CURSOR)
+
+
+def test_fulltext_phrase_escapes_quotes_and_backslashes():
+    assert fulltext_phrase(' a"b\\c ') == '"a\\"b\\\\c"'
+
+
+@pytest.mark.asyncio
+async def test_scan_pages_with_updated_at_cursor(client):
+    handler = SearchEntitiesHandler(client)
+    query = SearchEntitiesQuery(project_id="p1", owner_id="u1", limit=2, count_mode="none")
+
+    first = await handler.handle(query)
+    query.cursor = first.next_cursor
+    second = await handler.handle(query)
+
+    assert [e["id"] for e in first.entities] == ["s0", "s1"]
+    assert decode_cursor(first.next_cursor, UPDATED_AT_CURSOR) == (
+        UPDATED_AT_CURSOR, ["2026-01-08T00:00:00Z", "s1"]
+    )
+    assert [e["id"] for e in second.entities] == ["s2", "s3"]
+    assert second.offset == 0
+
+
+@pytest.mark.asyncio
+async def test_scan_cursor_with_keyword_skips_fulltext(client):
+    cursor = encode_cursor(UPDATED_AT_CURSOR, "2026-01-08T00:00:00Z", "s1")
+
+    result = await SearchEntitiesHandler(client).handle(
+        SearchEntitiesQuery(
+            project_id="p1", owner_id="u1", keyword="华为", cursor=cursor, count_mode="none"
+        )
+    )
+
+    assert [q for q, _ in client.calls] == [queries.SEARCH_ENTITIES]
+    assert [e["id"] for e in result.entities] == ["s2", "s3", "s4"]
@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import random
+from collections import deque
+
+import numpy as np
+import pytest
+
+from src.domain.services.analysis.betweenness import (
+    betweenness,
+    betweenness_partial,
+    sample_sources,
+    undirected_csr,
+)
+
+
+def csr(edges, n):
+    edges = np.array(edges)
+    return undirected_csr(edges[:, 0], edges[:, 1], n)
+
+
+def reference_betweenness(indptr, indices):
+    """逐节点队列实现的 Brandes（无向图，除以 2）"""
+    n = len(indptr) - 1
+    adj = [indices[indptr[i]:indptr[i + 1]].tolist() for i in range(n)]
+    scores = [0.0] * n
+    for s in range(n):
+        stack, preds = [], [[] for _ in range(n)]
+        sigma, dist = [0] * n, [-1] * n
+        sigma[s], dist[s] = 1, 0
+        queue = deque([s])
+        while queue:
+            v = queue.popleft()
+            stack.append(v)
+            for w in adj[v]:
+                if dist[w] < 0:
+                    dist[w] = dist[v] + 1
+                    queue.append(w)
+                if dist[w] == dist[v] + 1:
+                    sigma[w] += sigma[v]
+                    preds[w].append(v)
+        delta = [0.0] * n
+        while stack:
+            w = stack.pop()
+            for v in preds[w]:
+                delta[v] += sigma[v] / sigma[w] * (1 + delta[w])
+            if w != s:
+                scores[w] += delta[w]
+    return np.array(scores) / 2
+
+
+def test_path_and_star_graphs():
+    path = betweenness(*csr([(0, 1), (1, 2), (2, 3), (3, 4)], 5))
+    star = betweenness(*csr([(0, 1), (0, 2), (0, 3), (0, 4)], 5))
+
+    np.testing.assert_allclose(path, [0, 3, 4, 3, 0])
+    np.testing.assert_allclose(star, [6, 0, 0, 0, 0])
+
+
+def test_matches_reference_on_random_multigraph():
+    rng = random.Random(3)
+    edges = [(rng.randrange(60), rng.randrange(60)) for _ in range(150)]
+    indptr, indices = csr(edges, 60)
+
+    np.testing.assert_allclose(betweenness(indptr, indices), reference_betweenness(indptr, indices))
+
+
+def test_partials_over_source_chunks_sum_to_exact_scores():
+    indptr, indices = csr([(0, 1), (1, 2), (2, 3), (1, 3), (3, 4)], 5)
+    sources = np.arange(5)
+
+    chunked = sum(betweenness_partial(indptr, indices, chunk) for chunk in np.array_split(sources, 3))
+
+    np.testing.assert_allclose(chunked, betweenness_partial(indptr, indices, sources))
+
+
+def test_sampling_follows_gds_semantics():
+    assert len(sample_sources(10, 100)) == 10
+    np.testing.assert_array_equal(sample_sources(1000, 50, 7), sample_sources(1000, 50, 7))
+    assert len(set(sample_sources(1000, 50, 7).tolist())) == 50
+    with pytest.raises(ValueError):
+        sample_sources(10, 0)
+
+
+def test_sampled_scores_estimate_exact_scores():
+    rng = random.Random(5)
+    edges = [(rng.randrange(300), rng.randrange(300)) for _ in range(900)]
+    indptr, indices = csr(edges, 300)
+
+    exact = betweenness(indptr, indices)
+    sampled = betweenness(indptr, indices, sampling_size=150, sampling_seed=1)
+
+    assert np.corrcoef(exact, sampled)[0, 1] > 0.9
+    assert sampled.sum() == pytest.approx(exact.sum(), rel=0.2)
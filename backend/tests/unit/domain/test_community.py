@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from src.domain.services.analysis.community import (
+    detect_communities,
+    label_propagation,
+    louvain,
+    modularity,
+    symmetric_edges,
+)
+
+
+def planted_partition(groups=10, size=20, inner=120, outer=30, seed=0):
+    rng = np.random.default_rng(seed)
+    group = rng.integers(0, groups, inner * groups)
+    source = group * size + rng.integers(0, size, len(group))
+    target = group * size + rng.integers(0, size, len(group))
+    noise = rng.integers(0, groups * size, (outer, 2))
+    edges = symmetric_edges(np.concatenate([source, noise[:, 0]]), np.concatenate([target, noise[:, 1]]))
+    return edges, np.arange(groups * size) // size
+
+
+def same_partition(labels, truth):
+    pairs = set(zip(labels.tolist(), truth.tolist()))
+    return len(pairs) == len(set(labels.tolist())) == len(set(truth.tolist()))
+
+
+def test_louvain_recovers_planted_communities():
+    (rows, cols, weights), truth = planted_partition()
+
+    labels, quality, levels = louvain(rows, cols, weights, len(truth))
+
+    assert same_partition(labels, truth)
+    assert quality == pytest.approx(modularity(rows, cols, weights, truth))
+    assert levels >= 2
+
+
+def test_louvain_merges_two_triangles_joined_by_a_bridge():
+    rows, cols, weights = symmetric_edges(
+        np.array([0, 1, 2, 3, 4, 5, 2]), np.array([1, 2, 0, 4, 5, 3, 3])
+    )
+
+    labels, quality, _ = louvain(rows, cols, weights, 6)
+
+    assert labels[0] == labels[1] == labels[2] != labels[3] == labels[4] == labels[5]
+    assert quality == pytest.approx(5 / 14)
+
+
+def test_label_propagation_recovers_planted_communities_and_converges():
+    (rows, cols, weights), truth = planted_partition()
+
+    labels, iterations = label_propagation(rows, cols, weights, len(truth), max_iterations=50)
+
+    assert same_partition(labels, truth)
+    assert iterations < 50
+
+
+def test_isolated_nodes_and_weights():
+    # 节点 3 没有关系；0-1 权重远大于 1-2
+    labels = detect_communities(
+        "label_propagation", np.array([0, 1]), np.array([1, 2]), 4, weights=np.array([5.0, 1.0])
+    )
+
+    assert labels[0] == labels[1]
+    assert len(set(labels.tolist())) >= 2 and labels[3] not in labels[:3]
+
+
+def test_same_random_state_gives_same_result_and_unknown_algorithm_raises():
+    (rows, cols, weights), truth = planted_partition(seed=3)
+
+    first = louvain(rows, cols, weights, len(truth), random_state=7)[0]
+    second = louvain(rows, cols, weights, len(truth), random_state=7)[0]
+
+    np.testing.assert_array_equal(first, second)
+    with pytest.raises(ValueError):
+        detect_communities("girvan_newman", np.array([0]), np.array([1]), 2)
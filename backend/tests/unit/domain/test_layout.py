@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from src.domain.services.analysis.layout import (
+    _repulsion_barnes_hut,
+    _repulsion_exact,
+    force_layout,
+)
+
+
+def two_communities(size=30, seed=0):
+    rng = np.random.default_rng(seed)
+    group = np.arange(size * 2) // size
+    source = rng.integers(0, size * 2, size * 8)
+    target = group[source] * size + rng.integers(0, size, size * 8)
+    return source, target, group
+
+
+@pytest.mark.parametrize("algorithm", ["forceatlas2", "fruchterman_reingold"])
+def test_communities_are_laid_out_apart(algorithm):
+    source, target, group = two_communities()
+
+    positions = force_layout(source, target, len(group), algorithm=algorithm, iterations=50)
+
+    distance = np.linalg.norm(positions[:, None] - positions[None], axis=2)
+    same = distance[group[:, None] == group[None]].mean()
+    other = distance[group[:, None] != group[None]].mean()
+    assert positions.shape == (len(group), 2)
+    assert np.abs(positions.mean(axis=0)).max() < 1e-6
+    assert same < 0.6 * other
+
+
+def test_layout_is_reproducible_with_seed():
+    source, target, group = two_communities()
+
+    first = force_layout(source, target, len(group), seed=3)
+    second = force_layout(source, target, len(group), seed=3)
+
+    np.testing.assert_allclose(first, second)
+
+
+def test_barnes_hut_approximates_exact_repulsion():
+    rng = np.random.default_rng(1)
+    positions = np.concatenate([rng.normal(0, 20, (1500, 2)), rng.uniform(-2000, 2000, (500, 2))])
+    mass = rng.integers(1, 5, len(positions)).astype(float)
+
+    exact = _repulsion_exact(positions, mass, 1e4)
+    approx = _repulsion_barnes_hut(positions, mass, 1e4)
+
+    error = np.linalg.norm(exact - approx, axis=1) / np.linalg.norm(exact, axis=1)
+    assert np.median(error) < 0.01
+    assert np.percentile(error, 95) < 0.05
+
+
+def test_warm_start_keeps_known_nodes_and_places_new_ones_near_neighbors():
+    source, target, group = two_communities()
+    n = len(group)
+    layout = force_layout(source, target, n)
+    # 新节点 n 只连到第一个社区的节点 0
+    initial = np.vstack([layout, [np.nan, np.nan]])
+
+    warm = force_layout(np.append(source, n), np.append(target, 0), n + 1, initial=initial, iterations=15)
+
+    spread = np.ptp(layout, axis=0).mean()
+    assert np.linalg.norm(warm[:n] - layout, axis=1).mean() < 0.1 * spread
+    first_centre = warm[:n][group == 0].mean(axis=0)
+    second_centre = warm[:n][group == 1].mean(axis=0)
+    assert np.linalg.norm(warm[n] - first_centre) < np.linalg.norm(warm[n] - second_centre)
+
+
+def test_rejects_unknown_algorithm():
+    with pytest.raises(ValueError):
+        force_layout(np.array([0]), np.array([1]), 2, algorithm="spring")
@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from src.domain.services.analysis.pagerank import pagerank
+
+
+def undirected(edges):
+    source = np.array([s for s, _ in edges] + [t for _, t in edges])
+    target = np.array([t for _, t in edges] + [s for s, _ in edges])
+    return source, target
+
+
+def reference_pagerank(edges, n, damping=0.85, iterations=20, teleport=None):
+    """逐节点循环的参考实现（GDS 公式）"""
+    teleport = teleport or [1.0] * n
+    out = {u: [] for u in range(n)}
+    for s, t in edges:
+        out[s].append(t)
+    scores = [(1 - damping) * p for p in teleport]
+    for _ in range(iterations):
+        incoming = [0.0] * n
+        for u, targets in out.items():
+            for v in targets:
+                incoming[v] += scores[u] / len(targets)
+        scores = [(1 - damping) * p + damping * x for p, x in zip(teleport, incoming)]
+    return scores
+
+
+def test_matches_reference_on_directed_graph_with_dangling_node():
+    edges = [(0, 1), (1, 2), (2, 0), (3, 2), (0, 4)]
+    source = np.array([s for s, _ in edges])
+    target = np.array([t for _, t in edges])
+
+    scores, iterations = pagerank(source, target, 5, tolerance=0)
+
+    assert iterations == 20
+    np.testing.assert_allclose(scores, reference_pagerank(edges, 5), rtol=1e-12)
+
+
+def test_star_center_ranks_first_and_converges_early():
+    source, target = undirected([(0, 1), (0, 2), (0, 3), (0, 4)])
+
+    scores, iterations = pagerank(source, target, 5, max_iterations=500, tolerance=1e-9)
+
+    assert iterations < 500
+    assert scores.argmax() == 0
+    # 无向星形图的稳态：中心 c = (1-d) + 4d*x，叶子 x = (1-d) + d*c/4
+    assert scores[0] == pytest.approx((0.15 + 0.85 * 0.15 * 4) / (1 - 0.85 ** 2), rel=1e-6)
+
+
+def test_personalized_pagerank_decays_with_distance_and_leaves_other_components_at_zero():
+    source, target = undirected([(0, 1), (1, 2), (3, 4)])
+
+    scores, _ = pagerank(source, target, 5, source_nodes=np.array([0]))
+
+    assert scores[1] > scores[2] > 0 and scores[0] > scores[2]
+    assert scores[3] == scores[4] == 0
+
+
+def test_weights_shift_rank_and_non_positive_edges_are_ignored():
+    source = np.array([0, 0, 0])
+    target = np.array([1, 2, 3])
+
+    scores, _ = pagerank(source, target, 4, weights=np.array([3.0, 1.0, 0.0]))
+
+    assert scores[1] == pytest.approx(0.15 + 0.85 * 0.15 * 0.75)
+    assert scores[2] == pytest.approx(0.15 + 0.85 * 0.15 * 0.25)
+    assert scores[3] == pytest.approx(0.15)
+
+
+def test_rejects_invalid_damping_factor():
+    with pytest.raises(ValueError):
+        pagerank(np.array([0]), np.array([1]), 2, damping_factor=1.0)
@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+from itertools import islice
+
+from src.domain.services.analysis.path_finder import k_shortest_paths, shortest_path
+from src.infrastructure.persistence.neo4j.adjacency_snapshot import AdjacencySnapshot
+
+
+def _graph(*edges: tuple[str, str]) -> AdjacencySnapshot:
+    return AdjacencySnapshot.from_edges(
+        "p1", 0, ((source, target, f"{source}-{target}", "HOLDS") for source, target in edges)
+    )
+
+
+def _ids(graph: AdjacencySnapshot, path) -> list[str]:
+    return [graph.node_id(node) for node in path.nodes]
+
+
+def test_shortest_path_ignores_relation_direction():
+    graph = _graph(("a", "b"), ("c", "b"), ("c", "d"), ("a", "x"), ("x", "y"), ("y", "z"), ("z", "d"))
+
+    path = shortest_path(graph, graph.index_of("a"), graph.index_of("d"), max_depth=5)
+
+    assert _ids(graph, path) == ["a", "b", "c", "d"]
+    assert [graph.edge_id(edge) for edge in path.edges] == ["a-b", "c-b", "c-d"]
+
+
+def test_shortest_path_respects_max_depth():
+    graph = _graph(("a", "b"), ("b", "c"), ("c", "d"))
+    a, d = graph.index_of("a"), graph.index_of("d")
+
+    assert shortest_path(graph, a, d, max_depth=2) is None
+    assert len(shortest_path(graph, a, d, max_depth=3)) == 3
+    assert shortest_path(graph, a, a, max_depth=3) is None
+
+
+def test_k_shortest_paths_are_simple_and_sorted_by_length():
+    graph = _graph(
+        ("s", "a"), ("a", "t"),
+        ("s", "b"), ("b", "t"),
+        ("s", "c"), ("c", "d"), ("d", "t"),
+        ("a", "b"),
+    )
+    s, t = graph.index_of("s"), graph.index_of("t")
+
+    paths = list(k_shortest_paths(graph, s, t, max_depth=4))
+
+    lengths = [len(path) for path in paths]
+    assert lengths == sorted(lengths)
+    assert sorted(tuple(_ids(graph, p)) for p in paths) == sorted([
+        ("s", "a", "t"), ("s", "b", "t"), ("s", "c", "d", "t"),
+        ("s", "a", "b", "t"), ("s", "b", "a", "t"),
+    ])
+    assert all(len(set(p.nodes)) == len(p.nodes) for p in paths)
+
+
+def test_k_shortest_paths_distinguish_parallel_relations_and_stop_early():
+    graph = AdjacencySnapshot.from_edges("p1", 0, [("a", "b", "r1", "HOLDS"), ("a", "b", "r2", "HOLDS"), ("b", "c", "r3", "HOLDS")])
+
+    paths = list(islice(k_shortest_paths(graph, graph.index_of("a"), graph.index_of("c"), 3), 5))
+    first = next(k_shortest_paths(graph, graph.index_of("a"), graph.index_of("c"), 3))
+
+    assert {tuple(graph.edge_id(e) for e in p.edges) for p in paths} == {("r1", "r3"), ("r2", "r3")}
+    assert len(first) == 2
@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+import pytest
+
+from src.domain.services.matching.similarity_index import (
+    NameSimilarityIndex,
+    SimilarityIndexConfig,
+    blocking_key,
+)
+
+
+def _lsh_index() -> NameSimilarityIndex[str]:
+    return NameSimilarityIndex(SimilarityIndexConfig(exact_below=0))
+
+
+def test_blocking_key_strips_common_suffix_and_whitespace():
+    assert blocking_key(" 北京华为 科技有限公司 ") == "北京华为科技"
+    assert blocking_key("有限公司") == "有限公司"
+
+
+def test_query_returns_near_duplicates():
+    index = _lsh_index()
+    index.add("a", "深圳腾讯计算机系统有限公司")
+    index.add("b", "杭州阿里巴巴网络技术有限公司")
+
+    assert "a" in index.query("深圳腾讯计算机系统股份有限公司")
+    assert index.query("成都天府农业合作社") == []
+
+
+def test_small_index_falls_back_to_full_scan():
+    index = NameSimilarityIndex(SimilarityIndexConfig(exact_below=10))
+    index.add("a", "甲")
+    index.add("b", "完全无关的名称")
+
+    assert index.query("乙") == ["a", "b"]
+
+
+def test_duplicate_keys_are_ignored_and_order_is_preserved():
+    index = _lsh_index()
+    index.add("first", "上海浦东发展银行")
+    index.add("second", "上海浦东发展银行股份有限公司")
+    index.add("first", "上海浦东发展银行")
+
+    assert len(index) == 2
+    assert index.query("上海浦东发展银行") == ["first", "second"]
+
+
+def test_bands_must_divide_num_perm():
+    with pytest.raises(ValueError):
+        NameSimilarityIndex(SimilarityIndexConfig(num_perm=30, bands=16))
@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from src.domain.services.analysis.tiles import (
+    TILE_DEPTH,
+    assign_min_zoom,
+    morton_encode,
+    quantize,
+    tile_bounds,
+    tile_key_range,
+)
+
+
+def test_tile_key_range_covers_exactly_the_cells_inside_the_tile():
+    rng = np.random.default_rng(0)
+    cells = rng.integers(0, 1 << TILE_DEPTH, size=(2000, 2))
+    codes = morton_encode(cells[:, 0], cells[:, 1])
+
+    for z, x, y in [(0, 0, 0), (1, 1, 0), (3, 5, 2), (6, 40, 63)]:
+        lo, hi = tile_key_range(z, x, y)
+        shift = TILE_DEPTH - z
+        inside = ((cells[:, 0] >> shift) == x) & ((cells[:, 1] >> shift) == y)
+        assert np.array_equal((codes >= lo) & (codes < hi), inside)
+
+
+def test_tile_key_range_rejects_out_of_range_tiles():
+    with pytest.raises(ValueError):
+        tile_key_range(2, 4, 0)
+    # 比最细一层更深的瓦片落在所在的最细格子里
+    assert tile_key_range(TILE_DEPTH + 2, 4, 0) == tile_key_range(TILE_DEPTH, 1, 0)
+
+
+def test_min_zoom_caps_nodes_per_tile_and_keeps_hubs_visible():
+    rng = np.random.default_rng(1)
+    positions = rng.normal(size=(5000, 2))
+    importance = rng.pareto(1.5, 5000)
+    codes = quantize(positions, *tile_bounds(positions))
+
+    min_zoom, max_zoom = assign_min_zoom(codes, importance, capacity=64)
+
+    assert (min_zoom <= max_zoom).all()
+    assert min_zoom[np.argmax(importance)] == 0
+    for z in range(max_zoom + 1):
+        cells = codes >> np.uint64(2 * (TILE_DEPTH - z))
+        visible = min_zoom <= z
+        assert np.bincount(np.unique(cells[visible], return_inverse=True)[1]).max() <= 64
+    # 最深一层所有节点都可见
+    assert (min_zoom <= max_zoom).sum() == 5000
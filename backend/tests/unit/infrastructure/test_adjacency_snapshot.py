@@ -0,0 +1,252 @@
+from __future__ import annotations
+
+import asyncio
+import uuid
+
+import numpy as np
+import pytest
+
+from src.domain.entities.relation import Relation
+from src.domain.value_objects.relation_type import RelationType
+from src.infrastructure.cache.graph_version import InMemoryGraphVersionStore
+from src.infrastructure.persistence.neo4j.adjacency_snapshot import (
+    AdjacencySnapshot,
+    AdjacencySnapshotStore,
+    SnapshotDelta,
+)
+from src.infrastructure.persistence.neo4j.graph_repository import Neo4jGraphRepository
+
+
+class FakeClient:
+    loads = 0
+    rows = [
+        {"source_id": "a", "target_id": "b", "id": "r1", "type": "HOLDS"},
+        {"source_id": "b", "target_id": "c", "id": "r2", "type": "HOLDS"},
+    ]
+
+    @classmethod
+    async def iter_read_batches(cls, query, parameters=None, *, batch_size=1000):
+        cls.loads += 1
+        yield cls.rows
+
+
+@pytest.fixture(autouse=True)
+def reset_client():
+    FakeClient.loads = 0
+
+
+@pytest.mark.asyncio
+async def test_snapshot_is_reused_until_graph_version_changes():
+    versions = InMemoryGraphVersionStore()
+    store = AdjacencySnapshotStore(FakeClient, versions, max_edges=10, max_projects=2)
+
+    first = await store.get("p1")
+    again = await store.get("p1")
+    await versions.bump("p1")
+    reloaded = await store.get("p1")
+
+    assert first is again and reloaded is not first
+    assert FakeClient.loads == 2
+    assert first.edge_count == 2 and sorted(n for n, _ in first.neighbors(first.index_of("b"))) == [0, 2]
+
+
+@pytest.mark.asyncio
+async def test_oversized_projects_fall_back_without_reloading():
+    store = AdjacencySnapshotStore(FakeClient, InMemoryGraphVersionStore(), max_edges=1)
+
+    assert await store.get("p1") is None
+    assert await store.get("p1") is None
+    assert FakeClient.loads == 1
+
+
+@pytest.mark.asyncio
+async def test_disabled_store_never_loads():
+    store = AdjacencySnapshotStore(FakeClient, InMemoryGraphVersionStore(), max_edges=0)
+
+    assert await store.get("p1") is None
+    assert FakeClient.loads == 0
+
+
+def _uuid_edges(count: int) -> list[tuple[str, str, str, str]]:
+    nodes = [str(uuid.uuid4()) for _ in range(count)]
+    return [
+        (nodes[i], nodes[(i + 1) % count], str(uuid.uuid4()), "HOLDS" if i % 2 else "CONTROLS")
+        for i in range(count)
+    ]
+
+
+def test_uuid_ids_are_stored_in_sixteen_bytes_and_round_trip():
+    edges = _uuid_edges(50)
+    snapshot = AdjacencySnapshot.from_edges("p1", 3, edges)
+
+    assert snapshot.node_keys.dtype.itemsize == 16 and snapshot.edge_keys.dtype.itemsize == 16
+    assert snapshot.nbytes < 50 * len(edges) + 24 * snapshot.node_count
+    for source_id, target_id, relation_id, relation_type in edges:
+        edge = snapshot.edge_index_of(relation_id)
+        assert snapshot.edge_id(edge) == relation_id
+        assert snapshot.edge_type(edge) == relation_type
+        source, target = snapshot.edge_endpoints(edge)
+        assert (snapshot.node_id(source), snapshot.node_id(target)) == (source_id, target_id)
+        assert (target, edge) in snapshot.neighbors(source)
+    assert snapshot.index_of("not-a-uuid") is None
+
+
+def test_deltas_overlay_the_csr_and_compact_to_the_same_topology():
+    snapshot = AdjacencySnapshot.from_edges(
+        "p1", 0, [("a", "b", "r1", "HOLDS"), ("b", "c", "r2", "HOLDS"), ("c", "d", "r3", "HOLDS")]
+    )
+
+    snapshot.apply(SnapshotDelta(
+        added_relations=[("d", "new-node", "r4", "GUARANTEES"), ("a", "c", "r2", "HOLDS")],
+        removed_relation_ids=["r1"],
+    ))
+    snapshot.apply(SnapshotDelta(removed_entity_ids=["d"]))
+
+    def topology(s):
+        source, target, edges = s.coo()
+        return sorted(
+            (s.node_id(int(a)), s.node_id(int(b)), s.edge_id(int(e)), s.edge_type(int(e)))
+            for a, b, e in zip(source, target, edges)
+        )
+
+    assert topology(snapshot) == [("a", "c", "r2", "HOLDS")]
+    assert snapshot.index_of("d") is None and snapshot.edge_index_of("r4") is None
+    assert [snapshot.node_id(n) for n, _ in snapshot.neighbors(snapshot.index_of("a"))] == ["c"]
+    compacted = snapshot.compacted()
+    assert topology(compacted) == topology(snapshot) and not compacted.has_delta
+
+
+def _topology(snapshot):
+    source, target, edges = snapshot.coo()
+    return sorted(
+        (snapshot.node_id(int(a)), snapshot.node_id(int(b)), snapshot.edge_id(int(e)), snapshot.edge_type(int(e)))
+        for a, b, e in zip(source, target, edges)
+    )
+
+
+@pytest.mark.parametrize("new_node", [str(uuid.uuid4()), "not-a-uuid"])
+def test_compaction_of_uuid_snapshot_keeps_topology(new_node):
+    edges = _uuid_edges(30)
+    snapshot = AdjacencySnapshot.from_edges("p1", 0, edges)
+    snapshot.apply(SnapshotDelta(
+        added_relations=[(edges[0][0], new_node, str(uuid.uuid4()), "GUARANTEES")],
+        removed_relation_ids=[edges[1][2]],
+        removed_entity_ids=[edges[5][0]],
+    ))
+
+    build = snapshot.compaction()
+    expected = _topology(snapshot)
+    snapshot.apply(SnapshotDelta(removed_relation_ids=[edges[10][2]]))  # 冻结之后的增量不影响结果
+    compacted = build()
+
+    assert _topology(compacted) == expected and not compacted.has_delta
+    assert compacted.node_count == len({n for row in expected for n in row[:2]})
+    node = compacted.index_of(edges[0][0])
+    assert new_node in {compacted.node_id(n) for n, _ in compacted.neighbors(node)}
+
+
+def test_save_and_mmap_load_round_trip(tmp_path):
+    snapshot = AdjacencySnapshot.from_edges("p1", 7, _uuid_edges(20))
+    snapshot.save(tmp_path / "v7")
+
+    loaded = AdjacencySnapshot.load(tmp_path / "v7")
+
+    assert loaded.version == 7 and loaded.type_names == snapshot.type_names
+    assert isinstance(loaded.indices, np.memmap)
+    node = snapshot.index_of(snapshot.node_id(5))
+    assert loaded.neighbors(node) == snapshot.neighbors(node)
+
+
+@pytest.mark.asyncio
+async def test_store_reuses_disk_snapshot_for_the_same_version(tmp_path):
+    versions = InMemoryGraphVersionStore()
+    await AdjacencySnapshotStore(FakeClient, versions, max_edges=10, directory=tmp_path).get("p1")
+
+    fresh_worker = AdjacencySnapshotStore(FakeClient, versions, max_edges=10, directory=tmp_path)
+    snapshot = await fresh_worker.get("p1")
+
+    assert FakeClient.loads == 1
+    assert snapshot.edge_count == 2 and (tmp_path / "p1" / "v0" / "meta.json").exists()
+
+
+@pytest.mark.asyncio
+async def test_unsafe_project_id_is_served_without_touching_disk(tmp_path):
+    directory = tmp_path / "snapshots"
+    store = AdjacencySnapshotStore(FakeClient, InMemoryGraphVersionStore(), max_edges=10, directory=directory)
+
+    snapshot = await store.get("../escape")
+
+    assert snapshot.edge_count == 2
+    assert not (tmp_path / "escape").exists()
+    assert not directory.exists() or list(directory.iterdir()) == []
+
+
+@pytest.mark.asyncio
+async def test_apply_delta_advances_only_the_expected_version():
+    versions = InMemoryGraphVersionStore()
+    store = AdjacencySnapshotStore(FakeClient, versions, max_edges=10)
+    snapshot = await store.get("p1")
+
+    version = await versions.bump("p1")
+    store.apply_delta("p1", version, SnapshotDelta(added_relations=[("c", "d", "r3", "HOLDS")]))
+    assert await store.get("p1") is snapshot and snapshot.edge_count == 3
+
+    await versions.bump("p1")  # 未经过 apply_delta 的写入
+    version = await versions.bump("p1")
+    store.apply_delta("p1", version, SnapshotDelta())
+    reloaded = await store.get("p1")
+
+    assert reloaded is not snapshot and FakeClient.loads == 2
+
+
+@pytest.mark.asyncio
+async def test_large_deltas_are_compacted_in_the_background():
+    versions = InMemoryGraphVersionStore()
+    store = AdjacencySnapshotStore(FakeClient, versions, max_edges=5000)
+    snapshot = await store.get("p1")
+    delta = SnapshotDelta(added_relations=[("c", f"n{i}", f"x{i}", "HOLDS") for i in range(1001)])
+
+    store.apply_delta("p1", await versions.bump("p1"), delta)
+    assert await store.get("p1") is snapshot and snapshot.has_delta
+    await store._compacting["p1"]
+
+    compacted = await store.get("p1")
+    assert compacted is not snapshot and not compacted.has_delta
+    assert compacted.version == 1 and compacted.edge_count == 1003 and FakeClient.loads == 1
+
+
+@pytest.mark.asyncio
+async def test_background_compaction_is_discarded_after_newer_writes():
+    versions = InMemoryGraphVersionStore()
+    store = AdjacencySnapshotStore(FakeClient, versions, max_edges=5000)
+    snapshot = await store.get("p1")
+    delta = SnapshotDelta(added_relations=[("c", f"n{i}", f"x{i}", "HOLDS") for i in range(1001)])
+
+    store.apply_delta("p1", await versions.bump("p1"), delta)
+    task = store._compacting["p1"]
+    await asyncio.sleep(0)  # 压缩已冻结拓扑，在线程中执行
+    store.apply_delta("p1", await versions.bump("p1"), SnapshotDelta(removed_relation_ids=["r1"]))
+    await task
+
+    assert await store.get("p1") is snapshot and snapshot.edge_index_of("r1") is None
+
+
+@pytest.mark.asyncio
+async def test_repository_writes_update_cached_snapshot():
+    class WriteClient(FakeClient):
+        @classmethod
+        async def execute_write(cls, query, parameters=None):
+            return [{"r": {}}]
+
+    versions = InMemoryGraphVersionStore()
+    store = AdjacencySnapshotStore(WriteClient, versions, max_edges=10)
+    repo = Neo4jGraphRepository(WriteClient, versions=versions, snapshots=store)
+    snapshot = await store.get("p1")
+
+    await repo.delete_relation("p1", "r1")
+    await repo.merge_relation(Relation(
+        project_id="p1", source_id="c", target_id="a", type=RelationType.OWNS, id="r9"
+    ))
+
+    assert await store.get("p1") is snapshot and WriteClient.loads == 1
+    assert sorted(snapshot.edge_id(e) for _, e in snapshot.neighbors(snapshot.index_of("a"))) == ["r9"]
@@ -0,0 +1,192 @@
+from __future__ import annotations
+
+import time
+
+import pytest
+
+from src.infrastructure.cache.graph_version import InMemoryGraphVersionStore
+from src.infrastructure.cache.in_memory import InMemoryPreviewCache
+from src.infrastructure.persistence.neo4j import cypher_queries as queries
+from src.infrastructure.persistence.neo4j.gds_projections import (
+    GdsProjectionManager,
+    GraphProjectionError,
+)
+
+
+class FakeGds:
+    """内存中的 GDS 图目录：每个项目 10 个节点，投影大小 = 估算值"""
+
+    graphs: dict[str, int] = {}
+    created_at_ms: dict[str, int] = {}
+    created: list[str] = []
+    bytes_per_node = 10
+
+    @classmethod
+    async def execute_read(cls, query, parameters=None):
+        if query == queries.CHECK_GRAPH_EXISTS:
+            return [{"exists": parameters["graph_name"] in cls.graphs}]
+        if query == queries.LIST_GRAPH_PROJECTIONS:
+            return [
+                {"graph_name": name, "node_count": 10, "relationship_count": 20,
+                 "size_bytes": size, "created_at_ms": cls.created_at_ms.get(name, 1_700_000_000_000 + i)}
+                for i, (name, size) in enumerate(cls.graphs.items())
+            ]
+        if query == queries.COUNT_PROJECT_GRAPH:
+            return [{"node_count": 10, "relationship_count": 10}]
+        if query == queries.ESTIMATE_GRAPH_PROJECTION:
+            return [{"bytesMin": 0, "bytesMax": parameters["node_count"] * cls.bytes_per_node}]
+        return []
+
+    @classmethod
+    async def execute_write(cls, query, parameters=None):
+        if query == queries.CREATE_GRAPH_PROJECTION:
+            cls.graphs[parameters["graph_name"]] = 10 * cls.bytes_per_node
+            cls.created_at_ms[parameters["graph_name"]] = int(time.time() * 1000)
+            cls.created.append(parameters["graph_name"])
+        elif query == queries.DROP_GRAPH_PROJECTION:
+            cls.graphs.pop(parameters["graph_name"], None)
+        return []
+
+
+@pytest.fixture(autouse=True)
+def reset_gds():
+    FakeGds.graphs = {}
+    FakeGds.created_at_ms = {}
+    FakeGds.created = []
+    FakeGds.bytes_per_node = 10
+
+
+def make_manager(versions=None, **options):
+    options = {
+        "heap_budget_bytes": 1000, "max_staleness_seconds": 0, "max_projections": 0,
+        "lease_seconds": 0, "usage": InMemoryPreviewCache(), **options,
+    }
+    return GdsProjectionManager(FakeGds, versions or InMemoryGraphVersionStore(), **options)
+
+
+@pytest.mark.asyncio
+async def test_projection_is_reused_until_graph_changes():
+    versions = InMemoryGraphVersionStore()
+    manager = make_manager(versions)
+
+    name = await manager.ensure("p-1")
+    assert await manager.ensure("p-1") == name == "graph_p_1_v0"
+    await versions.bump("p-1")
+
+    assert await manager.ensure("p-1") == "graph_p_1_v1"
+    assert FakeGds.created == ["graph_p_1_v0", "graph_p_1_v1"]
+    assert set(FakeGds.graphs) == {"graph_p_1_v1"}
+
+
+@pytest.mark.asyncio
+async def test_stale_projection_is_kept_within_staleness_window():
+    versions = InMemoryGraphVersionStore()
+    manager = make_manager(versions, max_staleness_seconds=3600)
+
+    await manager.ensure("p1")
+    await versions.bump("p1")
+
+    assert await manager.ensure("p1") == "graph_p1_v0"
+    assert FakeGds.created == ["graph_p1_v0"]
+    assert (await manager.catalog())[0]["stale"] is True
+
+
+@pytest.mark.asyncio
+async def test_workers_share_projections_through_the_name_and_usage_records():
+    versions, usage = InMemoryGraphVersionStore(), InMemoryPreviewCache()
+    first = make_manager(versions, usage=usage)
+    second = make_manager(versions, usage=usage)
+
+    await first.ensure("p1")
+    assert await second.ensure("p1") == "graph_p1_v0"
+
+    assert FakeGds.created == ["graph_p1_v0"]
+    entry = (await second.catalog())[0]
+    assert entry["project_id"] == "p1" and entry["graph_version"] == 0 and entry["stale"] is False
+
+
+@pytest.mark.asyncio
+async def test_projections_in_use_by_other_workers_are_not_dropped():
+    versions, usage = InMemoryGraphVersionStore(), InMemoryPreviewCache()
+    other_worker = make_manager(versions, usage=usage, lease_seconds=3600)
+    manager = make_manager(versions, usage=usage, lease_seconds=3600)
+
+    await other_worker.ensure("p1")
+    await versions.bump("p1")
+    await manager.ensure("p1")
+
+    assert set(FakeGds.graphs) == {"graph_p1_v0", "graph_p1_v1"}
+    with pytest.raises(GraphProjectionError, match="No idle graph projection"):
+        await make_manager(versions, usage=usage, lease_seconds=3600, heap_budget_bytes=250).ensure("p2")
+    assert set(FakeGds.graphs) == {"graph_p1_v0", "graph_p1_v1"}
+
+
+@pytest.mark.asyncio
+async def test_projection_created_by_another_worker_is_reused():
+    FakeGds.graphs.update({"graph_p1_v0": 100, "graph_p10_v0": 100})
+    manager = make_manager()
+
+    assert await manager.ensure("p1") == "graph_p1_v0"
+
+    assert not FakeGds.created
+    assert await manager.drop("p1") == 1 and set(FakeGds.graphs) == {"graph_p10_v0"}
+
+
+@pytest.mark.asyncio
+async def test_unavailable_version_uses_the_newest_projection_only():
+    class BrokenVersions(InMemoryGraphVersionStore):
+        async def get(self, project_id):
+            raise ConnectionError("redis down")
+
+    manager = make_manager(BrokenVersions())
+
+    with pytest.raises(GraphProjectionError, match="unavailable"):
+        await manager.ensure("p1")
+    FakeGds.graphs.update({"graph_p1_v3": 100, "graph_p1_v4": 100})
+    assert await manager.ensure("p1") == "graph_p1_v4"
+
+
+@pytest.mark.asyncio
+async def test_least_recently_used_projection_is_evicted_to_fit_budget():
+    manager = make_manager(heap_budget_bytes=250)
+
+    await manager.ensure("p1")
+    await manager.ensure("p2")
+    await manager.ensure("p1")
+    await manager.ensure("p3")
+
+    assert set(FakeGds.graphs) == {"graph_p1_v0", "graph_p3_v0"}
+    assert [entry["graph_name"] for entry in await manager.catalog()] == ["graph_p3_v0", "graph_p1_v0"]
+
+
+@pytest.mark.asyncio
+async def test_projection_count_limit_evicts_oldest():
+    manager = make_manager(heap_budget_bytes=0, max_projections=2)
+
+    for project_id in ("p1", "p2", "p3"):
+        await manager.ensure(project_id)
+
+    assert set(FakeGds.graphs) == {"graph_p2_v0", "graph_p3_v0"}
+
+
+@pytest.mark.asyncio
+async def test_projection_over_budget_is_refused():
+    FakeGds.bytes_per_node = 1000
+    manager = make_manager()
+
+    with pytest.raises(GraphProjectionError, match="heap budget"):
+        await manager.ensure("p1")
+    assert not FakeGds.created
+
+
+@pytest.mark.asyncio
+async def test_missing_gds_raises_projection_error():
+    class NoGds(FakeGds):
+        @classmethod
+        async def execute_read(cls, query, parameters=None):
+            raise RuntimeError("Unknown function 'gds.graph.exists'")
+
+    manager = GdsProjectionManager(NoGds, InMemoryGraphVersionStore(), usage=InMemoryPreviewCache())
+
+    with pytest.raises(GraphProjectionError):
+        await manager.ensure("p1")
@@ -0,0 +1,215 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+
+import pytest
+
+from src.config import settings
+from src.infrastructure.cache.graph_version import InMemoryGraphVersionStore
+from src.infrastructure.persistence.neo4j import cypher_queries as queries
+from src.infrastructure.persistence.neo4j.adjacency_snapshot import AdjacencySnapshot
+from src.infrastructure.persistence.neo4j import graph_algorithms
+from src.infrastructure.persistence.neo4j.gds_projections import GdsProjectionManager
+from src.infrastructure.persistence.neo4j.graph_algorithms import GraphAlgorithmRunner
+
+EDGES = [
+    ("hub", "a", "r1", "HOLDS"),
+    ("hub", "b", "r2", "HOLDS"),
+    ("hub", "c", "r3", "HOLDS"),
+    ("c", "d", "r4", "HOLDS"),
+    ("x", "y", "r5", "HOLDS"),
+]
+
+
+class NoGdsClient:
+    calls: list[str] = []
+    writes: list[tuple[str, dict]] = []
+    weights: dict[str, str] = {}
+
+    @classmethod
+    async def execute_write(cls, query, parameters=None):
+        cls.writes.append((query, parameters))
+        return []
+
+    @classmethod
+    async def execute_read(cls, query, parameters=None):
+        cls.calls.append(query)
+        if query in (queries.CHECK_GRAPH_EXISTS, queries.LIST_GRAPH_PROJECTIONS):
+            raise RuntimeError("Unknown function or procedure 'gds.graph.*'")
+        if query == queries.GET_ENTITIES_BY_IDS:
+            return [{"entity": {"id": i, "external_id": i.upper(), "type": "ENTERPRISE"}} for i in parameters["ids"]]
+        return []
+
+    @classmethod
+    async def iter_read_batches(cls, query, parameters=None, *, batch_size=1000):
+        cls.calls.append(query)
+        if query == queries.GET_PROJECT_ENTITY_LABELS:
+            yield [
+                {"entity_id": i, "name": i.upper(), "entity_type": "ENTERPRISE"}
+                for i in ("hub", "a", "b", "c", "d", "x", "y", "lonely")
+            ]
+        else:
+            yield [{"id": i, "properties_json": props} for i, props in cls.weights.items()]
+
+
+class FakeSnapshots:
+    def __init__(self, snapshot):
+        self.snapshot = snapshot
+
+    async def get(self, project_id):
+        return self.snapshot
+
+
+@pytest.fixture(autouse=True)
+def in_thread_workers(mocker):
+    NoGdsClient.calls = []
+    NoGdsClient.writes = []
+    NoGdsClient.weights = {}
+    mocker.patch.object(settings, "graph_compute_workers", 0)
+    graph_algorithms._community_results.clear()
+
+
+def make_runner(snapshots=None):
+    snapshots = snapshots or FakeSnapshots(AdjacencySnapshot.from_edges("p1", 0, EDGES))
+    projections = GdsProjectionManager(NoGdsClient, InMemoryGraphVersionStore())
+    return GraphAlgorithmRunner(NoGdsClient, snapshots, projections)
+
+
+@pytest.mark.asyncio
+async def test_pagerank_without_gds_is_computed_from_snapshot():
+    rows = await make_runner().run_pagerank("p1", limit=3)
+
+    assert len(rows) == 3
+    assert rows[0]["entity_id"] == "hub" and rows[0]["name"] == "HUB" and rows[0]["entity_type"] == "ENTERPRISE"
+    assert rows[0]["score"] > rows[1]["score"] >= rows[2]["score"]
+    assert queries.DEGREE_CENTRALITY not in NoGdsClient.calls
+
+
+@pytest.mark.asyncio
+async def test_personalized_pagerank_only_reaches_connected_entities():
+    rows = await make_runner().run_pagerank("p1", limit=10, source_ids=["d"])
+
+    scores = {row["entity_id"]: row["score"] for row in rows}
+    assert scores["c"] > scores["hub"] > scores["a"] > 0
+    assert scores["x"] == scores["y"] == 0
+
+
+@pytest.mark.asyncio
+async def test_pagerank_without_gds_includes_isolated_entities_like_gds():
+    rows = await make_runner().run_pagerank("p1", limit=10)
+
+    assert len(rows) == 8 and rows[-1]["entity_id"] == "lonely"
+    assert rows[-1]["score"] == pytest.approx(0.15)
+    assert rows[-2]["score"] >= rows[-1]["score"]
+
+    rows = await make_runner().run_pagerank("p1", limit=10, source_ids=["lonely"])
+    assert rows[0]["entity_id"] == "lonely" and rows[0]["score"] == pytest.approx(0.15)
+    assert all(row["score"] == 0 for row in rows[1:])
+
+
+@pytest.mark.asyncio
+async def test_weight_property_is_read_from_relation_properties():
+    NoGdsClient.weights = {"r1": '{"amount": 9}', "r2": '{"amount": "n/a"}'}
+
+    rows = await make_runner().run_pagerank("p1", limit=10, weight_property="amount")
+
+    scores = {row["entity_id"]: row["score"] for row in rows}
+    # r2 的权重不是数值，按默认值 1 处理，a、b 原本对称
+    assert scores["a"] > scores["b"] > 0
+
+
+@pytest.mark.asyncio
+async def test_weighted_runs_skip_gds_projections():
+    class UnweightedProjections:
+        async def ensure(self, project_id):
+            raise AssertionError("GDS projections carry no relation weights")
+
+    NoGdsClient.weights = {"r1": '{"amount": 9}'}
+    snapshots = FakeSnapshots(AdjacencySnapshot.from_edges("p1", 0, EDGES))
+    runner = GraphAlgorithmRunner(NoGdsClient, snapshots, UnweightedProjections())
+
+    rows = await runner.run_pagerank("p1", limit=10, weight_property="amount")
+    communities = await runner.run_louvain("p1", weight_property="amount")
+
+    assert rows[0]["entity_id"] == "hub" and {row["entity_id"] for row in communities} >= {"a", "y"}
+
+
+@pytest.mark.asyncio
+async def test_pagerank_without_snapshot_falls_back_to_degree():
+    await make_runner(FakeSnapshots(None)).run_pagerank("p1")
+
+    assert NoGdsClient.calls[-1] == queries.DEGREE_CENTRALITY
+
+
+@pytest.mark.asyncio
+async def test_betweenness_without_gds_is_computed_from_snapshot():
+    rows = await make_runner().run_betweenness("p1", limit=2)
+
+    # 经过 hub 的节点对：a-b、a-c、a-d、b-c、b-d；经过 c 的：d 与 hub、a、b
+    assert [(row["entity_id"], row["score"]) for row in rows] == [("hub", 5.0), ("c", 3.0)]
+
+
+@pytest.mark.asyncio
+async def test_betweenness_of_empty_project_is_empty():
+    rows = await make_runner(FakeSnapshots(AdjacencySnapshot.from_edges("p1", 1, []))).run_betweenness("p1")
+
+    assert rows == []
+
+
+@pytest.mark.asyncio
+async def test_sampled_betweenness_is_reproducible_with_seed():
+    runner = make_runner()
+
+    first = await runner.run_betweenness("p1", sampling_size=3, sampling_seed=11)
+    second = await runner.run_betweenness("p1", sampling_size=3, sampling_seed=11)
+
+    assert first == second
+
+
+@pytest.mark.asyncio
+async def test_communities_without_gds_use_gds_row_format():
+    rows = await make_runner().run_louvain("p1")
+
+    community = {row["entity_id"]: row["community_id"] for row in rows}
+    assert community["x"] == community["y"] != community["hub"]
+    assert community["hub"] == community["a"] == community["b"]
+    # 没有关系的实体单独成为一个社区
+    assert list(community.values()).count(community["lonely"]) == 1
+    assert set(rows[0]) == {"entity_id", "name", "entity_type", "community_id"}
+
+
+@pytest.mark.asyncio
+async def test_community_results_are_cached_per_graph_version():
+    snapshot = AdjacencySnapshot.from_edges("p1", 0, EDGES)
+    runner = make_runner(FakeSnapshots(snapshot))
+
+    first = await runner.run_label_propagation("p1")
+    again = await runner.run_label_propagation("p1")
+    snapshot.version = 1
+    await runner.run_label_propagation("p1")
+
+    assert again is first
+    assert NoGdsClient.calls.count(queries.GET_PROJECT_ENTITY_LABELS) == 2
+
+
+@pytest.mark.asyncio
+async def test_write_scores_without_gds_covers_every_entity():
+    computed_at = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+    written = await make_runner().write_scores("p1", computed_at)
+
+    rows = {
+        row["entity_id"]: row
+        for query, params in NoGdsClient.writes
+        if query == queries.WRITE_ENTITY_SCORES
+        for row in params["rows"]
+    }
+    assert written == len(rows) == 8
+    assert all(params["computed_at"] == computed_at for _, params in NoGdsClient.writes)
+    assert max(rows, key=lambda i: rows[i]["pagerank"]) == "hub"
+    assert max(rows, key=lambda i: rows[i]["betweenness"]) == "hub"
+    assert rows["x"]["community_id"] == rows["y"]["community_id"] != rows["hub"]["community_id"]
+    # 孤立实体不在快照中，取GDS的默认值并单独成社区
+    assert rows["lonely"]["pagerank"] == pytest.approx(0.15)
+    assert rows["lonely"]["betweenness"] == 0.0
+    assert rows["lonely"]["community_id"] not in {row["community_id"] for i, row in rows.items() if i != "lonely"}
@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from src.infrastructure.cache.graph_version import InMemoryGraphVersionStore
+from src.infrastructure.cache.in_memory import InMemoryPreviewCache
+from src.infrastructure.persistence.neo4j import cypher_queries as queries
+from src.infrastructure.persistence.neo4j.graph_summary import OTHER_GROUP, GraphSummarizer
+
+
+class GroupClient:
+    """按 group_property 返回预设的分组聚合结果"""
+
+    groups: dict[str, list[dict]] = {}
+    relations: dict[str, list[dict]] = {}
+    calls: list[str] = []
+
+    @classmethod
+    async def iter_read(cls, query, parameters=None, **kwargs):
+        cls.calls.append(query)
+        source = cls.groups if query == queries.SUMMARIZE_ENTITY_GROUPS else cls.relations
+        for record in source.get(parameters["group_property"], []):
+            yield record
+
+    @classmethod
+    async def execute_read(cls, query, parameters=None, **kwargs):
+        cls.calls.append(query)
+        rows = cls.groups.get("type", [])
+        return [{"entity_count": sum(row["members"] for row in rows)}]
+
+
+class FakeScores:
+    def __init__(self, materialized: bool):
+        self.materialized = materialized
+
+    async def is_materialized(self, project_id):
+        return self.materialized
+
+
+def _summarizer(materialized: bool = True, versions=None) -> GraphSummarizer:
+    return GraphSummarizer(
+        GroupClient,
+        cache=InMemoryPreviewCache(),
+        versions=versions or InMemoryGraphVersionStore(),
+        scores=FakeScores(materialized),
+        ttl_seconds=60,
+    )
+
+
+@pytest.fixture(autouse=True)
+def client():
+    GroupClient.calls = []
+    GroupClient.groups = {
+        "community_id": [
+            {"group": 1, "entity_type": "PERSON", "members": 50},
+            {"group": 1, "entity_type": "ENTERPRISE", "members": 10},
+            {"group": 2, "entity_type": "ENTERPRISE", "members": 30},
+            {"group": 3, "entity_type": "ACCOUNT", "members": 5},
+            {"group": 4, "entity_type": "ACCOUNT", "members": 3},
+            {"group": None, "entity_type": "PERSON", "members": 2},
+        ],
+        "type": [
+            {"group": "PERSON", "entity_type": "PERSON", "members": 52},
+            {"group": "ENTERPRISE", "entity_type": "ENTERPRISE", "members": 40},
+            {"group": "ACCOUNT", "entity_type": "ACCOUNT", "members": 8},
+        ],
+    }
+    GroupClient.relations = {
+        "community_id": [
+            {"source_group": 1, "target_group": 1, "weight": 80},
+            {"source_group": 1, "target_group": 2, "weight": 9},
+            {"source_group": 3, "target_group": 4, "weight": 4},
+            {"source_group": 2, "target_group": 4, "weight": 2},
+            {"source_group": 3, "target_group": 1, "weight": 1},
+        ],
+    }
+    return GroupClient
+
+
+@pytest.mark.asyncio
+async def test_small_groups_merge_into_other_supernode():
+    summary = await _summarizer().summarize("p1", "community", max_groups=3)
+
+    assert summary.group_by == "community"
+    assert summary.entity_count == 100
+    assert [(n.group, n.member_count, n.dominant_type) for n in summary.nodes] == [
+        ("1", 60, "PERSON"),
+        ("2", 30, "ENTERPRISE"),
+        (OTHER_GROUP, 10, "ACCOUNT"),
+    ]
+    assert summary.truncated_groups == 2
+    # 3 -> 4 合并后成为 other 的组内关系
+    assert summary.nodes[0].internal_edges == 80
+    assert summary.nodes[2].internal_edges == 4
+    assert [(e.source_group, e.target_group, e.weight) for e in summary.edges] == [
+        ("1", "2", 9),
+        ("2", OTHER_GROUP, 2),
+        (OTHER_GROUP, "1", 1),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_community_falls_back_to_type_before_materialization():
+    summary = await _summarizer(materialized=False).summarize("p1", "community")
+
+    assert summary.group_by == "type"
+    assert [n.group for n in summary.nodes] == ["PERSON", "ENTERPRISE", "ACCOUNT"]
+    assert summary.edges == []
+
+
+@pytest.mark.asyncio
+async def test_stale_summary_is_served_while_recomputing():
+    versions = InMemoryGraphVersionStore()
+    summarizer = _summarizer(versions=versions)
+
+    first = await summarizer.summarize("p1", "type")
+    assert await summarizer.entity_count("p1") == 100
+    again = await summarizer.summarize("p1", "type")
+    assert again is first
+    assert GroupClient.calls.count(queries.SUMMARIZE_ENTITY_GROUPS) == 1
+    assert queries.COUNT_PROJECT_ENTITIES not in GroupClient.calls
+
+    await versions.bump("p1")
+    assert await summarizer.summarize("p1", "type") is first
+    await asyncio.gather(*summarizer._refreshing.values())
+    assert GroupClient.calls.count(queries.SUMMARIZE_ENTITY_GROUPS) == 2
+
+    refreshed = await summarizer.summarize("p1", "type")
+    assert refreshed is not first and refreshed.entity_count == 100
+    assert GroupClient.calls.count(queries.SUMMARIZE_ENTITY_GROUPS) == 2
+
+
+class BrokenVersions:
+    async def get(self, project_id):
+        raise ConnectionError("redis down")
+
+
+@pytest.mark.asyncio
+async def test_version_lookup_failure_computes_without_caching():
+    summarizer = _summarizer(versions=BrokenVersions())
+
+    summary = await summarizer.summarize("p1", "type")
+    assert summary.entity_count == 100
+    assert await summarizer.entity_count("p1") == 100
+    await summarizer.summarize("p1", "type")
+
+    assert GroupClient.calls.count(queries.SUMMARIZE_ENTITY_GROUPS) == 2
+    assert GroupClient.calls.count(queries.COUNT_PROJECT_ENTITIES) == 1
+    assert summarizer._refreshing == {}
+
+
+@pytest.mark.asyncio
+async def test_rejects_unknown_grouping():
+    with pytest.raises(ValueError):
+        await _summarizer().summarize("p1", "label")
+    with pytest.raises(ValueError):
+        await _summarizer().summarize("p1", "type", max_groups=1)
@@ -0,0 +1,28 @@
+from __future__ import annotations
+
+import pytest
+
+from src.domain.entities.entity import Entity
+from src.domain.value_objects.entity_type import EntityType
+from src.infrastructure.cache.graph_version import InMemoryGraphVersionStore
+from src.infrastructure.persistence.neo4j.graph_repository import Neo4jGraphRepository
+
+
+class FakeClient:
+    @classmethod
+    async def execute_write(cls, query, parameters=None):
+        return [{"created_count": 1, "merged_ids": []}]
+
+
+@pytest.mark.asyncio
+async def test_repository_writes_bump_project_version():
+    versions = InMemoryGraphVersionStore()
+    repo = Neo4jGraphRepository(FakeClient, versions=versions)
+    entity = Entity.create(project_id="p1", external_id="公司A", type=EntityType.ENTERPRISE)
+
+    await repo.merge_entity(entity)
+    await repo.merge_entities_bulk([entity])
+    await repo.delete_entity("p1", entity.id)
+
+    assert await versions.get("p1") == 3
+    assert await versions.get("p2") == 0
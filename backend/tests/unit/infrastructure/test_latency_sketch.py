@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+import random
+
+import pytest
+
+from src.infrastructure.monitoring.latency import LatencySketch
+
+
+def test_quantiles_stay_within_relative_accuracy():
+    rng = random.Random(7)
+    samples = sorted(rng.lognormvariate(3, 1.2) for _ in range(20000))
+    sketch = LatencySketch(relative_accuracy=0.01)
+    for value in samples:
+        sketch.add(value)
+
+    for q in (0.5, 0.95, 0.99):
+        exact = samples[int(q * (len(samples) - 1))]
+        assert sketch.quantile(q) == pytest.approx(exact, rel=0.011)
+    assert sketch.count == len(samples)
+    assert sketch.max == samples[-1]
+
+
+def test_empty_and_sub_resolution_samples():
+    sketch = LatencySketch()
+    assert sketch.summary()["p99"] == 0
+
+    sketch.add(0.0)
+    sketch.add(0.0)
+    sketch.add(50.0)
+
+    assert sketch.quantile(0.5) == 0
+    assert sketch.quantile(1.0) == pytest.approx(50.0, rel=0.01)
+
+
+def test_rejects_invalid_accuracy():
+    with pytest.raises(ValueError):
+        LatencySketch(relative_accuracy=1.5)
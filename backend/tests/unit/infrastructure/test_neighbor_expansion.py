@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import pytest
+
+from src.infrastructure.cache.graph_version import InMemoryGraphVersionStore
+from src.infrastructure.persistence.neo4j import cypher_queries as queries
+from src.infrastructure.persistence.neo4j.graph_repository import Neo4jGraphRepository
+
+
+class FakeRelationship(dict):
+    type = "RELATION"
+
+
+class NeighborClient:
+    calls: list[tuple[str, dict]] = []
+    records: list[dict] = []
+
+    @classmethod
+    async def execute_read(cls, query, parameters=None, **kwargs):
+        cls.calls.append((query, parameters))
+        return cls.records
+
+
+@pytest.fixture
+def repo():
+    NeighborClient.calls = []
+    NeighborClient.records = [{
+        "neighbors": [
+            {"entity": {"id": "a", "properties_json": '{"k": 1}'}, "distance": 0},
+            {"entity": {"id": "b"}, "distance": 1},
+            {"entity": {"id": "c"}, "distance": 2},
+        ],
+        "relations": [
+            {"relation": FakeRelationship(id="r1"), "source_id": "a", "target_id": "b"},
+        ],
+    }]
+    return Neo4jGraphRepository(NeighborClient, versions=InMemoryGraphVersionStore())
+
+
+@pytest.mark.asyncio
+async def test_neighbors_come_from_one_breadth_first_query(repo):
+    graph = await repo.find_neighbors("p1", "a", depth=2, limit=5)
+
+    assert len(NeighborClient.calls) == 1
+    query, params = NeighborClient.calls[0]
+    assert query.count("CALL {") == 3
+    assert query.startswith(queries.NEIGHBOR_EXPANSION_START)
+    assert params == {"entity_id": "a", "project_id": "p1", "limit": 5, "include_relations": True}
+    assert [(e["id"], e["distance"]) for e in graph["entities"]] == [("a", 0), ("b", 1), ("c", 2)]
+    assert graph["entities"][0]["properties"] == {"k": 1}
+    assert graph["relations"][0]["source_id"] == "a"
+
+
+@pytest.mark.asyncio
+async def test_default_limit_and_depth_zero(repo, monkeypatch):
+    from src.infrastructure.persistence.neo4j import graph_repository
+
+    monkeypatch.setattr(graph_repository.settings, "graph_neighbor_max_results", 7)
+    await repo.find_neighbors("p1", "a", depth=0)
+
+    query, params = NeighborClient.calls[0]
+    assert queries.NEIGHBOR_EXPANSION_HOP not in query
+    assert params["limit"] == 7 and params["include_relations"] is False
+
+
+@pytest.mark.asyncio
+async def test_missing_entity_has_no_neighbors(repo):
+    NeighborClient.records = []
+
+    assert await repo.find_neighbors("p1", "x") == {"entities": [], "relations": []}
@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+import tracemalloc
+
+import pytest
+
+from src.infrastructure.persistence.neo4j.client import Neo4jClient
+
+
+class FakeResult:
+    def __init__(self, records):
+        self._records = records
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for record in self._records:
+            yield record
+
+
+class FakeTransaction:
+    def __init__(self, log):
+        self._log = log
+
+    async def run(self, query, parameters):
+        self._log.append((query, parameters))
+        return FakeResult([{"n": len(self._log)}])
+
+
+class LazyResult:
+    """Generates synthetic node records on demand, like a server-side cursor."""
+
+    def __init__(self, count):
+        self._count = count
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for i in range(self._count):
+            yield {"id": i, "type": "ENTERPRISE"}
+
+
+class FakeSession:
+    def __init__(self, driver, access_mode, fetch_size=None):
+        self._driver = driver
+        self.access_mode = access_mode
+        self.fetch_size = fetch_size
+
+    async def run(self, query, parameters):
+        self._driver.statements.append((query, parameters))
+        return LazyResult(self._driver.synthetic_rows)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute_read(self, work, *args):
+        self._driver.transactions.append(("read", self.access_mode))
+        return await work(FakeTransaction(self._driver.statements), *args)
+
+    async def execute_write(self, work, *args):
+        self._driver.transactions.append(("write", self.access_mode))
+        return await work(FakeTransaction(self._driver.statements), *args)
+
+
+class FakeDriver:
+    def __init__(self):
+        self.transactions = []
+        self.statements = []
+        self.synthetic_rows = 0
+
+    def session(self, default_access_mode, fetch_size=None):
+        return FakeSession(self, default_access_mode, fetch_size)
+
+
+@pytest.fixture
+def driver(monkeypatch):
+    fake = FakeDriver()
+    monkeypatch.setattr(Neo4jClient, "_driver", fake)
+    return fake
+
+
+@pytest.mark.asyncio
+async def test_execute_read_uses_managed_read_transaction(driver):
+    records = await Neo4jClient.execute_read("RETURN 1 AS n", {"x": 1})
+
+    assert records == [{"n": 1}]
+    assert driver.transactions == [("read", "READ")]
+    assert driver.statements == [("RETURN 1 AS n", {"x": 1})]
+
+
+@pytest.mark.asyncio
+async def test_execute_write_many_runs_statements_in_one_transaction(driver):
+    results = await Neo4jClient.execute_write_many([("CREATE (a)", {}), ("CREATE (b)", None)])
+
+    assert results == [[{"n": 1}], [{"n": 2}]]
+    assert driver.transactions == [("write", "WRITE")]
+    assert [query for query, _ in driver.statements] == ["CREATE (a)", "CREATE (b)"]
+
+
+@pytest.mark.asyncio
+async def test_execute_write_many_skips_empty_unit_of_work(driver):
+    assert await Neo4jClient.execute_write_many([]) == []
+    assert driver.transactions == []
+
+
+@pytest.mark.asyncio
+async def test_iter_read_batches_yields_fixed_size_batches(driver):
+    driver.synthetic_rows = 2500
+
+    sizes = [len(batch) async for batch in Neo4jClient.iter_read_batches("MATCH (n) RETURN n", batch_size=1000)]
+
+    assert sizes == [1000, 1000, 500]
+
+
+@pytest.mark.asyncio
+async def test_iter_read_memory_stays_flat_for_1m_nodes(driver):
+    driver.synthetic_rows = 1_000_000
+
+    tracemalloc.start()
+    try:
+        seen = 0
+        async for batch in Neo4jClient.iter_read_batches("MATCH (n) RETURN n", batch_size=1000):
+            seen += len(batch)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    assert seen == 1_000_000
+    # one batch of 1000 small records is well under 2 MB; materializing 1M would be ~500 MB
+    assert peak < 2 * 1024 * 1024
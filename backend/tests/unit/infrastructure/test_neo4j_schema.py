@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import pytest
+
+from src.infrastructure.persistence.neo4j.schema import (
+    SCHEMA_ITEMS,
+    SHOW_CONSTRAINTS,
+    SHOW_INDEXES,
+    Neo4jSchemaManager,
+    bootstrap_schema,
+)
+
+
+class FakeClient:
+    writes: list[str] = []
+    indexes: list[dict] = []
+    constraints: list[dict] = []
+    fail_on: set[str] = set()
+
+    @classmethod
+    async def execute_write(cls, query, parameters=None):
+        if any(name in query for name in cls.fail_on):
+            raise RuntimeError("constraint violation")
+        cls.writes.append(query)
+        return []
+
+    @classmethod
+    async def execute_read(cls, query, parameters=None):
+        if query == SHOW_INDEXES:
+            return cls.indexes
+        if query == SHOW_CONSTRAINTS:
+            return cls.constraints
+        return []
+
+
+@pytest.fixture
+def client():
+    FakeClient.writes = []
+    FakeClient.indexes = []
+    FakeClient.constraints = []
+    FakeClient.fail_on = set()
+    return FakeClient
+
+
+@pytest.mark.asyncio
+async def test_apply_is_idempotent_and_continues_after_failure(client):
+    client.fail_on = {"entity_id_project_unique"}
+    manager = Neo4jSchemaManager(client)
+
+    failed = await manager.apply()
+
+    assert failed == ["entity_id_project_unique"]
+    assert len(client.writes) == len(SCHEMA_ITEMS) - 1
+    assert all("IF NOT EXISTS" in statement for statement in client.writes)
+
+
+@pytest.mark.asyncio
+async def test_find_missing_reports_absent_and_offline_items(client):
+    client.constraints = [{"name": "entity_id_project_unique"}]
+    client.indexes = [
+        {"name": item.name, "state": "ONLINE"}
+        for item in SCHEMA_ITEMS
+        if item.kind == "index" and item.name != "relation_id"
+    ]
+    client.indexes[0]["state"] = "POPULATING"
+
+    problems = await Neo4jSchemaManager(client).find_missing()
+
+    assert problems == {client.indexes[0]["name"]: "POPULATING", "relation_id": "MISSING"}
+
+
+@pytest.mark.asyncio
+async def test_bootstrap_reports_no_problems_when_schema_complete(client):
+    client.constraints = [{"name": item.name} for item in SCHEMA_ITEMS if item.kind == "constraint"]
+    client.indexes = [
+        {"name": item.name, "state": "ONLINE"} for item in SCHEMA_ITEMS if item.kind == "index"
+    ]
+
+    assert await bootstrap_schema(Neo4jSchemaManager(client)) == {}
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import pytest
+
+from src.application.queries.analyze_centrality import CentralityAnalysisResult, CentralityScore
+from src.infrastructure.cache import serialization
+from src.infrastructure.cache.redis_cache import LruBytesCache, RedisPreviewCache
+
+
+class FakeRedis:
+    def __init__(self, fail: bool = False):
+        self.store: dict[str, bytes] = {}
+        self.fail = fail
+        self.gets = 0
+
+    async def get(self, key):
+        self.gets += 1
+        if self.fail:
+            raise ConnectionError("redis down")
+        return self.store.get(key)
+
+    async def set(self, key, value, ex=None):
+        if self.fail:
+            raise ConnectionError("redis down")
+        self.store[key] = value
+
+    async def aclose(self):
+        pass
+
+
+def _result() -> CentralityAnalysisResult:
+    return CentralityAnalysisResult(
+        algorithm="pagerank",
+        scores=[CentralityScore(entity_id="e1", name="公司A", entity_type="ENTERPRISE", score=0.5, rank=1)],
+        total_entities=1,
+    )
+
+
+def test_serialization_round_trips_dataclasses():
+    restored = serialization.loads(serialization.dumps({"result": _result(), "ids": ("a", "b")}))
+
+    assert restored == {"result": _result(), "ids": ["a", "b"]}
+    assert isinstance(restored["result"].scores[0], CentralityScore)
+
+
+def test_serialization_rejects_foreign_dataclass_tags():
+    payload = b'{"__dataclass__":"os:PathLike","fields":{}}'
+
+    with pytest.raises(ValueError):
+        serialization.loads(payload)
+
+
+def test_lru_evicts_least_recently_used_by_bytes():
+    cache = LruBytesCache(max_bytes=10)
+    cache.set("a", b"1234", 60)
+    cache.set("b", b"1234", 60)
+    assert cache.get("a") == b"1234"
+
+    cache.set("c", b"1234", 60)
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+    assert cache.size_bytes == 8
+
+
+@pytest.mark.asyncio
+async def test_l1_serves_repeat_reads_and_returns_fresh_copies():
+    redis = FakeRedis()
+    cache = RedisPreviewCache(client=redis, l1_max_bytes=1024, l1_ttl_seconds=30)
+
+    await cache.set("k", _result(), 300)
+    first = await cache.get("k")
+    first.execution_time_ms = 1.0
+    second = await cache.get("k")
+
+    assert redis.gets == 0
+    assert second == _result()
+    assert "kg:query:k" in redis.store
+
+
+@pytest.mark.asyncio
+async def test_reads_through_to_redis_and_fills_l1():
+    redis = FakeRedis()
+    await RedisPreviewCache(client=redis, l1_max_bytes=0).set("k", _result(), 300)
+    cache = RedisPreviewCache(client=redis, l1_max_bytes=1024)
+
+    assert await cache.get("k") == _result()
+    assert await cache.get("k") == _result()
+    assert redis.gets == 1
+    assert await cache.get("missing") is None
+
+
+@pytest.mark.asyncio
+async def test_redis_failures_degrade_to_miss():
+    cache = RedisPreviewCache(client=FakeRedis(fail=True), l1_max_bytes=0)
+
+    await cache.set("k", _result(), 300)
+
+    assert await cache.get("k") is None
@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import pytest
+
+from src.infrastructure.cache.graph_version import InMemoryGraphVersionStore
+from src.infrastructure.persistence.neo4j import cypher_queries as queries
+from src.infrastructure.persistence.neo4j.score_materializer import MATERIALIZE_TASK, ScoreMaterializer
+from src.infrastructure.queue.local_queue import LocalTaskQueue
+
+
+class MarkerClient:
+    """只模拟 ScoreMaterialization 标记节点"""
+
+    markers: dict[str, int] = {}
+    reads: list[str] = []
+
+    @classmethod
+    async def execute_read(cls, query, parameters=None):
+        cls.reads.append(query)
+        if query == queries.GET_SCORE_MATERIALIZATION:
+            version = cls.markers.get(parameters["project_id"])
+            return [] if version is None else [{"graph_version": version, "computed_at": None}]
+        if query == queries.LIST_SCORE_MATERIALIZATIONS:
+            return [{"project_id": p, "graph_version": v, "computed_at": None} for p, v in cls.markers.items()]
+        if query == queries.TOP_ENTITIES_BY_PAGERANK:
+            return [{"entity_id": "a", "name": "A", "entity_type": "PERSON", "score": 2.5}]
+        return []
+
+    @classmethod
+    async def execute_write(cls, query, parameters=None):
+        if query == queries.SET_SCORE_MATERIALIZATION:
+            cls.markers[parameters["project_id"]] = parameters["graph_version"]
+        return []
+
+
+class FakeRunner:
+    def __init__(self):
+        self.calls = []
+
+    async def write_scores(self, project_id, computed_at):
+        self.calls.append(project_id)
+        return 3
+
+
+@pytest.fixture
+def materializer():
+    MarkerClient.markers = {}
+    MarkerClient.reads = []
+    return ScoreMaterializer(
+        MarkerClient,
+        InMemoryGraphVersionStore(),
+        queue=LocalTaskQueue(),
+        runner=FakeRunner(),
+        write_threshold=3,
+        shared_versions=True,
+    )
+
+
+@pytest.mark.asyncio
+async def test_materialize_skips_when_marker_matches_graph_version(materializer):
+    await materializer._versions.bump("p1")
+
+    summary = await materializer.materialize("p1")
+    again = await materializer.materialize("p1")
+    forced = await materializer.materialize("p1", force=True)
+
+    assert summary["graph_version"] == 1 and summary["entities"] == 3
+    assert again is None and forced is not None
+    assert materializer._runner.calls == ["p1", "p1"]
+    assert MarkerClient.markers == {"p1": 1}
+
+
+@pytest.mark.asyncio
+async def test_write_threshold_enqueues_once_per_threshold(materializer):
+    for version in range(1, 8):
+        await materializer.notify_write("p1", version)
+
+    assert materializer._queue._tasks == [
+        (MATERIALIZE_TASK, {"project_id": "p1", "graph_version": 3}),
+        (MATERIALIZE_TASK, {"project_id": "p1", "graph_version": 6}),
+    ]
+    # 达到阈值前不读取标记节点
+    assert MarkerClient.reads.count(queries.GET_SCORE_MATERIALIZATION) == 2
+
+
+@pytest.mark.asyncio
+async def test_write_threshold_counts_from_marker_written_by_other_process(materializer):
+    MarkerClient.markers["p1"] = 2
+
+    await materializer.notify_write("p1", 3)
+    await materializer.notify_write("p1", 5)
+
+    assert materializer._queue._tasks == [(MATERIALIZE_TASK, {"project_id": "p1", "graph_version": 5})]
+
+
+@pytest.mark.asyncio
+async def test_reads_return_none_until_materialized(materializer):
+    assert await materializer.top_entities("p1", "pagerank", 10) is None
+    assert await materializer.communities("p1") is None
+
+    MarkerClient.markers["p1"] = 0
+    rows = await materializer.top_entities("p1", "pagerank", 10)
+
+    assert rows[0]["entity_id"] == "a"
+    assert await materializer.top_entities("p1", "degree", 10) is None
+
+
+@pytest.mark.asyncio
+async def test_stale_projects_compare_marker_with_graph_version(materializer):
+    MarkerClient.markers = {"p1": 0, "p2": 0}
+    await materializer._versions.bump("p2")
+
+    assert await materializer.stale_projects() == ["p2"]
+
+
+@pytest.mark.asyncio
+async def test_unshared_versions_never_refresh_by_current_version():
+    MarkerClient.markers = {"p1": 4}
+    materializer = ScoreMaterializer(MarkerClient, InMemoryGraphVersionStore(), runner=FakeRunner())
+
+    assert await materializer.stale_projects() == []
+    assert await materializer.materialize("p1") is None
+    assert await materializer.materialize("p1", graph_version=5) is not None
+    assert MarkerClient.markers == {"p1": 5}
@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from src.infrastructure.compute import call_with_shared, share_arrays
+
+
+def total(values, offsets):
+    return values[offsets].sum()
+
+
+def scribble(values):
+    values[0] = 1
+
+
+def test_arrays_round_trip_through_shared_memory():
+    values = np.arange(10, dtype=np.float64)
+    offsets = np.array([1, 3, 5], dtype=np.int64)
+
+    with share_arrays(values, offsets, np.empty(0, dtype=np.int32)) as handles:
+        assert call_with_shared(total, handles[:2]) == 9.0
+        assert handles[2].shape == (0,)
+
+
+def test_shared_arrays_are_read_only_in_workers():
+    with share_arrays(np.zeros(3)) as handles:
+        with pytest.raises(ValueError):
+            call_with_shared(scribble, handles)
@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from src.config import settings
+from src.infrastructure.cache.graph_version import InMemoryGraphVersionStore
+from src.infrastructure.persistence.neo4j.adjacency_snapshot import AdjacencySnapshot
+from src.infrastructure.persistence.neo4j.tile_index import (
+    TileIndex,
+    TileIndexStore,
+    TileIndexUnavailableError,
+)
+
+
+def _star_graph(version: int, leaves: int = 30, hubs: int = 4):
+    edges = []
+    for h in range(hubs):
+        for i in range(leaves):
+            edges.append((f"hub{h}", f"leaf{h}-{i}", f"r{h}-{i}", "OWNS"))
+        edges.append((f"hub{h}", f"hub{(h + 1) % hubs}", f"ring{h}", "OWNS"))
+    return AdjacencySnapshot.from_edges("p1", version, edges)
+
+
+class FakeSnapshots:
+    def __init__(self, snapshot=None):
+        self.snapshot = snapshot
+        self.calls = 0
+
+    async def get(self, project_id):
+        self.calls += 1
+        return self.snapshot
+
+
+@pytest.fixture(autouse=True)
+def in_thread_layout(mocker):
+    mocker.patch.object(settings, "graph_compute_workers", 0)
+    mocker.patch.object(settings, "graph_layout_iterations", 20)
+
+
+def _store(snapshots, tmp_path=None, versions=None):
+    return TileIndexStore(
+        snapshots=snapshots,
+        versions=versions or InMemoryGraphVersionStore(),
+        directory=tmp_path,
+        capacity=8,
+    )
+
+
+@pytest.mark.asyncio
+async def test_tiles_partition_nodes_and_cap_each_tile():
+    store = _store(FakeSnapshots(_star_graph(0)))
+    index = await store.get("p1")
+
+    root = index.tile(0, 0, 0, max_edges=1000)
+    assert len(root.node_ids) == 8
+    assert {f"hub{h}" for h in range(4)} <= set(root.node_ids)
+    assert all(source in root.node_ids and target in root.node_ids for source, target in root.edges)
+
+    z = index.max_zoom
+    seen = []
+    for x in range(1 << z):
+        for y in range(1 << z):
+            tile = index.tile(z, x, y, max_edges=1000)
+            assert len(tile.node_ids) <= 8 or z == 16
+            seen.extend(tile.node_ids)
+    assert sorted(seen) == sorted(set(seen)) and len(seen) == index.node_count == 124
+
+
+@pytest.mark.asyncio
+async def test_edges_are_truncated_to_the_limit():
+    index = await _store(FakeSnapshots(_star_graph(0))).get("p1")
+
+    tile = index.tile(index.max_zoom + 2, 0, 0, max_edges=1)
+
+    assert len(tile.edges) <= 1
+
+
+@pytest.mark.asyncio
+async def test_index_is_persisted_and_stale_index_rebuilds_in_background(tmp_path):
+    versions = InMemoryGraphVersionStore()
+    snapshots = FakeSnapshots(_star_graph(0))
+    first = await _store(snapshots, tmp_path, versions).get("p1")
+    assert (tmp_path / "p1.npz").exists()
+
+    # 新进程从磁盘加载，不再读取快照
+    reloaded_store = _store(snapshots, tmp_path, versions)
+    reloaded = await reloaded_store.get("p1")
+    assert snapshots.calls == 1
+    assert np.array_equal(reloaded.x, first.x) and np.array_equal(reloaded.node_keys, first.node_keys)
+
+    await versions.bump("p1")
+    snapshots.snapshot = _star_graph(1, leaves=31)
+    stale = await reloaded_store.get("p1")
+    assert stale.version == 0
+    await reloaded_store._rebuilding["p1"]
+    rebuilt = await reloaded_store.get("p1")
+    assert rebuilt.version == 1 and rebuilt.node_count == 128
+
+    # 热启动：原有节点基本保持在原来的位置
+    old = dict(zip(first.node_keys.tolist(), zip(first.x.tolist(), first.y.tolist())))
+    moved = [
+        np.hypot(x - old[key][0], y - old[key][1])
+        for key, x, y in zip(rebuilt.node_keys.tolist(), rebuilt.x.tolist(), rebuilt.y.tolist())
+        if key in old
+    ]
+    assert np.median(moved) < first.size / 4
+
+
+def test_load_rejects_other_formats(tmp_path):
+    np.savez(tmp_path / "p1.npz", meta=np.array('{"format": 0}'))
+
+    with pytest.raises(ValueError):
+        TileIndex.load(tmp_path / "p1.npz")
+
+
+@pytest.mark.asyncio
+async def test_projects_without_snapshot_are_unavailable():
+    with pytest.raises(TileIndexUnavailableError):
+        await _store(FakeSnapshots(None)).get("p1")
+
+
+class BrokenVersions:
+    async def get(self, project_id):
+        raise ConnectionError("redis down")
+
+
+@pytest.mark.asyncio
+async def test_version_lookup_failure_serves_index_without_rebuild():
+    store = _store(FakeSnapshots(_star_graph(0)), versions=BrokenVersions())
+
+    index = await store.get("p1")
+
+    assert index.node_count == 124
+    assert await store.get("p1") is index
+    assert store._rebuilding == {}
+
+
+@pytest.mark.asyncio
+async def test_unsafe_project_id_is_not_persisted(tmp_path):
+    directory = tmp_path / "tiles"
+    directory.mkdir()
+
+    index = await _store(FakeSnapshots(_star_graph(0)), directory).get("../escape")
+
+    assert index.node_count == 124
+    assert list(tmp_path.iterdir()) == [directory] and list(directory.iterdir()) == []
+
+
+@pytest.mark.asyncio
+async def test_corrupt_index_file_is_rebuilt(tmp_path):
+    (tmp_path / "p1.npz").write_bytes(b"not a zip archive")
+    snapshots = FakeSnapshots(_star_graph(0))
+
+    index = await _store(snapshots, tmp_path).get("p1")
+
+    assert snapshots.calls == 1 and index.node_count == 124
+    assert TileIndex.load(tmp_path / "p1.npz").node_count == 124
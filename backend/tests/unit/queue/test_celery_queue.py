@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from src.infrastructure.queue.celery_queue import CeleryTaskQueue
+
+
+class RecordingCelery:
+    def __init__(self) -> None:
+        self.calls = []
+
+    def send_task(self, name, kwargs=None):
+        self.calls.append((name, kwargs, threading.current_thread()))
+        return SimpleNamespace(id="task-1")
+
+
+@pytest.mark.asyncio
+async def test_enqueue_sends_task_off_the_event_loop_thread():
+    celery = RecordingCelery()
+
+    task_id = await CeleryTaskQueue(celery).enqueue("scores.materialize", {"project_id": "p1"})
+
+    assert task_id == "task-1"
+    name, kwargs, thread = celery.calls[0]
+    assert (name, kwargs) == ("scores.materialize", {"project_id": "p1"})
+    assert thread is not threading.main_thread()
@@ -0,0 +1,20 @@
+from __future__ import annotations
+
+import asyncio
+
+from src.infrastructure.queue.tasks import score_task
+
+
+def test_tasks_share_one_event_loop_per_worker_process(mocker):
+    mocker.patch.object(score_task, "_loop", None)
+
+    async def current_loop():
+        return asyncio.get_running_loop()
+
+    first = score_task._run(current_loop())
+    second = score_task._run(current_loop())
+
+    assert first is second and not first.is_closed()
+    first.close()
+    assert score_task._run(current_loop()) is not first
+    score_task._loop.close()